@@ -6,7 +6,7 @@ from flask import request, current_app, g
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import or_, and_
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from models import (
     Admin, User, UserProfile, AdminLevel, SystemConfig,
@@ -24,7 +24,9 @@ from utils.responses import (
     forbidden_response, validation_error_response
 )
 from utils.decorators import require_permission, rate_limit
-from utils.pagination import paginate_query
+from utils.pagination import paginate, InvalidCursorError
+from utils.logger import get_performance_logger
+from services.dashboard_metrics import get_dashboard_snapshot
 
 # 创建命名空间
 admins_ns = Namespace('admins', description='管理员相关操作')
@@ -438,6 +440,8 @@ class AuditLogsResource(Resource):
             end_date = request.args.get('end_date')
             page = int(request.args.get('page', 1))
             per_page = int(request.args.get('per_page', 50))
+            cursor = request.args.get('cursor')
+            count_mode = request.args.get('count')
 
             query = AuditLog.query
 
@@ -453,11 +457,18 @@ class AuditLogsResource(Resource):
                 end_datetime = datetime.combine(end_date, datetime.max.time())
                 query = query.filter(AuditLog.timestamp <= end_datetime)
 
-            # 排序
-            query = query.order_by(AuditLog.timestamp.desc())
-
-            # 分页
-            pagination = paginate_query(query, page, per_page)
+            # 按时间倒序分页（携带cursor参数时使用键集分页）
+            pagination = paginate(
+                query,
+                AuditLog.timestamp,
+                AuditLog.id,
+                page=page,
+                per_page=per_page,
+                cursor=cursor,
+                sort_key='timestamp',
+                descending=True,
+                count_mode=count_mode
+            )
             logs = pagination.items
 
             # 序列化
@@ -485,14 +496,47 @@ class AuditLogsResource(Resource):
 
             response_data = {
                 'logs': logs_data,
-                'total': pagination.total,
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'pages': pagination.pages
+                **pagination.to_meta()
             }
 
             return success_response("获取审计日志成功", response_data)
 
+        except InvalidCursorError as e:
+            return error_response(str(e), 400)
+        except Exception as e:
+            return error_response(str(e), 500)
+
+@admins_ns.route('/performance/queries')
+class AdminTopQueriesResource(Resource):
+    @jwt_required()
+    @admins_ns.doc('get_top_queries')
+    @admins_ns.param('limit', '返回数量', type=int, default=20)
+    @admins_ns.param('order_by', '排序字段', enum=['total_time', 'count', 'avg_time', 'max_time'], default='total_time')
+    @require_permission('system_config')
+    def get(self):
+        """获取SQL语句执行排行"""
+        try:
+            limit = min(request.args.get('limit', 20, type=int), 100)
+            order_by = request.args.get('order_by', 'total_time')
+            if order_by not in ('total_time', 'count', 'avg_time', 'max_time'):
+                return error_response("无效的排序字段", 400)
+
+            top_queries = get_performance_logger().get_top_queries(limit=limit, order_by=order_by)
+
+            return success_response("获取SQL统计成功", top_queries)
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+    @jwt_required()
+    @admins_ns.doc('reset_top_queries')
+    @require_permission('system_config')
+    def delete(self):
+        """清空SQL统计"""
+        try:
+            get_performance_logger().reset_query_stats()
+            return success_response("SQL统计已清空")
+
         except Exception as e:
             return error_response(str(e), 500)
 
@@ -659,73 +703,50 @@ class AdminNotificationResource(Resource):
 # 辅助函数
 def get_system_overview():
     """获取系统概览"""
-    from models import User, Student, Teacher, Course, Enrollment
+    metrics = get_dashboard_snapshot()
 
     return {
-        'total_users': User.query.count(),
-        'active_users': User.query.filter_by(status='active').count(),
-        'total_students': Student.query.count(),
-        'active_students': Student.query.filter_by(academic_status='enrolled').count(),
-        'total_teachers': Teacher.query.count(),
-        'active_teachers': Teacher.query.filter_by(status='active').count(),
-        'total_courses': Course.query.count(),
-        'active_courses': Course.query.filter_by(status='active').count(),
-        'total_enrollments': Enrollment.query.count(),
-        'active_enrollments': Enrollment.query.filter_by(status='enrolled').count()
+        'total_users': metrics['users']['total'],
+        'active_users': metrics['users']['active'],
+        'total_students': metrics['students']['total'],
+        'active_students': metrics['students']['active'],
+        'total_teachers': metrics['teachers']['total'],
+        'active_teachers': metrics['teachers']['active'],
+        'total_courses': metrics['courses']['total'],
+        'active_courses': metrics['courses']['active'],
+        'total_enrollments': metrics['enrollments']['total'],
+        'active_enrollments': metrics['enrollments']['active']
     }
 
 def get_user_statistics():
     """获取用户统计"""
-    from models import User, UserRole
+    metrics = get_dashboard_snapshot()
 
     return {
-        'by_role': {
-            role.value: User.query.filter_by(role=role).count()
-            for role in UserRole
-        },
-        'by_status': {
-            'active': User.query.filter_by(status='active').count(),
-            'inactive': User.query.filter_by(status='inactive').count(),
-            'suspended': User.query.filter_by(status='suspended').count()
-        },
-        'recent_registrations': User.query.filter(
-            User.created_at >= datetime.utcnow() - timedelta(days=7)
-        ).count()
+        'by_role': metrics['users']['by_role'],
+        'by_status': metrics['users']['by_status'],
+        'recent_registrations': metrics['users']['new_this_week']
     }
 
 def get_academic_statistics():
     """获取学业统计"""
-    from models import Student, Course, Enrollment, Grade
+    metrics = get_dashboard_snapshot()
 
     return {
         'student_stats': {
-            'by_academic_status': {
-                status.value: Student.query.filter_by(academic_status=status).count()
-                for status in Student._status_enum_
-            },
-            'by_grade': {},
-            'by_major': {}
+            'by_academic_status': metrics['students']['by_academic_status'],
+            'by_grade': metrics['students']['by_grade'],
+            'by_major': metrics['students']['by_major']
         },
         'course_stats': {
-            'by_type': {
-                type.value: Course.query.filter_by(course_type=type).count()
-                for type in Course._course_type_enum_
-            },
-            'by_status': {
-                status.value: Course.query.filter_by(status=status).count()
-                for status in Course._course_status_enum_
-            }
+            'by_type': metrics['courses']['by_type'],
+            'by_status': metrics['courses']['by_status']
         },
         'enrollment_stats': {
-            'by_status': {
-                status.value: Enrollment.query.filter_by(status=status).count()
-                for status in Enrollment._status_enum_
-            }
+            'by_status': metrics['enrollments']['by_status']
         },
         'grade_stats': {
-            'average_gpa': db.session.query(func.avg(Student.gpa)).filter(
-                Student.gpa.isnot(None)
-            ).scalar() or 0
+            'average_gpa': metrics['students']['average_gpa']
         }
     }
 
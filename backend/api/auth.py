@@ -16,13 +16,14 @@ from models import User, UserRole, AuditLog, AuditAction, UserProfile
 from schemas import UserSchema, UserLoginSchema, UserPasswordChangeSchema, UserPasswordResetSchema, UserRegisterSchema, UserUpdateSchema
 from extensions import db, redis_client
 from utils.auth import (
-    verify_password, generate_password_hash,
+    verify_password, verify_user_password, generate_password_hash,
     check_login_attempts, record_login_attempt,
-    revoke_token, is_token_revoked
+    revoke_token, revoke_all_tokens, is_token_revoked
 )
+from utils.password_hashing import PasswordHashingBusy
 from utils.responses import success_response, error_response, validation_error_response
 from utils.decorators import rate_limit
-from utils.captcha import generate_captcha_image, verify_captcha
+from utils.captcha import delete_captcha, generate_captcha_image, store_captcha, verify_captcha
 from marshmallow import ValidationError
 
 # 创建命名空间
@@ -92,8 +93,8 @@ class LoginResource(Resource):
                     return error_response("账户已被锁定，请稍后再试", 423)
                 return error_response("账户状态异常", 403)
 
-            # 验证密码
-            if not verify_password(data['password'], user.password_hash):
+            # 验证密码（哈希算法或参数变化时顺带升级，随登录信息一起保存）
+            if not verify_user_password(user, data['password']):
                 user.record_failed_login()
                 AuditLog.log_login(user.id, user.username, False, "密码错误")
                 return error_response("用户名或密码错误", 401)
@@ -136,6 +137,8 @@ class LoginResource(Resource):
 
             return success_response("登录成功", response_data)
 
+        except PasswordHashingBusy as e:
+            return error_response(str(e), 503, 'SERVICE_BUSY')
         except Exception as e:
             return error_response(str(e), 500)
 
@@ -147,14 +150,10 @@ class LogoutResource(Resource):
         """用户登出"""
         try:
             current_user_id = get_jwt_identity()
-            jti = get_jwt()['jti']
+            claims = get_jwt()
 
-            # 将令牌加入黑名单
-            redis_client.set(
-                f"revoked_token:{jti}",
-                "true",
-                ex=current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
-            )
+            # 将令牌加入黑名单（在令牌过期时自动删除）
+            revoke_token(claims['jti'], claims['exp'])
 
             # 记录登出
             AuditLog.log_action(
@@ -363,6 +362,9 @@ class ConfirmResetPasswordResource(Resource):
             # 删除重置令牌
             redis_client.delete(reset_token_key)
 
+            # 重置密码后之前签发的令牌全部失效
+            revoke_all_tokens(user.id)
+
             # 记录密码重置
             AuditLog.log_action(
                 action=AuditAction.PASSWORD_CHANGE,
@@ -405,9 +407,9 @@ class CheckTokenResource(Resource):
     def get(self):
         """检查令牌有效性"""
         try:
-            jti = get_jwt()['jti']
+            claims = get_jwt()
 
-            if is_token_revoked(jti):
+            if is_token_revoked(claims['jti'], claims.get('sub'), claims.get('gen', 0)):
                 return error_response("令牌已失效", 401)
 
             current_user_id = get_jwt_identity()
@@ -439,7 +441,7 @@ class RegisterResource(Resource):
 
             # 验证验证码
             captcha_id = request.json.get('captcha_id')
-            if not captcha_id or not verify_captcha(captcha_id, data['captcha'], redis_client):
+            if not captcha_id or not verify_captcha(captcha_id, data['captcha']):
                 return error_response("验证码错误", 400)
 
             # 检查注册限制
@@ -491,7 +493,7 @@ class RegisterResource(Resource):
             redis_client.setex(registration_key, 3600, (int(registration_count or 0) + 1))
 
             # 删除已使用的验证码
-            redis_client.delete(f"captcha:{captcha_id}")
+            delete_captcha(captcha_id)
 
             return success_response("注册成功", {
                 'user_id': user.id,
@@ -501,6 +503,9 @@ class RegisterResource(Resource):
 
         except ValidationError as e:
             return validation_error_response(e.messages)
+        except PasswordHashingBusy as e:
+            db.session.rollback()
+            return error_response(str(e), 503, 'SERVICE_BUSY')
         except Exception as e:
             db.session.rollback()
             return error_response(str(e), 500)
@@ -511,11 +516,11 @@ class CaptchaResource(Resource):
     def get(self):
         """获取验证码"""
         try:
-            # 生成验证码
+            # 从预生成池中取出验证码
             captcha_data = generate_captcha_image()
 
-            # 存储验证码到Redis（5分钟有效）
-            captcha_id = store_captcha(captcha_data, redis_client, expire_time=300)
+            # 存储验证码（5分钟有效）
+            captcha_id = store_captcha(captcha_data, expire_time=current_app.config.get('CAPTCHA_EXPIRE_TIME', 300))
 
             return success_response("验证码生成成功", {
                 'captcha_id': captcha_id,
@@ -17,12 +17,13 @@ from schemas import (
     CourseSearchSchema
 )
 from extensions import db
+from models.loading_profiles import apply_loading_profile
 from utils.responses import (
     success_response, error_response, not_found_response,
     forbidden_response, validation_error_response
 )
 from utils.decorators import require_permission, rate_limit
-from utils.pagination import paginate_query
+from utils.pagination import paginate, InvalidCursorError
 
 # 创建命名空间
 courses_ns = Namespace('courses', description='课程管理相关操作')
@@ -90,6 +91,8 @@ course_search_model = courses_ns.model('CourseSearch', {
     'credits_max': fields.Float(description='学分最大值'),
     'page': fields.Integer(description='页码', default=1),
     'per_page': fields.Integer(description='每页数量', default=20),
+    'cursor': fields.String(description='分页游标（传空字符串获取第一页，之后传next_cursor）'),
+    'count': fields.String(description='总数统计方式', enum=['exact', 'estimated', 'cached', 'none']),
     'sort_by': fields.String(description='排序字段', default='course_code'),
     'sort_order': fields.String(description='排序方式', default='asc')
 })
@@ -161,13 +164,22 @@ class CourseListResource(Resource):
             }
 
             sort_field = sort_field_map.get(data['sort_by'], Course.course_code)
-            if data['sort_order'] == 'desc':
-                sort_field = sort_field.desc()
 
-            query = query.order_by(sort_field)
-
-            # 分页
-            pagination = paginate_query(query, data['page'], data['per_page'])
+            # 预加载授课教师
+            query = apply_loading_profile(query, Course, 'list')
+
+            # 分页（携带cursor参数时使用键集分页）
+            pagination = paginate(
+                query,
+                sort_field,
+                Course.id,
+                page=data['page'],
+                per_page=data['per_page'],
+                cursor=data.get('cursor'),
+                sort_key=data['sort_by'],
+                descending=data['sort_order'] == 'desc',
+                count_mode=data.get('count')
+            )
             courses = pagination.items
 
             # 序列化
@@ -176,14 +188,13 @@ class CourseListResource(Resource):
 
             response_data = {
                 'courses': course_data,
-                'total': pagination.total,
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'pages': pagination.pages
+                **pagination.to_meta()
             }
 
             return success_response("获取课程列表成功", response_data)
 
+        except InvalidCursorError as e:
+            return error_response(str(e), 400)
         except Exception as e:
             return error_response(str(e), 500)
 
@@ -471,20 +482,20 @@ class CourseGradesResource(Resource):
             if not (is_teacher or g.current_user.has_permission('grade_management')):
                 return forbidden_response("权限不足")
 
-            # 获取成绩统计
+            # 获取成绩统计（期末成绩，在数据库中聚合）
+            statistics = course.get_grade_statistics('final')
             grades_info = {
                 'total_students': len(course.enrollments),
                 'class_average': course.calculate_class_average('final'),
                 'grade_distribution': course.get_grade_distribution('final'),
-                'pass_rate': 0
+                'pass_rate': statistics['pass_rate'],
+                'std_deviation': statistics['std_deviation'],
+                'median_score': statistics['median'],
+                'percentiles': statistics['percentiles'],
+                'score_histogram': statistics['histogram'],
+                'letter_distribution': statistics['grade_distribution']
             }
 
-            # 计算及格率
-            final_grades = course.get_final_grades()
-            if final_grades:
-                pass_count = sum(1 for grade in final_grades if grade.is_passing)
-                grades_info['pass_rate'] = (pass_count / len(final_grades)) * 100
-
             return success_response("获取课程成绩统计成功", grades_info)
 
         except Exception as e:
@@ -19,13 +19,14 @@ from schemas import (
     GradeSearchSchema
 )
 from extensions import db
+from models.loading_profiles import apply_loading_profile
 from utils.responses import (
     success_response, error_response, not_found_response,
     forbidden_response, validation_error_response,
     make_file_response
 )
 from utils.decorators import require_permission, rate_limit
-from utils.pagination import paginate_query
+from utils.pagination import paginate, InvalidCursorError
 from utils.file_upload import save_uploaded_file, validate_file_type
 
 # 创建命名空间
@@ -67,6 +68,8 @@ grade_search_model = grades_ns.model('GradeSearch', {
     'is_published': fields.Boolean(description='是否已发布'),
     'page': fields.Integer(description='页码', default=1),
     'per_page': fields.Integer(description='每页数量', default=20),
+    'cursor': fields.String(description='分页游标（传空字符串获取第一页，之后传next_cursor）'),
+    'count': fields.String(description='总数统计方式', enum=['exact', 'estimated', 'cached', 'none']),
     'sort_by': fields.String(description='排序字段', default='created_at'),
     'sort_order': fields.String(description='排序方式', default='desc')
 })
@@ -154,13 +157,22 @@ class GradeListResource(Resource):
             }
 
             sort_field = sort_field_map.get(data['sort_by'], Grade.created_at)
-            if data['sort_order'] == 'desc':
-                sort_field = sort_field.desc()
 
-            query = query.order_by(sort_field)
-
-            # 分页
-            pagination = paginate_query(query, data['page'], data['per_page'])
+            # 预加载序列化所需关联，复用已有的Student/Course连接
+            query = apply_loading_profile(query, Grade, 'list', contains=('student', 'course'))
+
+            # 分页（携带cursor参数时使用键集分页）
+            pagination = paginate(
+                query,
+                sort_field,
+                Grade.id,
+                page=data['page'],
+                per_page=data['per_page'],
+                cursor=data.get('cursor'),
+                sort_key=data['sort_by'],
+                descending=data['sort_order'] == 'desc',
+                count_mode=data.get('count')
+            )
             grades = pagination.items
 
             # 序列化
@@ -169,14 +181,13 @@ class GradeListResource(Resource):
 
             response_data = {
                 'grades': grade_data,
-                'total': pagination.total,
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'pages': pagination.pages
+                **pagination.to_meta()
             }
 
             return success_response("获取成绩列表成功", response_data)
 
+        except InvalidCursorError as e:
+            return error_response(str(e), 400)
         except Exception as e:
             return error_response(str(e), 500)
 
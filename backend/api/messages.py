@@ -18,12 +18,13 @@ from schemas import (
     MessageTemplateCreateSchema, MessageSendSchema
 )
 from extensions import db
+from models.loading_profiles import apply_loading_profile
 from utils.responses import (
     success_response, error_response, validation_error_response,
     not_found_response, forbidden_response
 )
 from utils.decorators import require_permission, rate_limit
-from utils.pagination import paginate_query
+from utils.pagination import paginate, InvalidCursorError
 from utils.email import send_email_notification
 
 # 创建命名空间
@@ -65,6 +66,8 @@ message_search_model = messages_ns.model('MessageSearch', {
     'end_date': fields.Date(description='结束日期'),
     'page': fields.Integer(description='页码', default=1),
     'per_page': fields.Integer(description='每页数量', default=20),
+    'cursor': fields.String(description='分页游标（传空字符串获取第一页，之后传next_cursor）'),
+    'count': fields.String(description='总数统计方式', enum=['exact', 'estimated', 'cached', 'none']),
     'sort_by': fields.String(description='排序字段', default='sent_at'),
     'sort_order': fields.String(description='排序方式', default='desc')
 })
@@ -133,13 +136,22 @@ class MessageListResource(Resource):
 
             # 排序
             sort_field = getattr(Message, data['sort_by'], Message.sent_at)
-            if data['sort_order'] == 'desc':
-                sort_field = sort_field.desc()
 
-            query = query.order_by(sort_field)
-
-            # 分页
-            pagination = paginate_query(query, data['page'], data['per_page'])
+            # 预加载发送者和接收者资料
+            query = apply_loading_profile(query, Message, 'list')
+
+            # 分页（携带cursor参数时使用键集分页）
+            pagination = paginate(
+                query,
+                sort_field,
+                Message.id,
+                page=data['page'],
+                per_page=data['per_page'],
+                cursor=data.get('cursor'),
+                sort_key=data['sort_by'],
+                descending=data['sort_order'] == 'desc',
+                count_mode=data.get('count')
+            )
             messages = pagination.items
 
             # 序列化
@@ -154,15 +166,14 @@ class MessageListResource(Resource):
 
             response_data = {
                 'messages': message_data,
-                'total': pagination.total,
                 'unread_count': unread_count,
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'pages': pagination.pages
+                **pagination.to_meta()
             }
 
             return success_response("获取消息列表成功", response_data)
 
+        except InvalidCursorError as e:
+            return error_response(str(e), 400)
         except Exception as e:
             return error_response(str(e), 500)
 
@@ -1,15 +1,31 @@
-from flask import request, current_app, send_file
+from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
-from sqlalchemy import func, desc, or_, and_, extract
-from datetime import datetime, timedelta
-import io
-import csv
-import json
-
-from ..models import User, Student, Teacher, Course, Enrollment, Grade, AuditLog, db
-from ..utils.responses import success_response, error_response
+from sqlalchemy import func, desc, or_, and_, extract, select
+from sqlalchemy.orm import aliased
+from datetime import datetime
+
+from ..models import User, UserProfile, Student, Teacher, Course, Enrollment, Grade, db
+from ..models.enrollment import EnrollmentStatus
+from ..models.grade import GradeType
+from ..models.teacher import TeacherStatus
+from ..models.user import display_name_expression
+from ..models.grading_scale import get_grading_scale, grade_percentage
+from ..models.report_rollups import get_course_semester_series, get_department_semester_series, get_daily_series
+from ..utils.responses import success_response, error_response, make_streaming_file_response
+from ..utils.export_stream import EXPORT_FORMATS, export_chunks, iter_query, query_fields, row_to_dict
+from ..utils.columnar_export import COLUMNAR_FORMATS, columnar_available, columnar_chunks
+from ..utils.report_compute import compute_grade_report, compute_teacher_report
+from ..utils.report_document import DOCUMENT_FORMATS
+from ..services.dashboard_metrics import get_dashboard_snapshot
+from ..services.report_cache import get_cached_report
+from ..services.term_report import (
+    TERM_REPORT_SECTIONS, get_term_report_file, get_term_report_job, start_term_report_job
+)
+from ..services.report_service import (
+    build_enrollment_export_query, build_grade_export_query, build_teacher_export_query
+)
 from ..utils.decorators import require_permission
 from ..schemas.student import StudentSchema
 from ..schemas.teacher import TeacherSchema
@@ -29,16 +45,35 @@ report_filter_model = api.model('ReportFilter', {
 
 export_model = api.model('ExportData', {
     'report_type': fields.String(required=True, description='报表类型'),
-    'format': fields.String(required=True, description='导出格式 (csv/json/excel)'),
+    'format': fields.String(required=True, description='导出格式 (csv/json/ndjson/xlsx/parquet/arrow)'),
     'filters': fields.Raw(description='筛选条件')
 })
 
+term_report_model = api.model('TermReportRequest', {
+    'semester': fields.String(description='学期筛选'),
+    'department': fields.String(description='院系筛选'),
+    'sections': fields.List(fields.String, description='分节 (overview/departments/courses/teachers)，默认全部'),
+    'formats': fields.List(fields.String, description='输出格式 (json/xlsx/pdf)，默认 json+xlsx'),
+    'timeout': fields.Integer(description='时限（秒），超时输出已完成的分节')
+})
+
+# XLSX导出工作表名
+EXPORT_SHEET_NAMES = {
+    'enrollments': '选课记录',
+    'grades': '成绩记录',
+    'teachers': '教师信息'
+}
+
 # 初始化Schema
 student_schema = StudentSchema()
 students_schema = StudentSchema(many=True)
 teacher_schema = TeacherSchema()
 teachers_schema = TeacherSchema(many=True)
 
+def _refresh_arg():
+    """?refresh=1/true/yes 时跳过缓存重新计算（type=bool 会把 'false'、'0' 也当作真）"""
+    return request.args.get('refresh', '').strip().lower() in ('1', 'true', 'yes')
+
 @api.route('/dashboard')
 class DashboardStats(Resource):
     @api.doc('get_dashboard_stats')
@@ -47,99 +82,43 @@ class DashboardStats(Resource):
     def get(self):
         """获取仪表板统计数据"""
         try:
-            # 基础统计
-            total_students = Student.query.filter_by(is_active=True).count()
-            total_teachers = Teacher.query.filter_by(is_active=True).count()
-            total_courses = Course.query.filter_by(is_active=True).count()
-            total_enrollments = Enrollment.query.count()
-
-            # 本月新增统计
-            current_month = datetime.utcnow().replace(day=1)
-            new_students_this_month = Student.query.filter(
-                Student.created_at >= current_month,
-                Student.is_active == True
-            ).count()
-
-            new_teachers_this_month = Teacher.query.filter(
-                Teacher.created_at >= current_month,
-                Teacher.is_active == True
-            ).count()
-
-            # 课程统计
-            active_courses = Course.query.filter_by(is_active=True).count()
-            full_courses = db.session.query(Course.id)\
-                                     .join(Enrollment)\
-                                     .group_by(Course.id)\
-                                     .having(func.count(Enrollment.id) >= Course.capacity)\
-                                     .count()
-
-            # 成绩统计
-            grade_stats = db.session.query(
-                func.avg(Grade.score).label('avg_score'),
-                func.min(Grade.score).label('min_score'),
-                func.max(Grade.score).label('max_score'),
-                func.count(Grade.id).label('total_grades')
-            ).first()
-
-            # 在读学生按年级分布
-            student_by_grade = db.session.query(
-                Student.grade_level,
-                func.count(Student.id).label('count')
-            ).filter_by(is_active=True)\
-             .group_by(Student.grade_level)\
-             .order_by(Student.grade_level)\
-             .all()
-
-            # 教师按院系分布
-            teacher_by_department = db.session.query(
-                Teacher.department,
-                func.count(Teacher.id).label('count')
-            ).filter_by(is_active=True)\
-             .group_by(Teacher.department)\
-             .order_by(func.count(Teacher.id).desc())\
-             .all()
-
-            # 最近操作日志
-            recent_logs = db.session.query(AuditLog, User.username)\
-                                   .join(User, AuditLog.user_id == User.id)\
-                                   .order_by(AuditLog.created_at.desc())\
-                                   .limit(10)\
-                                   .all()
+            # 所有计数来自同一时间桶的指标快照
+            metrics = get_dashboard_snapshot()
+            courses = metrics['courses']
+            grades = metrics['grades']
 
             dashboard_data = {
                 'overview': {
-                    'total_students': total_students,
-                    'total_teachers': total_teachers,
-                    'total_courses': total_courses,
-                    'total_enrollments': total_enrollments,
-                    'new_students_this_month': new_students_this_month,
-                    'new_teachers_this_month': new_teachers_this_month
+                    'total_students': metrics['students']['total'],
+                    'total_teachers': metrics['teachers']['total'],
+                    'total_courses': courses['total'],
+                    'total_enrollments': metrics['enrollments']['total'],
+                    'new_students_this_month': metrics['students']['new_this_month'],
+                    'new_teachers_this_month': metrics['teachers']['new_this_month']
                 },
                 'courses': {
-                    'active_courses': active_courses,
-                    'full_courses': full_courses,
-                    'full_rate': round(full_courses / active_courses * 100, 2) if active_courses > 0 else 0
+                    'active_courses': courses['active'],
+                    'full_courses': courses['full'],
+                    'full_rate': round(courses['full'] / courses['active'] * 100, 2) if courses['active'] > 0 else 0
                 },
                 'grades': {
-                    'average_score': round(float(grade_stats.avg_score), 2) if grade_stats.avg_score else 0,
-                    'min_score': grade_stats.min_score,
-                    'max_score': grade_stats.max_score,
-                    'total_graded': grade_stats.total_grades
+                    'average_score': grades['average_score'],
+                    'min_score': grades['min_score'],
+                    'max_score': grades['max_score'],
+                    'total_graded': grades['graded']
                 },
                 'distributions': {
-                    'students_by_grade': [{'grade': grade, 'count': count} for grade, count in student_by_grade],
-                    'teachers_by_department': [{'department': dept, 'count': count} for dept, count in teacher_by_department]
+                    'students_by_grade': [
+                        {'grade': grade, 'count': count}
+                        for grade, count in metrics['students']['by_grade'].items()
+                    ],
+                    'teachers_by_department': [
+                        {'department': dept, 'count': count}
+                        for dept, count in metrics['teachers']['by_department'].items()
+                    ]
                 },
-                'recent_activities': [
-                    {
-                        'id': log.id,
-                        'username': username,
-                        'action': log.action,
-                        'details': log.details,
-                        'created_at': log.created_at.isoformat()
-                    }
-                    for log, username in recent_logs
-                ]
+                'recent_activities': metrics['recent_activities'],
+                'generated_at': metrics['generated_at']
             }
 
             return success_response(dashboard_data)
@@ -157,136 +136,152 @@ class EnrollmentReports(Resource):
     def get(self):
         """获取选课报表数据"""
         try:
-            # 获取筛选参数
             filters = request.get_json() or {}
-            start_date = filters.get('start_date')
-            end_date = filters.get('end_date')
-            department = filters.get('department')
-            grade_level = filters.get('grade_level')
-            course_category = filters.get('course_category')
-            semester = filters.get('semester')
-
-            # 构建基础查询
-            query = db.session.query(
-                Enrollment.id,
-                Enrollment.status,
-                Enrollment.created_at.label('enrollment_date'),
-                Student.student_id.label('student_number'),
-                Student.name.label('student_name'),
-                Student.grade_level,
-                Student.department.label('student_department'),
-                Course.course_code,
-                Course.name.label('course_name'),
-                Course.credits,
-                Course.category,
-                Teacher.name.label('teacher_name'),
-                Teacher.department.label('teacher_department'),
-                Grade.score,
-                Grade.grade_letter,
-                Grade.semester.label('grade_semester')
-            ).join(Student, Enrollment.student_id == Student.id)\
-             .join(Course, Enrollment.course_id == Course.id)\
-             .outerjoin(Teacher, Course.teacher_id == Teacher.id)\
-             .outer_join(Grade, and_(
-                 Grade.student_id == Student.id,
-                 Grade.course_id == Course.id
-             ))
-
-            # 应用筛选条件
-            if start_date:
-                query = query.filter(Enrollment.created_at >= start_date)
-            if end_date:
-                query = query.filter(Enrollment.created_at <= end_date)
-            if grade_level:
-                query = query.filter(Student.grade_level == grade_level)
-            if department:
-                query = query.filter(or_(
-                    Student.department == department,
-                    Teacher.department == department
-                ))
-            if course_category:
-                query = query.filter(Course.category == course_category)
-
-            # 获取数据
-            enrollments = query.order_by(Enrollment.created_at.desc()).all()
-
-            # 统计数据
-            total_enrollments = len(enrollments)
-            pending_enrollments = len([e for e in enrollments if e.status == 'pending'])
-            approved_enrollments = len([e for e in enrollments if e.status == 'approved'])
-            rejected_enrollments = len([e for e in enrollments if e.status == 'rejected'])
-
-            # 按课程统计选课人数
-            course_stats = {}
-            for e in enrollments:
-                if e.course_name not in course_stats:
-                    course_stats[e.course_name] = {
-                        'course_code': e.course_code,
-                        'teacher': e.teacher_name,
-                        'total': 0,
-                        'approved': 0,
-                        'pending': 0,
-                        'rejected': 0
-                    }
-                course_stats[e.course_name]['total'] += 1
-                course_stats[e.course_name][e.status] += 1
-
-            # 按院系统计选课情况
-            dept_stats = {}
-            for e in enrollments:
-                dept = e.student_department or '未知'
-                if dept not in dept_stats:
-                    dept_stats[dept] = {'total': 0, 'approved': 0, 'pending': 0}
-                dept_stats[dept]['total'] += 1
-                dept_stats[dept][e.status] += 1
-
-            # 格式化数据
-            enrollment_data = [
-                {
-                    'id': e.id,
-                    'enrollment_date': e.enrollment_date.isoformat(),
-                    'student': {
-                        'number': e.student_number,
-                        'name': e.student_name,
-                        'grade_level': e.grade_level,
-                        'department': e.student_department
-                    },
-                    'course': {
-                        'code': e.course_code,
-                        'name': e.course_name,
-                        'credits': e.credits,
-                        'category': e.category,
-                        'teacher': e.teacher_name
-                    },
-                    'status': e.status,
-                    'grade': {
-                        'score': e.score,
-                        'letter': e.grade_letter,
-                        'semester': e.grade_semester
-                    } if e.score else None
-                }
-                for e in enrollments
-            ]
-
-            report_data = {
-                'summary': {
-                    'total_enrollments': total_enrollments,
-                    'pending': pending_enrollments,
-                    'approved': approved_enrollments,
-                    'rejected': rejected_enrollments,
-                    'approval_rate': round(approved_enrollments / total_enrollments * 100, 2) if total_enrollments > 0 else 0
-                },
-                'enrollments': enrollment_data,
-                'course_statistics': course_stats,
-                'department_statistics': dept_stats
-            }
-
-            return success_response(report_data)
+            report_data, meta = get_cached_report(
+                'enrollments', filters, lambda: self._build_report(filters),
+                refresh=_refresh_arg()
+            )
+            return success_response("获取选课报表成功", report_data, meta=meta)
 
         except Exception as e:
             current_app.logger.error(f"获取选课报表失败: {str(e)}")
             return error_response("获取选课报表失败")
 
+    def _build_report(self, filters):
+        """计算选课报表"""
+        start_date = filters.get('start_date')
+        end_date = filters.get('end_date')
+        department = filters.get('department')
+        grade_level = filters.get('grade_level')
+        course_category = filters.get('course_category')
+        semester = filters.get('semester')
+
+        # 构建基础查询（姓名、院系取自用户资料；成绩只连接同学期的总评）
+        student_user, student_profile = aliased(User), aliased(UserProfile)
+        teacher_user, teacher_profile = aliased(User), aliased(UserProfile)
+        query = db.session.query(
+            Enrollment.id,
+            Enrollment.status,
+            Enrollment.created_at.label('enrollment_date'),
+            Student.student_id.label('student_number'),
+            display_name_expression(student_user, student_profile).label('student_name'),
+            Student.grade.label('grade_level'),
+            student_profile.department.label('student_department'),
+            Course.course_code,
+            Course.name.label('course_name'),
+            Course.credits,
+            Course.category,
+            display_name_expression(teacher_user, teacher_profile).label('teacher_name'),
+            Teacher.department.label('teacher_department'),
+            Grade.score,
+            get_grading_scale().letter_case(grade_percentage(Grade)).label('grade_letter'),
+            Grade.semester.label('grade_semester')
+        ).select_from(Enrollment)\
+         .join(Student, Enrollment.student_id == Student.id)\
+         .join(student_user, student_user.id == Student.user_id)\
+         .outerjoin(student_profile, student_profile.user_id == Student.user_id)\
+         .join(Course, Enrollment.course_id == Course.id)\
+         .outerjoin(Teacher, Course.teacher_id == Teacher.id)\
+         .outerjoin(teacher_user, teacher_user.id == Teacher.user_id)\
+         .outerjoin(teacher_profile, teacher_profile.user_id == Teacher.user_id)\
+         .outerjoin(Grade, and_(
+             Grade.student_id == Student.id,
+             Grade.course_id == Course.id,
+             Grade.semester == Enrollment.semester,
+             Grade.exam_type == GradeType.FINAL
+         ))
+
+        # 应用筛选条件
+        if start_date:
+            query = query.filter(Enrollment.created_at >= start_date)
+        if end_date:
+            query = query.filter(Enrollment.created_at <= end_date)
+        if grade_level:
+            query = query.filter(Student.grade == grade_level)
+        if department:
+            query = query.filter(or_(
+                student_profile.department == department,
+                Teacher.department == department
+            ))
+        if course_category:
+            query = query.filter(Course.category == course_category)
+
+        # 获取数据
+        enrollments = query.order_by(Enrollment.created_at.desc()).all()
+
+        # 统计数据（按选课状态计数）
+        statuses = [e.status.value for e in enrollments]
+        total_enrollments = len(enrollments)
+        status_counts = {status.value: statuses.count(status.value) for status in EnrollmentStatus}
+
+        # 按课程统计选课人数
+        course_stats = {}
+        for e, status in zip(enrollments, statuses):
+            if e.course_name not in course_stats:
+                course_stats[e.course_name] = {
+                    'course_code': e.course_code,
+                    'teacher': e.teacher_name,
+                    'total': 0,
+                    **{value: 0 for value in status_counts}
+                }
+            course_stats[e.course_name]['total'] += 1
+            course_stats[e.course_name][status] += 1
+
+        # 按院系统计选课情况
+        dept_stats = {}
+        for e, status in zip(enrollments, statuses):
+            dept = e.student_department or '未知'
+            if dept not in dept_stats:
+                dept_stats[dept] = {'total': 0, **{value: 0 for value in status_counts}}
+            dept_stats[dept]['total'] += 1
+            dept_stats[dept][status] += 1
+
+        # 格式化数据
+        enrollment_data = [
+            {
+                'id': e.id,
+                'enrollment_date': e.enrollment_date.isoformat(),
+                'student': {
+                    'number': e.student_number,
+                    'name': e.student_name,
+                    'grade_level': e.grade_level,
+                    'department': e.student_department
+                },
+                'course': {
+                    'code': e.course_code,
+                    'name': e.course_name,
+                    'credits': e.credits,
+                    'category': e.category,
+                    'teacher': e.teacher_name
+                },
+                'status': status,
+                'grade': {
+                    'score': e.score,
+                    'letter': e.grade_letter,
+                    'semester': e.grade_semester
+                } if e.score is not None else None
+            }
+            for e, status in zip(enrollments, statuses)
+        ]
+
+        completed_enrollments = status_counts[EnrollmentStatus.COMPLETED.value]
+        report_data = {
+            'summary': {
+                'total_enrollments': total_enrollments,
+                **status_counts,
+                'completion_rate': round(completed_enrollments / total_enrollments * 100, 2) if total_enrollments > 0 else 0
+            },
+            'enrollments': enrollment_data,
+            'course_statistics': course_stats,
+            'department_statistics': dept_stats,
+            # 按学期趋势读取院系汇总表
+            'semester_trends': get_department_semester_series(
+                departments=[department] if department else None
+            )
+        }
+
+        return report_data
+
 @api.route('/grades')
 class GradeReports(Resource):
     @api.doc('get_grade_reports')
@@ -296,170 +291,188 @@ class GradeReports(Resource):
     def get(self):
         """获取成绩报表数据"""
         try:
-            # 获取筛选参数
             filters = request.get_json() or {}
-            start_date = filters.get('start_date')
-            end_date = filters.get('end_date')
-            department = filters.get('department')
-            grade_level = filters.get('grade_level')
-            course_category = filters.get('course_category')
-            semester = filters.get('semester')
-            teacher_id = filters.get('teacher_id')
-
-            # 构建基础查询
-            query = db.session.query(
-                Grade.id,
-                Grade.score,
-                Grade.grade_letter,
-                Grade.gpa,
-                Grade.semester,
-                Grade.created_at.label('grade_date'),
-                Student.student_id.label('student_number'),
-                Student.name.label('student_name'),
-                Student.grade_level,
-                Student.department,
-                Course.course_code,
-                Course.name.label('course_name'),
-                Course.credits,
-                Course.category,
-                Teacher.name.label('teacher_name')
-            ).join(Student, Grade.student_id == Student.id)\
-             .join(Course, Grade.course_id == Course.id)\
-             .join(Teacher, Course.teacher_id == Teacher.id)
-
-            # 应用筛选条件
-            if start_date:
-                query = query.filter(Grade.created_at >= start_date)
-            if end_date:
-                query = query.filter(Grade.created_at <= end_date)
-            if grade_level:
-                query = query.filter(Student.grade_level == grade_level)
-            if department:
-                query = query.filter(Student.department == department)
-            if course_category:
-                query = query.filter(Course.category == course_category)
-            if semester:
-                query = query.filter(Grade.semester == semester)
-            if teacher_id:
-                query = query.filter(Teacher.id == teacher_id)
-
-            # 获取数据
-            grades = query.order_by(Grade.created_at.desc()).all()
-
-            # 统计数据
-            total_grades = len(grades)
-            if total_grades > 0:
-                scores = [g.score for g in grades if g.score is not None]
-                avg_score = sum(scores) / len(scores) if scores else 0
-                max_score = max(scores) if scores else 0
-                min_score = min(scores) if scores else 0
-
-                # 成绩分布
-                grade_distribution = {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0}
-                for g in grades:
-                    if g.grade_letter in grade_distribution:
-                        grade_distribution[g.grade_letter] += 1
-            else:
-                avg_score = max_score = min_score = 0
-                grade_distribution = {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0}
-
-            # 按课程统计成绩
-            course_grade_stats = {}
-            for g in grades:
-                if g.course_name not in course_grade_stats:
-                    course_grade_stats[g.course_name] = {
-                        'course_code': g.course_code,
-                        'teacher': g.teacher_name,
-                        'total_students': 0,
-                        'scores': [],
-                        'avg_score': 0,
-                        'grade_distribution': {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0}
-                    }
+            report_data, meta = get_cached_report(
+                'grades', filters, lambda: self._build_report(filters),
+                refresh=_refresh_arg()
+            )
+            return success_response("获取成绩报表成功", report_data, meta=meta)
 
-                stats = course_grade_stats[g.course_name]
-                stats['total_students'] += 1
-                if g.score is not None:
-                    stats['scores'].append(g.score)
-                if g.grade_letter in stats['grade_distribution']:
-                    stats['grade_distribution'][g.grade_letter] += 1
-
-            # 计算各科平均分
-            for course_name in course_grade_stats:
-                scores = course_grade_stats[course_name]['scores']
-                course_grade_stats[course_name]['avg_score'] = round(sum(scores) / len(scores), 2) if scores else 0
-                del course_grade_stats[course_name]['scores']  # 删除原始分数列表
-
-            # 按院系统计成绩
-            dept_grade_stats = {}
-            for g in grades:
-                dept = g.department or '未知'
-                if dept not in dept_grade_stats:
-                    dept_grade_stats[dept] = {
-                        'total_grades': 0,
-                        'scores': [],
-                        'avg_score': 0,
-                        'grade_distribution': {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0}
-                    }
+        except Exception as e:
+            current_app.logger.error(f"获取成绩报表失败: {str(e)}")
+            return error_response("获取成绩报表失败")
 
-                stats = dept_grade_stats[dept]
-                stats['total_grades'] += 1
-                if g.score is not None:
-                    stats['scores'].append(g.score)
-                if g.grade_letter in stats['grade_distribution']:
-                    stats['grade_distribution'][g.grade_letter] += 1
-
-            # 计算各院系平均分
-            for dept in dept_grade_stats:
-                scores = dept_grade_stats[dept]['scores']
-                dept_grade_stats[dept]['avg_score'] = round(sum(scores) / len(scores), 2) if scores else 0
-                del dept_grade_stats[dept]['scores']
-
-            # 格式化数据
-            grade_data = [
-                {
-                    'id': g.id,
-                    'grade_date': g.grade_date.isoformat(),
-                    'student': {
-                        'number': g.student_number,
-                        'name': g.student_name,
-                        'grade_level': g.grade_level,
-                        'department': g.department
-                    },
-                    'course': {
-                        'code': g.course_code,
-                        'name': g.course_name,
-                        'credits': g.credits,
-                        'category': g.category,
-                        'teacher': g.teacher_name
-                    },
-                    'grade': {
-                        'score': g.score,
-                        'letter': g.grade_letter,
-                        'gpa': g.gpa,
-                        'semester': g.semester
-                    }
-                }
-                for g in grades
-            ]
-
-            report_data = {
-                'summary': {
-                    'total_grades': total_grades,
-                    'average_score': round(avg_score, 2),
-                    'highest_score': max_score,
-                    'lowest_score': min_score,
-                    'grade_distribution': grade_distribution
+    def _build_report(self, filters):
+        """计算成绩报表"""
+        start_date = filters.get('start_date')
+        end_date = filters.get('end_date')
+        department = filters.get('department')
+        grade_level = filters.get('grade_level')
+        course_category = filters.get('course_category')
+        semester = filters.get('semester')
+        teacher_id = filters.get('teacher_id')
+
+        # 构建基础查询（等级和绩点由计算层批量换算）
+        scale = get_grading_scale()
+        student_user, student_profile = aliased(User), aliased(UserProfile)
+        teacher_user, teacher_profile = aliased(User), aliased(UserProfile)
+        query = db.session.query(
+            Grade.id,
+            Grade.score,
+            Grade.max_score,
+            Grade.semester,
+            Grade.created_at.label('grade_date'),
+            Student.student_id.label('student_number'),
+            display_name_expression(student_user, student_profile).label('student_name'),
+            Student.grade.label('grade_level'),
+            student_profile.department.label('department'),
+            Course.course_code,
+            Course.name.label('course_name'),
+            Course.credits,
+            Course.category,
+            display_name_expression(teacher_user, teacher_profile).label('teacher_name')
+        ).select_from(Grade)\
+         .join(Student, Grade.student_id == Student.id)\
+         .join(student_user, student_user.id == Student.user_id)\
+         .outerjoin(student_profile, student_profile.user_id == Student.user_id)\
+         .join(Course, Grade.course_id == Course.id)\
+         .join(Teacher, Course.teacher_id == Teacher.id)\
+         .join(teacher_user, teacher_user.id == Teacher.user_id)\
+         .outerjoin(teacher_profile, teacher_profile.user_id == Teacher.user_id)
+
+        # 应用筛选条件
+        if start_date:
+            query = query.filter(Grade.created_at >= start_date)
+        if end_date:
+            query = query.filter(Grade.created_at <= end_date)
+        if grade_level:
+            query = query.filter(Student.grade == grade_level)
+        if department:
+            query = query.filter(student_profile.department == department)
+        if course_category:
+            query = query.filter(Course.category == course_category)
+        if semester:
+            query = query.filter(Grade.semester == semester)
+        if teacher_id:
+            query = query.filter(Teacher.id == teacher_id)
+
+        # 获取数据
+        grades = query.order_by(Grade.created_at.desc()).all()
+
+        # 统计数据（分布、分组均值、百分位等向量化计算）
+        statistics = compute_grade_report(grades, [column['name'] for column in query.column_descriptions], scale)
+
+        # 格式化数据
+        grade_data = [
+            {
+                'id': g.id,
+                'grade_date': g.grade_date.isoformat(),
+                'student': {
+                    'number': g.student_number,
+                    'name': g.student_name,
+                    'grade_level': g.grade_level,
+                    'department': g.department
                 },
-                'grades': grade_data,
-                'course_statistics': course_grade_stats,
-                'department_statistics': dept_grade_stats
+                'course': {
+                    'code': g.course_code,
+                    'name': g.course_name,
+                    'credits': g.credits,
+                    'category': g.category,
+                    'teacher': g.teacher_name
+                },
+                'grade': {
+                    'score': g.score,
+                    'letter': letter,
+                    'gpa': gpa,
+                    'semester': g.semester
+                }
+            }
+            for g, letter, gpa in zip(grades, statistics['letters'], statistics['points'])
+        ]
+
+        report_data = {
+            'summary': statistics['summary'],
+            'grades': grade_data,
+            'course_statistics': statistics['course_statistics'],
+            'department_statistics': statistics['department_statistics'],
+            'semester_trends': get_department_semester_series(
+                departments=[department] if department else None
+            )
+        }
+
+        return report_data
+
+def _split_arg(name):
+    """逗号分隔的查询参数 -> 列表，未提供时为None"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+@api.route('/trends')
+class TrendReports(Resource):
+    @api.doc('get_trend_reports', params={
+        'grain': '粒度 (semester/department/daily)',
+        'course_ids': '课程ID，逗号分隔',
+        'semesters': '学期，逗号分隔',
+        'departments': '院系，逗号分隔',
+        'last': '最近N个学期（semester粒度）',
+        'start_date': '开始日期 YYYY-MM-DD（daily粒度）',
+        'end_date': '结束日期 YYYY-MM-DD（daily粒度）'
+    })
+    @jwt_required()
+    @require_permission('reports:view')
+    def get(self):
+        """获取选课/成绩趋势（读取汇总表）"""
+        try:
+            grain = request.args.get('grain', 'semester')
+            if grain not in ('semester', 'department', 'daily'):
+                return error_response("不支持的趋势粒度")
+
+            start_date = request.args.get('start_date')
+            end_date = request.args.get('end_date')
+            filters = {
+                'grain': grain,
+                'course_ids': _split_arg('course_ids'),
+                'semesters': _split_arg('semesters'),
+                'departments': _split_arg('departments'),
+                'last': request.args.get('last', type=int),
+                'start_date': datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+                'end_date': datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
             }
 
-            return success_response(report_data)
+            series, meta = get_cached_report(
+                'trends', filters, lambda: self._build_series(filters),
+                refresh=_refresh_arg()
+            )
+            return success_response("获取趋势报表成功", {'grain': grain, 'series': series}, meta=meta)
 
+        except ValueError:
+            return error_response("日期格式错误，应为 YYYY-MM-DD")
         except Exception as e:
-            current_app.logger.error(f"获取成绩报表失败: {str(e)}")
-            return error_response("获取成绩报表失败")
+            current_app.logger.error(f"获取趋势报表失败: {str(e)}")
+            return error_response("获取趋势报表失败")
+
+    def _build_series(self, filters):
+        """按粒度读取趋势序列"""
+        if filters['grain'] == 'semester':
+            departments = filters['departments']
+            return get_course_semester_series(
+                course_ids=filters['course_ids'],
+                semesters=filters['semesters'],
+                department=departments[0] if departments else None,
+                last_semesters=filters['last']
+            )
+        if filters['grain'] == 'department':
+            return get_department_semester_series(
+                departments=filters['departments'],
+                semesters=filters['semesters']
+            )
+        return get_daily_series(
+            course_ids=filters['course_ids'],
+            start_date=filters['start_date'],
+            end_date=filters['end_date']
+        )
 
 @api.route('/teachers')
 class TeacherReports(Resource):
@@ -470,109 +483,91 @@ class TeacherReports(Resource):
     def get(self):
         """获取教师工作报表"""
         try:
-            # 获取筛选参数
             filters = request.get_json() or {}
-            department = filters.get('department')
-
-            # 构建查询
-            query = db.session.query(
-                Teacher.id,
-                Teacher.teacher_id,
-                Teacher.name,
-                Teacher.department,
-                Teacher.title,
-                Teacher.email,
-                Teacher.phone,
-                Teacher.workload,
-                func.count(Course.id).label('course_count'),
-                func.count(Enrollment.id).label('total_students'),
-                func.avg(Grade.score).label('avg_grade'),
-                func.count(distinct(Student.department)).label('student_departments')
-            ).outerjoin(Course, Teacher.id == Course.teacher_id)\
-             .outerjoin(Enrollment, Course.id == Enrollment.course_id)\
-             .outerjoin(Grade, Course.id == Grade.course_id)\
-             .outerjoin(Student, Grade.student_id == Student.id)\
-             .filter(Teacher.is_active == True)\
-             .group_by(Teacher.id)
-
-            # 应用筛选
-            if department:
-                query = query.filter(Teacher.department == department)
-
-            teachers = query.order_by(Teacher.department, Teacher.name).all()
-
-            # 统计数据
-            total_teachers = len(teachers)
-            total_courses = sum(t.course_count for t in teachers)
-            total_students = sum(t.total_students for t in teachers)
-
-            # 按院系统计
-            dept_stats = {}
-            for t in teachers:
-                dept = t.department or '未知'
-                if dept not in dept_stats:
-                    dept_stats[dept] = {
-                        'teacher_count': 0,
-                        'course_count': 0,
-                        'student_count': 0,
-                        'avg_workload': 0,
-                        'avg_grade': 0
-                    }
-                dept_stats[dept]['teacher_count'] += 1
-                dept_stats[dept]['course_count'] += t.course_count or 0
-                dept_stats[dept]['student_count'] += t.total_students or 0
-
-            # 计算院系平均数据
-            for dept in dept_stats:
-                teachers_in_dept = [t for t in teachers if t.department == dept]
-                if teachers_in_dept:
-                    dept_stats[dept]['avg_workload'] = round(
-                        sum(t.workload or 0 for t in teachers_in_dept) / len(teachers_in_dept), 2
-                    )
-                    dept_stats[dept]['avg_grade'] = round(
-                        sum(t.avg_grade or 0 for t in teachers_in_dept if t.avg_grade) /
-                        len([t for t in teachers_in_dept if t.avg_grade]), 2
-                    ) if any(t.avg_grade for t in teachers_in_dept) else 0
-
-            # 格式化数据
-            teacher_data = [
-                {
-                    'id': t.id,
-                    'teacher_id': t.teacher_id,
-                    'name': t.name,
-                    'department': t.department,
-                    'title': t.title,
-                    'contact': {
-                        'email': t.email,
-                        'phone': t.phone
-                    },
-                    'workload': t.workload,
-                    'statistics': {
-                        'courses': t.course_count or 0,
-                        'total_students': t.total_students or 0,
-                        'average_grade': round(float(t.avg_grade), 2) if t.avg_grade else 0,
-                        'student_departments': t.student_departments or 0
-                    }
-                }
-                for t in teachers
-            ]
-
-            report_data = {
-                'summary': {
-                    'total_teachers': total_teachers,
-                    'total_courses': total_courses,
-                    'total_students': total_students
-                },
-                'teachers': teacher_data,
-                'department_statistics': dept_stats
-            }
-
-            return success_response(report_data)
+            report_data, meta = get_cached_report(
+                'teachers', filters, lambda: self._build_report(filters),
+                refresh=_refresh_arg()
+            )
+            return success_response("获取教师报表成功", report_data, meta=meta)
 
         except Exception as e:
             current_app.logger.error(f"获取教师报表失败: {str(e)}")
             return error_response("获取教师报表失败")
 
+    def _build_report(self, filters):
+        """计算教师报表"""
+        department = filters.get('department')
+
+        # 教师列表（聚合不在SQL中做，避免课程/选课/成绩多表外连接后的行数膨胀）
+        teacher_query = db.session.query(Teacher.id).filter(Teacher.status == TeacherStatus.ACTIVE)
+        if department:
+            teacher_query = teacher_query.filter(Teacher.department == department)
+        teacher_ids = teacher_query.subquery()
+
+        # 工作量为所授课程数；姓名、联系方式取自用户及资料
+        course_counts = db.session.query(
+            Course.teacher_id.label('teacher_id'),
+            func.count(Course.id).label('course_count')
+        ).group_by(Course.teacher_id).subquery()
+        teacher_rows = teacher_query.with_entities(
+            Teacher.id,
+            Teacher.teacher_id,
+            display_name_expression(User, UserProfile).label('name'),
+            Teacher.department,
+            Teacher.title,
+            User.email,
+            UserProfile.phone,
+            func.coalesce(course_counts.c.course_count, 0).label('workload')
+        ).join(User, User.id == Teacher.user_id)\
+         .outerjoin(UserProfile, UserProfile.user_id == Teacher.user_id)\
+         .outerjoin(course_counts, course_counts.c.teacher_id == Teacher.id)\
+         .order_by(Teacher.department, Teacher.teacher_id)
+        teachers = teacher_rows.all()
+
+        in_scope = Course.teacher_id.in_(select(teacher_ids.c.id))
+        course_teachers = db.session.query(Course.id, Course.teacher_id).filter(in_scope).all()
+        enrollment_counts = db.session.query(Enrollment.course_id, func.count(Enrollment.id))\
+            .join(Course, Enrollment.course_id == Course.id)\
+            .filter(in_scope)\
+            .group_by(Enrollment.course_id).all()
+        grades = db.session.query(Grade.course_id, Grade.score, UserProfile.department)\
+            .join(Course, Grade.course_id == Course.id)\
+            .outerjoin(Student, Grade.student_id == Student.id)\
+            .outerjoin(UserProfile, UserProfile.user_id == Student.user_id)\
+            .filter(in_scope).all()
+
+        # 按教师、按院系统计（向量化计算）
+        statistics = compute_teacher_report(
+            teachers, [column['name'] for column in teacher_rows.column_descriptions],
+            course_teachers, enrollment_counts, grades
+        )
+
+        # 格式化数据
+        teacher_data = [
+            {
+                'id': t.id,
+                'teacher_id': t.teacher_id,
+                'name': t.name,
+                'department': t.department,
+                'title': t.title.value if t.title else None,
+                'contact': {
+                    'email': t.email,
+                    'phone': t.phone
+                },
+                'workload': t.workload,
+                'statistics': teacher_statistics
+            }
+            for t, teacher_statistics in zip(teachers, statistics['teacher_statistics'])
+        ]
+
+        report_data = {
+            'summary': statistics['summary'],
+            'teachers': teacher_data,
+            'department_statistics': statistics['department_statistics']
+        }
+
+        return report_data
+
 @api.route('/export')
 class ReportExport(Resource):
     @api.doc('export_report')
@@ -586,155 +581,143 @@ class ReportExport(Resource):
             report_type = data.get('report_type')
             export_format = data.get('format', 'csv')
             filters = data.get('filters', {})
+            if export_format == 'excel':
+                export_format = 'xlsx'
 
             if not report_type:
                 return error_response("报表类型不能为空")
 
-            # 根据报表类型获取数据
+            if export_format not in EXPORT_FORMATS and export_format not in COLUMNAR_FORMATS:
+                return error_response("不支持的导出格式")
+            if export_format in COLUMNAR_FORMATS and not columnar_available():
+                return error_response("服务器未安装pyarrow，暂不支持列式导出", 501)
+
+            # 根据报表类型构建查询（不加载数据）
             if report_type == 'enrollments':
-                report_data = self._get_enrollment_data(filters)
+                query = self._get_enrollment_data(filters)
                 filename = f"enrollments_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             elif report_type == 'grades':
-                report_data = self._get_grade_data(filters)
+                query = self._get_grade_data(filters)
                 filename = f"grades_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             elif report_type == 'teachers':
-                report_data = self._get_teacher_data(filters)
+                query = self._get_teacher_data(filters)
                 filename = f"teachers_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             else:
                 return error_response("不支持的报表类型")
 
-            # 根据格式导出
-            if export_format == 'csv':
-                return self._export_csv(report_data, filename)
-            elif export_format == 'json':
-                return self._export_json(report_data, filename)
-            else:
-                return error_response("不支持的导出格式")
+            # 列式格式：按RecordBatch写出，保留列类型
+            if export_format in COLUMNAR_FORMATS:
+                content_type, extension = COLUMNAR_FORMATS[export_format]
+                chunks = columnar_chunks(export_format, query)
+                return make_streaming_file_response(chunks, f'{filename}.{extension}', content_type)
+
+            # 按批读取并流式输出
+            field_names = query_fields(query)
+            chunks = export_chunks(
+                export_format,
+                iter_query(query),
+                header=field_names,
+                dict_mapper=lambda row: row_to_dict(row, field_names),
+                sheet_name=EXPORT_SHEET_NAMES[report_type]
+            )
+            content_type, extension = EXPORT_FORMATS[export_format]
+            return make_streaming_file_response(chunks, f'{filename}.{extension}', content_type)
 
         except Exception as e:
             current_app.logger.error(f"导出报表失败: {str(e)}")
             return error_response("导出报表失败")
 
     def _get_enrollment_data(self, filters):
-        """获取选课数据"""
-        query = db.session.query(
-            Student.student_id,
-            Student.name,
-            Student.department.label('student_dept'),
-            Course.course_code,
-            Course.name,
-            Course.credits,
-            Teacher.name.label('teacher'),
-            Enrollment.status,
-            Enrollment.created_at
-        ).join(Student, Enrollment.student_id == Student.id)\
-         .join(Course, Enrollment.course_id == Course.id)\
-         .outerjoin(Teacher, Course.teacher_id == Teacher.id)
-
-        # 应用筛选
-        if filters.get('start_date'):
-            query = query.filter(Enrollment.created_at >= filters['start_date'])
-        if filters.get('end_date'):
-            query = query.filter(Enrollment.created_at <= filters['end_date'])
-        if filters.get('department'):
-            query = query.filter(Student.department == filters['department'])
-
-        return query.all()
+        """构建选课数据查询"""
+        return build_enrollment_export_query(filters)
 
     def _get_grade_data(self, filters):
-        """获取成绩数据"""
-        query = db.session.query(
-            Student.student_id,
-            Student.name,
-            Student.department,
-            Course.course_code,
-            Course.name,
-            Course.credits,
-            Teacher.name.label('teacher'),
-            Grade.score,
-            Grade.grade_letter,
-            Grade.gpa,
-            Grade.semester
-        ).join(Student, Grade.student_id == Student.id)\
-         .join(Course, Grade.course_id == Course.id)\
-         .join(Teacher, Course.teacher_id == Teacher.id)
-
-        # 应用筛选
-        if filters.get('semester'):
-            query = query.filter(Grade.semester == filters['semester'])
-        if filters.get('department'):
-            query = query.filter(Student.department == filters['department'])
-
-        return query.all()
+        """构建成绩数据查询"""
+        return build_grade_export_query(filters)
 
     def _get_teacher_data(self, filters):
-        """获取教师数据"""
-        query = db.session.query(
-            Teacher.teacher_id,
-            Teacher.name,
-            Teacher.department,
-            Teacher.title,
-            Teacher.email,
-            Teacher.workload
-        ).filter(Teacher.is_active == True)
-
-        # 应用筛选
-        if filters.get('department'):
-            query = query.filter(Teacher.department == filters['department'])
-
-        return query.all()
-
-    def _export_csv(self, data, filename):
-        """导出CSV格式"""
-        output = io.StringIO()
-
-        if data and hasattr(data[0], '_fields'):
-            # SQLAlchemy查询结果
-            writer = csv.writer(output)
-            writer.writerow(data[0]._fields)  # 写入表头
-
-            for row in data:
-                writer.writerow(row)
-
-        # 生成文件
-        output.seek(0)
-        mem = io.BytesIO()
-        mem.write(output.getvalue().encode('utf-8-sig'))  # 添加BOM以支持Excel中文
-        mem.seek(0)
-
-        return send_file(
-            mem,
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=f'{filename}.csv'
-        )
+        """构建教师数据查询"""
+        return build_teacher_export_query(filters)
 
-    def _export_json(self, data, filename):
-        """导出JSON格式"""
-        json_data = []
-
-        if data and hasattr(data[0], '_fields'):
-            # SQLAlchemy查询结果
-            for row in data:
-                row_dict = {}
-                for field in row._fields:
-                    value = getattr(row, field)
-                    if isinstance(value, datetime):
-                        value = value.isoformat()
-                    row_dict[field] = value
-                json_data.append(row_dict)
-
-        # 生成文件
-        output = io.BytesIO()
-        output.write(json.dumps(json_data, ensure_ascii=False, indent=2).encode('utf-8'))
-        output.seek(0)
-
-        return send_file(
-            output,
-            mimetype='application/json',
-            as_attachment=True,
-            download_name=f'{filename}.json'
-        )
+@api.route('/term')
+class TermReportJobs(Resource):
+    @api.doc('create_term_report')
+    @api.expect(term_report_model)
+    @jwt_required()
+    @require_permission('reports:export')
+    def post(self):
+        """创建全校成绩统计报表任务（后台并行生成）"""
+        try:
+            data = request.get_json() or {}
+            job = start_term_report_job(
+                filters=data,
+                sections=data.get('sections'),
+                formats=data.get('formats'),
+                timeout=data.get('timeout'),
+                created_by=get_jwt_identity()
+            )
+            return success_response("报表任务已创建", job, 202)
+
+        except ValueError as e:
+            return error_response(str(e))
+        except Exception as e:
+            current_app.logger.error(f"创建全校成绩统计报表任务失败: {str(e)}")
+            return error_response("创建报表任务失败")
+
+    @api.doc('get_term_report_sections')
+    @jwt_required()
+    @require_permission('reports:view')
+    def get(self):
+        """获取可用的报表分节和输出格式"""
+        return success_response("获取报表分节成功", {
+            'sections': [{'name': name, 'title': title} for name, (title, _) in TERM_REPORT_SECTIONS.items()],
+            'formats': list(DOCUMENT_FORMATS)
+        })
+
+@api.route('/term/<string:job_id>')
+class TermReportJob(Resource):
+    @api.doc('get_term_report_job')
+    @jwt_required()
+    @require_permission('reports:view')
+    def get(self, job_id):
+        """获取报表任务状态与进度"""
+        job = get_term_report_job(job_id)
+        if not job:
+            return error_response("报表任务不存在或已过期", 404)
+        return success_response("获取报表任务成功", job)
+
+def _file_chunks(path, chunk_size=256 * 1024):
+    """分块读取文件"""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            yield chunk
+
+@api.route('/term/<string:job_id>/download')
+class TermReportDownload(Resource):
+    @api.doc('download_term_report', params={'format': '文件格式 (json/xlsx/pdf)'})
+    @jwt_required()
+    @require_permission('reports:export')
+    def get(self, job_id):
+        """下载报表任务生成的文件"""
+        document_format = request.args.get('format', 'xlsx')
+        if document_format == 'excel':
+            document_format = 'xlsx'
+        if document_format not in DOCUMENT_FORMATS:
+            return error_response("不支持的报表格式")
+
+        job = get_term_report_job(job_id)
+        if not job:
+            return error_response("报表任务不存在或已过期", 404)
+        if job['status'] in ('pending', 'running'):
+            return error_response("报表尚未生成完成", 409)
+
+        path = get_term_report_file(job_id, document_format)
+        if not path:
+            return error_response("该任务未生成此格式的文件", 404)
+
+        content_type, extension = DOCUMENT_FORMATS[document_format]
+        filename = f"term_report_{job['created_at'][:10].replace('-', '')}_{job_id[:8]}.{extension}"
+        return make_streaming_file_response(_file_chunks(path), filename, content_type)
 
 @api.route('/statistics/overview')
 class OverviewStatistics(Resource):
@@ -744,97 +727,37 @@ class OverviewStatistics(Resource):
     def get(self):
         """获取系统概览统计"""
         try:
-            # 时间范围
-            now = datetime.utcnow()
-            this_month = now.replace(day=1)
-            last_month = (this_month - timedelta(days=1)).replace(day=1)
-            this_year = now.replace(month=1, day=1)
-
-            # 用户统计
-            total_users = User.query.filter_by(is_active=True).count()
-            new_users_this_month = User.query.filter(
-                User.created_at >= this_month,
-                User.is_active == True
-            ).count()
-
-            # 学生统计
-            total_students = Student.query.filter_by(is_active=True).count()
-            active_enrollments = Enrollment.query.filter_by(status='approved').count()
-
-            # 教师统计
-            total_teachers = Teacher.query.filter_by(is_active=True).count()
-            total_courses = Course.query.filter_by(is_active=True).count()
-
-            # 成绩统计
-            total_grades = Grade.query.count()
-            recent_grades = Grade.query.filter(Grade.created_at >= this_month).count()
-
-            # 操作日志统计
-            recent_operations = AuditLog.query.filter(
-                AuditLog.created_at >= this_month
-            ).count()
-
-            # 趋势数据（最近6个月）
-            monthly_stats = []
-            for i in range(6):
-                month_start = (this_month - timedelta(days=30 * i)).replace(day=1)
-                month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-
-                month_data = {
-                    'month': month_start.strftime('%Y-%m'),
-                    'new_students': Student.query.filter(
-                        Student.created_at >= month_start,
-                        Student.created_at <= month_end,
-                        Student.is_active == True
-                    ).count(),
-                    'new_teachers': Teacher.query.filter(
-                        Teacher.created_at >= month_start,
-                        Teacher.created_at <= month_end,
-                        Teacher.is_active == True
-                    ).count(),
-                    'new_courses': Course.query.filter(
-                        Course.created_at >= month_start,
-                        Course.created_at <= month_end,
-                        Course.is_active == True
-                    ).count(),
-                    'new_enrollments': Enrollment.query.filter(
-                        Enrollment.created_at >= month_start,
-                        Enrollment.created_at <= month_end
-                    ).count(),
-                    'new_grades': Grade.query.filter(
-                        Grade.created_at >= month_start,
-                        Grade.created_at <= month_end
-                    ).count()
-                }
-                monthly_stats.append(month_data)
-
-            monthly_stats.reverse()  # 按时间正序
+            metrics = get_dashboard_snapshot()
 
             overview_data = {
                 'current_stats': {
                     'users': {
-                        'total': total_users,
-                        'new_this_month': new_users_this_month
+                        'total': metrics['users']['active'],
+                        'new_this_month': metrics['users']['new_this_month']
                     },
                     'students': {
-                        'total': total_students,
-                        'active_enrollments': active_enrollments
+                        'total': metrics['students']['total'],
+                        'active_enrollments': metrics['enrollments']['active']
                     },
                     'teachers': {
-                        'total': total_teachers
+                        'total': metrics['teachers']['total']
                     },
                     'courses': {
-                        'total': total_courses
+                        'total': metrics['courses']['total']
                     },
                     'grades': {
-                        'total': total_grades,
-                        'new_this_month': recent_grades
+                        'total': metrics['grades']['total'],
+                        'new_this_month': metrics['grades']['new_this_month']
                     },
                     'operations': {
-                        'recent_count': recent_operations
+                        'recent_count': metrics['operations']['this_month']
                     }
                 },
-                'monthly_trends': monthly_stats
+                'monthly_trends': [
+                    {key: value for key, value in month.items() if key != 'new_users'}
+                    for month in metrics['monthly_trends']
+                ],
+                'generated_at': metrics['generated_at']
             }
 
             return success_response(overview_data)
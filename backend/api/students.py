@@ -7,8 +7,6 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import or_, and_
 from datetime import datetime, timedelta
-import csv
-import io
 
 from models import (
     Student, User, UserProfile, AcademicStatus,
@@ -21,13 +19,18 @@ from schemas import (
     StudentImportSchema, StudentExportSchema
 )
 from extensions import db
+from models.loading_profiles import apply_loading_profile
+from models.academic_stats import refresh_student_stats, get_semester_stats
 from utils.responses import (
     success_response, error_response, not_found_response,
     forbidden_response, validation_error_response,
-    make_file_response
+    make_streaming_file_response
 )
+from utils.export_stream import EXPORT_FORMATS, export_chunks, iter_query
+from utils.transcript_document import TRANSCRIPT_FORMATS, render_transcript, transcript_filename
+from services.transcripts import get_transcript, transcript_zip_chunks
 from utils.decorators import require_permission, rate_limit
-from utils.pagination import paginate_query
+from utils.pagination import paginate, InvalidCursorError
 from utils.file_upload import save_uploaded_file, validate_file_type
 
 # 创建命名空间
@@ -92,10 +95,21 @@ student_search_model = students_ns.model('StudentSearch', {
     'tags': fields.List(fields.String, description='标签'),
     'page': fields.Integer(description='页码', default=1),
     'per_page': fields.Integer(description='每页数量', default=20),
+    'cursor': fields.String(description='分页游标（传空字符串获取第一页，之后传next_cursor）'),
+    'count': fields.String(description='总数统计方式', enum=['exact', 'estimated', 'cached', 'none']),
     'sort_by': fields.String(description='排序字段', default='student_id'),
     'sort_order': fields.String(description='排序方式', default='asc')
 })
 
+transcript_batch_model = students_ns.model('TranscriptBatch', {
+    'student_ids': fields.List(fields.String, description='学生ID列表'),
+    'grade': fields.String(description='年级'),
+    'major': fields.String(description='专业'),
+    'class_name': fields.String(description='班级'),
+    'academic_status': fields.String(description='学业状态', enum=['enrolled', 'graduated', 'suspended', 'withdrawn', 'on_leave']),
+    'format': fields.String(description='成绩单格式', enum=['pdf', 'html'], default='pdf')
+})
+
 @students_ns.route('')
 class StudentListResource(Resource):
     @jwt_required()
@@ -186,13 +200,22 @@ class StudentListResource(Resource):
             }
 
             sort_field = sort_field_map.get(data['sort_by'], Student.student_id)
-            if data['sort_order'] == 'desc':
-                sort_field = sort_field.desc()
 
-            query = query.order_by(sort_field)
-
-            # 分页
-            pagination = paginate_query(query, data['page'], data['per_page'])
+            # 预加载序列化所需关联，复用已有的User/UserProfile连接
+            query = apply_loading_profile(query, Student, 'list', contains=('user', 'user.profile'))
+
+            # 分页（携带cursor参数时使用键集分页）
+            pagination = paginate(
+                query,
+                sort_field,
+                Student.id,
+                page=data['page'],
+                per_page=data['per_page'],
+                cursor=data.get('cursor'),
+                sort_key=data['sort_by'],
+                descending=data['sort_order'] == 'desc',
+                count_mode=data.get('count')
+            )
             students = pagination.items
 
             # 序列化
@@ -201,14 +224,13 @@ class StudentListResource(Resource):
 
             response_data = {
                 'students': student_data,
-                'total': pagination.total,
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'pages': pagination.pages
+                **pagination.to_meta()
             }
 
             return success_response("获取学生列表成功", response_data)
 
+        except InvalidCursorError as e:
+            return error_response(str(e), 400)
         except Exception as e:
             return error_response(str(e), 500)
 
@@ -305,7 +327,9 @@ class StudentResource(Resource):
     def get(self, student_id):
         """获取学生详情"""
         try:
-            student = Student.query.get(student_id)
+            student = apply_loading_profile(Student.query, Student, 'detail').filter(
+                Student.id == student_id
+            ).first()
             if not student:
                 return not_found_response("学生不存在")
 
@@ -559,17 +583,85 @@ class StudentGPAResource(Resource):
             if not g.current_user.has_permission('grade_management'):
                 return forbidden_response("权限不足")
 
-            # 更新GPA
-            student.update_gpa()
+            # 重算该学生全部学期的GPA和学分
+            refresh_student_stats([student.id])
+            db.session.commit()
 
             return success_response("GPA更新成功", {
                 'student_id': student_id,
-                'gpa': student.gpa
+                'gpa': student.gpa,
+                'total_credits': student.total_credits,
+                'credits_earned': student.credits_earned,
+                'credits_in_progress': student.credits_in_progress,
+                'semesters': [stats.to_dict() for stats in get_semester_stats(student.id)]
             })
 
         except Exception as e:
             return error_response(str(e), 500)
 
+@students_ns.route('/<string:student_id>/transcript')
+class StudentTranscriptResource(Resource):
+    @jwt_required()
+    @students_ns.doc('get_student_transcript', params={'format': 'json/html/pdf，默认json'})
+    def get(self, student_id):
+        """获取学生成绩单"""
+        try:
+            student = Student.query.get(student_id)
+            if not student:
+                return not_found_response("学生不存在")
+
+            # 检查权限
+            current_user_id = get_jwt_identity()
+            if (current_user_id != student.user_id and
+                    not g.current_user.has_permission('grade_management')):
+                return forbidden_response("权限不足")
+
+            document_format = request.args.get('format', 'json')
+            if document_format != 'json' and document_format not in TRANSCRIPT_FORMATS:
+                return error_response("不支持的成绩单格式", 400)
+
+            transcript = get_transcript(student.id)
+            if document_format == 'json':
+                return success_response("获取成绩单成功", transcript)
+
+            content = render_transcript(transcript, document_format)
+            return make_streaming_file_response(
+                iter([content]),
+                transcript_filename(transcript, document_format),
+                TRANSCRIPT_FORMATS[document_format][0]
+            )
+
+        except Exception as e:
+            return error_response(str(e), 500)
+
+@students_ns.route('/transcripts')
+class StudentTranscriptBatchResource(Resource):
+    @jwt_required()
+    @students_ns.doc('export_student_transcripts')
+    @students_ns.expect(transcript_batch_model)
+    @require_permission('student_management')
+    def post(self):
+        """批量生成成绩单（ZIP）"""
+        try:
+            data = request.get_json() or {}
+            document_format = data.get('format', 'pdf')
+            filters = {
+                key: data[key]
+                for key in ('student_ids', 'grade', 'major', 'class_name', 'academic_status')
+                if data.get(key)
+            }
+            if not filters:
+                return error_response("请至少指定一个筛选条件", 400)
+
+            chunks = transcript_zip_chunks(filters, document_format)
+            filename = f"transcripts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+            return make_streaming_file_response(chunks, filename, 'application/zip')
+
+        except ValueError as e:
+            return error_response(str(e), 400)
+        except Exception as e:
+            return error_response(str(e), 500)
+
 @students_ns.route('/<string:student_id>/graduate')
 class StudentGraduateResource(Resource):
     @jwt_required()
@@ -642,6 +734,38 @@ class StudentImportResource(Resource):
         except Exception as e:
             return error_response(str(e), 500)
 
+# 学生导出字段（键用于JSON，值为CSV表头）
+STUDENT_EXPORT_FIELDS = {
+    'student_id': '学号',
+    'name': '姓名',
+    'grade': '年级',
+    'class_name': '班级',
+    'major': '专业',
+    'academic_status': '状态',
+    'gpa': 'GPA',
+    'credits_earned': '已修学分',
+    'enrollment_date': '入学日期',
+    'phone': '手机号',
+    'email': '邮箱'
+}
+
+def _student_export_row(student):
+    """学生导出行"""
+    profile = student.user.profile
+    return {
+        'student_id': student.student_id,
+        'name': profile.full_name if profile else student.user.username,
+        'grade': student.grade,
+        'class_name': student.class_name,
+        'major': student.major,
+        'academic_status': student.academic_status.value,
+        'gpa': student.gpa if student.gpa is not None else '',
+        'credits_earned': student.credits_earned,
+        'enrollment_date': student.enrollment_date.strftime('%Y-%m-%d') if student.enrollment_date else '',
+        'phone': profile.phone if profile else '',
+        'email': student.user.email
+    }
+
 @students_ns.route('/export')
 class StudentExportResource(Resource):
     @jwt_required()
@@ -666,40 +790,25 @@ class StudentExportResource(Resource):
             if academic_status:
                 query = query.filter(Student.academic_status == AcademicStatus(academic_status))
 
-            students = query.all()
-
-            # 生成CSV数据
-            output = io.StringIO()
-            writer = csv.writer(output)
-
-            # 写入标题
-            writer.writerow([
-                '学号', '姓名', '年级', '班级', '专业', '状态',
-                'GPA', '已修学分', '入学日期', '手机号', '邮箱'
-            ])
-
-            # 写入数据
-            for student in students:
-                writer.writerow([
-                    student.student_id,
-                    student.user.profile.full_name if student.user.profile else student.user.username,
-                    student.grade,
-                    student.class_name,
-                    student.major,
-                    student.academic_status.value,
-                    student.gpa or '',
-                    student.credits_earned,
-                    student.enrollment_date.strftime('%Y-%m-%d') if student.enrollment_date else '',
-                    student.user.profile.phone if student.user.profile else '',
-                    student.user.email
-                ])
-
-            # 创建文件响应
-            csv_data = output.getvalue()
-            output.close()
-
-            filename = f"students_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            return make_file_response(csv_data, filename, 'text/csv')
+            query = apply_loading_profile(query, Student, 'export', contains=('user', 'user.profile'))
+            query = query.order_by(Student.student_id)
+
+            export_format = 'xlsx' if format_type == 'excel' else format_type
+            if export_format not in EXPORT_FORMATS:
+                return error_response("不支持的导出格式", 400)
+
+            chunks = export_chunks(
+                export_format,
+                iter_query(query),
+                header=list(STUDENT_EXPORT_FIELDS.values()),
+                row_mapper=lambda student: list(_student_export_row(student).values()),
+                dict_mapper=_student_export_row,
+                sheet_name='学生信息'
+            )
+
+            content_type, extension = EXPORT_FORMATS[export_format]
+            filename = f"students_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+            return make_streaming_file_response(chunks, filename, content_type)
 
         except Exception as e:
             return error_response(str(e), 500)
@@ -17,12 +17,13 @@ from schemas import (
     TeacherSearchSchema
 )
 from extensions import db
+from models.loading_profiles import apply_loading_profile
 from utils.responses import (
     success_response, error_response, not_found_response,
     forbidden_response, validation_error_response
 )
 from utils.decorators import require_permission, rate_limit
-from utils.pagination import paginate_query
+from utils.pagination import paginate, InvalidCursorError
 
 # 创建命名空间
 teachers_ns = Namespace('teachers', description='教师管理相关操作')
@@ -76,6 +77,8 @@ teacher_search_model = teachers_ns.model('TeacherSearch', {
     'specialization': fields.String(description='专业领域'),
     'page': fields.Integer(description='页码', default=1),
     'per_page': fields.Integer(description='每页数量', default=20),
+    'cursor': fields.String(description='分页游标（传空字符串获取第一页，之后传next_cursor）'),
+    'count': fields.String(description='总数统计方式', enum=['exact', 'estimated', 'cached', 'none']),
     'sort_by': fields.String(description='排序字段', default='teacher_id'),
     'sort_order': fields.String(description='排序方式', default='asc')
 })
@@ -143,13 +146,22 @@ class TeacherListResource(Resource):
             }
 
             sort_field = sort_field_map.get(data['sort_by'], Teacher.teacher_id)
-            if data['sort_order'] == 'desc':
-                sort_field = sort_field.desc()
 
-            query = query.order_by(sort_field)
-
-            # 分页
-            pagination = paginate_query(query, data['page'], data['per_page'])
+            # 预加载序列化所需关联，复用已有的User/UserProfile连接
+            query = apply_loading_profile(query, Teacher, 'list', contains=('user', 'user.profile'))
+
+            # 分页（携带cursor参数时使用键集分页）
+            pagination = paginate(
+                query,
+                sort_field,
+                Teacher.id,
+                page=data['page'],
+                per_page=data['per_page'],
+                cursor=data.get('cursor'),
+                sort_key=data['sort_by'],
+                descending=data['sort_order'] == 'desc',
+                count_mode=data.get('count')
+            )
             teachers = pagination.items
 
             # 序列化
@@ -158,14 +170,13 @@ class TeacherListResource(Resource):
 
             response_data = {
                 'teachers': teacher_data,
-                'total': pagination.total,
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'pages': pagination.pages
+                **pagination.to_meta()
             }
 
             return success_response("获取教师列表成功", response_data)
 
+        except InvalidCursorError as e:
+            return error_response(str(e), 400)
         except Exception as e:
             return error_response(str(e), 500)
 
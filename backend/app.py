@@ -3,6 +3,7 @@
 # ========================================
 
 import os
+import click
 from flask import Flask
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
@@ -38,6 +39,10 @@ def create_app(config_name: str = None):
     # 注册蓝图
     register_blueprints(app)
 
+    # 注册SQL性能分析
+    from utils.query_profiler import init_query_profiler
+    init_query_profiler(app)
+
     # 注册错误处理器
     register_error_handlers(app)
 
@@ -70,6 +75,10 @@ def init_extensions(app):
     # JWT认证
     jwt = JWTManager(app)
 
+    # 令牌撤销（签发时写入用户代数，验证时检查撤销列表）
+    from utils.token_revocation import init_token_revocation
+    init_token_revocation(app, jwt)
+
     # Marshmallow序列化
     ma = Marshmallow(app)
 
@@ -233,6 +242,133 @@ def register_cli_commands(app):
 
         print(f'管理员用户 {username} 创建成功')
 
+    @app.cli.command('recompute-academic-stats')
+    @click.option('--chunk-size', default=None, type=int, help='每批处理的学生数')
+    def recompute_academic_stats(chunk_size):
+        """全量重算学生GPA和学分"""
+        from models.academic_stats import recompute_all_stats
+
+        result = recompute_all_stats(chunk_size or app.config['ACADEMIC_STATS_CHUNK_SIZE'])
+        print(f"已重算 {result['students']} 名学生（{result['chunks']} 批），耗时 {result['duration_seconds']} 秒")
+
+    @app.cli.command('check-academic-stats')
+    @click.option('--chunk-size', default=None, type=int, help='每批处理的学生数')
+    @click.option('--fix', is_flag=True, help='修复不一致的学生')
+    def check_academic_stats(chunk_size, fix):
+        """检查学生GPA和学分是否与成绩一致"""
+        from models.academic_stats import check_stats_consistency
+
+        result = check_stats_consistency(chunk_size or app.config['ACADEMIC_STATS_CHUNK_SIZE'], fix=fix)
+        print(f"已检查 {result['checked']} 名学生，不一致 {result['mismatched']} 名，已修复 {result['fixed']} 名")
+        for item in result['mismatches']:
+            print(f"  {item['student_id']}: {item['problems']}")
+
+    @app.cli.command('backfill-report-rollups')
+    @click.option('--chunk-size', default=None, type=int, help='每批处理的课程数')
+    def backfill_report_rollups(chunk_size):
+        """全量回填选课/成绩趋势汇总表"""
+        from models.report_rollups import backfill_rollups
+        from services.report_cache import invalidate_reports
+
+        result = backfill_rollups(chunk_size or app.config['REPORT_ROLLUP_CHUNK_SIZE'])
+        # 回填直接写表，不经过会话变更跟踪
+        invalidate_reports()
+        print(
+            f"已回填 {result['courses']} 门课程（{result['chunks']} 批，"
+            f"{result['semester_keys']} 个学期键，{result['day_keys']} 个日期键），耗时 {result['duration_seconds']} 秒"
+        )
+
+    @app.cli.command('export-snapshots')
+    @click.option('--format', 'export_format', default='parquet', type=click.Choice(['parquet', 'arrow']), help='快照格式')
+    @click.option('--report', 'report_types', multiple=True, help='报表类型（可多次指定），默认全部')
+    def export_snapshots(export_format, report_types):
+        """生成每日报表快照（由定时任务每晚执行）"""
+        from services.report_service import EXPORT_QUERY_BUILDERS
+        from utils.columnar_export import columnar_available, write_export_snapshots
+
+        if not columnar_available():
+            raise click.ClickException('生成快照需要安装 pyarrow')
+
+        report_types = report_types or tuple(EXPORT_QUERY_BUILDERS)
+        unknown = [report_type for report_type in report_types if report_type not in EXPORT_QUERY_BUILDERS]
+        if unknown:
+            raise click.BadParameter(f"不支持的报表类型: {', '.join(unknown)}")
+
+        result = write_export_snapshots(
+            {report_type: EXPORT_QUERY_BUILDERS[report_type]() for report_type in report_types},
+            export_format=export_format
+        )
+        for report_type, info in result['files'].items():
+            print(f"{report_type}: {info['row_count']} 行，{info['file_size']} 字节 -> {info['file_path']}")
+        if result['removed']:
+            print(f"已清理过期快照: {', '.join(result['removed'])}")
+
+    @app.cli.command('term-report')
+    @click.option('--semester', default=None, help='学期')
+    @click.option('--department', default=None, help='院系')
+    @click.option('--section', 'sections', multiple=True, help='分节（可多次指定），默认全部')
+    @click.option('--format', 'formats', multiple=True, type=click.Choice(['json', 'xlsx', 'pdf']), help='输出格式（可多次指定），默认 json+xlsx')
+    @click.option('--output', default='.', help='输出目录')
+    @click.option('--timeout', default=None, type=int, help='时限（秒）')
+    @click.option('--workers', default=None, type=int, help='工作进程数')
+    def term_report(semester, department, sections, formats, output, timeout, workers):
+        """生成全校成绩统计报表"""
+        from services.term_report import build_term_report, write_term_report_files
+        from utils.report_document import document_format_available
+
+        formats = formats or ('json', 'xlsx')
+        unavailable = [document_format for document_format in formats if not document_format_available(document_format)]
+        if unavailable:
+            raise click.ClickException(f"生成 {', '.join(unavailable)} 需要安装 reportlab")
+
+        def show_progress(completed, total, name, status):
+            print(f"[{completed}/{total}] {name}: {status}")
+
+        try:
+            document = build_term_report(
+                {'semester': semester, 'department': department}, sections, timeout, workers, progress=show_progress
+            )
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+
+        files = write_term_report_files(document, output, formats)
+        print(f"报表状态: {document['status']}，耗时 {document['duration_ms']} ms")
+        for document_format, path in files.items():
+            print(f"{document_format}: {path}")
+
+    @app.cli.command('generate-transcripts')
+    @click.option('--grade', default=None, help='年级')
+    @click.option('--major', default=None, help='专业')
+    @click.option('--class-name', default=None, help='班级')
+    @click.option('--status', 'academic_status', default=None, help='学业状态')
+    @click.option('--format', 'document_format', default='pdf', type=click.Choice(['pdf', 'html']), help='成绩单格式')
+    @click.option('--output', default='transcripts', help='输出目录（--zip 时为ZIP文件路径）')
+    @click.option('--zip', 'as_zip', is_flag=True, help='打包为单个ZIP文件')
+    @click.option('--workers', default=None, type=int, help='渲染工作进程数')
+    def generate_transcripts(grade, major, class_name, academic_status, document_format, output, as_zip, workers):
+        """批量生成学生成绩单"""
+        import time
+        from services.transcripts import transcript_zip_chunks, write_transcripts
+
+        filters = {'grade': grade, 'major': major, 'class_name': class_name, 'academic_status': academic_status}
+        try:
+            if as_zip:
+                started = time.perf_counter()
+                size = 0
+                with open(output, 'wb') as f:
+                    for chunk in transcript_zip_chunks(filters, document_format, workers):
+                        f.write(chunk)
+                        size += len(chunk)
+                print(f"已生成 {output}（{size} 字节），耗时 {round(time.perf_counter() - started, 2)} 秒")
+            else:
+                result = write_transcripts(filters, output, document_format, workers)
+                print(
+                    f"已生成 {result['count']} 份成绩单（{result['total_bytes']} 字节）-> {result['output_dir']}，"
+                    f"耗时 {result['duration_seconds']} 秒"
+                )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
     @app.cli.command()
     def seed_data():
         """填充种子数据"""
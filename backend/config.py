@@ -50,6 +50,19 @@ class Config:
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     JWT_BLACKLIST_ENABLED = True
     JWT_BLACKLIST_TOKEN_CHECKS = ['access', 'refresh']
+    TOKEN_REVOCATION_SYNC_INTERVAL = 5  # 从Redis同步令牌撤销列表的间隔（秒），其他实例上的撤销最多延迟这么久生效
+    TOKEN_REVOCATION_FILTER_CAPACITY = 100000  # 本地布隆过滤器容量
+    TOKEN_REVOCATION_FILTER_ERROR_RATE = 0.001  # 本地布隆过滤器误判率（误判时再查Redis确认）
+    TOKEN_REVOCATION_REBUILD_INTERVAL = 3600  # 清理过期令牌并重建本地过滤器的间隔（秒），其间只增量同步
+    TOKEN_REVOCATION_LOG_LENGTH = 10000  # 撤销变更日志保留的条数，落后更多的实例整体重建
+    PRINCIPAL_CACHE_SIZE = 10000  # 缓存的已认证用户主体数
+    PRINCIPAL_CACHE_TTL = 300  # 主体缓存最长有效期（秒），未经 UserService 的权限修改在此时间内生效
+
+    # 会话配置
+    SESSION_IDLE_TIMEOUT = 86400  # 会话空闲过期时间（秒）
+    SESSION_ACTIVITY_INTERVAL = 60  # 同一会话的活动时间最多每隔多少秒写一次
+    SESSION_FLUSH_INTERVAL = 5  # 批量写入活动时间的间隔（秒）
+    SESSION_FLUSH_BATCH_SIZE = 500  # 待写入的会话达到该数量时立即写入
 
     # CORS配置
     CORS_ORIGINS = ['http://localhost:3000', 'http://localhost:8080']
@@ -70,6 +83,7 @@ class Config:
     # 分页配置
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
+    PAGINATION_COUNT_CACHE_TIMEOUT = 60  # count=cached/estimated 时总数缓存秒数
 
     # 缓存配置
     CACHE_TYPE = 'redis'
@@ -80,6 +94,14 @@ class Config:
     LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
     LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs', 'app.log')
 
+    # SQL性能分析配置
+    SQL_PROFILER_ENABLED = True
+    SQL_PROFILER_HEADERS = False  # 非调试模式下是否输出 X-DB-* 响应头
+    SQL_PROFILER_SLOWEST_LIMIT = 5  # 每个请求保留的最慢语句数
+    SQL_PROFILER_DUPLICATE_THRESHOLD = 5  # 同一语句指纹在单个请求内执行达到该次数视为N+1
+    SQL_PROFILER_MAX_FINGERPRINTS = 1000  # 聚合统计保留的最大指纹数
+    SLOW_QUERY_THRESHOLD = 0.5  # 慢查询阈值（秒）
+
     # API配置
     API_VERSION = 'v1'
     API_PREFIX = f'/api/{API_VERSION}'
@@ -91,8 +113,33 @@ class Config:
 
     # 安全配置
     BCRYPT_LOG_ROUNDS = 12
+    PASSWORD_HASH_SCHEME = 'pbkdf2'  # 新密码的哈希算法：argon2/bcrypt/pbkdf2，旧哈希在登录时自动升级
+    PASSWORD_HASH_PBKDF2_ITERATIONS = 600000
+    PASSWORD_HASH_ARGON2_TIME_COST = 3
+    PASSWORD_HASH_ARGON2_MEMORY_COST = 65536  # KiB
+    PASSWORD_HASH_ARGON2_PARALLELISM = 1
+    PASSWORD_HASH_WORKERS = None  # 密码哈希工作进程数，默认为CPU核数的一半；0为在请求线程中计算
+    PASSWORD_HASH_MAX_PENDING = None  # 排队和执行中的哈希任务上限，默认为 工作进程数×8
+    PASSWORD_HASH_ADMISSION_TIMEOUT = 2.0  # 等待空位的最长秒数，超时返回503
+    PASSWORD_HASH_TASK_TIMEOUT = 30.0
+    PASSWORD_HASH_START_METHOD = 'spawn'
+    TWO_FACTOR_ISSUER = SYSTEM_NAME
+    TWO_FACTOR_VALID_WINDOW = 1  # 允许前后偏差的时间步数
+    TWO_FACTOR_SECRETS_ENCRYPTED = False  # 2FA密钥是否以 ENCRYPTION_KEY 加密存储
+    TWO_FACTOR_SECRET_CACHE_TTL = 60  # 解密后的密钥在内存中保留的秒数
+    TWO_FACTOR_SECRET_CACHE_SIZE = 10000
+    TWO_FACTOR_QR_CACHE_SIZE = 256  # 预生成的二维码数
+    CAPTCHA_STORAGE = 'redis'  # 验证码存储：redis/memory，Redis 未初始化时自动使用进程内存储
+    CAPTCHA_EXPIRE_TIME = 300  # 验证码有效期（秒）
+    CAPTCHA_POOL_SIZE = 200  # 预生成的验证码数，0为在请求线程中生成
+    CAPTCHA_POOL_LOW_WATERMARK = 50  # 剩余数量低于该值时后台补充
     RATELIMIT_STORAGE_URL = REDIS_URL
     RATELIMIT_DEFAULT = "100/hour"
+    RATE_LIMIT_ALGORITHM = 'sliding_window'  # 内存限流算法：sliding_window/token_bucket/gcra/sliding_log
+    RATE_LIMIT_SHARDS = 16  # 内存限流存储的分片（锁）数
+    RATE_LIMIT_SWEEP_INTERVAL = 60  # 清理空闲限流键（内存）/过期窗口计数（数据库）的间隔（秒）
+    RATE_LIMIT_ENDPOINTS = {}  # 按端点名覆盖全局限流规则，如 {'api.grades_list': '20/second;1000/hour'}
+    RATE_LIMIT_HEADERS = True  # 响应中添加 X-RateLimit-* 头
 
     # WebSocket配置
     SOCKETIO_ASYNC_MODE = 'gevent'
@@ -110,6 +157,24 @@ class Config:
     MIN_PASSWORD_LENGTH = 6
     MAX_LOGIN_ATTEMPTS = 5
     LOGIN_ATTEMPT_WINDOW = 300  # 5分钟
+    ACADEMIC_STATS_CHUNK_SIZE = 500  # GPA/学分全量重算每批学生数
+    REPORT_ROLLUP_CHUNK_SIZE = 200  # 报表汇总回填每批课程数
+    DASHBOARD_METRICS_BUCKET_SECONDS = 60  # 仪表板指标快照时间桶（秒）
+    REPORT_CACHE_TIMEOUT = 600  # 报表结果缓存有效期（秒）
+    REPORT_CACHE_MAX_SCOPES = 32  # 单个报表最多记录的依赖范围数
+    TERM_REPORT_MAX_WORKERS = 4  # 全校成绩统计报表并行计算的工作进程数
+    TERM_REPORT_TIMEOUT = 300  # 全校成绩统计报表时限（秒），超时输出已完成的分节
+    TERM_REPORT_START_METHOD = 'spawn'  # 工作进程启动方式（不继承Web进程的数据库连接）
+    TERM_REPORT_JOB_TTL = 86400  # 报表任务状态与文件保留时间（秒）
+    TRANSCRIPT_CHUNK_SIZE = 500  # 批量成绩单每次加载的学生数
+    TRANSCRIPT_MAX_WORKERS = 4  # 成绩单渲染工作进程数
+    TRANSCRIPT_RENDER_BATCH_SIZE = 50  # 每个渲染任务的成绩单数
+    TRANSCRIPT_START_METHOD = 'spawn'  # 渲染工作进程启动方式
+    EXPORT_STREAM_BATCH_SIZE = 1000  # 流式导出每批读取行数
+    EXPORT_XLSX_BUFFER_SIZE = 256 * 1024  # XLSX导出缓冲区上限（字节），超过即输出一个分块
+    EXPORT_RECORD_BATCH_SIZE = 10000  # Parquet/Arrow导出每个RecordBatch行数
+    EXPORT_PARQUET_COMPRESSION = 'zstd'
+    EXPORT_SNAPSHOT_RETENTION_DAYS = 30  # 每日快照保留天数
 
     @staticmethod
     def init_app(app):
@@ -175,6 +240,14 @@ class TestingConfig(Config):
     # 测试环境不发送邮件
     MAIL_SUPPRESS_SEND = True
 
+    # 测试环境在请求线程中计算密码哈希，并降低迭代次数
+    PASSWORD_HASH_WORKERS = 0
+    PASSWORD_HASH_PBKDF2_ITERATIONS = 1000
+
+    # 测试环境不启动验证码预生成线程，验证码存进程内
+    CAPTCHA_POOL_SIZE = 0
+    CAPTCHA_STORAGE = 'memory'
+
     # 测试环境文件上传到临时目录
     UPLOAD_FOLDER = '/tmp/uploads'
 
@@ -2,6 +2,7 @@
 # 学生信息管理系统 - 数据模型初始化
 # ========================================
 
+from extensions import db
 from models.user import User, UserProfile
 from models.student import Student
 from models.teacher import Teacher
@@ -9,12 +10,15 @@ from models.admin import Admin
 from models.course import Course
 from models.enrollment import Enrollment
 from models.grade import Grade
+from models.academic_stats import StudentSemesterStats
+from models.report_rollups import CourseDailyRollup, CourseSemesterRollup, DepartmentSemesterRollup
 from models.message import Message, MessageTemplate
 from models.audit_log import AuditLog
 from models.system_config import SystemConfig
 
 # 导出所有模型类
 __all__ = [
+    'db',
     'User',
     'UserProfile',
     'Student',
@@ -23,6 +27,10 @@ __all__ = [
     'Course',
     'Enrollment',
     'Grade',
+    'StudentSemesterStats',
+    'CourseDailyRollup',
+    'CourseSemesterRollup',
+    'DepartmentSemesterRollup',
     'Message',
     'MessageTemplate',
     'AuditLog',
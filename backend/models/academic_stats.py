@@ -0,0 +1,619 @@
+# ========================================
+# 学生信息管理系统 - 学业统计（GPA/学分）
+# ========================================
+
+"""
+学生GPA与学分的统一计算引擎。
+
+计算口径：
+- 课程成绩：同一学生、课程、学期下期中/期末成绩按权重加权的百分制分数
+- 课程绩点：按当前等级表（models.grading_scale）由课程成绩换算
+- GPA：Σ(课程绩点 × 学分) / Σ学分
+- 已获学分：课程成绩达到课程及格线的学分；在修学分：状态为已选课且尚无课程成绩的选课学分
+
+结果按学期保存在 student_semester_stats，学生总计回写到 students 表。
+成绩、选课或课程学分变化时，在会话 flush 后按 (学生, 学期) 增量刷新；
+全量重算和一致性检查按学生分块执行，每块只需两条聚合查询。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, String, Integer, Float, DateTime, Index, UniqueConstraint
+from sqlalchemy import and_, bindparam, case, delete, event, func, inspect, insert, select, update
+from sqlalchemy.orm import Session, relationship
+
+from extensions import db
+from .base import BaseModel
+from .grading_scale import get_grading_scale, grade_percentage
+
+# 影响统计结果的字段
+_GRADE_FIELDS = ('student_id', 'course_id', 'semester', 'score', 'max_score', 'weight', 'exam_type')
+_ENROLLMENT_FIELDS = ('student_id', 'course_id', 'semester', 'status')
+_COURSE_FIELDS = ('credits', 'passing_score')
+
+_STUDENT_STAT_FIELDS = ['gpa', 'total_credits', 'credits_earned', 'credits_in_progress']
+
+
+class StudentSemesterStats(BaseModel):
+    """学生学期学业统计"""
+
+    __tablename__ = 'student_semester_stats'
+
+    student_id = Column(db.CHAR(36), db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False)
+    semester = Column(String(20), nullable=False)
+
+    grade_points = Column(Float, nullable=False, default=0.0)  # Σ(绩点 × 学分)
+    graded_credits = Column(Float, nullable=False, default=0.0)  # 已出成绩的学分
+    credits_earned = Column(Float, nullable=False, default=0.0)  # 已获学分
+    credits_in_progress = Column(Float, nullable=False, default=0.0)  # 在修学分
+    course_count = Column(Integer, nullable=False, default=0)  # 已出成绩的课程数
+    gpa = Column(Float)
+
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    student = relationship("Student")
+
+    __table_args__ = (
+        UniqueConstraint('student_id', 'semester', name='uq_student_semester_stats'),
+        Index('idx_semester_stats_semester', 'semester'),
+    )
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'semester': self.semester,
+            'gpa': self.gpa,
+            'graded_credits': self.graded_credits,
+            'credits_earned': self.credits_earned,
+            'credits_in_progress': self.credits_in_progress,
+            'course_count': self.course_count,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
+    def __repr__(self):
+        return f"<StudentSemesterStats(student_id='{self.student_id}', semester='{self.semester}', gpa={self.gpa})>"
+
+
+# ========================================
+# 聚合计算
+# ========================================
+
+def course_results_query(student_ids: Iterable[str], semesters: Iterable[str] = None):
+    """
+    按 (学生, 课程, 学期) 聚合课程成绩的查询（期中/期末按权重加权的百分制分数）
+
+    Args:
+        student_ids: 学生ID列表
+        semesters: 限定的学期列表，None表示全部学期
+
+    Returns:
+        Select: student_id/course_id/semester/percentage 四列
+    """
+    from .grade import Grade, GradeType
+
+    weight = func.coalesce(Grade.weight, 1.0)
+    percentage = grade_percentage(Grade)
+
+    query = select(
+        Grade.student_id.label('student_id'),
+        Grade.course_id.label('course_id'),
+        Grade.semester.label('semester'),
+        (func.sum(percentage * weight) / func.sum(weight)).label('percentage')
+    ).where(
+        Grade.student_id.in_(list(student_ids)),
+        Grade.exam_type.in_([GradeType.MIDTERM, GradeType.FINAL]),
+        Grade.score.isnot(None)
+    ).group_by(
+        Grade.student_id, Grade.course_id, Grade.semester
+    ).having(func.sum(weight) > 0)
+
+    if semesters is not None:
+        query = query.where(Grade.semester.in_(list(semesters)))
+
+    return query
+
+
+def _course_results_subquery(student_ids: Iterable[str], semesters: Iterable[str] = None):
+    """按 (学生, 课程, 学期) 聚合课程成绩的子查询"""
+    return course_results_query(student_ids, semesters).subquery('course_results')
+
+
+def _empty_row() -> Dict[str, Any]:
+    return {
+        'grade_points': 0.0,
+        'graded_credits': 0.0,
+        'credits_earned': 0.0,
+        'credits_in_progress': 0.0,
+        'course_count': 0
+    }
+
+
+def compute_semester_rows(
+    connection,
+    student_ids: Iterable[str],
+    semesters: Iterable[str] = None
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    计算学生的学期统计
+
+    Args:
+        connection: 数据库连接或会话
+        student_ids: 学生ID列表
+        semesters: 限定的学期列表，None表示全部学期
+
+    Returns:
+        Dict: (学生ID, 学期) -> 统计值
+    """
+    from .course import Course
+    from .enrollment import Enrollment, EnrollmentStatus
+
+    student_ids = list(student_ids)
+    if not student_ids:
+        return {}
+    if semesters is not None:
+        semesters = list(semesters)
+        if not semesters:
+            return {}
+
+    scale = get_grading_scale()
+    results = _course_results_subquery(student_ids, semesters)
+    credits = func.coalesce(Course.credits, 0.0)
+    passing_score = func.coalesce(Course.passing_score, scale.passing_score)
+
+    graded_query = select(
+        results.c.student_id,
+        results.c.semester,
+        func.sum(scale.point_case(results.c.percentage) * credits).label('grade_points'),
+        func.sum(credits).label('graded_credits'),
+        func.sum(case((results.c.percentage >= passing_score, credits), else_=0.0)).label('credits_earned'),
+        func.count().label('course_count')
+    ).join(
+        Course, Course.id == results.c.course_id
+    ).group_by(results.c.student_id, results.c.semester)
+
+    in_progress_query = select(
+        Enrollment.student_id,
+        Enrollment.semester,
+        func.sum(credits).label('credits_in_progress')
+    ).join(
+        Course, Course.id == Enrollment.course_id
+    ).where(
+        Enrollment.student_id.in_(student_ids),
+        Enrollment.status == EnrollmentStatus.ENROLLED,
+        # 已出成绩的课程计入已获学分，不再计入在修学分
+        ~select(results.c.course_id).where(
+            results.c.student_id == Enrollment.student_id,
+            results.c.course_id == Enrollment.course_id,
+            results.c.semester == Enrollment.semester
+        ).exists()
+    ).group_by(Enrollment.student_id, Enrollment.semester)
+
+    if semesters is not None:
+        in_progress_query = in_progress_query.where(Enrollment.semester.in_(semesters))
+
+    rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    for row in connection.execute(graded_query):
+        stats = rows.setdefault((row.student_id, row.semester), _empty_row())
+        stats['grade_points'] = float(row.grade_points or 0)
+        stats['graded_credits'] = float(row.graded_credits or 0)
+        stats['credits_earned'] = float(row.credits_earned or 0)
+        stats['course_count'] = int(row.course_count or 0)
+
+    for row in connection.execute(in_progress_query):
+        stats = rows.setdefault((row.student_id, row.semester), _empty_row())
+        stats['credits_in_progress'] = float(row.credits_in_progress or 0)
+
+    for stats in rows.values():
+        stats['gpa'] = _gpa(stats['grade_points'], stats['graded_credits'])
+
+    return rows
+
+
+def _gpa(grade_points: float, graded_credits: float) -> Optional[float]:
+    if graded_credits <= 0:
+        return None
+    return round(grade_points / graded_credits, 2)
+
+
+def summarize_student(semester_rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    由学期统计汇总学生总计
+
+    Args:
+        semester_rows: 学生各学期统计
+
+    Returns:
+        Dict: gpa/total_credits/credits_earned/credits_in_progress
+    """
+    grade_points = graded_credits = earned = in_progress = 0.0
+    for stats in semester_rows:
+        grade_points += stats['grade_points']
+        graded_credits += stats['graded_credits']
+        earned += stats['credits_earned']
+        in_progress += stats['credits_in_progress']
+
+    return {
+        'gpa': _gpa(grade_points, graded_credits),
+        'credits_earned': int(round(earned)),
+        'credits_in_progress': int(round(in_progress)),
+        'total_credits': int(round(earned)) + int(round(in_progress))
+    }
+
+
+# ========================================
+# 写入
+# ========================================
+
+def _write_semester_rows(connection, student_ids: List[str], rows: Dict, semesters: List[str] = None):
+    """替换学生（指定学期）的学期统计"""
+    table = StudentSemesterStats.__table__
+
+    condition = table.c.student_id.in_(student_ids)
+    if semesters is not None:
+        condition = and_(condition, table.c.semester.in_(semesters))
+    connection.execute(delete(table).where(condition))
+
+    if rows:
+        now = datetime.utcnow()
+        connection.execute(insert(table), [
+            dict(stats, student_id=student_id, semester=semester, refreshed_at=now)
+            for (student_id, semester), stats in rows.items()
+        ])
+
+
+def _write_student_totals(connection, totals: Dict[str, Dict[str, Any]]):
+    """回写学生总计"""
+    if not totals:
+        return
+
+    table = db.metadata.tables['students']
+    statement = update(table).where(table.c.id == bindparam('b_id')).values(
+        gpa=bindparam('b_gpa'),
+        total_credits=bindparam('b_total_credits'),
+        credits_earned=bindparam('b_credits_earned'),
+        credits_in_progress=bindparam('b_credits_in_progress'),
+        updated_at=datetime.utcnow()
+    )
+    connection.execute(statement, [
+        {
+            'b_id': student_id,
+            'b_gpa': values['gpa'],
+            'b_total_credits': values['total_credits'],
+            'b_credits_earned': values['credits_earned'],
+            'b_credits_in_progress': values['credits_in_progress']
+        }
+        for student_id, values in totals.items()
+    ])
+
+
+def _load_semester_rows(connection, student_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """读取已保存的学期统计，按学生分组"""
+    table = StudentSemesterStats.__table__
+    grouped: Dict[str, List[Dict[str, Any]]] = {student_id: [] for student_id in student_ids}
+
+    result = connection.execute(
+        select(
+            table.c.student_id, table.c.semester, table.c.grade_points, table.c.graded_credits,
+            table.c.credits_earned, table.c.credits_in_progress, table.c.course_count, table.c.gpa
+        ).where(table.c.student_id.in_(student_ids))
+    )
+    for row in result:
+        grouped[row.student_id].append(dict(row._mapping))
+
+    return grouped
+
+
+def refresh_student_stats(
+    student_ids: Iterable[str],
+    semesters: Iterable[str] = None,
+    connection=None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    刷新学生统计（增量：只重算指定学期，再由学期统计汇总总计）
+
+    Args:
+        student_ids: 学生ID列表
+        semesters: 需要重算的学期，None表示全部学期
+        connection: 数据库连接，默认使用当前会话的连接
+
+    Returns:
+        Dict: 学生ID -> 刷新后的总计
+    """
+    student_ids = list(dict.fromkeys(student_id for student_id in student_ids if student_id))
+    if not student_ids:
+        return {}
+
+    if connection is None:
+        connection = db.session.connection()
+    if semesters is not None:
+        semesters = list(dict.fromkeys(semesters))
+
+    rows = compute_semester_rows(connection, student_ids, semesters)
+    _write_semester_rows(connection, student_ids, rows, semesters)
+
+    if semesters is None:
+        grouped = {student_id: [] for student_id in student_ids}
+        for (student_id, _), stats in rows.items():
+            grouped[student_id].append(stats)
+    else:
+        grouped = _load_semester_rows(connection, student_ids)
+
+    totals = {student_id: summarize_student(semester_rows) for student_id, semester_rows in grouped.items()}
+    _write_student_totals(connection, totals)
+    return totals
+
+
+def refresh_changed(connection, keys: Set[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    按 (学生ID, 学期) 集合刷新统计
+
+    Args:
+        connection: 数据库连接
+        keys: 发生变化的 (学生ID, 学期)
+
+    Returns:
+        Dict: 学生ID -> 刷新后的总计
+    """
+    by_student: Dict[str, Set[str]] = {}
+    for student_id, semester in keys:
+        if student_id and semester:
+            by_student.setdefault(student_id, set()).add(semester)
+
+    # 学期集合相同的学生合并为一次刷新
+    groups: Dict[frozenset, List[str]] = {}
+    for student_id, semesters in by_student.items():
+        groups.setdefault(frozenset(semesters), []).append(student_id)
+
+    totals: Dict[str, Dict[str, Any]] = {}
+    for semesters, student_ids in groups.items():
+        for start in range(0, len(student_ids), 500):
+            totals.update(refresh_student_stats(student_ids[start:start + 500], semesters, connection))
+    return totals
+
+
+def _iter_student_id_chunks(chunk_size: int, student_ids: Iterable[str] = None):
+    """按主键顺序分块遍历学生ID（每块之间可提交事务）"""
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        for start in range(0, len(student_ids), chunk_size):
+            yield student_ids[start:start + chunk_size]
+        return
+
+    table = db.metadata.tables['students']
+    last_id = None
+    while True:
+        query = select(table.c.id).order_by(table.c.id).limit(chunk_size)
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        chunk = [row.id for row in db.session.execute(query)]
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def recompute_all_stats(chunk_size: int = 500, student_ids: Iterable[str] = None) -> Dict[str, Any]:
+    """
+    全量重算学生统计，每块学生单独提交
+
+    Args:
+        chunk_size: 每块学生数
+        student_ids: 限定的学生ID，None表示全部学生
+
+    Returns:
+        Dict: 处理的学生数、块数、耗时
+    """
+    started = datetime.utcnow()
+    processed = chunks = 0
+
+    for chunk in _iter_student_id_chunks(chunk_size, student_ids):
+        refresh_student_stats(chunk, connection=db.session.connection())
+        db.session.commit()
+        processed += len(chunk)
+        chunks += 1
+
+    db.session.expire_all()
+
+    return {
+        'students': processed,
+        'chunks': chunks,
+        'duration_seconds': round((datetime.utcnow() - started).total_seconds(), 3)
+    }
+
+
+def check_stats_consistency(
+    chunk_size: int = 500,
+    student_ids: Iterable[str] = None,
+    tolerance: float = 0.01,
+    fix: bool = False
+) -> Dict[str, Any]:
+    """
+    检查已保存的统计与重新计算的结果是否一致
+
+    Args:
+        chunk_size: 每块学生数
+        student_ids: 限定的学生ID，None表示全部学生
+        tolerance: 允许的数值误差
+        fix: 是否修复不一致的学生
+
+    Returns:
+        Dict: 检查的学生数、不一致明细、修复数量
+    """
+    students = db.metadata.tables['students']
+    checked = 0
+    mismatches: List[Dict[str, Any]] = []
+    fixed = 0
+
+    def _differs(stored, expected) -> bool:
+        if stored is None or expected is None:
+            return stored is not expected
+        return abs(float(stored) - float(expected)) > tolerance
+
+    for chunk in _iter_student_id_chunks(chunk_size, student_ids):
+        connection = db.session.connection()
+        expected_rows = compute_semester_rows(connection, chunk)
+        stored_rows = _load_semester_rows(connection, chunk)
+        stored_totals = {
+            row.id: row for row in connection.execute(
+                select(students.c.id, *[students.c[name] for name in _STUDENT_STAT_FIELDS])
+                .where(students.c.id.in_(chunk))
+            )
+        }
+
+        broken = []
+        for student_id in chunk:
+            expected_semesters = {
+                semester: stats for (sid, semester), stats in expected_rows.items() if sid == student_id
+            }
+            stored_semesters = {stats['semester']: stats for stats in stored_rows.get(student_id, [])}
+            problems = []
+
+            for semester in set(expected_semesters) | set(stored_semesters):
+                expected = expected_semesters.get(semester)
+                stored = stored_semesters.get(semester)
+                if expected is None or stored is None:
+                    problems.append({'semester': semester, 'field': 'row',
+                                     'stored': stored is not None, 'expected': expected is not None})
+                    continue
+                for field in ('grade_points', 'graded_credits', 'credits_earned', 'credits_in_progress', 'gpa'):
+                    if _differs(stored[field], expected[field]):
+                        problems.append({'semester': semester, 'field': field,
+                                         'stored': stored[field], 'expected': expected[field]})
+
+            expected_total = summarize_student(expected_semesters.values())
+            stored_total = stored_totals.get(student_id)
+            if stored_total is not None:
+                for field in _STUDENT_STAT_FIELDS:
+                    if _differs(getattr(stored_total, field), expected_total[field]):
+                        problems.append({'semester': None, 'field': field,
+                                         'stored': getattr(stored_total, field), 'expected': expected_total[field]})
+
+            if problems:
+                broken.append(student_id)
+                mismatches.append({'student_id': student_id, 'problems': problems})
+
+        if fix and broken:
+            refresh_student_stats(broken, connection=connection)
+            db.session.commit()
+            fixed += len(broken)
+
+        checked += len(chunk)
+
+    if fix:
+        db.session.expire_all()
+
+    return {
+        'checked': checked,
+        'mismatched': len(mismatches),
+        'fixed': fixed,
+        'mismatches': mismatches[:100]
+    }
+
+
+# ========================================
+# 查询
+# ========================================
+
+def get_semester_stats(student_id: str, semester: str = None) -> List[StudentSemesterStats]:
+    """
+    获取学生的学期统计
+
+    Args:
+        student_id: 学生ID
+        semester: 学期，None表示全部学期
+
+    Returns:
+        List[StudentSemesterStats]: 按学期排序的统计
+    """
+    query = StudentSemesterStats.query.filter_by(student_id=student_id)
+    if semester:
+        query = query.filter_by(semester=semester)
+    return query.order_by(StudentSemesterStats.semester).all()
+
+
+# ========================================
+# 增量刷新
+# ========================================
+
+def _changed(state, fields) -> bool:
+    return any(state.attrs[name].history.has_changes() for name in fields)
+
+
+def _collect_changed(session, model, objects: List, pending: Set):
+    """
+    已修改对象：新值和数据库中的原值都计入
+
+    过期对象被赋值时不会加载原值（history 中没有旧值），因此 flush 前统一查询一次原值
+    """
+    if not objects:
+        return
+
+    previous = session.connection().execute(
+        select(model.student_id, model.semester).where(model.id.in_([obj.id for obj in objects]))
+    )
+    pending.update((row.student_id, row.semester) for row in previous)
+    pending.update((obj.student_id, obj.semester) for obj in objects)
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_stats_changes(session, flush_context, instances):
+    """flush 前记录受影响的 (学生, 学期)"""
+    from .course import Course
+    from .enrollment import Enrollment
+    from .grade import Grade
+
+    pending = session.info.setdefault('academic_stats_pending', set())
+    pending_courses = session.info.setdefault('academic_stats_pending_courses', set())
+
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (Grade, Enrollment)):
+            pending.add((obj.student_id, obj.semester))
+
+    changed_grades, changed_enrollments = [], []
+    for obj in session.dirty:
+        if isinstance(obj, Grade):
+            if _changed(inspect(obj), _GRADE_FIELDS):
+                changed_grades.append(obj)
+        elif isinstance(obj, Enrollment):
+            if _changed(inspect(obj), _ENROLLMENT_FIELDS):
+                changed_enrollments.append(obj)
+        elif isinstance(obj, Course):
+            if _changed(inspect(obj), _COURSE_FIELDS):
+                pending_courses.add(obj.id)
+
+    _collect_changed(session, Grade, changed_grades, pending)
+    _collect_changed(session, Enrollment, changed_enrollments, pending)
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _refresh_stats_after_flush(session, flush_context):
+    """flush 后在同一事务内刷新受影响学生的统计"""
+    from .enrollment import Enrollment
+    from .grade import Grade
+    from .student import Student
+
+    pending = session.info.pop('academic_stats_pending', None) or set()
+    pending_courses = session.info.pop('academic_stats_pending_courses', None) or set()
+    if not pending and not pending_courses:
+        return
+
+    connection = session.connection()
+
+    # 课程学分或及格线变化，影响该课程所有学生的对应学期
+    if pending_courses:
+        course_ids = list(pending_courses)
+        for model in (Grade, Enrollment):
+            pending.update(
+                (row.student_id, row.semester) for row in connection.execute(
+                    select(model.student_id, model.semester).where(model.course_id.in_(course_ids)).distinct()
+                )
+            )
+
+    totals = refresh_changed(connection, pending)
+
+    # 会话中已加载的学生对象改为读取新值
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Student) and obj.id in totals and obj not in session.dirty:
+            session.expire(obj, _STUDENT_STAT_FIELDS)
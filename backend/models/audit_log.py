@@ -77,6 +77,7 @@ class AuditLog(BaseModel):
         Index('idx_resource_timestamp', 'resource_type', 'resource_id', 'timestamp'),
         Index('idx_ip_timestamp', 'ip_address', 'timestamp'),
         Index('idx_batch_id', 'batch_id'),
+        Index('idx_timestamp_id', 'timestamp', 'id'),  # 键集分页
     )
 
     def __init__(self, **kwargs):
@@ -3,11 +3,16 @@
 # ========================================
 
 import enum
-from sqlalchemy import Column, String, Integer, Float, Text, Enum, ForeignKey, Index, CheckConstraint
+from sqlalchemy import Column, String, Integer, Float, Text, Enum, ForeignKey, Index, CheckConstraint, JSON, Boolean
+from sqlalchemy import func, literal, select
 from sqlalchemy.orm import relationship
 from extensions import db
 from .base import BaseModel
 
+# 课程成绩分布的默认分段（百分制）
+GRADE_DISTRIBUTION_EDGES = (0, 60, 70, 80, 90, 100)
+GRADE_DISTRIBUTION_LABELS = ('F (0-59)', 'D (60-69)', 'C (70-79)', 'B (80-89)', 'A (90-100)')
+
 class CourseType(enum.Enum):
     """课程类型枚举"""
     REQUIRED = "required"  # 必修课
@@ -21,7 +26,7 @@ class CourseStatus(enum.Enum):
     INACTIVE = "inactive"  # 未开课
     COMPLETED = "completed"  # 已结束
     CANCELLED = "cancelled"  # 已取消
-PLANNING = "planning"  # 计划中
+    PLANNING = "planning"  # 计划中
 
 class Course(BaseModel):
     """课程模型"""
@@ -255,51 +260,79 @@ class Course(BaseModel):
             exam_type=GradeType.FINAL
         ).all()
 
-    def calculate_class_average(self, exam_type):
-        """计算班级平均分"""
-        from .grade import Grade
-        grades = Grade.query.filter_by(
-            course_id=self.id,
-            exam_type=exam_type
-        ).filter(Grade.score.isnot(None)).all()
+    @staticmethod
+    def _exam_type(exam_type):
+        """考试类型参数可为枚举或值（如 'final'）"""
+        from .grade import GradeType
+        return exam_type if isinstance(exam_type, GradeType) else GradeType(exam_type)
 
-        if not grades:
-            return None
-
-        return sum(grade.score for grade in grades) / len(grades)
-
-    def get_grade_distribution(self, exam_type):
-        """获取成绩分布"""
+    def _grade_distribution_source(self, exam_type):
+        """本课程某类考试成绩（百分制）的查询"""
         from .grade import Grade
-        grades = Grade.query.filter_by(
-            course_id=self.id,
-            exam_type=exam_type
-        ).filter(Grade.score.isnot(None)).all()
+        from .grading_scale import grade_percentage
+        return select(grade_percentage(Grade).label('value')).where(
+            Grade.course_id == self.id,
+            Grade.exam_type == self._exam_type(exam_type)
+        )
 
-        if not grades:
+    def calculate_class_average(self, exam_type):
+        """计算班级平均分"""
+        from .grade import Grade
+        average = db.session.query(func.avg(Grade.score)).filter(
+            Grade.course_id == self.id,
+            Grade.exam_type == self._exam_type(exam_type),
+            Grade.score.isnot(None)
+        ).scalar()
+        return float(average) if average is not None else None
+
+    def get_grade_distribution(self, exam_type, edges=None):
+        """
+        获取成绩分布（在数据库中分段计数）
+
+        Args:
+            exam_type: 考试类型
+            edges: 分段边界（百分制），默认按 A/B/C/D/F 五段
+
+        Returns:
+            dict: {分段名: 人数}，无成绩时为空
+        """
+        from utils.grade_distribution import query_distribution
+
+        labels = None if edges is not None else GRADE_DISTRIBUTION_LABELS
+        result = query_distribution(
+            self._grade_distribution_source(exam_type),
+            edges=edges if edges is not None else GRADE_DISTRIBUTION_EDGES,
+            labels=labels
+        )
+        if not result['count']:
             return {}
-
-        distribution = {
-            'A (90-100)': 0,
-            'B (80-89)': 0,
-            'C (70-79)': 0,
-            'D (60-69)': 0,
-            'F (0-59)': 0
-        }
-
-        for grade in grades:
-            if grade.score >= 90:
-                distribution['A (90-100)'] += 1
-            elif grade.score >= 80:
-                distribution['B (80-89)'] += 1
-            elif grade.score >= 70:
-                distribution['C (70-79)'] += 1
-            elif grade.score >= 60:
-                distribution['D (60-69)'] += 1
-            else:
-                distribution['F (0-59)'] += 1
-
-        return distribution
+        # 高分段在前
+        return {item['label']: item['count'] for item in reversed(result['histogram'])}
+
+    def get_grade_statistics(self, exam_type, scale=None, edges=None, percentiles=None):
+        """
+        获取成绩统计：均值、标准差、百分位、及格率、分段直方图和等级分布
+
+        Args:
+            exam_type: 考试类型
+            scale: 成绩等级表，默认为当前等级表
+            edges: 分段边界（百分制）
+            percentiles: 百分位
+
+        Returns:
+            dict: 见 utils.grade_distribution.query_distribution
+        """
+        from utils.grade_distribution import query_distribution
+        from .grade import Grade
+        from .grading_scale import get_grading_scale, grade_percentage
+
+        scale = scale or get_grading_scale()
+        passing_score = self.passing_score if self.passing_score is not None else scale.passing_score
+        source = select(
+            grade_percentage(Grade).label('value'),
+            literal(passing_score).label('passing_score')
+        ).where(Grade.course_id == self.id, Grade.exam_type == self._exam_type(exam_type))
+        return query_distribution(source, scale, edges, percentiles)
 
     def duplicate_for_semester(self, new_semester, new_teacher_id=None):
         """为新学期复制课程"""
@@ -8,6 +8,7 @@ from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Index, CheckC
 from sqlalchemy.orm import relationship
 from extensions import db
 from .base import BaseModel
+from .grading_scale import get_grading_scale
 
 class EnrollmentStatus(enum.Enum):
     """选课状态枚举"""
@@ -74,6 +75,7 @@ class Enrollment(BaseModel):
         Index('idx_course_semester_status', 'course_id', 'semester', 'status'),
         Index('idx_student_semester_status', 'student_id', 'semester', 'status'),
         Index('idx_enrollment_date', 'enrollment_date'),
+        Index('idx_enrollment_date_id', 'enrollment_date', 'id'),  # 键集分页
         CheckConstraint('final_score >= 0 AND final_score <= 100', name='check_final_score_range'),
         CheckConstraint('grade_point >= 0 AND grade_point <= 4.0', name='check_grade_point_range'),
         CheckConstraint('attendance_count >= 0', name='check_attendance_positive'),
@@ -169,49 +171,11 @@ class Enrollment(BaseModel):
 
     def _calculate_grade_point(self, score):
         """计算绩点"""
-        if score >= 90:
-            return 4.0
-        elif score >= 85:
-            return 3.7
-        elif score >= 82:
-            return 3.3
-        elif score >= 78:
-            return 3.0
-        elif score >= 75:
-            return 2.7
-        elif score >= 72:
-            return 2.3
-        elif score >= 68:
-            return 2.0
-        elif score >= 64:
-            return 1.5
-        elif score >= 60:
-            return 1.0
-        else:
-            return 0.0
+        return get_grading_scale().point_for(score)
 
     def _calculate_letter_grade(self, score):
         """计算等级成绩"""
-        if score >= 90:
-            return "A"
-        elif score >= 85:
-            return "A-"
-        elif score >= 82:
-            return "B+"
-        elif score >= 78:
-            return "B"
-        elif score >= 75:
-            return "B-"
-        elif score >= 72:
-            return "C+"
-        elif score >= 68:
-            return "C"
-        elif score >= 64:
-            return "C-"
-        elif score >= 60:
-            return "D"
-        else:
-            return "F"
+        return get_grading_scale().letter_for(score)
 
     def record_attendance(self, present=True, tardy=False):
         """记录考勤"""
@@ -8,6 +8,7 @@ from sqlalchemy import Column, String, Float, DateTime, Enum, ForeignKey, Index,
 from sqlalchemy.orm import relationship
 from extensions import db
 from .base import BaseModel
+from .grading_scale import get_grading_scale
 
 class GradeType(enum.Enum):
     """成绩类型枚举"""
@@ -94,6 +95,7 @@ class Grade(BaseModel):
         Index('idx_course_semester_type', 'course_id', 'semester', 'exam_type'),
         Index('idx_graded_by_date', 'graded_by', 'graded_at'),
         Index('idx_exam_name', 'exam_name'),
+        Index('idx_grade_created_id', 'created_at', 'id'),  # 键集分页
         CheckConstraint('score >= 0 AND score <= max_score', name='check_score_range'),
         CheckConstraint('max_score > 0', name='check_max_score_positive'),
         CheckConstraint('weight >= 0', name='check_weight_positive'),
@@ -134,63 +136,21 @@ class Grade(BaseModel):
         """获取等级成绩"""
         if self.score is None:
             return None
-
-        percentage = self.percentage
-        if percentage >= 90:
-            return "A"
-        elif percentage >= 85:
-            return "A-"
-        elif percentage >= 82:
-            return "B+"
-        elif percentage >= 78:
-            return "B"
-        elif percentage >= 75:
-            return "B-"
-        elif percentage >= 72:
-            return "C+"
-        elif percentage >= 68:
-            return "C"
-        elif percentage >= 64:
-            return "C-"
-        elif percentage >= 60:
-            return "D"
-        else:
-            return "F"
+        return get_grading_scale().letter_for(self.percentage)
 
     @property
     def grade_point(self):
         """获取绩点"""
         if self.score is None:
             return None
-
-        percentage = self.percentage
-        if percentage >= 90:
-            return 4.0
-        elif percentage >= 85:
-            return 3.7
-        elif percentage >= 82:
-            return 3.3
-        elif percentage >= 78:
-            return 3.0
-        elif percentage >= 75:
-            return 2.7
-        elif percentage >= 72:
-            return 2.3
-        elif percentage >= 68:
-            return 2.0
-        elif percentage >= 64:
-            return 1.5
-        elif percentage >= 60:
-            return 1.0
-        else:
-            return 0.0
+        return get_grading_scale().point_for(self.percentage)
 
     @property
     def is_passing(self):
         """是否及格"""
         if self.score is None:
             return False
-        return self.percentage >= 60
+        return get_grading_scale().is_passing(self.percentage)
 
     @property
     def can_be_modified(self):
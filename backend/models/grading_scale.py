@@ -0,0 +1,362 @@
+# ========================================
+# 学生信息管理系统 - 成绩等级换算
+# ========================================
+
+"""
+统一的分数 -> 等级/绩点换算。
+
+等级表通过系统配置 academic.grading_scale 维护（JSON）：
+
+    {
+        "passing_score": 60,
+        "bands": [
+            {"min_score": 90, "letter": "A", "grade_point": 4.0},
+            ...
+            {"min_score": 0, "letter": "F", "grade_point": 0.0}
+        ]
+    }
+
+等级表编译为按百分制分数下标的查找数组（整数分界为0-100共101项，
+含一位小数分界时为0-1000共1001项），单个换算为一次数组访问；
+整列分数可用 letters_for/points_for 批量换算（安装numpy时向量化）；
+letter_case/point_case 生成等价的 SQL CASE 表达式，供数据库内聚合使用。
+
+修改等级表后，已保存的GPA需执行 flask recompute-academic-stats 重算。
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from flask import has_app_context
+from sqlalchemy import case, event, func, select
+
+from extensions import db
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖
+    np = None
+
+logger = logging.getLogger(__name__)
+
+GRADING_SCALE_CONFIG_KEY = 'academic.grading_scale'
+
+DEFAULT_GRADING_SCALE = {
+    'passing_score': 60,
+    'bands': [
+        {'min_score': 90, 'letter': 'A', 'grade_point': 4.0},
+        {'min_score': 85, 'letter': 'A-', 'grade_point': 3.7},
+        {'min_score': 82, 'letter': 'B+', 'grade_point': 3.3},
+        {'min_score': 78, 'letter': 'B', 'grade_point': 3.0},
+        {'min_score': 75, 'letter': 'B-', 'grade_point': 2.7},
+        {'min_score': 72, 'letter': 'C+', 'grade_point': 2.3},
+        {'min_score': 68, 'letter': 'C', 'grade_point': 2.0},
+        {'min_score': 64, 'letter': 'C-', 'grade_point': 1.5},
+        {'min_score': 60, 'letter': 'D', 'grade_point': 1.0},
+        {'min_score': 0, 'letter': 'F', 'grade_point': 0.0},
+    ]
+}
+
+# 浮点误差容忍（如 0.29 * 100 = 28.999999999999996）
+_EPSILON = 1e-9
+
+
+class GradingScale:
+    """编译后的成绩等级表"""
+
+    def __init__(self, bands: Sequence[Dict[str, Any]], passing_score: float = 60):
+        """
+        编译等级表
+
+        Args:
+            bands: 等级分段，每段包含 min_score/letter/grade_point
+            passing_score: 及格分数
+
+        Raises:
+            ValueError: 等级表不合法
+        """
+        if not bands:
+            raise ValueError("等级表不能为空")
+
+        self.bands = sorted(
+            (
+                {
+                    'min_score': float(band['min_score']),
+                    'letter': str(band['letter']),
+                    'grade_point': float(band['grade_point'])
+                }
+                for band in bands
+            ),
+            key=lambda band: band['min_score'],
+            reverse=True
+        )
+        self.passing_score = float(passing_score)
+
+        thresholds = [band['min_score'] for band in self.bands]
+        if len(set(thresholds)) != len(thresholds):
+            raise ValueError("等级分界分数不能重复")
+        if thresholds[-1] != 0:
+            raise ValueError("等级表必须包含最低分为0的分段")
+        if thresholds[0] > 100:
+            raise ValueError("等级分界分数不能超过100")
+
+        # 整数分界按1分精度，含小数分界按0.1分精度
+        if all(threshold == int(threshold) for threshold in thresholds):
+            self.resolution = 1
+        elif all(abs(threshold * 10 - round(threshold * 10)) < _EPSILON for threshold in thresholds):
+            self.resolution = 10
+        else:
+            raise ValueError("等级分界分数最多保留一位小数")
+
+        self.letters: List[str] = [band['letter'] for band in self.bands]
+        size = 100 * self.resolution + 1
+
+        # 查找数组：下标为 分数×精度，值为等级序号
+        band_index = []
+        current = len(self.bands) - 1
+        for position in range(size):
+            while current > 0 and position >= round(self.bands[current - 1]['min_score'] * self.resolution):
+                current -= 1
+            band_index.append(current)
+
+        self._band_index = band_index
+        self._letter_table = [self.bands[index]['letter'] for index in band_index]
+        self._point_table = [self.bands[index]['grade_point'] for index in band_index]
+        self._point_by_letter = {band['letter']: band['grade_point'] for band in self.bands}
+
+        if np is not None:
+            self._np_band_index = np.asarray(band_index, dtype=np.int16)
+            self._np_letters = np.asarray(self.letters + [None], dtype=object)
+            self._np_points = np.asarray([band['grade_point'] for band in self.bands] + [np.nan], dtype=float)
+
+    # ========================================
+    # 单值换算
+    # ========================================
+
+    def _position(self, percentage: float) -> int:
+        position = math.floor(percentage * self.resolution + _EPSILON)
+        return min(max(position, 0), len(self._band_index) - 1)
+
+    def letter_for(self, percentage: Optional[float]) -> Optional[str]:
+        """百分制分数 -> 等级"""
+        if percentage is None:
+            return None
+        return self._letter_table[self._position(percentage)]
+
+    def point_for(self, percentage: Optional[float]) -> Optional[float]:
+        """百分制分数 -> 绩点"""
+        if percentage is None:
+            return None
+        return self._point_table[self._position(percentage)]
+
+    def point_for_letter(self, letter: Optional[str]) -> float:
+        """等级 -> 绩点"""
+        return self._point_by_letter.get(letter, 0.0)
+
+    def is_passing(self, percentage: Optional[float]) -> bool:
+        """是否及格"""
+        return percentage is not None and percentage + _EPSILON >= self.passing_score
+
+    # ========================================
+    # 批量换算
+    # ========================================
+
+    def _positions(self, percentages):
+        missing = np.isnan(percentages)
+        positions = np.floor(np.where(missing, 0, percentages) * self.resolution + _EPSILON)
+        positions = np.clip(positions, 0, len(self._band_index) - 1).astype(np.intp)
+        indexes = self._np_band_index[positions].astype(np.intp)
+        # 空分数映射到末尾的占位项（None / NaN）
+        indexes[missing] = len(self.bands)
+        return indexes
+
+    def _float_array(self, percentages):
+        if isinstance(percentages, np.ndarray) and percentages.dtype != object:
+            return percentages.astype(float, copy=False)
+        return np.asarray([np.nan if value is None else value for value in percentages], dtype=float)
+
+    def band_indexes_for(self, percentages):
+        """
+        批量换算等级序号（需要numpy）
+
+        Args:
+            percentages: 百分制分数序列或float数组，None/NaN表示无成绩
+
+        Returns:
+            整数数组，值为 letters 的下标，无成绩为 len(letters)
+        """
+        return self._positions(self._float_array(percentages))
+
+    def letters_for(self, percentages: Iterable[Optional[float]]):
+        """
+        批量换算等级
+
+        Args:
+            percentages: 百分制分数序列，None/NaN表示无成绩
+
+        Returns:
+            安装numpy时返回object数组，否则返回列表
+        """
+        if np is not None:
+            return self._np_letters[self.band_indexes_for(percentages)]
+        return [self.letter_for(value) for value in percentages]
+
+    def points_for(self, percentages: Iterable[Optional[float]]):
+        """
+        批量换算绩点
+
+        Args:
+            percentages: 百分制分数序列，None/NaN表示无成绩
+
+        Returns:
+            安装numpy时返回float数组（无成绩为NaN），否则返回列表
+        """
+        if np is not None:
+            return self._np_points[self.band_indexes_for(percentages)]
+        return [self.point_for(value) for value in percentages]
+
+    def empty_distribution(self) -> Dict[str, int]:
+        """按等级顺序初始化的分布计数"""
+        return {letter: 0 for letter in self.letters}
+
+    # ========================================
+    # SQL表达式
+    # ========================================
+
+    def letter_case(self, percentage):
+        """
+        等级换算的SQL CASE表达式
+
+        Args:
+            percentage: 百分制分数的SQL表达式
+
+        Returns:
+            SQL表达式，分数为NULL时结果为NULL
+        """
+        return case(
+            (percentage.is_(None), None),
+            *[(percentage >= band['min_score'], band['letter']) for band in self.bands[:-1]],
+            else_=self.bands[-1]['letter']
+        )
+
+    def point_case(self, percentage):
+        """
+        绩点换算的SQL CASE表达式
+
+        Args:
+            percentage: 百分制分数的SQL表达式
+
+        Returns:
+            SQL表达式，分数为NULL时结果为NULL
+        """
+        return case(
+            (percentage.is_(None), None),
+            *[(percentage >= band['min_score'], band['grade_point']) for band in self.bands[:-1]],
+            else_=self.bands[-1]['grade_point']
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为配置格式"""
+        return {
+            'passing_score': self.passing_score,
+            'bands': [dict(band) for band in self.bands]
+        }
+
+
+def grade_percentage(grade_model=None):
+    """
+    成绩百分制分数的SQL表达式（score / max_score × 100）
+
+    Args:
+        grade_model: 成绩模型或别名，默认为 Grade
+
+    Returns:
+        SQL表达式
+    """
+    if grade_model is None:
+        from .grade import Grade as grade_model
+    return grade_model.score * 100.0 / func.coalesce(grade_model.max_score, 100.0)
+
+
+# ========================================
+# 配置加载
+# ========================================
+
+_scale_lock = threading.Lock()
+_cached_scale: Optional[GradingScale] = None
+_cached_at = 0.0
+_CACHE_TTL = 300
+
+_default_scale = GradingScale(DEFAULT_GRADING_SCALE['bands'], DEFAULT_GRADING_SCALE['passing_score'])
+
+
+def _load_scale_config() -> Optional[Dict[str, Any]]:
+    from .system_config import SystemConfig
+
+    table = SystemConfig.__table__
+    row = db.session.execute(
+        select(table.c.json_value).where(
+            table.c.key == GRADING_SCALE_CONFIG_KEY,
+            table.c.is_active.is_(True)
+        )
+    ).first()
+    return row.json_value if row else None
+
+
+def get_grading_scale() -> GradingScale:
+    """
+    获取当前生效的等级表（缓存，配置变更时失效）
+
+    Returns:
+        GradingScale: 编译后的等级表；未配置或配置无效时为默认等级表
+    """
+    global _cached_scale, _cached_at
+
+    scale = _cached_scale
+    if scale is not None and time.monotonic() - _cached_at < _CACHE_TTL:
+        return scale
+
+    with _scale_lock:
+        if _cached_scale is not None and time.monotonic() - _cached_at < _CACHE_TTL:
+            return _cached_scale
+
+        # 无应用上下文时无法读取配置，使用默认等级表，不缓存
+        if not has_app_context():
+            return _default_scale
+
+        try:
+            config = _load_scale_config()
+            scale = GradingScale(config['bands'], config.get('passing_score', 60)) if config else _default_scale
+        except Exception:
+            # 表不存在、数据库暂时不可用或配置不合法时本次使用默认等级表，
+            # 不缓存，下次调用重新读取
+            logger.exception("读取等级表配置失败，使用默认等级表")
+            return _default_scale
+
+        _cached_scale = scale
+        _cached_at = time.monotonic()
+        return scale
+
+
+def invalidate_grading_scale():
+    """清除等级表缓存"""
+    global _cached_scale
+    with _scale_lock:
+        _cached_scale = None
+
+
+def _register_config_listeners():
+    from .system_config import SystemConfig
+
+    def _invalidate_if_scale(mapper, connection, target):
+        if target.key == GRADING_SCALE_CONFIG_KEY:
+            invalidate_grading_scale()
+
+    for event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(SystemConfig, event_name, _invalidate_if_scale)
+
+
+_register_config_listeners()
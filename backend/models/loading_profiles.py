@@ -0,0 +1,176 @@
+# ========================================
+# 学生信息管理系统 - 关联加载配置
+# ========================================
+
+"""
+按场景集中配置各模型的关联加载方式，避免列表序列化时逐行懒加载（N+1）。
+
+每个配置包含两类关联路径：
+- joined: 多对一/一对一关联，使用 joinedload 在主查询中一并加载
+- selectin: 一对多集合，使用 selectinload 以 IN 查询批量加载
+
+路径用点号连接，如 'user.profile' 表示先加载 user 再加载 user.profile。
+查询已显式 JOIN 的关联可通过 contains 参数声明，改用 contains_eager 复用该 JOIN。
+"""
+
+from typing import Dict, Iterable, List
+
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+
+LOADING_PROFILES: Dict[str, Dict[str, Dict[str, List[str]]]] = {
+    'Student': {
+        # StudentSchema: user/profile、advisor、当前学期课程数
+        'list': {
+            'joined': ['user.profile', 'advisor.user.profile'],
+            'selectin': ['enrollments.course'],
+        },
+        'detail': {
+            'joined': ['user.profile', 'advisor.user.profile'],
+            'selectin': ['enrollments.course.teacher.user.profile'],
+        },
+        'export': {
+            'joined': ['user.profile'],
+            'selectin': [],
+        },
+    },
+    'Teacher': {
+        'list': {
+            'joined': ['user.profile'],
+            'selectin': [],
+        },
+        'detail': {
+            'joined': ['user.profile'],
+            'selectin': ['courses'],
+        },
+        'export': {
+            'joined': ['user.profile'],
+            'selectin': [],
+        },
+    },
+    'Course': {
+        'list': {
+            'joined': ['teacher.user.profile'],
+            'selectin': [],
+        },
+        'detail': {
+            'joined': ['teacher.user.profile'],
+            'selectin': [],
+        },
+        'export': {
+            'joined': ['teacher.user.profile'],
+            'selectin': [],
+        },
+    },
+    'Enrollment': {
+        # Enrollment.to_dict: student.user.profile、course.teacher.user.profile
+        'list': {
+            'joined': ['student.user.profile', 'course.teacher.user.profile'],
+            'selectin': [],
+        },
+        'detail': {
+            'joined': ['student.user.profile', 'course.teacher.user.profile', 'approver'],
+            'selectin': [],
+        },
+        'export': {
+            'joined': ['student.user.profile', 'course'],
+            'selectin': [],
+        },
+    },
+    'Grade': {
+        # Grade.to_dict: student.user.profile、course、grader.profile
+        'list': {
+            'joined': ['student.user.profile', 'course', 'grader.profile'],
+            'selectin': [],
+        },
+        'detail': {
+            'joined': ['student.user.profile', 'course', 'grader.profile'],
+            'selectin': [],
+        },
+        'export': {
+            'joined': ['student.user.profile', 'course'],
+            'selectin': [],
+        },
+    },
+    'Message': {
+        # Message.to_dict / MessageSchema: sender.profile、receiver.profile
+        'list': {
+            'joined': ['sender.profile', 'receiver.profile'],
+            'selectin': [],
+        },
+        'detail': {
+            'joined': ['sender.profile', 'receiver.profile'],
+            'selectin': [],
+        },
+        'export': {
+            'joined': ['sender.profile', 'receiver.profile'],
+            'selectin': [],
+        },
+    },
+}
+
+
+def _build_loader(model, path: str, strategy, contains: Iterable[str]):
+    """根据关联路径构造加载选项，已JOIN的前缀使用 contains_eager"""
+    loader = None
+    current_model = model
+    walked = []
+
+    for name in path.split('.'):
+        attribute = getattr(current_model, name)
+        walked.append(name)
+
+        if '.'.join(walked) in contains:
+            step = contains_eager
+        else:
+            step = strategy
+
+        loader = step(attribute) if loader is None else getattr(loader, step.__name__)(attribute)
+        current_model = attribute.property.mapper.class_
+
+    return loader
+
+
+def get_loader_options(model, profile: str, contains: Iterable[str] = ()) -> list:
+    """
+    获取模型在指定场景下的加载选项
+
+    Args:
+        model: 模型类
+        profile: 场景名称 (list/detail/export)
+        contains: 查询中已显式JOIN的关联路径
+
+    Returns:
+        list: 可传给 query.options() 的加载选项
+    """
+    model_profiles = LOADING_PROFILES.get(model.__name__)
+    if not model_profiles:
+        return []
+
+    if profile not in model_profiles:
+        raise ValueError(f"模型 {model.__name__} 未定义加载配置: {profile}")
+
+    contains = set(contains)
+    config = model_profiles[profile]
+
+    options = [_build_loader(model, path, joinedload, contains) for path in config.get('joined', [])]
+    options.extend(_build_loader(model, path, selectinload, contains) for path in config.get('selectin', []))
+    return options
+
+
+def apply_loading_profile(query, model, profile: str, contains: Iterable[str] = ()):
+    """
+    为查询应用加载配置
+
+    Args:
+        query: SQLAlchemy查询
+        model: 查询的主模型类
+        profile: 场景名称 (list/detail/export)
+        contains: 查询中已显式JOIN的关联路径，如 ('user', 'user.profile')
+
+    Returns:
+        Query: 应用加载选项后的查询
+    """
+    options = get_loader_options(model, profile, contains)
+    if not options:
+        return query
+    return query.options(*options)
@@ -4,7 +4,7 @@
 
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Enum, ForeignKey, Index, Boolean, JSON
+from sqlalchemy import Column, String, Text, Enum, ForeignKey, Index, Boolean, JSON, DateTime
 from sqlalchemy.orm import relationship
 from extensions import db
 from .base import BaseModel
@@ -64,7 +64,7 @@ class Message(BaseModel):
 
     # 附加信息
     attachments = Column(JSON)  # 附件列表
-    metadata = Column(JSON)     # 元数据
+    extra_data = Column('metadata', JSON)     # 元数据（metadata 为 Declarative 保留属性名）
     tags = Column(JSON)         # 标签
 
     # 定时发送
@@ -88,6 +88,7 @@ class Message(BaseModel):
         Index('idx_type_priority', 'type', 'priority'),
         Index('idx_related_entity', 'related_entity_type', 'related_entity_id'),
         Index('idx_scheduled_at', 'scheduled_at'),
+        Index('idx_receiver_sent_id', 'receiver_id', 'sent_at', 'id'),  # 键集分页
     )
 
     def __init__(self, **kwargs):
@@ -201,6 +202,7 @@ class Message(BaseModel):
 
     def _get_html_content(self):
         """获取HTML格式的邮件内容"""
+        content = self.content.replace('\n', '<br>')
         html_content = f"""
         <!DOCTYPE html>
         <html>
@@ -245,7 +247,7 @@ class Message(BaseModel):
                     <h2>{self.title}</h2>
                 </div>
                 <div class="content">
-                    {self.content.replace('\n', '<br>')}
+                    {content}
                 </div>
                 <div class="footer">
                     <p>此邮件由学生信息管理系统自动发送</p>
@@ -0,0 +1,770 @@
+# ========================================
+# 学生信息管理系统 - 报表汇总表（选课/成绩趋势）
+# ========================================
+
+"""
+选课与成绩趋势的预聚合汇总表。
+
+三种粒度：
+- course_daily_rollups:        (日期, 课程) 新增选课数、录入成绩数、分数合计
+- course_semester_rollups:     (学期, 课程) 各状态选课数、成绩数、分数合计/最值、及格数
+- department_semester_rollups: (学期, 院系) 由课程学期汇总再聚合（院系取课程任课教师所在院系）
+
+选课、成绩写入时在会话 flush 后按受影响的键增量重算（同一事务内），
+课程更换教师或教师调整院系时重算相关课程；全量回填由 flask backfill-report-rollups 执行。
+趋势查询只读汇总表，多课程、多学期的序列由一条查询得出。
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Index, UniqueConstraint
+from sqlalchemy import and_, case, delete, event, func, inspect, insert, select
+from sqlalchemy.orm import Session
+
+from extensions import db
+from .base import BaseModel
+from .grading_scale import get_grading_scale, grade_percentage
+
+UNKNOWN_DEPARTMENT = '未知'
+
+# 影响汇总结果的字段
+_ENROLLMENT_FIELDS = ('course_id', 'semester', 'status', 'enrollment_date')
+_GRADE_FIELDS = ('course_id', 'semester', 'score', 'max_score', 'graded_at')
+
+# 课程学期汇总与院系汇总共有的指标列
+_STATUS_COUNT_COLUMNS = (
+    'enrolled_count', 'waitlist_count', 'dropped_count',
+    'completed_count', 'failed_count', 'auditing_count'
+)
+_SUM_COLUMNS = ('enrollment_count',) + _STATUS_COUNT_COLUMNS + ('grade_count', 'scored_count', 'score_sum', 'pass_count')
+
+
+class CourseDailyRollup(BaseModel):
+    """课程每日汇总"""
+
+    __tablename__ = 'course_daily_rollups'
+
+    day = Column(Date, nullable=False)
+    course_id = Column(db.CHAR(36), db.ForeignKey('courses.id', ondelete='CASCADE'), nullable=False)
+
+    new_enrollments = Column(Integer, nullable=False, default=0)  # 当日选课数
+    grades_recorded = Column(Integer, nullable=False, default=0)  # 当日录入成绩数
+    scored_count = Column(Integer, nullable=False, default=0)  # 当日有分数的成绩数
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('day', 'course_id', name='uq_course_daily_rollup'),
+        Index('idx_course_daily_rollup_course', 'course_id', 'day'),
+    )
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'course_id': self.course_id,
+            'new_enrollments': self.new_enrollments,
+            'grades_recorded': self.grades_recorded,
+            'average_score': round(self.score_sum / self.scored_count, 2) if self.scored_count else None
+        }
+
+
+class _SemesterMetricsMixin:
+    """学期汇总的指标列"""
+
+    enrollment_count = Column(Integer, nullable=False, default=0)  # 选课记录总数
+    enrolled_count = Column(Integer, nullable=False, default=0)
+    waitlist_count = Column(Integer, nullable=False, default=0)
+    dropped_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    auditing_count = Column(Integer, nullable=False, default=0)
+
+    grade_count = Column(Integer, nullable=False, default=0)  # 成绩记录数
+    scored_count = Column(Integer, nullable=False, default=0)  # 有分数的成绩数
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_min = Column(Float)
+    score_max = Column(Float)
+    pass_count = Column(Integer, nullable=False, default=0)  # 及格成绩数
+
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class CourseSemesterRollup(_SemesterMetricsMixin, BaseModel):
+    """课程学期汇总"""
+
+    __tablename__ = 'course_semester_rollups'
+
+    semester = Column(String(20), nullable=False)
+    course_id = Column(db.CHAR(36), db.ForeignKey('courses.id', ondelete='CASCADE'), nullable=False)
+    department = Column(String(100), nullable=False, default=UNKNOWN_DEPARTMENT)  # 任课教师院系
+
+    __table_args__ = (
+        UniqueConstraint('semester', 'course_id', name='uq_course_semester_rollup'),
+        Index('idx_course_semester_rollup_course', 'course_id', 'semester'),
+        Index('idx_course_semester_rollup_dept', 'department', 'semester'),
+    )
+
+
+class DepartmentSemesterRollup(_SemesterMetricsMixin, BaseModel):
+    """院系学期汇总"""
+
+    __tablename__ = 'department_semester_rollups'
+
+    semester = Column(String(20), nullable=False)
+    department = Column(String(100), nullable=False)
+    course_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('semester', 'department', name='uq_department_semester_rollup'),
+    )
+
+
+def rollup_metrics(row) -> Dict[str, Any]:
+    """
+    学期汇总行 -> 指标字典（ORM对象或查询结果行均可）
+
+    Args:
+        row: 含指标列的对象
+
+    Returns:
+        Dict[str, Any]: 指标
+    """
+    active = row.enrolled_count + row.completed_count + row.failed_count
+    return {
+        'enrollment_count': active,
+        'total_records': row.enrollment_count,
+        'by_status': {column[:-len('_count')]: getattr(row, column) for column in _STATUS_COUNT_COLUMNS},
+        'grade_count': row.grade_count,
+        'average_score': round(row.score_sum / row.scored_count, 2) if row.scored_count else None,
+        'min_score': row.score_min,
+        'max_score': row.score_max,
+        'pass_rate': round(row.pass_count / row.scored_count * 100, 2) if row.scored_count else None
+    }
+
+
+# ========================================
+# 聚合计算
+# ========================================
+
+def _as_date(value) -> Optional[date]:
+    """func.date 在SQLite返回字符串，统一为 date"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _group_by_first(keys: Iterable[Tuple]) -> Dict[Any, Set[Any]]:
+    grouped: Dict[Any, Set[Any]] = {}
+    for first, second in keys:
+        grouped.setdefault(first, set()).add(second)
+    return grouped
+
+
+def _course_departments(connection, course_ids: Iterable[str]) -> Dict[str, str]:
+    from .course import Course
+    from .teacher import Teacher
+
+    result = connection.execute(
+        select(Course.id, Teacher.department)
+        .select_from(Course)
+        .outerjoin(Teacher, Course.teacher_id == Teacher.id)
+        .where(Course.id.in_(list(course_ids)))
+    )
+    return {row.id: row.department or UNKNOWN_DEPARTMENT for row in result}
+
+
+def compute_course_semester_rows(connection, keys: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    计算 (课程, 学期) 的汇总指标
+
+    Args:
+        connection: 数据库连接
+        keys: (课程ID, 学期) 集合
+
+    Returns:
+        Dict: (课程ID, 学期) -> 指标，无任何选课和成绩的键不出现在结果中
+    """
+    from .enrollment import Enrollment, EnrollmentStatus
+    from .grade import Grade
+
+    if not keys:
+        return {}
+
+    course_ids = list({course_id for course_id, _ in keys})
+    semesters = list({semester for _, semester in keys})
+    rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def _row(key):
+        if key not in rows:
+            rows[key] = {column: 0 for column in _SUM_COLUMNS}
+            rows[key].update(score_sum=0.0, score_min=None, score_max=None)
+        return rows[key]
+
+    status_columns = [
+        func.sum(case((Enrollment.status == EnrollmentStatus[column[:-len('_count')].upper()], 1), else_=0)).label(column)
+        for column in _STATUS_COUNT_COLUMNS
+    ]
+    enrollment_result = connection.execute(
+        select(
+            Enrollment.course_id, Enrollment.semester,
+            func.count().label('enrollment_count'), *status_columns
+        ).where(
+            Enrollment.course_id.in_(course_ids),
+            Enrollment.semester.in_(semesters)
+        ).group_by(Enrollment.course_id, Enrollment.semester)
+    )
+    for result_row in enrollment_result:
+        key = (result_row.course_id, result_row.semester)
+        if key not in keys:
+            continue
+        row = _row(key)
+        row['enrollment_count'] = result_row.enrollment_count
+        for column in _STATUS_COUNT_COLUMNS:
+            row[column] = getattr(result_row, column) or 0
+
+    passing_score = get_grading_scale().passing_score
+    percentage = grade_percentage(Grade)
+    grade_result = connection.execute(
+        select(
+            Grade.course_id, Grade.semester,
+            func.count().label('grade_count'),
+            func.count(Grade.score).label('scored_count'),
+            func.sum(Grade.score).label('score_sum'),
+            func.min(Grade.score).label('score_min'),
+            func.max(Grade.score).label('score_max'),
+            func.sum(case((percentage >= passing_score, 1), else_=0)).label('pass_count')
+        ).where(
+            Grade.course_id.in_(course_ids),
+            Grade.semester.in_(semesters)
+        ).group_by(Grade.course_id, Grade.semester)
+    )
+    for result_row in grade_result:
+        key = (result_row.course_id, result_row.semester)
+        if key not in keys:
+            continue
+        row = _row(key)
+        row['grade_count'] = result_row.grade_count
+        row['scored_count'] = result_row.scored_count
+        row['score_sum'] = float(result_row.score_sum or 0.0)
+        row['score_min'] = result_row.score_min
+        row['score_max'] = result_row.score_max
+        row['pass_count'] = result_row.pass_count or 0
+
+    return rows
+
+
+def compute_course_daily_rows(connection, keys: Set[Tuple[str, date]]) -> Dict[Tuple[str, date], Dict[str, Any]]:
+    """
+    计算 (课程, 日期) 的汇总指标
+
+    Args:
+        connection: 数据库连接
+        keys: (课程ID, 日期) 集合
+
+    Returns:
+        Dict: (课程ID, 日期) -> 指标
+    """
+    from .enrollment import Enrollment
+    from .grade import Grade
+
+    if not keys:
+        return {}
+
+    course_ids = list({course_id for course_id, _ in keys})
+    start = datetime.combine(min(day for _, day in keys), datetime.min.time())
+    end = datetime.combine(max(day for _, day in keys) + timedelta(days=1), datetime.min.time())
+    rows: Dict[Tuple[str, date], Dict[str, Any]] = {}
+
+    def _row(key):
+        return rows.setdefault(key, {'new_enrollments': 0, 'grades_recorded': 0, 'scored_count': 0, 'score_sum': 0.0})
+
+    enrollment_day = func.date(Enrollment.enrollment_date)
+    for result_row in connection.execute(
+        select(Enrollment.course_id, enrollment_day.label('day'), func.count().label('total'))
+        .where(
+            Enrollment.course_id.in_(course_ids),
+            Enrollment.enrollment_date >= start,
+            Enrollment.enrollment_date < end
+        ).group_by(Enrollment.course_id, enrollment_day)
+    ):
+        key = (result_row.course_id, _as_date(result_row.day))
+        if key in keys:
+            _row(key)['new_enrollments'] = result_row.total
+
+    grade_day = func.date(Grade.graded_at)
+    for result_row in connection.execute(
+        select(
+            Grade.course_id, grade_day.label('day'), func.count().label('total'),
+            func.count(Grade.score).label('scored_count'), func.sum(Grade.score).label('score_sum')
+        ).where(
+            Grade.course_id.in_(course_ids),
+            Grade.graded_at >= start,
+            Grade.graded_at < end
+        ).group_by(Grade.course_id, grade_day)
+    ):
+        key = (result_row.course_id, _as_date(result_row.day))
+        if key in keys:
+            row = _row(key)
+            row['grades_recorded'] = result_row.total
+            row['scored_count'] = result_row.scored_count
+            row['score_sum'] = float(result_row.score_sum or 0.0)
+
+    return rows
+
+
+# ========================================
+# 写入
+# ========================================
+
+def refresh_department_rollups(connection, keys: Set[Tuple[str, str]]):
+    """
+    由课程学期汇总重算 (学期, 院系) 汇总
+
+    Args:
+        connection: 数据库连接
+        keys: (学期, 院系) 集合
+    """
+    table = DepartmentSemesterRollup.__table__
+    source = CourseSemesterRollup.__table__
+    now = datetime.utcnow()
+
+    for semester, departments in _group_by_first(keys).items():
+        departments = list(departments)
+        connection.execute(delete(table).where(
+            table.c.semester == semester,
+            table.c.department.in_(departments)
+        ))
+
+        aggregate = select(
+            source.c.semester,
+            source.c.department,
+            func.count().label('course_count'),
+            *[func.sum(source.c[column]).label(column) for column in _SUM_COLUMNS],
+            func.min(source.c.score_min).label('score_min'),
+            func.max(source.c.score_max).label('score_max'),
+        ).where(
+            source.c.semester == semester,
+            source.c.department.in_(departments)
+        ).group_by(source.c.semester, source.c.department)
+
+        rows = [dict(row._mapping, refreshed_at=now) for row in connection.execute(aggregate)]
+        if rows:
+            connection.execute(insert(table), rows)
+
+
+def refresh_course_semester_rollups(connection, keys: Set[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """
+    重算 (课程, 学期) 汇总，并重算受影响的院系汇总
+
+    Args:
+        connection: 数据库连接
+        keys: (课程ID, 学期) 集合
+
+    Returns:
+        Set: 受影响的 (学期, 院系)
+    """
+    keys = {(course_id, semester) for course_id, semester in keys if course_id and semester}
+    if not keys:
+        return set()
+
+    table = CourseSemesterRollup.__table__
+    rows = compute_course_semester_rows(connection, keys)
+    departments = _course_departments(connection, {course_id for course_id, _ in keys})
+
+    affected: Set[Tuple[str, str]] = set()
+    for semester, course_ids in _group_by_first((semester, course_id) for course_id, semester in keys).items():
+        condition = and_(table.c.semester == semester, table.c.course_id.in_(list(course_ids)))
+        # 原院系也需要重算（课程更换教师时院系会变化）
+        affected.update(
+            (semester, row.department)
+            for row in connection.execute(select(table.c.department).where(condition).distinct())
+        )
+        connection.execute(delete(table).where(condition))
+
+    if rows:
+        now = datetime.utcnow()
+        connection.execute(insert(table), [
+            dict(
+                metrics,
+                course_id=course_id,
+                semester=semester,
+                department=departments.get(course_id, UNKNOWN_DEPARTMENT),
+                refreshed_at=now
+            )
+            for (course_id, semester), metrics in rows.items()
+        ])
+        affected.update((semester, departments.get(course_id, UNKNOWN_DEPARTMENT)) for course_id, semester in rows)
+
+    refresh_department_rollups(connection, affected)
+    return affected
+
+
+def refresh_course_daily_rollups(connection, keys: Set[Tuple[str, date]]):
+    """
+    重算 (课程, 日期) 汇总
+
+    Args:
+        connection: 数据库连接
+        keys: (课程ID, 日期) 集合
+    """
+    keys = {(course_id, day) for course_id, day in keys if course_id and day}
+    if not keys:
+        return
+
+    table = CourseDailyRollup.__table__
+    rows = compute_course_daily_rows(connection, keys)
+
+    for day, course_ids in _group_by_first((day, course_id) for course_id, day in keys).items():
+        connection.execute(delete(table).where(table.c.day == day, table.c.course_id.in_(list(course_ids))))
+
+    if rows:
+        now = datetime.utcnow()
+        connection.execute(insert(table), [
+            dict(metrics, course_id=course_id, day=day, refreshed_at=now)
+            for (course_id, day), metrics in rows.items()
+        ])
+
+
+def _source_keys(connection, course_ids: List[str]) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, date]]]:
+    """课程在选课/成绩表中出现的全部 (课程, 学期) 与 (课程, 日期)，以及汇总表中已有的键"""
+    from .enrollment import Enrollment
+    from .grade import Grade
+
+    semester_keys: Set[Tuple[str, str]] = set()
+    day_keys: Set[Tuple[str, date]] = set()
+
+    for model, date_column in ((Enrollment, Enrollment.enrollment_date), (Grade, Grade.graded_at)):
+        day = func.date(date_column)
+        for row in connection.execute(
+            select(model.course_id, model.semester, day.label('day'))
+            .where(model.course_id.in_(course_ids))
+            .distinct()
+        ):
+            semester_keys.add((row.course_id, row.semester))
+            if row.day is not None:
+                day_keys.add((row.course_id, _as_date(row.day)))
+
+    semester_table = CourseSemesterRollup.__table__
+    daily_table = CourseDailyRollup.__table__
+    semester_keys.update(
+        (row.course_id, row.semester) for row in connection.execute(
+            select(semester_table.c.course_id, semester_table.c.semester)
+            .where(semester_table.c.course_id.in_(course_ids))
+        )
+    )
+    day_keys.update(
+        (row.course_id, row.day) for row in connection.execute(
+            select(daily_table.c.course_id, daily_table.c.day)
+            .where(daily_table.c.course_id.in_(course_ids))
+        )
+    )
+    return semester_keys, day_keys
+
+
+def refresh_course_rollups(course_ids: Iterable[str], connection=None) -> Dict[str, int]:
+    """
+    重算课程的全部汇总（学期、每日及相关院系）
+
+    Args:
+        course_ids: 课程ID列表
+        connection: 数据库连接，默认使用当前会话的连接
+
+    Returns:
+        Dict[str, int]: 重算的学期键数和日期键数
+    """
+    course_ids = list(dict.fromkeys(course_id for course_id in course_ids if course_id))
+    if not course_ids:
+        return {'semester_keys': 0, 'day_keys': 0}
+
+    if connection is None:
+        connection = db.session.connection()
+
+    semester_keys, day_keys = _source_keys(connection, course_ids)
+    refresh_course_semester_rollups(connection, semester_keys)
+    refresh_course_daily_rollups(connection, day_keys)
+    return {'semester_keys': len(semester_keys), 'day_keys': len(day_keys)}
+
+
+def backfill_rollups(chunk_size: int = 200, course_ids: Iterable[str] = None) -> Dict[str, Any]:
+    """
+    全量回填汇总表，按课程分块，每块单独提交
+
+    Args:
+        chunk_size: 每块课程数
+        course_ids: 限定的课程ID，None表示全部课程
+
+    Returns:
+        Dict: 处理的课程数、块数、键数、耗时
+    """
+    started = datetime.utcnow()
+    processed = chunks = semester_keys = day_keys = 0
+
+    for chunk in _iter_course_id_chunks(chunk_size, course_ids):
+        result = refresh_course_rollups(chunk, connection=db.session.connection())
+        db.session.commit()
+        processed += len(chunk)
+        chunks += 1
+        semester_keys += result['semester_keys']
+        day_keys += result['day_keys']
+
+    return {
+        'courses': processed,
+        'chunks': chunks,
+        'semester_keys': semester_keys,
+        'day_keys': day_keys,
+        'duration_seconds': round((datetime.utcnow() - started).total_seconds(), 3)
+    }
+
+
+def _iter_course_id_chunks(chunk_size: int, course_ids: Iterable[str] = None):
+    """按主键顺序分块遍历课程ID"""
+    if course_ids is not None:
+        course_ids = list(course_ids)
+        for start in range(0, len(course_ids), chunk_size):
+            yield course_ids[start:start + chunk_size]
+        return
+
+    table = db.metadata.tables['courses']
+    last_id = None
+    while True:
+        query = select(table.c.id).order_by(table.c.id).limit(chunk_size)
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        chunk = [row.id for row in db.session.execute(query)]
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+# ========================================
+# 趋势查询
+# ========================================
+
+def get_course_semester_series(
+    course_ids: Iterable[str] = None,
+    semesters: Iterable[str] = None,
+    department: str = None,
+    last_semesters: int = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    课程按学期的趋势序列（一条查询）
+
+    Args:
+        course_ids: 课程ID列表，None表示全部课程
+        semesters: 限定学期
+        department: 限定院系
+        last_semesters: 只取最近N个学期（按学期名排序）
+
+    Returns:
+        Dict: 课程ID -> 按学期升序的指标列表
+    """
+    table = CourseSemesterRollup.__table__
+    query = select(table)
+
+    if course_ids is not None:
+        query = query.where(table.c.course_id.in_(list(course_ids)))
+    if semesters is not None:
+        query = query.where(table.c.semester.in_(list(semesters)))
+    if department:
+        query = query.where(table.c.department == department)
+    if last_semesters:
+        recent = select(table.c.semester).distinct().order_by(table.c.semester.desc()).limit(last_semesters)
+        if course_ids is not None:
+            recent = recent.where(table.c.course_id.in_(list(course_ids)))
+        query = query.where(table.c.semester.in_(select(recent.subquery().c.semester)))
+
+    series: Dict[str, List[Dict[str, Any]]] = {}
+    for row in db.session.execute(query.order_by(table.c.course_id, table.c.semester)):
+        series.setdefault(row.course_id, []).append(dict(rollup_metrics(row), semester=row.semester))
+    return series
+
+
+def get_department_semester_series(
+    departments: Iterable[str] = None,
+    semesters: Iterable[str] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    院系按学期的趋势序列（一条查询）
+
+    Args:
+        departments: 院系列表，None表示全部院系
+        semesters: 限定学期
+
+    Returns:
+        Dict: 院系 -> 按学期升序的指标列表
+    """
+    table = DepartmentSemesterRollup.__table__
+    query = select(table)
+
+    if departments is not None:
+        query = query.where(table.c.department.in_(list(departments)))
+    if semesters is not None:
+        query = query.where(table.c.semester.in_(list(semesters)))
+
+    series: Dict[str, List[Dict[str, Any]]] = {}
+    for row in db.session.execute(query.order_by(table.c.department, table.c.semester)):
+        series.setdefault(row.department, []).append(
+            dict(rollup_metrics(row), semester=row.semester, course_count=row.course_count)
+        )
+    return series
+
+
+def get_daily_series(
+    course_ids: Iterable[str] = None,
+    start_date: date = None,
+    end_date: date = None
+) -> List[Dict[str, Any]]:
+    """
+    每日趋势（一条查询；未指定课程时按日期合计所有课程）
+
+    Args:
+        course_ids: 课程ID列表
+        start_date: 开始日期（含）
+        end_date: 结束日期（含）
+
+    Returns:
+        List[Dict]: 按日期升序的指标列表，指定课程时每项含 course_id
+    """
+    table = CourseDailyRollup.__table__
+    group_columns = [table.c.day] if course_ids is None else [table.c.course_id, table.c.day]
+
+    query = select(
+        *group_columns,
+        func.sum(table.c.new_enrollments).label('new_enrollments'),
+        func.sum(table.c.grades_recorded).label('grades_recorded'),
+        func.sum(table.c.scored_count).label('scored_count'),
+        func.sum(table.c.score_sum).label('score_sum')
+    ).group_by(*group_columns).order_by(*group_columns)
+
+    if course_ids is not None:
+        query = query.where(table.c.course_id.in_(list(course_ids)))
+    if start_date:
+        query = query.where(table.c.day >= start_date)
+    if end_date:
+        query = query.where(table.c.day <= end_date)
+
+    series = []
+    for row in db.session.execute(query):
+        item = {
+            'day': _as_date(row.day).isoformat(),
+            'new_enrollments': int(row.new_enrollments or 0),
+            'grades_recorded': int(row.grades_recorded or 0),
+            'average_score': round(row.score_sum / row.scored_count, 2) if row.scored_count else None
+        }
+        if course_ids is not None:
+            item['course_id'] = row.course_id
+        series.append(item)
+    return series
+
+
+# ========================================
+# 增量刷新
+# ========================================
+
+def _day_of(value) -> date:
+    # 新对象的日期列在 flush 时才由默认值填充（utcnow）
+    return _as_date(value) if value is not None else datetime.utcnow().date()
+
+
+def _add_keys(course_id, semester, day_value, semester_keys: Set, day_keys: Set):
+    semester_keys.add((course_id, semester))
+    day_keys.add((course_id, _day_of(day_value)))
+
+
+def _collect_changed(session, model, objects: List, date_field: str, semester_keys: Set, day_keys: Set):
+    """
+    已修改对象：新值和数据库中的原值都计入
+
+    过期对象被赋值时不会加载原值（history 中没有旧值），因此 flush 前统一查询一次原值
+    """
+    if not objects:
+        return
+
+    date_column = getattr(model, date_field)
+    previous = session.connection().execute(
+        select(model.course_id, model.semester, date_column.label('day'))
+        .where(model.id.in_([obj.id for obj in objects]))
+    )
+    for row in previous:
+        _add_keys(row.course_id, row.semester, row.day, semester_keys, day_keys)
+    for obj in objects:
+        _add_keys(obj.course_id, obj.semester, getattr(obj, date_field), semester_keys, day_keys)
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_rollup_changes(session, flush_context, instances):
+    """flush 前记录受影响的汇总键"""
+    from .course import Course
+    from .enrollment import Enrollment
+    from .grade import Grade
+    from .teacher import Teacher
+
+    semester_keys = session.info.setdefault('report_rollups_semesters', set())
+    day_keys = session.info.setdefault('report_rollups_days', set())
+    courses = session.info.setdefault('report_rollups_courses', set())
+    teachers = session.info.setdefault('report_rollups_teachers', set())
+
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Enrollment):
+            _add_keys(obj.course_id, obj.semester, obj.enrollment_date, semester_keys, day_keys)
+        elif isinstance(obj, Grade):
+            _add_keys(obj.course_id, obj.semester, obj.graded_at, semester_keys, day_keys)
+
+    changed_enrollments, changed_grades = [], []
+    for obj in session.dirty:
+        if isinstance(obj, Enrollment):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _ENROLLMENT_FIELDS):
+                changed_enrollments.append(obj)
+        elif isinstance(obj, Grade):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _GRADE_FIELDS):
+                changed_grades.append(obj)
+        elif isinstance(obj, Course):
+            if inspect(obj).attrs.teacher_id.history.has_changes():
+                courses.add(obj.id)
+        elif isinstance(obj, Teacher):
+            if inspect(obj).attrs.department.history.has_changes():
+                teachers.add(obj.id)
+
+    _collect_changed(session, Enrollment, changed_enrollments, 'enrollment_date', semester_keys, day_keys)
+    _collect_changed(session, Grade, changed_grades, 'graded_at', semester_keys, day_keys)
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _refresh_rollups_after_flush(session, flush_context):
+    """flush 后在同一事务内重算受影响的汇总"""
+    from .course import Course
+
+    semester_keys = session.info.pop('report_rollups_semesters', None) or set()
+    day_keys = session.info.pop('report_rollups_days', None) or set()
+    courses = session.info.pop('report_rollups_courses', None) or set()
+    teachers = session.info.pop('report_rollups_teachers', None) or set()
+    if not (semester_keys or day_keys or courses or teachers):
+        return
+
+    connection = session.connection()
+
+    # 课程院系变化：重算课程已有的全部学期汇总
+    if teachers:
+        courses.update(
+            row.id for row in connection.execute(select(Course.id).where(Course.teacher_id.in_(list(teachers))))
+        )
+    if courses:
+        table = CourseSemesterRollup.__table__
+        semester_keys.update(
+            (row.course_id, row.semester) for row in connection.execute(
+                select(table.c.course_id, table.c.semester).where(table.c.course_id.in_(list(courses)))
+            )
+        )
+
+    refresh_course_semester_rollups(connection, semester_keys)
+    refresh_course_daily_rollups(connection, day_keys)
@@ -54,7 +54,7 @@ class Student(BaseModel):
 
     # 关系
     user = relationship("User", backref="student_record")
-    advisor = relationship("Teacher", backref="advisees")
+    advisor = relationship("Teacher", back_populates="advisees", foreign_keys=[advisor_id])
     enrollments = relationship("Enrollment", back_populates="student", cascade="all, delete-orphan")
     grades = relationship("Grade", back_populates="student", cascade="all, delete-orphan")
 
@@ -101,59 +101,15 @@ class Student(BaseModel):
         return 0
 
     def update_gpa(self):
-        """更新GPA"""
-        from sqlalchemy import func
-        from .grade import Grade, GradeType
-
-        # 计算加权平均分
-        grade_query = db.session.query(
-            func.sum(Grade.score * Grade.weight).label('weighted_sum'),
-            func.sum(Grade.weight).label('total_weight')
-        ).filter(
-            Grade.student_id == self.id,
-            Grade.exam_type.in_([GradeType.MIDTERM, GradeType.FINAL]),
-            Grade.score.isnot(None)
-        )
-
-        result = grade_query.first()
-        if result and result.total_weight and result.total_weight > 0:
-            weighted_average = result.weighted_sum / result.total_weight
-            # 转换为4.0制GPA（这里使用简单的线性转换）
-            self.gpa = round((weighted_average / 100) * 4.0, 2)
-        else:
-            self.gpa = None
+        """更新GPA（同时刷新学分，口径见 models.academic_stats）"""
+        from .academic_stats import refresh_student_stats
 
-        self.save()
+        refresh_student_stats([self.id])
+        db.session.commit()
 
     def update_credits(self):
         """更新学分信息"""
-        from sqlalchemy import func
-        from .enrollment import Enrollment
-        from .grade import Grade, GradeType
-
-        # 获取已修读课程的总学分
-        completed_courses = db.session.query(
-            func.sum(func.cofunc.credits).label('total_credits')
-        ).join(Grade).filter(
-            Enrollment.student_id == self.id,
-            Enrollment.status == 'completed',
-            Grade.exam_type == GradeType.FINAL,
-            Grade.score >= 60  # 及格
-        ).first()
-
-        # 获取正在修读的课程学分
-        in_progress_courses = db.session.query(
-            func.sum(func.cofunc.credits).label('total_credits')
-        ).filter(
-            Enrollment.student_id == self.id,
-            Enrollment.status == 'enrolled'
-        ).first()
-
-        self.credits_earned = completed_courses.total_credits or 0
-        self.credits_in_progress = in_progress_courses.total_credits or 0
-        self.total_credits = self.credits_earned + self.credits_in_progress
-
-        self.save()
+        self.update_gpa()
 
     def get_current_semester_courses(self):
         """获取当前学期课程"""
@@ -180,24 +136,11 @@ class Student(BaseModel):
         ).order_by(Grade.created_at).all()
 
     def calculate_semester_gpa(self, semester):
-        """计算指定学期的GPA"""
-        from sqlalchemy import func
-        from .grade import Grade, GradeType
-
-        result = db.session.query(
-            func.sum(Grade.score * Grade.weight).label('weighted_sum'),
-            func.sum(Grade.weight).label('total_weight')
-        ).join(Enrollment).filter(
-            Grade.student_id == self.id,
-            Enrollment.semester == semester,
-            Grade.exam_type.in_([GradeType.MIDTERM, GradeType.FINAL]),
-            Grade.score.isnot(None)
-        ).first()
-
-        if result and result.total_weight and result.total_weight > 0:
-            weighted_average = result.weighted_sum / result.total_weight
-            return round((weighted_average / 100) * 4.0, 2)
-        return None
+        """获取指定学期的GPA（读取预计算的学期统计）"""
+        from .academic_stats import get_semester_stats
+
+        stats = get_semester_stats(self.id, semester)
+        return stats[0].gpa if stats else None
 
     def add_tag(self, tag):
         """添加标签"""
@@ -4,7 +4,7 @@
 
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Enum, Index, Boolean, JSON, Integer, Float
+from sqlalchemy import Column, String, Text, Enum, Index, Boolean, JSON, Integer, Float, DateTime
 from sqlalchemy.orm import relationship
 from extensions import db
 from .base import BaseModel
@@ -204,6 +204,14 @@ class SystemConfig(BaseModel):
             if not re.match(self.validation_pattern, value):
                 raise ValueError("值格式不正确")
 
+        # 成绩等级表需能编译
+        from .grading_scale import GRADING_SCALE_CONFIG_KEY, GradingScale
+        if self.key == GRADING_SCALE_CONFIG_KEY:
+            try:
+                GradingScale(value['bands'], value.get('passing_score', 60))
+            except (KeyError, TypeError, AttributeError) as e:
+                raise ValueError(f"成绩等级表格式不正确: {e}")
+
     def update_value(self, new_value, user_id=None, change_description=None):
         """更新配置值"""
         old_value = self.value
@@ -63,7 +63,7 @@ class Teacher(BaseModel):
     # 关系
     user = relationship("User", backref="teacher_record")
     courses = relationship("Course", back_populates="teacher")
-    advisees = relationship("Student", backref="advisor", foreign_keys="Student.advisor_id")
+    advisees = relationship("Student", back_populates="advisor", foreign_keys="Student.advisor_id")
 
     # 索引
     __table_args__ = (
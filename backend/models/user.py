@@ -3,7 +3,8 @@
 # ========================================
 
 import enum
-from sqlalchemy import Column, String, Boolean, Enum, Index
+from datetime import datetime
+from sqlalchemy import Column, String, Boolean, Enum, Index, func
 from sqlalchemy.orm import relationship
 from extensions import db
 from .base import BaseModel
@@ -14,6 +15,10 @@ class UserRole(enum.Enum):
     TEACHER = "teacher"
     STUDENT = "student"
 
+# 教师和学生的固定权限（管理员权限见 Admin.permissions）
+TEACHER_PERMISSIONS = frozenset({'view_students', 'manage_grades', 'view_courses', 'manage_attendance'})
+STUDENT_PERMISSIONS = frozenset({'view_profile', 'view_grades', 'view_courses', 'manage_enrollment'})
+
 class UserStatus(enum.Enum):
     """用户状态枚举"""
     ACTIVE = "active"
@@ -128,16 +133,10 @@ class User(BaseModel):
             return False
         elif self.role == UserRole.TEACHER:
             # 教师权限
-            teacher_permissions = {
-                'view_students', 'manage_grades', 'view_courses', 'manage_attendance'
-            }
-            return permission in teacher_permissions
+            return permission in TEACHER_PERMISSIONS
         elif self.role == UserRole.STUDENT:
             # 学生权限
-            student_permissions = {
-                'view_profile', 'view_grades', 'view_courses', 'manage_enrollment'
-            }
-            return permission in student_permissions
+            return permission in STUDENT_PERMISSIONS
 
         return False
 
@@ -220,4 +219,18 @@ class UserProfile(BaseModel):
         return data
 
     def __repr__(self):
-        return f"<UserProfile(user_id='{self.user_id}', name='{self.full_name}')>"
\ No newline at end of file
+        return f"<UserProfile(user_id='{self.user_id}', name='{self.full_name}')>"
+
+
+def display_name_expression(user=User, profile=UserProfile):
+    """
+    显示名的SQL表达式：与 UserProfile.full_name 一致，没有资料时为用户名
+
+    Args:
+        user: User 或其别名
+        profile: UserProfile 或其别名（通常为外连接）
+
+    Returns:
+        ColumnElement: 显示名表达式
+    """
+    return func.coalesce(profile.first_name + ' ' + profile.last_name, user.username)
@@ -265,6 +265,11 @@ class MessageSearchSchema(Schema):
     # 分页和排序
     page = fields.Int(missing=1, validate=validate.Range(min=1))
     per_page = fields.Int(missing=20, validate=validate.Range(min=1, max=100))
+    cursor = fields.Str(allow_none=True)  # 键集分页游标，空字符串表示第一页
+    count = fields.Str(
+        allow_none=True,
+        validate=validate.OneOf(['exact', 'estimated', 'cached', 'none'])
+    )
     sort_by = fields.Str(
         missing='sent_at',
         validate=validate.OneOf(['sent_at', 'priority', 'type', 'status'])
@@ -374,6 +374,11 @@ class StudentSearchSchema(Schema):
     # 分页和排序
     page = fields.Int(missing=1, validate=validate.Range(min=1))
     per_page = fields.Int(missing=20, validate=validate.Range(min=1, max=100))
+    cursor = fields.Str(allow_none=True)  # 键集分页游标，空字符串表示第一页
+    count = fields.Str(
+        allow_none=True,
+        validate=validate.OneOf(['exact', 'estimated', 'cached', 'none'])
+    )
     sort_by = fields.Str(
         missing='student_id',
         validate=validate.OneOf(['student_id', 'grade', 'class_name', 'major', 'gpa', 'credits_earned', 'enrollment_date'])
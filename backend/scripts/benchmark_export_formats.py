@@ -0,0 +1,146 @@
+# ========================================
+# 学生信息管理系统 - 导出格式基准测试
+# ========================================
+
+"""
+对比 CSV / Parquet / Arrow IPC 导出的文件大小、写出耗时和 pandas 加载耗时。
+
+使用与成绩导出相同列结构的合成数据，不需要数据库：
+
+    cd backend
+    python scripts/benchmark_export_formats.py --rows 500000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import types as sqltypes
+
+from utils.export_stream import csv_chunks
+from utils.columnar_export import RecordBatchEncoder, columnar_available, write_columnar_rows
+
+FIELDS = [
+    ('student_id', sqltypes.String()),
+    ('student_name', sqltypes.String()),
+    ('department', sqltypes.String()),
+    ('course_code', sqltypes.String()),
+    ('course_name', sqltypes.String()),
+    ('credits', sqltypes.Integer()),
+    ('teacher', sqltypes.String()),
+    ('score', sqltypes.Float()),
+    ('grade_letter', sqltypes.String()),
+    ('gpa', sqltypes.Float()),
+    ('semester', sqltypes.String()),
+    ('graded_at', sqltypes.DateTime()),
+]
+
+DEPARTMENTS = ['计算机学院', '数学学院', '物理学院', '外国语学院', '经济管理学院', '机械工程学院']
+SEMESTERS = [f'{year}-{year + 1}-{term}' for year in range(2019, 2025) for term in (1, 2)]
+LETTERS = [(90, 'A', 4.0), (85, 'A-', 3.7), (82, 'B+', 3.3), (78, 'B', 3.0), (75, 'B-', 2.7),
+           (72, 'C+', 2.3), (68, 'C', 2.0), (64, 'C-', 1.5), (60, 'D', 1.0), (0, 'F', 0.0)]
+
+
+def generate_rows(count: int, seed: int = 42):
+    """生成合成成绩行"""
+    rng = random.Random(seed)
+    courses = [(f'CS{index:04d}', f'课程{index}', rng.choice([1, 2, 3, 4]), f'教师{index % 300}') for index in range(800)]
+    base_time = datetime(2020, 1, 1)
+
+    for index in range(count):
+        course_code, course_name, credits, teacher = rng.choice(courses)
+        score = round(min(max(rng.gauss(76, 12), 0), 100), 1)
+        letter, point = next((letter, point) for threshold, letter, point in LETTERS if score >= threshold)
+        yield (
+            f'S{index % 40000:08d}',
+            f'学生{index % 40000}',
+            rng.choice(DEPARTMENTS),
+            course_code,
+            course_name,
+            credits,
+            teacher,
+            score,
+            letter,
+            point,
+            rng.choice(SEMESTERS),
+            base_time + timedelta(minutes=index)
+        )
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(rows: int, folder: str):
+    """执行基准测试并打印结果"""
+    import pandas as pd
+    import pyarrow as pa
+
+    names = [name for name, _ in FIELDS]
+    sql_types = [sql_type for _, sql_type in FIELDS]
+
+    csv_path = os.path.join(folder, 'grades.csv')
+    parquet_path = os.path.join(folder, 'grades.parquet')
+    arrow_path = os.path.join(folder, 'grades.arrows')
+
+    def write_csv():
+        with open(csv_path, 'wb') as f:
+            for chunk in csv_chunks(generate_rows(rows), header=names):
+                f.write(chunk)
+
+    def write(export_format, path):
+        return lambda: write_columnar_rows(path, export_format, generate_rows(rows), RecordBatchEncoder(names, sql_types))
+
+    def read_arrow():
+        with pa.OSFile(arrow_path, 'rb') as source:
+            return pa.ipc.open_stream(source).read_pandas()
+
+    results = []
+    for label, path, writer, reader in (
+        ('csv', csv_path, write_csv, lambda: pd.read_csv(csv_path, encoding='utf-8-sig', parse_dates=['graded_at'])),
+        ('parquet', parquet_path, write('parquet', parquet_path), lambda: pd.read_parquet(parquet_path)),
+        ('arrow', arrow_path, write('arrow', arrow_path), read_arrow),
+    ):
+        _, write_seconds = _timed(writer)
+        frame, read_seconds = _timed(reader)
+        assert len(frame) == rows
+        results.append((label, os.path.getsize(path), write_seconds, read_seconds))
+
+    csv_size, csv_read = results[0][1], results[0][3]
+    print(f"{rows} 行成绩数据")
+    print(f"{'格式':<10}{'大小(MB)':>12}{'压缩比':>10}{'写出(s)':>10}{'加载(s)':>10}{'加载加速':>10}")
+    for label, size, write_seconds, read_seconds in results:
+        print(
+            f"{label:<10}{size / 1024 / 1024:>12.2f}{csv_size / size:>10.2f}"
+            f"{write_seconds:>10.2f}{read_seconds:>10.3f}{csv_read / read_seconds:>10.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出格式基准测试')
+    parser.add_argument('--rows', type=int, default=200000, help='数据行数')
+    parser.add_argument('--keep', help='保留输出文件的目录')
+    args = parser.parse_args()
+
+    if not columnar_available():
+        print('需要安装 pyarrow')
+        sys.exit(1)
+
+    if args.keep:
+        os.makedirs(args.keep, exist_ok=True)
+        run(args.rows, args.keep)
+    else:
+        with tempfile.TemporaryDirectory() as folder:
+            run(args.rows, folder)
+
+
+if __name__ == '__main__':
+    main()
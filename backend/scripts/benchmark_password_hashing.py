@@ -0,0 +1,123 @@
+# ========================================
+# 学生信息管理系统 - 密码哈希基准测试
+# ========================================
+
+"""
+测量各密码哈希算法每核每秒可完成的登录验证次数、进程池的总吞吐，
+以及登录突发时准入控制的效果（被拒绝的请求数、主线程其他计算是否变慢）。
+
+argon2/bcrypt 未安装时跳过。不需要应用上下文：
+
+    cd backend
+    python scripts/benchmark_password_hashing.py --workers 4 --logins 200
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.password_hashing import (
+    Argon2Hasher, BcryptHasher, PasswordHasher, PasswordHashingBusy, Pbkdf2Hasher, scheme_available
+)
+
+PASSWORD = 'Correct-Horse-42'
+
+
+def build_hashers(args):
+    hashers = [Pbkdf2Hasher(args.pbkdf2_iterations)]
+    if scheme_available(BcryptHasher.name):
+        hashers.append(BcryptHasher(args.bcrypt_rounds))
+    if scheme_available(Argon2Hasher.name):
+        hashers.append(Argon2Hasher())
+    return hashers
+
+
+def _parallel(service: PasswordHasher, encoded: str, logins: int, threads: int):
+    """threads 个线程共发起 logins 次验证，返回 (耗时, 成功数, 被拒绝数)"""
+    counts = {'ok': 0, 'busy': 0}
+    lock = threading.Lock()
+
+    def worker(total):
+        for _ in range(total):
+            try:
+                service.verify(PASSWORD, encoded)
+                key = 'ok'
+            except PasswordHashingBusy:
+                key = 'busy'
+            with lock:
+                counts[key] += 1
+
+    per_thread = [logins // threads + (1 if index < logins % threads else 0) for index in range(threads)]
+    workers = [threading.Thread(target=worker, args=(total,)) for total in per_thread]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started, counts['ok'], counts['busy']
+
+
+def _probe(rounds: int = 200000) -> float:
+    """主线程上的一段纯 Python 计算（代表其他接口），返回耗时"""
+    started = time.perf_counter()
+    total = 0
+    for index in range(rounds):
+        total += index * index
+    return time.perf_counter() - started
+
+
+def run(args):
+    print(f"{os.cpu_count()} 核，{args.workers} 个工作进程，{args.logins} 次登录")
+    print(f"{'算法':<10}{'单核 次/秒':>12}{'进程池 次/秒':>14}{'每核 次/秒':>12}")
+    for hasher in build_hashers(args):
+        encoded = hasher.hash(PASSWORD)
+
+        # 单核：在当前线程中验证
+        inline = PasswordHasher(hasher, workers=0)
+        count = max(5, args.logins // 10)
+        started = time.perf_counter()
+        for _ in range(count):
+            assert inline.verify(PASSWORD, encoded)
+        single = count / (time.perf_counter() - started)
+
+        # 进程池
+        service = PasswordHasher(hasher, workers=args.workers, max_pending=args.logins, admission_timeout=60)
+        service.verify(PASSWORD, encoded)  # 预热工作进程
+        seconds, ok, _ = _parallel(service, encoded, args.logins, args.workers * 4)
+        service.shutdown()
+        pooled = ok / seconds
+        cores = min(args.workers, os.cpu_count() or 1)
+        print(f"{hasher.name:<10}{single:>12,.1f}{pooled:>14,.1f}{pooled / cores:>12,.1f}")
+
+    # 准入控制：突发登录时超出上限的请求快速失败，主线程计算不受影响
+    hasher = Pbkdf2Hasher(args.pbkdf2_iterations)
+    encoded = hasher.hash(PASSWORD)
+    service = PasswordHasher(hasher, workers=args.workers, max_pending=args.workers * 2, admission_timeout=0.05)
+    service.verify(PASSWORD, encoded)
+    idle = _probe()
+    probe_seconds = []
+    burst = threading.Thread(target=lambda: probe_seconds.append(_parallel(service, encoded, args.logins, 32)))
+    burst.start()
+    busy = _probe()
+    burst.join()
+    service.shutdown()
+    seconds, ok, rejected = probe_seconds[0]
+    print(f"突发 {args.logins} 次登录（32 个线程，上限 {args.workers * 2}）：成功 {ok}，拒绝 {rejected}，耗时 {seconds:.2f}s")
+    print(f"主线程计算：空闲 {idle * 1000:.1f}ms，突发期间 {busy * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='密码哈希基准测试')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2), help='工作进程数')
+    parser.add_argument('--logins', type=int, default=200, help='每种算法的登录次数')
+    parser.add_argument('--pbkdf2-iterations', type=int, default=600000, help='PBKDF2 迭代次数')
+    parser.add_argument('--bcrypt-rounds', type=int, default=12, help='bcrypt 轮数')
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+# ========================================
+# 学生信息管理系统 - 限流算法基准测试
+# ========================================
+
+"""
+对比内存限流存储各算法（sliding_log 为原来的逐请求时间戳实现）在大量键下的
+耗时、内存占用和空闲键回收效果，并校验各算法在单个键上的限额是否准确。
+sliding_log 每个键的内存随窗口内请求数线性增长（限额用满时为限额个时间戳），
+其余算法与请求数无关。
+
+使用模拟时钟，不需要应用上下文：
+
+    cd backend
+    python scripts/benchmark_rate_limit.py --keys 100000 --requests 20 --limit 1000/hour
+
+--contention 校验并发下的原子性：多个线程同时对同一个键发请求，内存存储、
+LocalRedis（进程内 Redis 替身，在锁内执行等价的 Python 算法，不执行 Lua 脚本）
+和数据库存储（临时 SQLite 文件）允许的次数都应恰好等于限额。同样的校验在
+tests/test_rate_limit.py 中，Lua 脚本由 fakeredis 执行：
+
+    python scripts/benchmark_rate_limit.py --contention --threads 8
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from extensions import db
+from utils.rate_limit import (
+    RATE_LIMIT_ALGORITHMS, REDIS_SCRIPTS, DatabaseStorage, LocalRedis, MemoryStorage, RateLimitCounter, RedisStorage
+)
+
+TIME_UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def parse_limit(limit: str):
+    count, unit = limit.split('/')
+    return int(count), TIME_UNITS[unit.rstrip('s')]
+
+
+def check_accuracy(algorithm: str, max_requests: int, period: int) -> int:
+    """单个键同一时刻突发 2×限额 次请求，返回允许的次数（应等于限额）"""
+    storage = MemoryStorage(algorithm, clock=FakeClock())
+    return sum(storage.is_allowed('accuracy', max_requests, period) for _ in range(max_requests * 2))
+
+
+def _replay(storage: MemoryStorage, clock: FakeClock, order, max_requests: int, period: int, threads: int):
+    if threads <= 1:
+        for key in order:
+            clock.now += 0.0001
+            storage.is_allowed(key, max_requests, period)
+        return
+
+    def worker(part):
+        for key in part:
+            storage.is_allowed(key, max_requests, period)
+
+    workers = [threading.Thread(target=worker, args=(order[index::threads],)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+
+def run_algorithm(algorithm: str, keys: int, requests: int, max_requests: int, period: int,
+                  shards: int, threads: int):
+    """每个键发送 requests 次请求，返回耗时、内存、键数和回收情况"""
+    key_names = [f'rate_limit:api:user:{index}' for index in range(keys)]
+    order = [key for key in key_names for _ in range(requests)]
+    random.Random(42).shuffle(order)
+
+    # 计时
+    clock = FakeClock()
+    storage = MemoryStorage(algorithm, shards=shards, sweep_interval=period, clock=clock)
+    gc.collect()
+    started = time.perf_counter()
+    _replay(storage, clock, order, max_requests, period, threads)
+    seconds = time.perf_counter() - started
+
+    active_keys = len(storage)
+    # 所有键空闲超过两个周期后清理
+    clock.now += period * 2 + 1
+    removed = storage.cleanup()
+    left = len(storage)
+
+    # 内存（tracemalloc 开销大，单独重放一次）
+    clock = FakeClock()
+    storage = MemoryStorage(algorithm, shards=shards, sweep_interval=period, clock=clock)
+    gc.collect()
+    tracemalloc.start()
+    _replay(storage, clock, order, max_requests, period, 1)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'ops_per_second': len(order) / seconds,
+        'memory_mb': memory / 1024 / 1024,
+        'active_keys': active_keys,
+        'removed': removed,
+        'left': left
+    }
+
+
+def run(keys: int, requests: int, limit: str, shards: int, threads: int):
+    max_requests, period = parse_limit(limit)
+    print(f"{keys} 个键 × {requests} 次请求，限额 {limit}，{shards} 个分片，{threads} 个线程")
+    print(f"{'算法':<16}{'耗时(s)':>9}{'次/秒':>12}{'内存(MB)':>10}{'字节/键':>9}{'回收':>9}{'准确':>8}")
+    for algorithm in RATE_LIMIT_ALGORITHMS:
+        result = run_algorithm(algorithm, keys, requests, max_requests, period, shards, threads)
+        allowed = check_accuracy(algorithm, max_requests, period)
+        per_key = result['memory_mb'] * 1024 * 1024 / max(result['active_keys'], 1)
+        print(
+            f"{algorithm:<16}{result['seconds']:>9.2f}{result['ops_per_second']:>12,.0f}"
+            f"{result['memory_mb']:>10.1f}{per_key:>9.0f}"
+            f"{result['removed']:>9}{allowed:>5}/{max_requests}"
+        )
+        assert result['left'] == 0, f"{algorithm}: 清理后仍有 {result['left']} 个键"
+
+
+def _hammer(storage, threads: int, attempts: int, max_requests: int, period: int, app=None) -> int:
+    """多个线程同时对同一个键发请求，返回允许的次数（数据库存储需要传入 app，每个线程推入应用上下文）"""
+    allowed = [0] * threads
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        context = app.app_context() if app else None
+        if context:
+            context.push()
+        try:
+            barrier.wait()
+            for _ in range(attempts):
+                allowed[index] += storage.is_allowed('rate_limit:contention', max_requests, period)
+        finally:
+            if context:
+                context.pop()
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(allowed)
+
+
+def run_contention(threads: int, max_requests: int = 200, period: int = 3600):
+    """校验各存储在并发下恰好允许限额次数"""
+    attempts = max_requests * 2 // threads + 1
+    storages = [(f'memory/{name}', MemoryStorage(name, shards=1)) for name in RATE_LIMIT_ALGORITHMS]
+    storages += [(f'local_redis/{name}', RedisStorage(name, client=LocalRedis())) for name in REDIS_SCRIPTS]
+
+    app = Flask(__name__)
+    with tempfile.TemporaryDirectory() as directory:
+        app.config.update(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(directory, 'rate_limit.db')}",
+            SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'timeout': 30}}
+        )
+        db.init_app(app)
+        with app.app_context():
+            RateLimitCounter.__table__.create(db.engine)
+            storages.append(('database/sliding_window', DatabaseStorage()))
+
+            print(f"{threads} 个线程 × {attempts} 次请求，限额 {max_requests}")
+            failed = []
+            for label, storage in storages:
+                allowed = _hammer(storage, threads, attempts, max_requests, period, app)
+                print(f"{label:<28}{allowed:>6}")
+                if allowed != max_requests:
+                    failed.append(label)
+            db.engine.dispose()
+
+    if failed:
+        print(f"允许次数与限额不符: {', '.join(failed)}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='限流算法基准测试')
+    parser.add_argument('--keys', type=int, default=100000, help='键数')
+    parser.add_argument('--requests', type=int, default=20, help='每个键的请求数')
+    parser.add_argument('--limit', default='1000/hour', help='限流规则')
+    parser.add_argument('--shards', type=int, default=16, help='分片数')
+    parser.add_argument('--threads', type=int, default=1, help='并发线程数')
+    parser.add_argument('--contention', action='store_true', help='校验并发下的原子性')
+    args = parser.parse_args()
+    if args.contention:
+        run_contention(max(args.threads, 2))
+    else:
+        run(args.keys, args.requests, args.limit, args.shards, args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# ========================================
+# 学生信息管理系统 - 报表计算基准测试
+# ========================================
+
+"""
+对比成绩报表 / 教师报表统计的逐行计算与向量化计算耗时，并校验两者结果一致。
+
+使用合成成绩数据，不需要数据库：
+
+    cd backend
+    python scripts/benchmark_report_compute.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.grading_scale import DEFAULT_GRADING_SCALE, GradingScale
+from utils.report_compute import (
+    GRADE_REPORT_COLUMNS, TEACHER_COLUMNS, compute_grade_report, compute_teacher_report, vectorized_available
+)
+
+DEPARTMENTS = ['计算机学院', '数学学院', '物理学院', '外国语学院', '经济管理学院', '机械工程学院', None]
+COURSE_COUNT = 2000
+TEACHER_COUNT = 400
+
+
+def generate_grade_rows(count: int, seed: int = 42):
+    """生成合成成绩行（列顺序同 GRADE_REPORT_COLUMNS）"""
+    rng = random.Random(seed)
+    courses = [(f'课程{index}', f'CS{index:04d}', f'教师{index % TEACHER_COUNT}') for index in range(COURSE_COUNT)]
+    rows = []
+    for _ in range(count):
+        course_name, course_code, teacher = rng.choice(courses)
+        max_score = rng.choice((100.0, 100.0, 100.0, 150.0, None))
+        score = None if rng.random() < 0.02 else round(min(max(rng.gauss(76, 12), 0), 100) * (max_score or 100) / 100, 1)
+        rows.append((score, max_score, course_name, course_code, teacher, rng.choice(DEPARTMENTS)))
+    return rows
+
+
+def generate_teacher_data(count: int, seed: int = 42):
+    """生成合成教师报表输入"""
+    rng = random.Random(seed)
+    teachers = [(f't{index}', rng.choice(DEPARTMENTS), rng.randint(0, 6)) for index in range(TEACHER_COUNT)]
+    course_teachers = [(f'c{index}', f't{index % TEACHER_COUNT}') for index in range(COURSE_COUNT)]
+    enrollment_counts = [(f'c{index}', rng.randint(0, 120)) for index in range(COURSE_COUNT)]
+    grades = [
+        (f'c{rng.randrange(COURSE_COUNT)}', None if rng.random() < 0.02 else rng.uniform(30, 100), rng.choice(DEPARTMENTS))
+        for _ in range(count)
+    ]
+    return teachers, course_teachers, enrollment_counts, grades
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _assert_close(left, right, path='result'):
+    """结果逐项比较（浮点允许舍入误差）"""
+    if isinstance(left, dict):
+        assert list(left) == list(right), f"{path}: 键不一致"
+        for key in left:
+            _assert_close(left[key], right[key], f'{path}.{key}')
+    elif isinstance(left, list):
+        assert len(left) == len(right), f"{path}: 长度不一致"
+        for index, (a, b) in enumerate(zip(left, right)):
+            _assert_close(a, b, f'{path}[{index}]')
+    elif isinstance(left, float) or isinstance(right, float):
+        assert left is not None and right is not None and abs(left - right) <= 0.011, f"{path}: {left} != {right}"
+    else:
+        assert left == right, f"{path}: {left} != {right}"
+
+
+def run(rows: int):
+    """执行基准测试并打印结果"""
+    scale = GradingScale(DEFAULT_GRADING_SCALE['bands'], DEFAULT_GRADING_SCALE['passing_score'])
+    grade_rows = generate_grade_rows(rows)
+    teacher_data = generate_teacher_data(rows)
+
+    benchmarks = (
+        ('成绩报表', lambda vectorized: compute_grade_report(grade_rows, GRADE_REPORT_COLUMNS, scale, vectorized)),
+        ('教师报表', lambda vectorized: compute_teacher_report(
+            teacher_data[0], TEACHER_COLUMNS, *teacher_data[1:], vectorized=vectorized)),
+    )
+
+    print(f"{rows} 条成绩")
+    print(f"{'报表':<10}{'逐行(s)':>10}{'向量化(s)':>12}{'加速':>8}")
+    for label, compute in benchmarks:
+        expected, python_seconds = _timed(lambda: compute(False))
+        result, vectorized_seconds = _timed(lambda: compute(True))
+        _assert_close(result, expected)
+        print(f"{label:<10}{python_seconds:>10.2f}{vectorized_seconds:>12.2f}{python_seconds / vectorized_seconds:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='报表计算基准测试')
+    parser.add_argument('--rows', type=int, default=1000000, help='成绩行数')
+    args = parser.parse_args()
+
+    if not vectorized_available():
+        print('需要安装 numpy 和 pandas')
+        sys.exit(1)
+
+    run(args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# ========================================
+# 学生信息管理系统 - XLSX导出基准测试
+# ========================================
+
+"""
+对比流式 XLSX 写出与 openpyxl（只写模式 / 常规模式）的耗时、峰值内存和文件大小。
+
+使用与成绩导出相同列结构的合成数据，不需要数据库：
+
+    cd backend
+    python scripts/benchmark_xlsx_export.py --rows 200000
+    python scripts/benchmark_xlsx_export.py --rows 200000 --include-in-memory --verify
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.xlsx_stream import xlsx_chunks
+from scripts.benchmark_export_formats import FIELDS, generate_rows
+
+HEADER = [name for name, _ in FIELDS]
+
+
+def openpyxl_available() -> bool:
+    """openpyxl 为可选的对照基线"""
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+def write_streaming(path: str, rows: int):
+    with open(path, 'wb') as f:
+        for chunk in xlsx_chunks(generate_rows(rows), header=HEADER, sheet_name='成绩记录'):
+            f.write(chunk)
+
+
+def write_openpyxl(path: str, rows: int, write_only: bool):
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=write_only)
+    sheet = workbook.create_sheet('成绩记录') if write_only else workbook.active
+    if write_only:
+        from openpyxl.cell import WriteOnlyCell
+        header = []
+        for title in HEADER:
+            cell = WriteOnlyCell(sheet, value=title)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        sheet.append(header)
+    else:
+        sheet.title = '成绩记录'
+        sheet.append(HEADER)
+        for cell in sheet[1]:
+            cell.font = Font(bold=True)
+    for row in generate_rows(rows):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def _measure(func):
+    """返回 (耗时秒, 峰值内存MB)；耗时在未开启内存跟踪时单独测量"""
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024
+
+
+def _verify(path: str, rows: int):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    # 流式写出不含 <dimension>，逐行计数
+    count = sum(sum(1 for _ in sheet.iter_rows(values_only=True)) - 1 for sheet in workbook.worksheets)
+    workbook.close()
+    assert count == rows, f"{path}: 数据行数 {count} != {rows}"
+
+
+def run(rows: int, folder: str, include_in_memory: bool, verify: bool):
+    """执行基准测试并打印结果"""
+    writers = [('streaming', lambda path: write_streaming(path, rows))]
+    if openpyxl_available():
+        writers.append(('openpyxl-write-only', lambda path: write_openpyxl(path, rows, write_only=True)))
+        if include_in_memory:
+            writers.append(('openpyxl', lambda path: write_openpyxl(path, rows, write_only=False)))
+    else:
+        print('未安装 openpyxl，仅测试流式写出，跳过读回校验')
+        verify = False
+
+    print(f"{rows} 行成绩数据")
+    print(f"{'写出方式':<22}{'耗时(s)':>10}{'峰值内存(MB)':>14}{'大小(MB)':>10}")
+    for label, writer in writers:
+        path = os.path.join(folder, f'{label}.xlsx')
+        seconds, peak = _measure(lambda: writer(path))
+        if verify:
+            _verify(path, rows)
+        print(f"{label:<22}{seconds:>10.2f}{peak:>14.1f}{os.path.getsize(path) / 1024 / 1024:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='XLSX导出基准测试')
+    parser.add_argument('--rows', type=int, default=200000, help='数据行数')
+    parser.add_argument('--include-in-memory', action='store_true', help='同时测试 openpyxl 常规模式（内存占用大）')
+    parser.add_argument('--verify', action='store_true', help='用 openpyxl 读回并校验行数')
+    parser.add_argument('--keep', help='保留输出文件的目录')
+    args = parser.parse_args()
+
+    if args.keep:
+        os.makedirs(args.keep, exist_ok=True)
+        run(args.rows, args.keep, args.include_in_memory, args.verify)
+    else:
+        with tempfile.TemporaryDirectory() as folder:
+            run(args.rows, folder, args.include_in_memory, args.verify)
+
+
+if __name__ == '__main__':
+    main()
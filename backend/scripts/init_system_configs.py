@@ -4,6 +4,7 @@
 
 from datetime import datetime
 from models.system_config import SystemConfig, ConfigType, ConfigValueType
+from models.grading_scale import GRADING_SCALE_CONFIG_KEY, DEFAULT_GRADING_SCALE
 from extensions import db
 
 def init_default_system_configs():
@@ -254,6 +255,18 @@ def init_default_system_configs():
             'sort_order': 26
         },
 
+        # 学术设置
+        {
+            'key': GRADING_SCALE_CONFIG_KEY,
+            'name': '成绩等级表',
+            'description': '百分制分数与等级、绩点的对应关系，修改后需执行 flask recompute-academic-stats 重算GPA',
+            'category': 'academic',
+            'config_type': ConfigType.ACADEMIC,
+            'value_type': ConfigValueType.JSON,
+            'value': DEFAULT_GRADING_SCALE,
+            'sort_order': 28
+        },
+
         # 通知设置
         {
             'key': 'notification.system_notification',
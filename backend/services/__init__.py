@@ -22,16 +22,45 @@
 - 可复用性
 """
 
-from .base_service import BaseService
-from .user_service import UserService
-from .student_service import StudentService
-from .teacher_service import TeacherService
-from .course_service import CourseService
-from .enrollment_service import EnrollmentService
-from .grade_service import GradeService
-from .message_service import MessageService
-from .report_service import ReportService
-from .system_service import SystemService
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .user_service import UserService
+    from .student_service import StudentService
+    from .teacher_service import TeacherService
+    from .course_service import CourseService
+    from .enrollment_service import EnrollmentService
+    from .grade_service import GradeService
+    from .message_service import MessageService
+    from .report_service import ReportService
+    from .system_service import SystemService
+
+# 服务类 -> 所在模块；按需导入，导入单个服务模块（如 services.dashboard_metrics）时
+# 不会加载其余服务
+_SERVICE_MODULES = {
+    'BaseService': 'base_service',
+    'UserService': 'user_service',
+    'StudentService': 'student_service',
+    'TeacherService': 'teacher_service',
+    'CourseService': 'course_service',
+    'EnrollmentService': 'enrollment_service',
+    'GradeService': 'grade_service',
+    'MessageService': 'message_service',
+    'ReportService': 'report_service',
+    'SystemService': 'system_service'
+}
+
+
+def _service_class(name: str):
+    """导入并返回服务类"""
+    return getattr(import_module(f'.{_SERVICE_MODULES[name]}', __name__), name)
+
+
+def __getattr__(name: str):
+    if name in _SERVICE_MODULES:
+        return _service_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 导出所有服务类
 __all__ = [
@@ -54,66 +83,66 @@ class ServiceFactory:
     _instances = {}
 
     @classmethod
-    def get_user_service(cls) -> UserService:
+    def get_user_service(cls) -> 'UserService':
         """获取用户服务实例"""
         if 'user' not in cls._instances:
-            cls._instances['user'] = UserService()
+            cls._instances['user'] = _service_class('UserService')()
         return cls._instances['user']
 
     @classmethod
-    def get_student_service(cls) -> StudentService:
+    def get_student_service(cls) -> 'StudentService':
         """获取学生服务实例"""
         if 'student' not in cls._instances:
-            cls._instances['student'] = StudentService()
+            cls._instances['student'] = _service_class('StudentService')()
         return cls._instances['student']
 
     @classmethod
-    def get_teacher_service(cls) -> TeacherService:
+    def get_teacher_service(cls) -> 'TeacherService':
         """获取教师服务实例"""
         if 'teacher' not in cls._instances:
-            cls._instances['teacher'] = TeacherService()
+            cls._instances['teacher'] = _service_class('TeacherService')()
         return cls._instances['teacher']
 
     @classmethod
-    def get_course_service(cls) -> CourseService:
+    def get_course_service(cls) -> 'CourseService':
         """获取课程服务实例"""
         if 'course' not in cls._instances:
-            cls._instances['course'] = CourseService()
+            cls._instances['course'] = _service_class('CourseService')()
         return cls._instances['course']
 
     @classmethod
-    def get_enrollment_service(cls) -> EnrollmentService:
+    def get_enrollment_service(cls) -> 'EnrollmentService':
         """获取选课服务实例"""
         if 'enrollment' not in cls._instances:
-            cls._instances['enrollment'] = EnrollmentService()
+            cls._instances['enrollment'] = _service_class('EnrollmentService')()
         return cls._instances['enrollment']
 
     @classmethod
-    def get_grade_service(cls) -> GradeService:
+    def get_grade_service(cls) -> 'GradeService':
         """获取成绩服务实例"""
         if 'grade' not in cls._instances:
-            cls._instances['grade'] = GradeService()
+            cls._instances['grade'] = _service_class('GradeService')()
         return cls._instances['grade']
 
     @classmethod
-    def get_message_service(cls) -> MessageService:
+    def get_message_service(cls) -> 'MessageService':
         """获取消息服务实例"""
         if 'message' not in cls._instances:
-            cls._instances['message'] = MessageService()
+            cls._instances['message'] = _service_class('MessageService')()
         return cls._instances['message']
 
     @classmethod
-    def get_report_service(cls) -> ReportService:
+    def get_report_service(cls) -> 'ReportService':
         """获取报表服务实例"""
         if 'report' not in cls._instances:
-            cls._instances['report'] = ReportService()
+            cls._instances['report'] = _service_class('ReportService')()
         return cls._instances['report']
 
     @classmethod
-    def get_system_service(cls) -> SystemService:
+    def get_system_service(cls) -> 'SystemService':
         """获取系统服务实例"""
         if 'system' not in cls._instances:
-            cls._instances['system'] = SystemService()
+            cls._instances['system'] = _service_class('SystemService')()
         return cls._instances['system']
 
     @classmethod
@@ -5,15 +5,17 @@
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 from flask import current_app, g
-from sqlalchemy import and_, or_, desc, asc, func
+from sqlalchemy import and_, or_, func
 from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 
-from ..models import db
-from ..utils.logger import get_structured_logger
-from ..utils.cache import get_cache_manager
-from ..utils.responses import APIResponse
-from ..utils.validators import BaseValidator
+from models import db
+from models.loading_profiles import apply_loading_profile
+from utils.logger import get_structured_logger
+from utils.cache import get_cache_manager
+from utils.responses import APIResponse
+from utils.validators import BaseValidator
+from utils.pagination import paginate, KeysetPage, InvalidCursorError
 
 
 class ServiceError(Exception):
@@ -167,7 +169,10 @@ class BaseService:
         per_page: int = 20,
         sort_by: str = None,
         sort_order: str = 'desc',
-        include_deleted: bool = False
+        include_deleted: bool = False,
+        cursor: str = None,
+        count_mode: str = None,
+        loading_profile: str = None
     ) -> Dict[str, Any]:
         """
         获取记录列表
@@ -179,6 +184,10 @@ class BaseService:
             sort_by: 排序字段
             sort_order: 排序方向 (asc/desc)
             include_deleted: 是否包含已删除的记录
+            cursor: 键集分页游标，传入时（第一页为空字符串）忽略page，按 (sort_by, id) 翻页
+            count_mode: 总数统计模式 (exact/estimated/cached/none)，
+                默认OFFSET分页为exact、键集分页为none
+            loading_profile: 关联加载配置 (list/detail/export)，见 models.loading_profiles
 
         Returns:
             Dict[str, Any]: 包含数据和分页信息的字典
@@ -221,36 +230,52 @@ class BaseService:
             if hasattr(self.model_class, 'deleted_at') and not include_deleted:
                 query = query.filter(self.model_class.deleted_at.is_(None))
 
-            # 应用排序
+            # 关联预加载
+            if loading_profile:
+                query = apply_loading_profile(query, self.model_class, loading_profile)
+
+            # 排序列，按 (排序列, id) 排序保证翻页稳定
+            order_column = None
             if sort_by and hasattr(self.model_class, sort_by):
                 order_column = getattr(self.model_class, sort_by)
-                if sort_order.lower() == 'desc':
-                    query = query.order_by(desc(order_column))
-                else:
-                    query = query.order_by(asc(order_column))
+            descending = sort_order.lower() == 'desc'
 
             # 分页
             per_page = min(per_page, 100)  # 限制最大每页数量
-            pagination = query.paginate(
+            pagination = paginate(
+                query,
+                order_column,
+                self.model_class.id,
                 page=page,
                 per_page=per_page,
-                error_out=False
+                cursor=cursor,
+                sort_key=sort_by or 'id',
+                descending=descending,
+                count_mode=count_mode
             )
 
+            if isinstance(pagination, KeysetPage):
+                return {
+                    'items': pagination.items,
+                    'pagination': pagination.to_meta()
+                }
+
             return {
                 'items': pagination.items,
                 'pagination': {
-                    'page': page,
-                    'per_page': per_page,
+                    'page': pagination.page,
+                    'per_page': pagination.per_page,
                     'total': pagination.total,
                     'pages': pagination.pages,
                     'has_prev': pagination.has_prev,
                     'has_next': pagination.has_next,
-                    'prev_num': pagination.prev_num,
-                    'next_num': pagination.next_num
+                    'prev_num': pagination.page - 1 if pagination.has_prev else None,
+                    'next_num': pagination.page + 1 if pagination.has_next else None
                 }
             }
 
+        except InvalidCursorError as e:
+            raise ValidationError(str(e), field='cursor')
         except SQLAlchemyError as e:
             self.logger.error(f"获取{self.resource_name}列表失败: {str(e)}")
             raise ServiceError(f"查询失败: {str(e)}")
@@ -9,6 +9,7 @@ from sqlalchemy import and_, or_, func
 from .base_service import BaseService, ServiceError, NotFoundError, ValidationError, BusinessRuleError
 from .teacher_service import TeacherService
 from ..models import Course, Teacher, Enrollment, Grade, db
+from ..models.report_rollups import get_course_semester_series
 from ..utils.validators import AcademicValidator
 from ..utils.logger import get_structured_logger
 from ..utils.cache import cache_result
@@ -598,43 +599,41 @@ class CourseService(BaseService):
             if not course:
                 raise NotFoundError("课程")
 
-            # 获取最近几个学期的选课数据
-            from ..utils.datetime_utils import AcademicCalendar
+            return self.get_enrollment_trends([course_id], semesters).get(course_id, [])
 
-            trends = []
-            current_year = datetime.now().year
-            current_semester = AcademicCalendar.get_current_semester()
-
-            for i in range(semesters):
-                # 计算学期
-                semester_num = int(current_semester)
-                year_offset = (current_semester_num - semester_num + i) // 2
-                calc_year = current_year - year_offset
-
-                # 简化的学期计算
-                if i % 2 == 0:
-                    sem_name = f"{calc_year}-春季学期"
-                else:
-                    sem_name = f"{calc_year}-秋季学期"
+        except Exception as e:
+            self.logger.error(f"获取课程选课趋势失败: {str(e)}", course_id=course_id)
+            raise ServiceError("选课趋势查询服务异常", 'ENROLLMENT_TRENDS_ERROR')
 
-                # 获取该学期的选课人数
-                enrollment_count = db.session.query(func.count(Enrollment.id)).filter(
-                    and_(
-                        Enrollment.course_id == course_id,
-                        Enrollment.semester == sem_name,
-                        Enrollment.status == 'approved'
-                    )
-                ).scalar()
+    def get_enrollment_trends(self, course_ids: List[str], semesters: int = 6) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        批量获取课程选课趋势（读取课程学期汇总，一条查询）
 
-                trends.append({
-                    'semester': sem_name,
-                    'enrollment_count': enrollment_count or 0
-                })
+        Args:
+            course_ids: 课程ID列表
+            semesters: 最近的学期数量
 
-            return trends
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 课程ID -> 按学期升序的趋势数据
+        """
+        try:
+            series = get_course_semester_series(course_ids=course_ids, last_semesters=semesters)
+            return {
+                course_id: [
+                    {
+                        'semester': item['semester'],
+                        'enrollment_count': item['enrollment_count'],
+                        'by_status': item['by_status'],
+                        'average_score': item['average_score'],
+                        'pass_rate': item['pass_rate']
+                    }
+                    for item in items
+                ]
+                for course_id, items in series.items()
+            }
 
         except Exception as e:
-            self.logger.error(f"获取课程选课趋势失败: {str(e)}", course_id=course_id)
+            self.logger.error(f"获取选课趋势失败: {str(e)}")
             raise ServiceError("选课趋势查询服务异常", 'ENROLLMENT_TRENDS_ERROR')
 
     # ========================================
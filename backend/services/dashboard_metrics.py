@@ -0,0 +1,414 @@
+# ========================================
+# 学生信息管理系统 - 仪表板指标引擎
+# ========================================
+
+"""
+仪表板指标引擎：所有仪表板接口共用的一份指标快照。
+
+- 计数类指标由一条 UNION ALL 分组查询得出（用户/学生/教师/课程/选课/成绩/审计日志，
+  每张表按状态等维度 GROUP BY，并以条件求和得到本周、本月及近6个月新增数）
+- 最近操作日志为第二条查询
+- 快照按时间桶缓存（默认每分钟一个桶），同一时间桶内所有接口只读缓存，
+  本进程内另有一份内存副本，并发请求只有一个会执行查询
+
+Usage:
+    snapshot = get_dashboard_snapshot()
+    snapshot['students']['total'], snapshot['courses']['by_status']
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import Float, String, and_, case, cast, func, literal, null, select, union_all
+
+from models import User, Student, Teacher, Course, Enrollment, Grade, AuditLog, db
+from models.user import UserRole, UserStatus
+from models.student import AcademicStatus
+from models.teacher import TeacherStatus, TeacherTitle
+from models.course import CourseType, CourseStatus
+from models.enrollment import EnrollmentStatus
+from utils.cache import get_cache_manager
+
+DEFAULT_BUCKET_SECONDS = 60
+TREND_MONTHS = 6
+RECENT_ACTIVITY_LIMIT = 10
+CACHE_KEY_PREFIX = 'dashboard:metrics'
+
+_MONTH_COLUMNS = [f'm{index}' for index in range(TREND_MONTHS)]
+
+
+# ========================================
+# 时间边界
+# ========================================
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _shift_month(month_start: datetime, months: int) -> datetime:
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def _month_ranges(now: datetime) -> List[Tuple[datetime, datetime]]:
+    """本月起往前 TREND_MONTHS 个自然月的 [开始, 结束) 区间，下标0为本月"""
+    current = _month_start(now)
+    return [(_shift_month(current, -index), _shift_month(current, 1 - index)) for index in range(TREND_MONTHS)]
+
+
+# ========================================
+# 分组查询
+# ========================================
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _key(column):
+    return cast(column, String) if column is not None else cast(null(), String)
+
+
+def _grouped_select(
+    metric: str,
+    table,
+    keys: Tuple = (None, None, None),
+    created_column=None,
+    flag=None,
+    value_column=None,
+    where=None,
+    now: datetime = None,
+    months: List[Tuple[datetime, datetime]] = None
+):
+    """
+    单张表的分组统计子查询，各表列结构一致以便 UNION ALL
+
+    列: metric, k1, k2, k3, total, new_week, m0..m5, flag, val_sum, val_count, val_min, val_max
+    """
+    key_columns = [_key(column) for column in keys]
+    columns = [literal(metric, String).label('metric')]
+    columns += [column.label(f'k{index + 1}') for index, column in enumerate(key_columns)]
+    columns.append(func.count().label('total'))
+
+    if created_column is not None:
+        columns.append(_count_if(created_column >= now - timedelta(days=7)).label('new_week'))
+        for name, (start, end) in zip(_MONTH_COLUMNS, months):
+            columns.append(_count_if(and_(created_column >= start, created_column < end)).label(name))
+    else:
+        columns.append(literal(0).label('new_week'))
+        columns += [literal(0).label(name) for name in _MONTH_COLUMNS]
+
+    columns.append((_count_if(flag) if flag is not None else literal(0)).label('flag'))
+
+    if value_column is not None:
+        columns += [
+            cast(func.sum(value_column), Float).label('val_sum'),
+            func.count(value_column).label('val_count'),
+            cast(func.min(value_column), Float).label('val_min'),
+            cast(func.max(value_column), Float).label('val_max'),
+        ]
+    else:
+        columns += [
+            cast(null(), Float).label('val_sum'),
+            literal(0).label('val_count'),
+            cast(null(), Float).label('val_min'),
+            cast(null(), Float).label('val_max'),
+        ]
+
+    statement = select(*columns).select_from(table)
+    if where is not None:
+        statement = statement.where(where)
+    group_columns = [column for column in keys if column is not None]
+    if group_columns:
+        statement = statement.group_by(*group_columns)
+    return statement
+
+
+def _metrics_statement(now: datetime, months: List[Tuple[datetime, datetime]]):
+    """所有计数指标的单条 UNION ALL 查询"""
+    common = {'now': now, 'months': months}
+    return union_all(
+        _grouped_select(
+            'users', User.__table__, (User.role, User.status, None),
+            created_column=User.created_at, **common
+        ),
+        _grouped_select(
+            'students', Student.__table__, (Student.academic_status, Student.grade, Student.major),
+            created_column=Student.created_at, value_column=Student.gpa, **common
+        ),
+        _grouped_select(
+            'teachers', Teacher.__table__, (Teacher.status, Teacher.department, Teacher.title),
+            created_column=Teacher.created_at, **common
+        ),
+        _grouped_select(
+            'courses', Course.__table__, (Course.status, Course.course_type, None),
+            created_column=Course.created_at,
+            flag=and_(Course.max_students > 0, Course.current_students >= Course.max_students),
+            **common
+        ),
+        _grouped_select(
+            'enrollments', Enrollment.__table__, (Enrollment.status, None, None),
+            created_column=Enrollment.created_at, **common
+        ),
+        _grouped_select(
+            'grades', Grade.__table__,
+            created_column=Grade.created_at, value_column=Grade.score, **common
+        ),
+        _grouped_select(
+            'audit_logs', AuditLog.__table__,
+            created_column=AuditLog.timestamp, where=AuditLog.timestamp >= months[-1][0], **common
+        ),
+    )
+
+
+# ========================================
+# 快照组装
+# ========================================
+
+def _decode(enum_class, raw: Optional[str]) -> Optional[str]:
+    """枚举列按名称存储，统一转换为枚举值"""
+    if raw is None:
+        return None
+    member = enum_class.__members__.get(raw)
+    return member.value if member is not None else raw
+
+
+class _Bucket:
+    """单张表的聚合累加器"""
+
+    def __init__(self):
+        self.total = 0
+        self.new_week = 0
+        self.months = [0] * TREND_MONTHS
+        self.flag = 0
+        self.value_sum = 0.0
+        self.value_count = 0
+        self.value_min = None
+        self.value_max = None
+        self.by_key: List[Dict[str, int]] = [{}, {}, {}]
+
+    def add(self, row, keys: Tuple):
+        self.total += row.total
+        self.new_week += row.new_week
+        for index, name in enumerate(_MONTH_COLUMNS):
+            self.months[index] += getattr(row, name)
+        self.flag += row.flag
+        if row.val_count:
+            self.value_sum += row.val_sum or 0.0
+            self.value_count += row.val_count
+            self.value_min = row.val_min if self.value_min is None else min(self.value_min, row.val_min)
+            self.value_max = row.val_max if self.value_max is None else max(self.value_max, row.val_max)
+        for index, key in enumerate(keys):
+            if key is not None:
+                self.by_key[index][key] = self.by_key[index].get(key, 0) + row.total
+
+    @property
+    def average(self) -> Optional[float]:
+        return round(self.value_sum / self.value_count, 2) if self.value_count else None
+
+
+_KEY_DECODERS = {
+    'users': (UserRole, UserStatus, None),
+    'students': (AcademicStatus, None, None),
+    'teachers': (TeacherStatus, None, TeacherTitle),
+    'courses': (CourseStatus, CourseType, None),
+    'enrollments': (EnrollmentStatus, None, None),
+    'grades': (None, None, None),
+    'audit_logs': (None, None, None),
+}
+
+
+def _with_members(counts: Dict[str, int], enum_class) -> Dict[str, int]:
+    """补全计数为0的枚举项"""
+    result = {member.value: 0 for member in enum_class}
+    result.update(counts)
+    return result
+
+
+def _build_snapshot(rows, activities, now: datetime, months: List[Tuple[datetime, datetime]]) -> Dict[str, Any]:
+    buckets = {metric: _Bucket() for metric in _KEY_DECODERS}
+    for row in rows:
+        decoders = _KEY_DECODERS[row.metric]
+        keys = tuple(
+            _decode(decoder, raw) if decoder is not None else raw
+            for decoder, raw in zip(decoders, (row.k1, row.k2, row.k3))
+        )
+        buckets[row.metric].add(row, keys)
+
+    users, students, teachers = buckets['users'], buckets['students'], buckets['teachers']
+    courses, enrollments, grades = buckets['courses'], buckets['enrollments'], buckets['grades']
+    audit_logs = buckets['audit_logs']
+
+    by_user_status = _with_members(users.by_key[1], UserStatus)
+    by_academic_status = _with_members(students.by_key[0], AcademicStatus)
+    by_teacher_status = _with_members(teachers.by_key[0], TeacherStatus)
+    by_course_status = _with_members(courses.by_key[0], CourseStatus)
+    by_enrollment_status = _with_members(enrollments.by_key[0], EnrollmentStatus)
+
+    return {
+        'generated_at': now.isoformat(),
+        'users': {
+            'total': users.total,
+            'active': by_user_status[UserStatus.ACTIVE.value],
+            'new_this_week': users.new_week,
+            'new_this_month': users.months[0],
+            'by_role': _with_members(users.by_key[0], UserRole),
+            'by_status': by_user_status
+        },
+        'students': {
+            'total': students.total,
+            'active': by_academic_status[AcademicStatus.ENROLLED.value],
+            'new_this_month': students.months[0],
+            'average_gpa': students.average or 0,
+            'by_academic_status': by_academic_status,
+            'by_grade': dict(sorted(students.by_key[1].items())),
+            'by_major': dict(sorted(students.by_key[2].items(), key=lambda item: -item[1]))
+        },
+        'teachers': {
+            'total': teachers.total,
+            'active': by_teacher_status[TeacherStatus.ACTIVE.value],
+            'new_this_month': teachers.months[0],
+            'by_status': by_teacher_status,
+            'by_department': dict(sorted(teachers.by_key[1].items(), key=lambda item: -item[1])),
+            'by_title': teachers.by_key[2]
+        },
+        'courses': {
+            'total': courses.total,
+            'active': by_course_status[CourseStatus.ACTIVE.value],
+            'full': courses.flag,
+            'new_this_month': courses.months[0],
+            'by_status': by_course_status,
+            'by_type': _with_members(courses.by_key[1], CourseType)
+        },
+        'enrollments': {
+            'total': enrollments.total,
+            'active': by_enrollment_status[EnrollmentStatus.ENROLLED.value],
+            'new_this_month': enrollments.months[0],
+            'by_status': by_enrollment_status
+        },
+        'grades': {
+            'total': grades.total,
+            'graded': grades.value_count,
+            'new_this_month': grades.months[0],
+            'average_score': grades.average or 0,
+            'min_score': grades.value_min,
+            'max_score': grades.value_max
+        },
+        'operations': {
+            'this_month': audit_logs.months[0]
+        },
+        # 按时间正序的近6个月新增
+        'monthly_trends': [
+            {
+                'month': months[index][0].strftime('%Y-%m'),
+                'new_users': users.months[index],
+                'new_students': students.months[index],
+                'new_teachers': teachers.months[index],
+                'new_courses': courses.months[index],
+                'new_enrollments': enrollments.months[index],
+                'new_grades': grades.months[index]
+            }
+            for index in reversed(range(TREND_MONTHS))
+        ],
+        'recent_activities': [
+            {
+                'id': log.id,
+                'username': log.username,
+                'action': log.action.value if log.action is not None else None,
+                'description': log.description,
+                'created_at': log.timestamp.isoformat() if log.timestamp else None
+            }
+            for log in activities
+        ]
+    }
+
+
+def compute_dashboard_metrics(now: datetime = None) -> Dict[str, Any]:
+    """
+    执行查询并生成指标快照（不经过缓存）
+
+    Args:
+        now: 统计时间，默认当前UTC时间
+
+    Returns:
+        Dict[str, Any]: 指标快照
+    """
+    now = now or datetime.utcnow()
+    months = _month_ranges(now)
+
+    rows = db.session.execute(_metrics_statement(now, months)).all()
+    activities = db.session.query(AuditLog)\
+                           .order_by(AuditLog.timestamp.desc())\
+                           .limit(RECENT_ACTIVITY_LIMIT)\
+                           .all()
+
+    return _build_snapshot(rows, activities, now, months)
+
+
+# ========================================
+# 时间桶缓存
+# ========================================
+
+_local_lock = threading.Lock()
+_local_snapshot: Optional[Tuple[int, Dict[str, Any]]] = None
+
+
+def _bucket_seconds() -> int:
+    if has_app_context():
+        return current_app.config.get('DASHBOARD_METRICS_BUCKET_SECONDS', DEFAULT_BUCKET_SECONDS)
+    return DEFAULT_BUCKET_SECONDS
+
+
+def _cache_key(bucket: int) -> str:
+    return f"{CACHE_KEY_PREFIX}:{bucket}"
+
+
+def get_dashboard_snapshot(force_refresh: bool = False) -> Dict[str, Any]:
+    """
+    获取当前时间桶的指标快照
+
+    Args:
+        force_refresh: 是否忽略缓存重新计算
+
+    Returns:
+        Dict[str, Any]: 指标快照（只读，调用方不要修改）
+    """
+    global _local_snapshot
+
+    bucket_seconds = _bucket_seconds()
+    bucket = int(time.time() // bucket_seconds)
+
+    local = _local_snapshot
+    if not force_refresh and local is not None and local[0] == bucket:
+        return local[1]
+
+    with _local_lock:
+        local = _local_snapshot
+        if not force_refresh and local is not None and local[0] == bucket:
+            return local[1]
+
+        cache_manager = get_cache_manager()
+        snapshot = None if force_refresh else cache_manager.get(_cache_key(bucket))
+        if snapshot is None:
+            start = time.perf_counter()
+            snapshot = compute_dashboard_metrics()
+            current_app.logger.debug(
+                f"仪表板指标已刷新: 时间桶 {bucket}，耗时 {(time.perf_counter() - start) * 1000:.2f}ms"
+            )
+            # 多保留一个时间桶，供时钟略有偏差的其他进程读取
+            cache_manager.set(_cache_key(bucket), snapshot, timeout=bucket_seconds * 2)
+
+        _local_snapshot = (bucket, snapshot)
+        return snapshot
+
+
+def invalidate_dashboard_metrics():
+    """清除当前时间桶的指标快照（如批量导入数据后）"""
+    global _local_snapshot
+
+    bucket = int(time.time() // _bucket_seconds())
+    with _local_lock:
+        _local_snapshot = None
+    get_cache_manager().delete(_cache_key(bucket))
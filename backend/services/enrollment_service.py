@@ -483,16 +483,16 @@ class EnrollmentService(BaseService):
                 page=page,
                 per_page=per_page,
                 sort_by='created_at',
-                sort_order='desc'
+                sort_order='desc',
+                loading_profile='list'
             )
 
-            # 为每个选课记录添加课程信息
+            # 为每个选课记录添加课程信息（课程及教师已随列表预加载）
             enrollments_with_details = []
             for enrollment in result['items']:
                 enrollment_dict = enrollment.to_dict()
 
-                # 获取课程信息
-                course = self.course_service.get_by_id(enrollment.course_id)
+                course = enrollment.course
                 if course:
                     enrollment_dict['course'] = {
                         'id': course.id,
@@ -552,16 +552,16 @@ class EnrollmentService(BaseService):
                 page=page,
                 per_page=per_page,
                 sort_by='created_at',
-                sort_order='desc'
+                sort_order='desc',
+                loading_profile='list'
             )
 
-            # 为每个选课记录添加学生信息
+            # 为每个选课记录添加学生信息（学生及用户资料已随列表预加载）
             enrollments_with_details = []
             for enrollment in result['items']:
                 enrollment_dict = enrollment.to_dict()
 
-                # 获取学生信息
-                student = self.student_service.get_by_id(enrollment.student_id)
+                student = enrollment.student
                 if student:
                     enrollment_dict['student'] = {
                         'id': student.id,
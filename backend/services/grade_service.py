@@ -11,6 +11,9 @@ from .student_service import StudentService
 from .course_service import CourseService
 from .enrollment_service import EnrollmentService
 from ..models import Grade, Student, Course, Enrollment, db
+from ..models.academic_stats import get_semester_stats
+from ..models.grading_scale import get_grading_scale, grade_percentage
+from ..utils.grade_distribution import query_distribution, summarize
 from ..utils.validators import AcademicValidator
 from ..utils.logger import get_structured_logger
 from ..utils.cache import cache_result
@@ -296,11 +299,7 @@ class GradeService(BaseService):
             results = query.all()
 
             grades = []
-            total_students = len(results)
-            total_score = 0
-            grade_distribution = {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0}
-            passed_count = 0
-
+            percentages = []
             for grade, student in results:
                 grade_data = {
                     'grade_id': grade.id,
@@ -315,27 +314,27 @@ class GradeService(BaseService):
                     'graded_at': grade.created_at.isoformat() if grade.created_at else None
                 }
                 grades.append(grade_data)
+                percentages.append(
+                    grade.score * 100.0 / (grade.max_score or 100.0) if grade.score is not None else None
+                )
 
-                # 统计计算
-                if grade.score is not None:
-                    total_score += grade.score
-                    if grade.grade_letter in grade_distribution:
-                        grade_distribution[grade.grade_letter] += 1
-                    if grade.score >= (course.passing_grade or 60):
-                        passed_count += 1
-
-            # 计算统计数据
-            average_score = round(total_score / total_students, 2) if total_students > 0 else 0
-            pass_rate = round(passed_count / total_students * 100, 2) if total_students > 0 else 0
+            # 统计计算（成绩行已加载，在内存中向量化计算）
+            scale = get_grading_scale()
+            passing_score = course.passing_score if course.passing_score is not None else scale.passing_score
+            distribution = summarize(percentages, scale, passing_score=passing_score)
 
             return {
                 'course_info': course.to_dict(),
                 'semester': semester,
                 'statistics': {
-                    'total_students': total_students,
-                    'average_score': average_score,
-                    'pass_rate': pass_rate,
-                    'grade_distribution': grade_distribution
+                    'total_students': len(results),
+                    'average_score': distribution['average'],
+                    'pass_rate': distribution['pass_rate'],
+                    'grade_distribution': distribution['grade_distribution'],
+                    'std_deviation': distribution['std_deviation'],
+                    'median_score': distribution['median'],
+                    'percentiles': distribution['percentiles'],
+                    'score_histogram': distribution['histogram']
                 },
                 'grades': grades
             }
@@ -369,26 +368,20 @@ class GradeService(BaseService):
             if student.user_id != current_user_id:
                 self._check_permission('grade_management')
 
-            # 构建查询
-            query = db.session.query(
-                func.avg(Grade.gpa).label('avg_gpa'),
-                func.sum(Course.credits).label('total_credits'),
-                func.count(Grade.id).label('total_courses')
-            ).join(Course, Grade.course_id == Course.id)\
-             .filter(Grade.student_id == student_id)\
-             .filter(Grade.gpa.isnot(None))
+            # 读取预计算的学期统计
+            semester_stats = get_semester_stats(student_id, semester)
 
             if semester:
-                query = query.filter(Grade.semester == semester)
-
-            result = query.first()
+                average_gpa = semester_stats[0].gpa if semester_stats else None
+            else:
+                average_gpa = student.gpa
 
             return {
                 'student_id': student_id,
                 'semester': semester,
-                'average_gpa': round(float(result.avg_gpa), 2) if result.avg_gpa else 0,
-                'total_credits': int(result.total_credits) if result.total_credits else 0,
-                'total_courses': result.total_courses or 0
+                'average_gpa': average_gpa or 0,
+                'total_credits': int(round(sum(stats.graded_credits for stats in semester_stats))),
+                'total_courses': sum(stats.course_count for stats in semester_stats)
             }
 
         except Exception as e:
@@ -407,8 +400,8 @@ class GradeService(BaseService):
             Dict[str, Any]: 统计信息
         """
         try:
-            # 基础查询
-            query = db.session.query(Grade, Course, Student).join(
+            # 基础查询（各项统计使用同一组筛选条件）
+            query = db.session.query(Grade).join(
                 Course, Grade.course_id == Course.id
             ).join(Student, Grade.student_id == Student.id)
 
@@ -422,59 +415,40 @@ class GradeService(BaseService):
             # 总成绩数
             total_grades = query.count()
 
-            # 按等级分布统计
-            grade_distribution = db.session.query(
-                Grade.grade_letter,
-                func.count(Grade.id)
-            ).join(Course, Grade.course_id == Course.id)\
-             .join(Student, Grade.student_id == Student.id)\
-             .filter_by(**{
-                 'semester': semester if semester else Grade.semester
-             }).group_by(Grade.grade_letter).all()
-
-            # 平均分统计
-            score_stats = db.session.query(
-                func.avg(Grade.score).label('avg_score'),
-                func.min(Grade.score).label('min_score'),
-                func.max(Grade.score).label('max_score'),
-                func.count(Grade.id).label('total_count')
-            ).filter(Grade.score.isnot(None))
-
-            if semester:
-                score_stats = score_stats.join(Course, Grade.course_id == Course.id)\
-                                 .join(Student, Grade.student_id == Student.id)\
-                                 .filter(Course.semester == semester)
-
-            score_result = score_stats.first()
+            # 分数、分段与等级分布（在数据库中分组聚合，按课程及格线统计及格率）
+            scale = get_grading_scale()
+            distribution = query_distribution(
+                query.with_entities(
+                    grade_percentage(Grade).label('value'),
+                    Course.passing_score.label('passing_score')
+                ),
+                scale
+            )
 
             # GPA统计
-            gpa_stats = db.session.query(
-                func.avg(Grade.gpa).label('avg_gpa'),
+            gpa_result = query.filter(Grade.score.isnot(None)).with_entities(
+                func.avg(scale.point_case(grade_percentage(Grade))).label('avg_gpa'),
                 func.count(Grade.id).label('total_count')
-            ).filter(Grade.gpa.isnot(None))
-
-            if semester:
-                gpa_stats = gpa_stats.join(Course, Grade.course_id == Course.id)\
-                                .join(Student, Grade.student_id == Student.id)\
-                                .filter(Course.semester == semester)
-
-            gpa_result = gpa_stats.first()
+            ).first()
 
             return {
                 'total_grades': total_grades,
                 'score_statistics': {
-                    'average_score': round(float(score_result.avg_score), 2) if score_result.avg_score else 0,
-                    'min_score': score_result.min_score,
-                    'max_score': score_result.max_score,
-                    'count': score_result.total_count or 0
+                    'average_score': distribution['average'],
+                    'min_score': distribution['lowest'],
+                    'max_score': distribution['highest'],
+                    'count': distribution['count'],
+                    'std_deviation': distribution['std_deviation'],
+                    'median_score': distribution['median'],
+                    'percentiles': distribution['percentiles'],
+                    'pass_rate': distribution['pass_rate']
                 },
                 'gpa_statistics': {
                     'average_gpa': round(float(gpa_result.avg_gpa), 2) if gpa_result.avg_gpa else 0,
                     'count': gpa_result.total_count or 0
                 },
-                'grade_distribution': {
-                    grade: count for grade, count in grade_distribution if grade
-                }
+                'grade_distribution': distribution['grade_distribution'],
+                'score_histogram': distribution['histogram']
             }
 
         except Exception as e:
@@ -491,21 +465,15 @@ class GradeService(BaseService):
 
         Args:
             score: 分数
-            passing_grade: 及格分数
+            passing_grade: 及格分数（低于该分数的成绩按最低等级计）
 
         Returns:
-            str: 等级成绩 (A, B, C, D, F)
+            str: 等级成绩
         """
-        if score >= 90:
-            return 'A'
-        elif score >= 80:
-            return 'B'
-        elif score >= 70:
-            return 'C'
-        elif score >= passing_grade:
-            return 'D'
-        else:
-            return 'F'
+        scale = get_grading_scale()
+        if score < passing_grade:
+            return scale.letters[-1]
+        return scale.letter_for(score)
 
     def _calculate_gpa(self, grade_letter: str) -> float:
         """
@@ -517,15 +485,7 @@ class GradeService(BaseService):
         Returns:
             float: GPA值
         """
-        gpa_mapping = {
-            'A': 4.0,
-            'B': 3.0,
-            'C': 2.0,
-            'D': 1.0,
-            'F': 0.0
-        }
-
-        return gpa_mapping.get(grade_letter, 0.0)
+        return get_grading_scale().point_for_letter(grade_letter)
 
     # ========================================
     # 数据验证
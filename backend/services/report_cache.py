@@ -0,0 +1,394 @@
+# ========================================
+# 学生信息管理系统 - 报表结果缓存
+# ========================================
+
+"""
+报表结果缓存：相同报表类型 + 筛选条件的结果，在其依赖的数据变化之前直接复用。
+
+- 缓存键为报表类型与规范化筛选条件的哈希（键顺序、空值、列表顺序、数字/字符串写法不影响）
+- 每条结果记录依赖范围：学期 × 院系 × 课程，报表未按某维度筛选时该维度为 *；
+  同时记录计算前各范围的版本令牌
+- 成绩/选课变更提交后，替换受影响范围（含新旧值、学生院系和授课教师院系，
+  以及对应的 * 组合）的版本令牌；读取时令牌不一致即视为失效
+- 学生/教师/用户资料/课程/系统配置变更，以及用户名、邮箱变更，替换全局令牌，使所有报表失效
+- 同一进程内相同报表的并发请求只计算一次，结果附带计算时间 as_of
+
+Usage:
+    report_data, meta = get_cached_report('grades', filters, lambda: build_report(filters))
+    return success_response(report_data, meta=meta)
+"""
+
+import hashlib
+import itertools
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from models import User, UserProfile, Student, Teacher, Course, Enrollment, Grade, SystemConfig
+from utils.cache import get_cache_manager
+
+DEFAULT_TIMEOUT = 600
+DEFAULT_MAX_SCOPES = 32
+CACHE_KEY_PREFIX = 'report:result'
+VERSION_KEY_PREFIX = 'report:version'
+WILDCARD = '*'
+GLOBAL_SCOPE = 'all'
+
+SCOPE_DIMENSIONS = ('semester', 'department', 'course')
+
+# 报表类型 -> {依赖维度: 筛选条件中的键}；未列出的维度依赖全部数据
+REPORT_DEPENDENCIES: Dict[str, Dict[str, str]] = {
+    'enrollments': {'department': 'department'},
+    'grades': {'semester': 'semester', 'department': 'department'},
+    'teachers': {},
+    'trends': {'semester': 'semesters', 'department': 'departments', 'course': 'course_ids'},
+}
+
+# 变更后使所有报表失效的模型（姓名、院系取自 UserProfile，邮箱取自 User）
+_GLOBAL_MODELS = (Student, Teacher, User, UserProfile, Course, SystemConfig)
+
+# 报表中展示的用户字段；登录时间等其他字段频繁更新，不使报表失效
+_USER_REPORT_FIELDS = ('username', 'email')
+
+
+def _timeout() -> int:
+    if has_app_context():
+        return current_app.config.get('REPORT_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+    return DEFAULT_TIMEOUT
+
+
+def _max_scopes() -> int:
+    if has_app_context():
+        return current_app.config.get('REPORT_CACHE_MAX_SCOPES', DEFAULT_MAX_SCOPES)
+    return DEFAULT_MAX_SCOPES
+
+
+# ========================================
+# 缓存键与依赖范围
+# ========================================
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == '' or (isinstance(value, (list, tuple, set)) and not value)
+
+
+def _normalize(value: Any):
+    if isinstance(value, (list, tuple, set)):
+        return sorted({str(item) for item in value})
+    return str(value)
+
+
+def report_fingerprint(report_type: str, filters: Dict[str, Any] = None) -> str:
+    """
+    报表类型 + 筛选条件的规范化哈希
+
+    Args:
+        report_type: 报表类型
+        filters: 筛选条件
+
+    Returns:
+        str: 32位十六进制指纹
+    """
+    normalized = {
+        key: _normalize(value)
+        for key, value in (filters or {}).items()
+        if not _is_empty(value)
+    }
+    payload = json.dumps({'type': report_type, 'filters': normalized}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def report_scopes(report_type: str, filters: Dict[str, Any] = None) -> List[str]:
+    """
+    报表依赖的范围标签（学期|院系|课程）
+
+    Args:
+        report_type: 报表类型
+        filters: 筛选条件
+
+    Returns:
+        List[str]: 范围标签，组合数超过上限时取值最多的维度放宽为 *
+    """
+    filters = filters or {}
+    dependencies = REPORT_DEPENDENCIES.get(report_type, {})
+
+    values = []
+    for dimension in SCOPE_DIMENSIONS:
+        filter_key = dependencies.get(dimension)
+        value = filters.get(filter_key) if filter_key else None
+        if _is_empty(value):
+            values.append([WILDCARD])
+        elif isinstance(value, (list, tuple, set)):
+            values.append(_normalize(value))
+        else:
+            values.append([str(value)])
+
+    max_scopes = _max_scopes()
+    while _product(len(items) for items in values) > max_scopes:
+        widest = max(range(len(values)), key=lambda index: len(values[index]))
+        values[widest] = [WILDCARD]
+
+    return ['|'.join(combination) for combination in itertools.product(*values)]
+
+
+def _product(numbers: Iterable[int]) -> int:
+    result = 1
+    for number in numbers:
+        result *= number
+    return result
+
+
+def _change_scopes(semester: Optional[str], departments: Iterable[Optional[str]], course_id: Optional[str]) -> Set[str]:
+    """一条成绩/选课变更影响的范围标签：每个维度取自身值和 *"""
+    semesters = (str(semester), WILDCARD) if semester else (WILDCARD,)
+    department_values = {str(department) for department in departments if department} | {WILDCARD}
+    courses = (str(course_id), WILDCARD) if course_id else (WILDCARD,)
+    return {'|'.join(combination) for combination in itertools.product(semesters, department_values, courses)}
+
+
+def _cache_key(report_type: str, fingerprint: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{report_type}:{fingerprint}"
+
+
+def _version_key(scope: str) -> str:
+    return f"{VERSION_KEY_PREFIX}:{scope}"
+
+
+# ========================================
+# 版本令牌
+# ========================================
+
+def _new_token() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _current_versions(cache_manager, scopes: List[str]) -> Dict[str, Optional[str]]:
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache_manager.get_many(keys)
+    return {scope: found.get(key) for scope, key in zip(scopes, keys)}
+
+
+def _ensure_versions(cache_manager, scopes: List[str]) -> Dict[str, str]:
+    """
+    读取版本令牌，缺失的补建
+
+    令牌被淘汰或过期后与已缓存结果记录的值不一致，只会使结果提前失效；
+    结果中从不记录“无令牌”，避免令牌丢失后把旧结果误判为有效
+    """
+    versions = _current_versions(cache_manager, scopes)
+    missing = {_version_key(scope): _new_token() for scope, token in versions.items() if token is None}
+    if missing:
+        # 令牌比结果保留更久，结果有效期内令牌不会先于结果过期
+        cache_manager.set_many(missing, timeout=_timeout() * 4)
+        versions = _current_versions(cache_manager, scopes)
+    return versions
+
+
+def bump_report_scopes(scopes: Iterable[str]) -> int:
+    """
+    替换范围的版本令牌，使依赖这些范围的缓存结果失效
+
+    Args:
+        scopes: 范围标签
+
+    Returns:
+        int: 替换的令牌数
+    """
+    tokens = {_version_key(scope): _new_token() for scope in set(scopes)}
+    if not tokens:
+        return 0
+    return get_cache_manager().set_many(tokens, timeout=_timeout() * 4)
+
+
+def invalidate_reports() -> int:
+    """使所有报表缓存失效（如修改等级表、批量导入数据后）"""
+    return bump_report_scopes([GLOBAL_SCOPE])
+
+
+# ========================================
+# 读取与计算
+# ========================================
+
+_flight_guard = threading.Lock()
+_flight_locks: Dict[str, threading.Lock] = {}
+
+
+def _flight_lock(key: str) -> threading.Lock:
+    with _flight_guard:
+        lock = _flight_locks.get(key)
+        if lock is None:
+            lock = _flight_locks[key] = threading.Lock()
+        return lock
+
+
+def _valid_entry(cache_manager, key: str) -> Optional[Dict[str, Any]]:
+    entry = cache_manager.get(key)
+    if entry is None:
+        return None
+    recorded = entry['versions']
+    current = _current_versions(cache_manager, list(recorded))
+    return entry if current == recorded else None
+
+
+def _meta(entry: Dict[str, Any], fingerprint: str, cached: bool) -> Dict[str, Any]:
+    return {
+        'as_of': entry['as_of'],
+        'cached': cached,
+        'fingerprint': fingerprint,
+        'compute_ms': entry['compute_ms']
+    }
+
+
+def get_cached_report(report_type: str, filters: Dict[str, Any], compute: Callable[[], Any],
+                      refresh: bool = False) -> Tuple[Any, Dict[str, Any]]:
+    """
+    读取报表结果，缓存失效或不存在时计算
+
+    Args:
+        report_type: 报表类型（REPORT_DEPENDENCIES 中的键）
+        filters: 筛选条件
+        compute: 计算报表的函数
+        refresh: 是否忽略缓存重新计算
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: (报表数据, 元数据 as_of/cached/fingerprint/compute_ms)
+    """
+    cache_manager = get_cache_manager()
+    fingerprint = report_fingerprint(report_type, filters)
+    key = _cache_key(report_type, fingerprint)
+
+    if not refresh:
+        entry = _valid_entry(cache_manager, key)
+        if entry is not None:
+            return entry['value'], _meta(entry, fingerprint, True)
+
+    lock = _flight_lock(key)
+    with lock:
+        # 等待期间其他请求可能已完成计算
+        if not refresh:
+            entry = _valid_entry(cache_manager, key)
+            if entry is not None:
+                return entry['value'], _meta(entry, fingerprint, True)
+
+        # 先取版本令牌再计算：计算期间提交的变更会使本次结果直接失效
+        versions = _ensure_versions(cache_manager, report_scopes(report_type, filters) + [GLOBAL_SCOPE])
+        as_of = datetime.utcnow().isoformat()
+        start = time.perf_counter()
+        value = compute()
+        compute_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        entry = {'value': value, 'as_of': as_of, 'versions': versions, 'compute_ms': compute_ms}
+        cache_manager.set(key, entry, timeout=_timeout())
+        current_app.logger.debug(f"报表已计算: {report_type} {fingerprint}，耗时 {compute_ms}ms")
+
+    with _flight_guard:
+        if not lock.locked():
+            _flight_locks.pop(key, None)
+
+    return value, _meta(entry, fingerprint, False)
+
+
+# ========================================
+# 变更跟踪
+# ========================================
+
+def _changed_keys(session, model, objects: List) -> Set[Tuple]:
+    """已修改对象的 (学生ID, 课程ID, 学期)：新值和数据库中的原值"""
+    if not objects:
+        return set()
+    keys = {(obj.student_id, obj.course_id, obj.semester) for obj in objects}
+    previous = session.connection().execute(
+        select(model.student_id, model.course_id, model.semester)
+        .where(model.id.in_([obj.id for obj in objects]))
+    )
+    keys.update((row.student_id, row.course_id, row.semester) for row in previous)
+    return keys
+
+
+def _affects_reports(obj) -> bool:
+    """已修改的全局模型对象是否改动了报表用到的字段"""
+    if isinstance(obj, User):
+        attrs = inspect(obj).attrs
+        return any(attrs[name].history.has_changes() for name in _USER_REPORT_FIELDS)
+    return True
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_report_changes(session, flush_context, instances):
+    """flush 前记录受影响的 (学生, 课程, 学期)"""
+    pending = session.info.setdefault('report_cache_keys', set())
+
+    changed = {Grade: [], Enrollment: []}
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (Grade, Enrollment)):
+            pending.add((obj.student_id, obj.course_id, obj.semester))
+        elif isinstance(obj, _GLOBAL_MODELS):
+            session.info['report_cache_global'] = True
+
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, (Grade, Enrollment)):
+            changed[type(obj)].append(obj)
+        elif isinstance(obj, _GLOBAL_MODELS) and _affects_reports(obj):
+            session.info['report_cache_global'] = True
+
+    for model, objects in changed.items():
+        pending.update(_changed_keys(session, model, objects))
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _resolve_report_scopes(session, flush_context):
+    """flush 后查出学生院系和授课教师院系，换算为范围标签"""
+    pending = session.info.pop('report_cache_keys', None)
+    if not pending:
+        return
+
+    connection = session.connection()
+    student_ids = {student_id for student_id, _, _ in pending if student_id}
+    course_ids = {course_id for _, course_id, _ in pending if course_id}
+
+    student_departments = dict(connection.execute(
+        select(Student.id, UserProfile.department)
+        .outerjoin(UserProfile, UserProfile.user_id == Student.user_id)
+        .where(Student.id.in_(student_ids))
+    ).all()) if student_ids else {}
+    teacher_departments = dict(connection.execute(
+        select(Course.id, Teacher.department)
+        .join(Teacher, Course.teacher_id == Teacher.id)
+        .where(Course.id.in_(course_ids))
+    ).all()) if course_ids else {}
+
+    scopes = session.info.setdefault('report_cache_scopes', set())
+    for student_id, course_id, semester in pending:
+        departments = (student_departments.get(student_id), teacher_departments.get(course_id))
+        scopes.update(_change_scopes(semester, departments, course_id))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    """事务提交后替换受影响范围的版本令牌"""
+    scopes = session.info.pop('report_cache_scopes', None) or set()
+    if session.info.pop('report_cache_global', False):
+        scopes.add(GLOBAL_SCOPE)
+    if not scopes or not has_app_context():
+        return
+
+    try:
+        bump_report_scopes(scopes)
+    except Exception as e:
+        # 令牌替换失败只影响缓存时效，不影响已提交的事务
+        current_app.logger.warning(f"报表缓存失效失败: {str(e)}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    """事务回滚后丢弃已记录的变更"""
+    for key in ('report_cache_keys', 'report_cache_scopes', 'report_cache_global'):
+        session.info.pop(key, None)
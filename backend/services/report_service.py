@@ -5,10 +5,16 @@
 from typing import Dict, List, Optional, Any
 from datetime import datetime, date
 from sqlalchemy import and_, or_, func, text
+from sqlalchemy.orm import aliased
 
 from .base_service import BaseService, ServiceError, NotFoundError, ValidationError
-from ..models import User, Student, Teacher, Course, Enrollment, Grade, db
-from ..utils.logger import get_structured_logger
+from .dashboard_metrics import get_dashboard_snapshot
+from models import User, UserProfile, Student, Teacher, Course, Enrollment, Grade, db
+from models.teacher import TeacherStatus
+from models.user import display_name_expression
+from models.grading_scale import get_grading_scale, grade_percentage
+from utils.grade_distribution import query_distribution
+from utils.logger import get_structured_logger
 
 
 class ReportService(BaseService):
@@ -30,88 +36,33 @@ class ReportService(BaseService):
             Dict[str, Any]: 仪表板数据
         """
         try:
-            now = datetime.utcnow()
-            current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-            # 基础统计
-            total_students = db.session.query(func.count(Student.id)).scalar() or 0
-            total_teachers = db.session.query(func.count(Teacher.id)).scalar() or 0
-            total_courses = db.session.query(func.count(Course.id)).scalar() or 0
-            total_enrollments = db.session.query(func.count(Enrollment.id)).scalar() or 0
-
-            # 本月新增统计
-            new_students = db.session.query(func.count(Student.id)).filter(
-                Student.created_at >= current_month_start
-            ).scalar() or 0
-
-            new_teachers = db.session.query(func.count(Teacher.id)).filter(
-                Teacher.created_at >= current_month_start
-            ).scalar() or 0
-
-            # 课程统计
-            active_courses = db.session.query(func.count(Course.id)).filter_by(status='active').scalar() or 0
-
-            # 成绩统计
-            grade_stats = db.session.query(
-                func.avg(Grade.score).label('avg_score'),
-                func.min(Grade.score).label('min_score'),
-                func.max(Grade.score).label('max_score')
-            ).first()
-
-            # 学生年级分布
-            student_by_grade = db.session.query(
-                Student.grade_level,
-                func.count(Student.id).label('count')
-            ).group_by(Student.grade_level).all()
-
-            # 教师院系分布
-            teacher_by_dept = db.session.query(
-                Teacher.department,
-                func.count(Teacher.id).label('count')
-            ).group_by(Teacher.department).all()
-
-            # 最近活动
-            recent_activities = db.session.query(
-                User.username,
-                db.session.query(func.text('users.role')).filter_by(id=User.id).label('role')
-            ).join(
-                db.session.query(func.text('audit_logs')).filter_by(user_id=User.id).subquery(),
-                db.session.query(func.text('audit_logs')).filter_by(user_id=User.id).c.id == User.id
-            ).order_by(
-                db.session.query(func.text('audit_logs')).filter_by(user_id=User.id).c.created_at.desc()
-            ).limit(10).all()
+            metrics = get_dashboard_snapshot()
 
             return {
                 'overview': {
-                    'total_students': total_students,
-                    'total_teachers': total_teachers,
-                    'total_courses': total_courses,
-                    'total_enrollments': total_enrollments,
-                    'new_students_this_month': new_students,
-                    'new_teachers_this_month': new_teachers
+                    'total_students': metrics['students']['total'],
+                    'total_teachers': metrics['teachers']['total'],
+                    'total_courses': metrics['courses']['total'],
+                    'total_enrollments': metrics['enrollments']['total'],
+                    'new_students_this_month': metrics['students']['new_this_month'],
+                    'new_teachers_this_month': metrics['teachers']['new_this_month']
                 },
                 'courses': {
-                    'active_courses': active_courses,
-                    'average_score': round(float(grade_stats.avg_score), 2) if grade_stats.avg_score else 0
+                    'active_courses': metrics['courses']['active'],
+                    'average_score': metrics['grades']['average_score']
                 },
                 'distributions': {
                     'students_by_grade': [
                         {'grade': grade, 'count': count}
-                        for grade, count in student_by_grade
+                        for grade, count in metrics['students']['by_grade'].items()
                     ],
                     'teachers_by_department': [
                         {'department': dept, 'count': count}
-                        for dept, count in teacher_by_dept
+                        for dept, count in metrics['teachers']['by_department'].items()
                     ]
                 },
-                'recent_activities': [
-                    {
-                        'username': activity[0],
-                        'role': activity[1],
-                        'timestamp': datetime.utcnow().isoformat()
-                    }
-                    for activity in recent_activities
-                ]
+                'recent_activities': metrics['recent_activities'],
+                'generated_at': metrics['generated_at']
             }
 
         except Exception as e:
@@ -302,7 +253,7 @@ class ReportService(BaseService):
             self._check_permission('reports_view')
 
             # 构建查询
-            query = db.session.query(Grade, Student, Course).join(
+            query = db.session.query(Grade).join(
                 Student, Grade.student_id == Student.id
             ).join(Course, Grade.course_id == Course.id)
 
@@ -312,56 +263,43 @@ class ReportService(BaseService):
             if department:
                 query = query.filter(Student.department == department)
 
-            # 成绩统计
+            # 成绩统计（分段、等级分布和百分位在数据库中计算，不加载成绩行）
+            scale = get_grading_scale()
             total_grades = query.count()
-            grade_scores = query.filter(Grade.score.isnot(None)).all()
-
-            if grade_scores:
-                scores = [g[0].score for g in grade_scores]
-                avg_score = sum(scores) / len(scores)
-                max_score = max(scores)
-                min_score = min(scores)
-
-                # 成绩分布
-                grade_distribution = {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0}
-                for grade, student, course in grade_scores:
-                    if grade.grade_letter in grade_distribution:
-                        grade_distribution[grade.grade_letter] += 1
-            else:
-                avg_score = max_score = min_score = 0
-                grade_distribution = {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0}
+            distribution = query_distribution(
+                query.with_entities(grade_percentage(Grade).label('value')), scale
+            )
 
             # 按课程统计
-            course_grade_stats = {}
-            for grade, student, course in grade_scores:
-                if course.name not in course_grade_stats:
-                    course_grade_stats[course.name] = {
-                        'course_code': course.course_code,
-                        'total_students': 0,
-                        'scores': [],
-                        'avg_score': 0
-                    }
-
-                stats = course_grade_stats[course.name]
-                stats['total_students'] += 1
-                if grade.score is not None:
-                    stats['scores'].append(grade.score)
-
-            # 计算各科平均分
-            for course_name in course_grade_stats:
-                scores = course_grade_stats[course_name]['scores']
-                course_grade_stats[course_name]['avg_score'] = round(sum(scores) / len(scores), 2) if scores else 0
-                del course_grade_stats[course_name]['scores']
+            course_rows = query.filter(Grade.score.isnot(None)).with_entities(
+                Course.name, Course.course_code,
+                func.count(Grade.id).label('total_students'),
+                func.avg(Grade.score).label('avg_score')
+            ).group_by(Course.id, Course.name, Course.course_code).all()
+
+            course_grade_stats = {
+                row.name: {
+                    'course_code': row.course_code,
+                    'total_students': row.total_students,
+                    'avg_score': round(float(row.avg_score), 2) if row.avg_score is not None else 0
+                }
+                for row in course_rows
+            }
 
             return {
                 'semester': semester,
                 'department': department,
                 'summary': {
                     'total_grades': total_grades,
-                    'average_score': round(avg_score, 2),
-                    'highest_score': max_score,
-                    'lowest_score': min_score,
-                    'grade_distribution': grade_distribution
+                    'average_score': distribution['average'],
+                    'highest_score': distribution['highest'],
+                    'lowest_score': distribution['lowest'],
+                    'grade_distribution': distribution['grade_distribution'],
+                    'std_deviation': distribution['std_deviation'],
+                    'median_score': distribution['median'],
+                    'percentiles': distribution['percentiles'],
+                    'pass_rate': distribution['pass_rate'],
+                    'score_histogram': distribution['histogram']
                 },
                 'course_statistics': course_grade_stats
             }
@@ -628,9 +566,156 @@ class ReportService(BaseService):
                 'course_name': course.name,
                 'semester': grade.semester,
                 'score': grade.score,
-                'grade_letter': grade.grade_letter,
-                'gpa': grade.gpa,
+                'grade_letter': grade.letter_grade,
+                'gpa': grade.grade_point,
                 'graded_at': grade.created_at.isoformat() if grade.created_at else None
             })
 
-        return export_data
\ No newline at end of file
+        return export_data
+
+# ========================================
+# 导出查询（列查询，供流式导出、列式导出和每日快照共用）
+# ========================================
+
+def _student_joins(query, student_user, student_profile):
+    """连接学生的用户和资料（院系取自 UserProfile）"""
+    return query.join(student_user, student_user.id == Student.user_id)\
+        .outerjoin(student_profile, student_profile.user_id == Student.user_id)
+
+
+def _teacher_joins(query, teacher_user, teacher_profile, outer: bool = False):
+    """连接教师的用户和资料（用于显示名）"""
+    join = query.outerjoin if outer else query.join
+    return join(teacher_user, teacher_user.id == Teacher.user_id)\
+        .outerjoin(teacher_profile, teacher_profile.user_id == Teacher.user_id)
+
+
+def build_enrollment_export_query(filters: Dict[str, Any] = None):
+    """
+    构建选课导出查询
+
+    Args:
+        filters: 筛选条件（start_date/end_date/department/semester）
+
+    Returns:
+        Query: 列查询（未执行）
+    """
+    filters = filters or {}
+    student_user, student_profile = aliased(User), aliased(UserProfile)
+    teacher_user, teacher_profile = aliased(User), aliased(UserProfile)
+    query = db.session.query(
+        Student.student_id,
+        display_name_expression(student_user, student_profile).label('student_name'),
+        student_profile.department.label('student_dept'),
+        Student.class_name,
+        Student.major,
+        Course.course_code,
+        Course.name.label('course_name'),
+        Course.credits,
+        display_name_expression(teacher_user, teacher_profile).label('teacher'),
+        Enrollment.semester,
+        Enrollment.status,
+        Enrollment.created_at
+    ).select_from(Enrollment)\
+     .join(Student, Enrollment.student_id == Student.id)
+    query = _student_joins(query, student_user, student_profile)\
+        .join(Course, Enrollment.course_id == Course.id)\
+        .outerjoin(Teacher, Course.teacher_id == Teacher.id)
+    query = _teacher_joins(query, teacher_user, teacher_profile, outer=True)
+
+    if filters.get('start_date'):
+        query = query.filter(Enrollment.created_at >= filters['start_date'])
+    if filters.get('end_date'):
+        query = query.filter(Enrollment.created_at <= filters['end_date'])
+    if filters.get('department'):
+        query = query.filter(student_profile.department == filters['department'])
+    if filters.get('semester'):
+        query = query.filter(Enrollment.semester == filters['semester'])
+
+    return query
+
+
+def build_grade_export_query(filters: Dict[str, Any] = None):
+    """
+    构建成绩导出查询
+
+    Args:
+        filters: 筛选条件（semester/department）
+
+    Returns:
+        Query: 列查询（未执行）
+    """
+    filters = filters or {}
+    scale = get_grading_scale()
+    percentage = grade_percentage(Grade)
+    student_user, student_profile = aliased(User), aliased(UserProfile)
+    teacher_user, teacher_profile = aliased(User), aliased(UserProfile)
+    query = db.session.query(
+        Student.student_id,
+        display_name_expression(student_user, student_profile).label('student_name'),
+        student_profile.department.label('department'),
+        Student.class_name,
+        Student.major,
+        Course.course_code,
+        Course.name.label('course_name'),
+        Course.credits,
+        display_name_expression(teacher_user, teacher_profile).label('teacher'),
+        Grade.score,
+        scale.letter_case(percentage).label('grade_letter'),
+        scale.point_case(percentage).label('gpa'),
+        Grade.semester
+    ).select_from(Grade)\
+     .join(Student, Grade.student_id == Student.id)
+    query = _student_joins(query, student_user, student_profile)\
+        .join(Course, Grade.course_id == Course.id)\
+        .join(Teacher, Course.teacher_id == Teacher.id)
+    query = _teacher_joins(query, teacher_user, teacher_profile)
+
+    if filters.get('semester'):
+        query = query.filter(Grade.semester == filters['semester'])
+    if filters.get('department'):
+        query = query.filter(student_profile.department == filters['department'])
+
+    return query
+
+
+def build_teacher_export_query(filters: Dict[str, Any] = None):
+    """
+    构建教师导出查询（工作量为所授课程数）
+
+    Args:
+        filters: 筛选条件（department）
+
+    Returns:
+        Query: 列查询（未执行）
+    """
+    filters = filters or {}
+    course_counts = db.session.query(
+        Course.teacher_id.label('teacher_id'),
+        func.count(Course.id).label('course_count')
+    ).group_by(Course.teacher_id).subquery()
+
+    query = db.session.query(
+        Teacher.teacher_id,
+        display_name_expression(User, UserProfile).label('name'),
+        Teacher.department,
+        Teacher.title,
+        Teacher.status,
+        User.email,
+        func.coalesce(course_counts.c.course_count, 0).label('workload')
+    ).select_from(Teacher)
+    query = _teacher_joins(query, User, UserProfile)\
+        .outerjoin(course_counts, course_counts.c.teacher_id == Teacher.id)\
+        .filter(Teacher.status == TeacherStatus.ACTIVE)
+
+    if filters.get('department'):
+        query = query.filter(Teacher.department == filters['department'])
+
+    return query
+
+
+EXPORT_QUERY_BUILDERS = {
+    'enrollments': build_enrollment_export_query,
+    'grades': build_grade_export_query,
+    'teachers': build_teacher_export_query,
+}
@@ -9,6 +9,7 @@ from sqlalchemy import and_, or_, func
 from .base_service import BaseService, ServiceError, NotFoundError, ValidationError, BusinessRuleError
 from .user_service import UserService
 from ..models import Student, User, UserProfile, Course, Enrollment, Grade, db
+from ..models.academic_stats import get_semester_stats
 from ..utils.validators import PersonalInfoValidator, AcademicValidator
 from ..utils.logger import get_structured_logger
 from ..utils.cache import cache_result
@@ -187,15 +188,8 @@ class StudentService(BaseService):
 
             student_dict['current_courses_count'] = enrollments_count or 0
 
-            # 获取GPA
-            gpa_result = db.session.query(func.avg(Grade.gpa)).filter(
-                and_(
-                    Grade.student_id == student.id,
-                    Grade.gpa.isnot(None)
-                )
-            ).first()
-
-            student_dict['gpa'] = round(float(gpa_result[0]), 2) if gpa_result[0] else None
+            # GPA为预计算值，见 models.academic_stats
+            student_dict['gpa'] = student.gpa
 
             return student_dict
 
@@ -532,9 +526,6 @@ class StudentService(BaseService):
             results = query.all()
 
             grades = []
-            total_credits = 0
-            total_grade_points = 0
-            graded_credits = 0
 
             for grade, course in results:
                 grade_data = {
@@ -545,29 +536,31 @@ class StudentService(BaseService):
                     'credits': course.credits,
                     'semester': grade.semester,
                     'score': grade.score,
-                    'grade_letter': grade.grade_letter,
-                    'gpa': grade.gpa,
+                    'grade_letter': grade.letter_grade,
+                    'gpa': grade.grade_point,
                     'graded_at': grade.created_at.isoformat() if grade.created_at else None
                 }
                 grades.append(grade_data)
 
-                # 计算GPA相关统计
-                if grade.gpa and grade.score is not None:
-                    total_credits += course.credits
-                    graded_credits += course.credits
-                    total_grade_points += grade.gpa * course.credits
-
-            # 计算总体GPA
-            overall_gpa = round(total_grade_points / graded_credits, 2) if graded_credits > 0 else 0
+            # GPA和学分读取预计算的学期统计
+            semester_stats = get_semester_stats(student_id, semester)
+            graded_credits = sum(stats.graded_credits for stats in semester_stats)
+            if semester:
+                overall_gpa = semester_stats[0].gpa if semester_stats else None
+                total_credits = sum(stats.credits_earned + stats.credits_in_progress for stats in semester_stats)
+            else:
+                overall_gpa = student.gpa
+                total_credits = student.total_credits or 0
 
             return {
                 'student_info': student.to_dict(),
                 'grades': grades,
+                'semesters': [stats.to_dict() for stats in semester_stats],
                 'statistics': {
                     'total_courses': len(grades),
                     'total_credits': total_credits,
                     'graded_credits': graded_credits,
-                    'overall_gpa': overall_gpa
+                    'overall_gpa': overall_gpa or 0
                 }
             }
 
@@ -577,7 +570,7 @@ class StudentService(BaseService):
 
     def calculate_student_gpa(self, student_id: int, semester: str = None) -> float:
         """
-        计算学生GPA
+        获取学生GPA（读取预计算值）
 
         Args:
             student_id: 学生ID
@@ -591,25 +584,13 @@ class StudentService(BaseService):
             if not student:
                 raise NotFoundError("学生")
 
-            query = db.session.query(
-                func.avg(Grade.gpa),
-                func.sum(Course.credits)
-            ).join(Course, Grade.course_id == Course.id)\
-             .filter(
-                 and_(
-                     Grade.student_id == student_id,
-                     Grade.gpa.isnot(None),
-                     Grade.score.isnot(None)
-                 )
-             )
-
             if semester:
-                query = query.filter(Grade.semester == semester)
-
-            result = query.first()
-            avg_gpa = result[0] if result[0] else 0
+                semester_stats = get_semester_stats(student_id, semester)
+                gpa = semester_stats[0].gpa if semester_stats else None
+            else:
+                gpa = student.gpa
 
-            return round(float(avg_gpa), 2)
+            return round(float(gpa), 2) if gpa else 0.0
 
         except Exception as e:
             self.logger.error(f"计算学生GPA失败: {str(e)}", student_id=student_id)
@@ -7,9 +7,11 @@ from datetime import datetime, timedelta
 from sqlalchemy import and_, or_, func, text
 
 from .base_service import BaseService, ServiceError, NotFoundError, ValidationError
+from .dashboard_metrics import get_dashboard_snapshot
 from ..models import SystemConfig, User, AuditLog, db
 from ..utils.logger import get_structured_logger, get_security_logger
 from ..utils.cache import get_cache_manager
+from ..utils.session_store import get_session_store
 from ..utils.email import EmailService
 
 
@@ -274,16 +276,8 @@ class SystemService(BaseService):
         try:
             self._check_permission('system_maintenance')
 
-            # 清理过期的缓存
-            expired_cache_keys = []
-            for pattern in ['rate_limit:*', 'session:*', 'temp:*']:
-                keys = self.cache.keys(pattern)
-                expired_cache_keys.extend(keys)
-
-            deleted_cache_count = 0
-            for key in expired_cache_keys:
-                if self.cache.delete(key):
-                    deleted_cache_count += 1
+            # 清理过期会话（按过期时间索引分批清理，不影响有效会话；限流键由各自的过期时间回收）
+            expired_sessions_count = get_session_store().cleanup_expired()
 
             # 清理过期的审计日志（保留90天）
             cutoff_date = datetime.utcnow() - timedelta(days=90)
@@ -294,7 +288,7 @@ class SystemService(BaseService):
             db.session.commit()
 
             result = {
-                'deleted_cache_keys': deleted_cache_count,
+                'expired_sessions': expired_sessions_count,
                 'deleted_audit_logs': deleted_logs_count,
                 'cutoff_date': cutoff_date.isoformat(),
                 'timestamp': datetime.utcnow().isoformat()
@@ -454,25 +448,7 @@ class SystemService(BaseService):
             from ..utils.datetime_utils import now, AcademicCalendar
 
             current_time = now()
-
-            # 用户统计
-            total_users = db.session.query(User).count()
-            active_users = db.session.query(User).filter_by(is_active=True).count()
-            new_users_this_month = db.session.query(User).filter(
-                User.created_at >= current_time.replace(day=1, hour=0, minute=0, second=0)
-            ).count()
-
-            # 学生和教师统计
-            total_students = db.session.query(func.count(func.text('id'))).select_from(func.text('students')).scalar() or 0
-            total_teachers = db.session.query(func.count(func.text('id'))).select_from(func.text('teachers')).scalar() or 0
-
-            # 课程统计
-            total_courses = db.session.query(func.count(func.text('id'))).select_from(func.text('courses')).scalar() or 0
-            active_courses = db.session.query(func.count(func.text('id'))).select_from(func.text('courses')).filter_by(status='active').scalar() or 0
-
-            # 选课和成绩统计
-            total_enrollments = db.session.query(func.count(func.text('id'))).select_from(func.text('enrollments')).scalar() or 0
-            total_grades = db.session.query(func.count(func.text('id'))).select_from(func.text('grades')).scalar() or 0
+            metrics = get_dashboard_snapshot()
 
             # 当前学期
             current_semester = AcademicCalendar.get_current_semester()
@@ -481,20 +457,20 @@ class SystemService(BaseService):
             return {
                 'timestamp': current_time.isoformat(),
                 'users': {
-                    'total': total_users,
-                    'active': active_users,
-                    'new_this_month': new_users_this_month,
-                    'students': total_students,
-                    'teachers': total_teachers
+                    'total': metrics['users']['total'],
+                    'active': metrics['users']['active'],
+                    'new_this_month': metrics['users']['new_this_month'],
+                    'students': metrics['students']['total'],
+                    'teachers': metrics['teachers']['total']
                 },
                 'courses': {
-                    'total': total_courses,
-                    'active': active_courses,
+                    'total': metrics['courses']['total'],
+                    'active': metrics['courses']['active'],
                     'current_semester': f"{current_year}-{current_semester}"
                 },
                 'enrollments': {
-                    'total': total_enrollments,
-                    'grades_recorded': total_grades
+                    'total': metrics['enrollments']['total'],
+                    'grades_recorded': metrics['grades']['total']
                 },
                 'system': {
                     'status': self.get_system_status()['status']
@@ -323,15 +323,12 @@ class TeacherService(BaseService):
             query = query.order_by(Course.semester.desc(), Course.name)
             courses = query.all()
 
-            # 获取每个课程的选课人数
+            # 一次分组查询获取所有课程的选课人数
+            enrollment_counts = self._count_enrollments_by_course([course.id for course in courses])
+
             course_list = []
             for course in courses:
-                enrollment_count = db.session.query(func.count(Enrollment.id)).filter(
-                    and_(
-                        Enrollment.course_id == course.id,
-                        Enrollment.status == 'approved'
-                    )
-                ).scalar()
+                enrollment_count = enrollment_counts.get(course.id, 0)
 
                 course_data = {
                     'course_id': course.id,
@@ -458,6 +455,7 @@ class TeacherService(BaseService):
                 query = query.filter(Course.semester == semester)
 
             courses = query.all()
+            enrollment_counts = self._count_enrollments_by_course([course.id for course in courses])
 
             # 统计工作量
             total_courses = len(courses)
@@ -466,12 +464,7 @@ class TeacherService(BaseService):
             course_details = []
 
             for course in courses:
-                enrollment_count = db.session.query(func.count(Enrollment.id)).filter(
-                    and_(
-                        Enrollment.course_id == course.id,
-                        Enrollment.status == 'approved'
-                    )
-                ).scalar() or 0
+                enrollment_count = enrollment_counts.get(course.id, 0)
 
                 # 计算工作量（基础工作量 + 学生数权重）
                 base_workload = 1.0  # 每门课程基础工作量
@@ -596,6 +589,31 @@ class TeacherService(BaseService):
     # 数据验证
     # ========================================
 
+    def _count_enrollments_by_course(self, course_ids: List[Any]) -> Dict[Any, int]:
+        """
+        批量统计课程选课人数
+
+        Args:
+            course_ids: 课程ID列表
+
+        Returns:
+            Dict[Any, int]: 课程ID到选课人数的映射
+        """
+        if not course_ids:
+            return {}
+
+        rows = db.session.query(
+            Enrollment.course_id,
+            func.count(Enrollment.id)
+        ).filter(
+            and_(
+                Enrollment.course_id.in_(course_ids),
+                Enrollment.status == 'approved'
+            )
+        ).group_by(Enrollment.course_id).all()
+
+        return {course_id: count for course_id, count in rows}
+
     def _validate_data(self, data: Dict[str, Any], operation: str = 'create', instance: Any = None):
         """
         验证教师数据
@@ -0,0 +1,651 @@
+# ========================================
+# 学生信息管理系统 - 全校成绩统计报表
+# ========================================
+
+"""
+全校成绩统计报表：概览、院系、课程、教师四个相互独立的分节并行计算后合并为一份文档。
+
+- 每个分节是两三条聚合查询（统计量、等级分布在数据库中分组得出），提交到进程池执行；
+  工作进程各自创建数据库引擎（NullPool），每个分节使用独立连接，不占用Web进程的连接池
+- 每完成一个分节即回调进度；超过时限时已完成的分节照常输出，未完成的标记为 timeout，
+  文档状态为 partial，仍在运行的工作进程被终止以释放数据库连接
+- 各分节分别在自己的连接上读取，彼此不是同一快照
+- 合并后的文档由 utils.report_document 写为 JSON / XLSX（每个分节一个工作表）/ PDF
+- 后台任务：start_term_report_job 立即返回任务ID，状态和进度保存在缓存中，
+  生成的文件保存在 exports/term_reports/<任务ID>/ 下；同一进程内任务依次执行
+
+Usage:
+    job = start_term_report_job({'semester': '2024秋季'}, formats=['xlsx', 'pdf'])
+    get_term_report_job(job['job_id'])['progress']
+
+    document = build_term_report({'semester': '2024秋季'}, progress=print)
+"""
+
+import copy
+import enum
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from flask import current_app, has_app_context
+from sqlalchemy import case, create_engine, func, select
+from sqlalchemy.pool import NullPool
+
+from models import Student, Teacher, Course, Enrollment, Grade, User, UserProfile, db
+from models.enrollment import EnrollmentStatus
+from models.grading_scale import GradingScale, get_grading_scale, grade_percentage
+from models.user import display_name_expression
+from utils.cache import get_cache_manager
+from utils.report_document import DOCUMENT_FORMATS, document_format_available, write_report_document
+
+TERM_REPORT_TITLE = '全校成绩统计报表'
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_TIMEOUT = 300
+DEFAULT_START_METHOD = 'spawn'
+DEFAULT_JOB_TTL = 86400
+DEFAULT_FORMATS = ('json', 'xlsx')
+JOB_KEY_PREFIX = 'report:term:job'
+
+# 计入选课人数的状态
+_ACTIVE_ENROLLMENT_STATUSES = (EnrollmentStatus.ENROLLED, EnrollmentStatus.COMPLETED, EnrollmentStatus.FAILED)
+
+# 与 GradingScale.is_passing 一致的浮点误差容忍
+_EPSILON = 1e-9
+
+_STAT_COLUMNS = [
+    ('grade_count', '成绩数'),
+    ('graded_count', '已评分'),
+    ('student_count', '学生数'),
+    ('average_score', '平均分'),
+    ('highest_score', '最高分'),
+    ('lowest_score', '最低分'),
+    ('pass_rate', '及格率(%)'),
+]
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def _number(value: Any) -> Optional[float]:
+    """数据库聚合值（可能为Decimal）-> 保留两位小数的float"""
+    if value is None:
+        return None
+    return round(float(value), 2)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+# ========================================
+# 分节计算（在工作进程中执行）
+# ========================================
+
+def _grade_statistics(connection, filters: Dict[str, Any], scale: GradingScale, key=None) -> Dict[Any, Dict[str, Any]]:
+    """
+    按分组键统计成绩（筛选：成绩学期、学生院系）
+
+    Args:
+        connection: 数据库连接
+        filters: 筛选条件
+        scale: 等级表
+        key: 分组列，None 表示全部成绩一组（键为None）
+
+    Returns:
+        Dict[Any, Dict[str, Any]]: 分组键 -> 统计量与等级分布
+    """
+    percentage = grade_percentage(Grade)
+    keys = [key] if key is not None else []
+
+    def scoped(query):
+        query = query.select_from(Grade)\
+            .join(Student, Grade.student_id == Student.id)\
+            .outerjoin(UserProfile, UserProfile.user_id == Student.user_id)\
+            .join(Course, Grade.course_id == Course.id)
+        if filters.get('semester'):
+            query = query.where(Grade.semester == filters['semester'])
+        if filters.get('department'):
+            query = query.where(UserProfile.department == filters['department'])
+        return query.group_by(*keys)
+
+    stats_query = scoped(select(
+        *keys,
+        func.count(Grade.id).label('grade_count'),
+        func.count(Grade.score).label('graded_count'),
+        func.count(func.distinct(Grade.student_id)).label('student_count'),
+        func.avg(Grade.score).label('average_score'),
+        func.max(Grade.score).label('highest_score'),
+        func.min(Grade.score).label('lowest_score'),
+        func.coalesce(func.sum(case((percentage + _EPSILON >= scale.passing_score, 1), else_=0)), 0).label('pass_count')
+    ))
+
+    statistics = {}
+    for row in connection.execute(stats_query):
+        group = row[0] if keys else None
+        statistics[group] = {
+            'grade_count': row.grade_count,
+            'graded_count': row.graded_count,
+            'student_count': row.student_count,
+            'average_score': _number(row.average_score),
+            'highest_score': _number(row.highest_score),
+            'lowest_score': _number(row.lowest_score),
+            'pass_rate': _number(row.pass_count * 100.0 / row.graded_count) if row.graded_count else 0,
+            'distribution': scale.empty_distribution()
+        }
+
+    letter = scale.letter_case(percentage).label('grade_letter')
+    distribution_query = scoped(select(*keys, letter, func.count(Grade.id)).where(Grade.score.isnot(None)))
+    distribution_query = distribution_query.group_by(letter)
+    for row in connection.execute(distribution_query):
+        group = row[0] if keys else None
+        grade_letter, count = row[-2], row[-1]
+        if group in statistics and grade_letter is not None:
+            statistics[group]['distribution'][grade_letter] = count
+
+    return statistics
+
+
+def _stat_values(stats: Optional[Dict[str, Any]], scale: GradingScale) -> List[Any]:
+    """统计量 + 各等级人数，按 _STAT_COLUMNS 与等级顺序展开为一行"""
+    if stats is None:
+        return [0, 0, 0, None, None, None, 0] + [0] * len(scale.letters)
+    return [stats[key] for key, _ in _STAT_COLUMNS] + [stats['distribution'][letter] for letter in scale.letters]
+
+
+def _stat_columns(scale: GradingScale) -> List[tuple]:
+    return _STAT_COLUMNS + [(f'grade_{letter}', f'等级{letter}') for letter in scale.letters]
+
+
+def _section(columns: Sequence[tuple], rows: List[List[Any]]) -> Dict[str, Any]:
+    return {
+        'keys': [key for key, _ in columns],
+        'columns': [label for _, label in columns],
+        'rows': rows
+    }
+
+
+def _enrollment_counts(connection, filters: Dict[str, Any], key) -> Dict[Any, int]:
+    """按分组键统计有效选课人数（筛选：选课学期、学生院系）"""
+    query = select(key, func.count(Enrollment.id))\
+        .select_from(Enrollment)\
+        .join(Course, Enrollment.course_id == Course.id)\
+        .where(Enrollment.status.in_(_ACTIVE_ENROLLMENT_STATUSES))
+    if filters.get('semester'):
+        query = query.where(Enrollment.semester == filters['semester'])
+    if filters.get('department'):
+        query = query.join(Student, Enrollment.student_id == Student.id)\
+            .join(UserProfile, UserProfile.user_id == Student.user_id)\
+            .where(UserProfile.department == filters['department'])
+    return dict(connection.execute(query.group_by(key)).all())
+
+
+def _overview_section(connection, filters: Dict[str, Any], scale: GradingScale) -> Dict[str, Any]:
+    """全校概览：指标/数值两列"""
+    stats = _grade_statistics(connection, filters, scale).get(None)
+    enrolled = sum(_enrollment_counts(connection, filters, Enrollment.course_id).values())
+
+    rows = [
+        ['学期', filters.get('semester') or '全部'],
+        ['院系', filters.get('department') or '全部'],
+        ['有效选课数', enrolled],
+    ]
+    for (key, label), value in zip(_stat_columns(scale), _stat_values(stats, scale)):
+        rows.append([label, value])
+    return _section([('metric', '指标'), ('value', '数值')], rows)
+
+
+def _department_section(connection, filters: Dict[str, Any], scale: GradingScale) -> Dict[str, Any]:
+    """院系统计：按学生院系（用户资料）分组"""
+    statistics = _grade_statistics(connection, filters, scale, UserProfile.department)
+    rows = [
+        [department] + _stat_values(stats, scale)
+        for department, stats in sorted(statistics.items(), key=lambda item: (item[0] is None, item[0] or ''))
+    ]
+    return _section([('department', '院系')] + _stat_columns(scale), rows)
+
+
+def _course_section(connection, filters: Dict[str, Any], scale: GradingScale) -> Dict[str, Any]:
+    """课程统计：按课程分组，附任课教师和有效选课人数"""
+    statistics = _grade_statistics(connection, filters, scale, Grade.course_id)
+    enrolled = _enrollment_counts(connection, filters, Enrollment.course_id)
+
+    course_ids = set(statistics) | set(enrolled)
+    query = select(
+        Course.id, Course.course_code, Course.name, Course.credits,
+        display_name_expression().label('teacher_name'), Teacher.department.label('teacher_department')
+    ).outerjoin(Teacher, Course.teacher_id == Teacher.id)\
+        .outerjoin(User, Teacher.user_id == User.id)\
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)\
+        .order_by(Course.course_code)
+    if filters.get('semester'):
+        query = query.where(Course.semester == filters['semester'])
+
+    rows = []
+    for course in connection.execute(query):
+        if filters.get('department') and course.id not in course_ids:
+            continue
+        rows.append([
+            course.course_code, course.name, course.teacher_name, course.teacher_department,
+            _plain(course.credits), enrolled.get(course.id, 0)
+        ] + _stat_values(statistics.get(course.id), scale))
+
+    columns = [
+        ('course_code', '课程代码'), ('course_name', '课程名称'), ('teacher_name', '任课教师'),
+        ('teacher_department', '开课院系'), ('credits', '学分'), ('enrolled_count', '选课人数')
+    ]
+    return _section(columns + _stat_columns(scale), rows)
+
+
+def _teacher_section(connection, filters: Dict[str, Any], scale: GradingScale) -> Dict[str, Any]:
+    """教师统计：按任课教师分组（本学期有课的教师）"""
+    statistics = _grade_statistics(connection, filters, scale, Course.teacher_id)
+    enrolled = _enrollment_counts(connection, filters, Course.teacher_id)
+
+    course_query = select(
+        Course.teacher_id,
+        func.count(Course.id).label('course_count'),
+        func.sum(Course.credits).label('total_credits')
+    ).where(Course.teacher_id.isnot(None)).group_by(Course.teacher_id)
+    if filters.get('semester'):
+        course_query = course_query.where(Course.semester == filters['semester'])
+    courses = {row.teacher_id: row for row in connection.execute(course_query)}
+
+    teacher_query = select(
+        Teacher.id, Teacher.teacher_id, display_name_expression().label('name'), Teacher.department, Teacher.title
+    ).join(User, Teacher.user_id == User.id)\
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)\
+        .where(Teacher.id.in_(list(courses))).order_by(Teacher.department, Teacher.teacher_id)
+
+    rows = []
+    for teacher in (connection.execute(teacher_query) if courses else ()):
+        if filters.get('department') and teacher.id not in statistics and teacher.id not in enrolled:
+            continue
+        course = courses[teacher.id]
+        rows.append([
+            teacher.teacher_id, teacher.name, teacher.department, _plain(teacher.title),
+            course.course_count, _number(course.total_credits) or 0, enrolled.get(teacher.id, 0)
+        ] + _stat_values(statistics.get(teacher.id), scale))
+
+    columns = [
+        ('teacher_id', '工号'), ('name', '姓名'), ('department', '院系'), ('title', '职称'),
+        ('course_count', '授课门数'), ('total_credits', '总学分'), ('enrolled_count', '选课人数')
+    ]
+    return _section(columns + _stat_columns(scale), rows)
+
+
+# 分节名 -> (标题, 计算函数)，文档按此顺序排列
+TERM_REPORT_SECTIONS: Dict[str, tuple] = {
+    'overview': ('全校概览', _overview_section),
+    'departments': ('院系统计', _department_section),
+    'courses': ('课程统计', _course_section),
+    'teachers': ('教师统计', _teacher_section),
+}
+
+_worker_engine = None
+
+
+def _init_worker(database_uri: str, engine_options: Dict[str, Any]):
+    """工作进程初始化：创建本进程的数据库引擎"""
+    global _worker_engine
+    _worker_engine = create_engine(database_uri, poolclass=NullPool, **engine_options)
+
+
+def _compute_section(engine, name: str, filters: Dict[str, Any], scale_config: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    scale = GradingScale(scale_config['bands'], scale_config['passing_score'])
+    with engine.connect() as connection:
+        section = TERM_REPORT_SECTIONS[name][1](connection, filters, scale)
+    section['duration_ms'] = int((time.perf_counter() - started) * 1000)
+    return section
+
+
+def _run_section(name: str, filters: Dict[str, Any], scale_config: Dict[str, Any]) -> Dict[str, Any]:
+    """工作进程入口：在独立连接上计算一个分节"""
+    return _compute_section(_worker_engine, name, filters, scale_config)
+
+
+# ========================================
+# 并行构建
+# ========================================
+
+def _worker_database() -> Optional[tuple]:
+    """工作进程使用的 (数据库URI, 引擎参数)；内存数据库无法跨进程共享，返回None"""
+    database_uri = db.engine.url.render_as_string(hide_password=False)
+    if database_uri.startswith('sqlite') and (database_uri in ('sqlite://', 'sqlite:///') or ':memory:' in database_uri):
+        return None
+    options = current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    return database_uri, {key: value for key, value in options.items() if key == 'connect_args'}
+
+
+def _shutdown(executor: ProcessPoolExecutor, pending):
+    """关闭进程池；有未完成的分节时终止工作进程（运行中的查询无法取消）"""
+    if not pending:
+        executor.shutdown(wait=True)
+        return
+
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    terminate = getattr(executor, 'terminate_workers', None)
+    if terminate is not None:
+        terminate()
+    else:
+        for process in processes:
+            process.terminate()
+
+
+def normalize_term_filters(filters: Dict[str, Any] = None) -> Dict[str, Any]:
+    """只保留报表支持的筛选条件（学期、院系）"""
+    return {key: (filters or {})[key] for key in ('semester', 'department') if (filters or {}).get(key)}
+
+
+def _validate_sections(sections: Sequence[str] = None) -> List[str]:
+    if not sections:
+        return list(TERM_REPORT_SECTIONS)
+    unknown = [name for name in sections if name not in TERM_REPORT_SECTIONS]
+    if unknown:
+        raise ValueError(f"不支持的报表分节: {', '.join(unknown)}")
+    return [name for name in TERM_REPORT_SECTIONS if name in sections]
+
+
+def build_term_report(
+    filters: Dict[str, Any] = None,
+    sections: Sequence[str] = None,
+    timeout: float = None,
+    max_workers: int = None,
+    progress: Callable[[int, int, str, str], None] = None
+) -> Dict[str, Any]:
+    """
+    并行计算各分节并合并为报表文档（需在应用上下文中调用）
+
+    Args:
+        filters: 筛选条件（semester/department）
+        sections: 分节名，默认全部
+        timeout: 时限（秒），超时后返回已完成的分节
+        max_workers: 工作进程数，<=1 时在当前进程内依次计算
+        progress: 进度回调 (已结束分节数, 分节总数, 分节名, 状态)
+
+    Returns:
+        Dict[str, Any]: 报表文档，status 为 complete/partial/failed
+
+    Raises:
+        ValueError: 分节名不合法
+    """
+    started = time.perf_counter()
+    filters = normalize_term_filters(filters)
+    names = _validate_sections(sections)
+    timeout = timeout or _config('TERM_REPORT_TIMEOUT', DEFAULT_TIMEOUT)
+    max_workers = min(max_workers or _config('TERM_REPORT_MAX_WORKERS', DEFAULT_MAX_WORKERS), len(names))
+    scale_config = get_grading_scale().to_dict()
+    deadline = time.monotonic() + timeout
+
+    results: Dict[str, Dict[str, Any]] = {}
+    states = {name: {'status': 'pending'} for name in names}
+
+    def finish(name: str, status: str, section: Dict[str, Any] = None, error: str = None):
+        states[name] = {'status': status, 'error': error}
+        if section is not None:
+            results[name] = section
+        if progress:
+            finished = sum(1 for state in states.values() if state['status'] != 'pending')
+            progress(finished, len(names), name, status)
+
+    worker_database = _worker_database() if max_workers > 1 else None
+    if worker_database is None:
+        for name in names:
+            if time.monotonic() >= deadline:
+                finish(name, 'timeout')
+                continue
+            try:
+                finish(name, 'completed', _compute_section(db.engine, name, filters, scale_config))
+            except Exception as e:
+                current_app.logger.error(f"报表分节 {name} 计算失败: {str(e)}")
+                finish(name, 'failed', error=str(e))
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context(_config('TERM_REPORT_START_METHOD', DEFAULT_START_METHOD)),
+            initializer=_init_worker,
+            initargs=worker_database
+        )
+        futures = {executor.submit(_run_section, name, filters, scale_config): name for name in names}
+        pending = set(futures)
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    try:
+                        finish(name, 'completed', future.result())
+                    except Exception as e:
+                        current_app.logger.error(f"报表分节 {name} 计算失败: {str(e)}")
+                        finish(name, 'failed', error=str(e))
+        finally:
+            _shutdown(executor, pending)
+        for future in pending:
+            finish(futures[future], 'timeout')
+
+    document_sections = []
+    for name in names:
+        section = results.get(name, {'keys': [], 'columns': [], 'rows': []})
+        document_sections.append({
+            'name': name,
+            'title': TERM_REPORT_SECTIONS[name][0],
+            'status': states[name]['status'],
+            'error': states[name].get('error'),
+            'row_count': len(section['rows']),
+            **section
+        })
+
+    completed = len(results)
+    return {
+        'title': TERM_REPORT_TITLE,
+        'filters': filters,
+        'status': 'complete' if completed == len(names) else ('partial' if completed else 'failed'),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'duration_ms': int((time.perf_counter() - started) * 1000),
+        'sections': document_sections
+    }
+
+
+# ========================================
+# 后台任务
+# ========================================
+
+_job_executor: Optional[ThreadPoolExecutor] = None
+_job_executor_lock = threading.Lock()
+
+
+def _get_job_executor() -> ThreadPoolExecutor:
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='term-report')
+        return _job_executor
+
+
+def get_term_report_folder() -> str:
+    """报表文件根目录（create_export_file 使用的 exports 目录下的 term_reports）"""
+    upload_folder = _config('UPLOAD_FOLDER', 'uploads')
+    return os.path.join(upload_folder, 'exports', 'term_reports')
+
+
+def _job_key(job_id: str) -> str:
+    return f"{JOB_KEY_PREFIX}:{job_id}"
+
+
+def _save_job(state: Dict[str, Any]):
+    get_cache_manager().set(_job_key(state['job_id']), state, timeout=_config('TERM_REPORT_JOB_TTL', DEFAULT_JOB_TTL))
+
+
+def get_term_report_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    获取报表任务状态
+
+    Args:
+        job_id: 任务ID
+
+    Returns:
+        Optional[Dict[str, Any]]: 任务状态（含进度），不存在或已过期时返回None
+    """
+    return get_cache_manager().get(_job_key(job_id))
+
+
+def get_term_report_file(job_id: str, document_format: str) -> Optional[str]:
+    """
+    获取报表任务生成的文件路径
+
+    Args:
+        job_id: 任务ID
+        document_format: 文件格式
+
+    Returns:
+        Optional[str]: 文件路径，任务未完成或未生成该格式时返回None
+    """
+    state = get_term_report_job(job_id)
+    if not state:
+        return None
+    path = state.get('files', {}).get(document_format)
+    return path if path and os.path.isfile(path) else None
+
+
+def write_term_report_files(document: Dict[str, Any], folder: str, formats: Sequence[str]) -> Dict[str, str]:
+    """
+    将报表文档写为各格式文件
+
+    Args:
+        document: build_term_report 返回的文档
+        folder: 输出目录
+        formats: 文件格式
+
+    Returns:
+        Dict[str, str]: 格式 -> 文件路径
+    """
+    Path(folder).mkdir(parents=True, exist_ok=True)
+    files = {}
+    for document_format in formats:
+        path = os.path.join(folder, f"term_report.{DOCUMENT_FORMATS[document_format][1]}")
+        write_report_document(document, path, document_format)
+        files[document_format] = path
+    return files
+
+
+def _prune_job_folders(root: str, max_age_seconds: int):
+    """删除超过任务状态有效期的报表目录"""
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - max_age_seconds
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def start_term_report_job(
+    filters: Dict[str, Any] = None,
+    sections: Sequence[str] = None,
+    formats: Sequence[str] = None,
+    timeout: float = None,
+    created_by: str = None
+) -> Dict[str, Any]:
+    """
+    创建后台报表任务并立即返回
+
+    Args:
+        filters: 筛选条件（semester/department）
+        sections: 分节名，默认全部
+        formats: 文件格式，默认 json+xlsx
+        timeout: 时限（秒）
+        created_by: 创建人用户ID
+
+    Returns:
+        Dict[str, Any]: 任务状态
+
+    Raises:
+        ValueError: 分节名或格式不合法，或格式所需的依赖未安装
+    """
+    names = _validate_sections(sections)
+    formats = list(dict.fromkeys(formats or DEFAULT_FORMATS))
+    unknown = [document_format for document_format in formats if document_format not in DOCUMENT_FORMATS]
+    if unknown:
+        raise ValueError(f"不支持的报表格式: {', '.join(unknown)}")
+    unavailable = [document_format for document_format in formats if not document_format_available(document_format)]
+    if unavailable:
+        raise ValueError(f"服务器未安装生成 {', '.join(unavailable)} 所需的依赖")
+
+    now = datetime.now()
+    state = {
+        'job_id': uuid.uuid4().hex,
+        'status': 'pending',
+        'filters': normalize_term_filters(filters),
+        'sections': names,
+        'formats': formats,
+        'timeout': timeout or _config('TERM_REPORT_TIMEOUT', DEFAULT_TIMEOUT),
+        'progress': {
+            'completed': 0,
+            'total': len(names),
+            'percent': 0,
+            'sections': {name: 'pending' for name in names}
+        },
+        'files': {},
+        'error': None,
+        'created_by': created_by,
+        'created_at': now.isoformat(),
+        'started_at': None,
+        'finished_at': None,
+        'expires_at': (now + timedelta(seconds=_config('TERM_REPORT_JOB_TTL', DEFAULT_JOB_TTL))).isoformat()
+    }
+    _save_job(state)
+
+    app = current_app._get_current_object()
+    _get_job_executor().submit(_run_job, app, copy.deepcopy(state))
+    return state
+
+
+def _run_job(app, state: Dict[str, Any]):
+    """任务线程：构建报表、写出文件，并随进度更新任务状态"""
+    with app.app_context():
+        state.update(status='running', started_at=datetime.now().isoformat())
+        _save_job(state)
+
+        def report_progress(completed: int, total: int, name: str, status: str):
+            state['progress']['completed'] = completed
+            state['progress']['percent'] = int(completed * 100 / total) if total else 100
+            state['progress']['sections'][name] = status
+            _save_job(state)
+
+        try:
+            root = get_term_report_folder()
+            _prune_job_folders(root, _config('TERM_REPORT_JOB_TTL', DEFAULT_JOB_TTL))
+            document = build_term_report(
+                state['filters'], state['sections'], state['timeout'], progress=report_progress
+            )
+            state['files'] = write_term_report_files(document, os.path.join(root, state['job_id']), state['formats'])
+            state['status'] = document['status']
+            state['duration_ms'] = document['duration_ms']
+        except Exception as e:
+            app.logger.error(f"全校成绩统计报表任务 {state['job_id']} 失败: {str(e)}")
+            state.update(status='failed', error=str(e))
+        finally:
+            db.session.remove()
+
+        state['finished_at'] = datetime.now().isoformat()
+        _save_job(state)
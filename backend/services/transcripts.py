@@ -0,0 +1,473 @@
+# ========================================
+# 学生信息管理系统 - 批量成绩单
+# ========================================
+
+"""
+批量成绩单引擎：按学生分块，每块三条集合查询加载数据，在内存中计算学期GPA与学分，
+渲染交给工作进程并行执行。
+
+- 学生信息（含用户资料姓名）、课程成绩（按 academic_stats 的口径在数据库中按
+  学生×课程×学期加权聚合，连同课程信息一次取回）、在修选课，各一条查询，与块大小无关
+- 课程等级/绩点由当前等级表换算，课程成绩达到课程及格线计入已获学分，
+  学期GPA、累计GPA、总计与 student_semester_stats / students 表的口径一致
+- 成绩单为纯数据字典，按批提交给进程池渲染（HTML/PDF）；在途批次数有上限，
+  输出顺序与学生顺序一致，内存占用与学生总数无关
+- 输出到目录（工作进程直接写文件）或 ZIP 流（可直接作为下载响应）
+
+Usage:
+    summary = write_transcripts({'grade': '2021', 'academic_status': 'enrolled'}, '/data/transcripts', 'pdf')
+    chunks = transcript_zip_chunks({'student_ids': ids}, 'pdf')
+    return make_streaming_file_response(chunks, 'transcripts.zip', 'application/zip')
+"""
+
+import multiprocessing
+import re
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import select
+
+from models import Student, Course, Enrollment, User, UserProfile, db
+from models.academic_stats import course_results_query
+from models.enrollment import EnrollmentStatus
+from models.grading_scale import GradingScale, get_grading_scale
+from models.student import AcademicStatus
+from utils.transcript_document import (
+    TRANSCRIPT_FORMATS, render_transcript_batch, transcript_format_available
+)
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RENDER_BATCH_SIZE = 50
+DEFAULT_START_METHOD = 'spawn'
+
+# 学期名中的季节顺序（同一年内）
+_SEASON_ORDER = {'春': 0, '夏': 1, '秋': 2, '冬': 3}
+_SEMESTER_PATTERN = re.compile(r'(\d{4})\D*?(春|夏|秋|冬)?')
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def semester_sort_key(semester: str) -> Tuple:
+    """学期排序键：年份、季节（春/夏/秋/冬），无法识别的学期按名称排在最后"""
+    match = _SEMESTER_PATTERN.match(semester or '')
+    if not match:
+        return (1, 0, 0, semester or '')
+    return (0, int(match.group(1)), _SEASON_ORDER.get(match.group(2), 9), semester)
+
+
+# ========================================
+# 数据加载
+# ========================================
+
+def _cohort_query(filters: Dict[str, Any]):
+    """按筛选条件选取学生（学号排序）"""
+    query = select(Student.id).order_by(Student.student_id)
+    if filters.get('student_ids'):
+        query = query.where(Student.id.in_(list(filters['student_ids'])))
+    if filters.get('grade'):
+        query = query.where(Student.grade == filters['grade'])
+    if filters.get('major'):
+        query = query.where(Student.major == filters['major'])
+    if filters.get('class_name'):
+        query = query.where(Student.class_name == filters['class_name'])
+    if filters.get('academic_status'):
+        query = query.where(Student.academic_status == AcademicStatus(filters['academic_status']))
+    return query
+
+
+def _iter_student_id_chunks(filters: Dict[str, Any], chunk_size: int) -> Iterator[List[str]]:
+    """按学号顺序分块取学生ID（按学号键集翻页）"""
+    last_number = None
+    while True:
+        query = _cohort_query(filters).add_columns(Student.student_id).limit(chunk_size)
+        if last_number is not None:
+            query = query.where(Student.student_id > last_number)
+        rows = db.session.execute(query).all()
+        if not rows:
+            return
+        yield [row.id for row in rows]
+        if len(rows) < chunk_size:
+            return
+        last_number = rows[-1].student_id
+
+
+def _load_chunk(student_ids: List[str]) -> Tuple[List[Any], Dict[str, List[Any]], Dict[str, List[Any]]]:
+    """一块学生的全部成绩单数据：学生、课程成绩、尚无成绩的在修选课（三条查询）"""
+    students = db.session.execute(
+        select(
+            Student.id, Student.student_id, Student.grade, Student.class_name, Student.major,
+            Student.enrollment_date, Student.expected_graduation_date, Student.academic_status,
+            User.username, UserProfile.first_name, UserProfile.last_name
+        )
+        .join(User, Student.user_id == User.id)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .where(Student.id.in_(student_ids))
+        .order_by(Student.student_id)
+    ).all()
+
+    results = course_results_query(student_ids).subquery('course_results')
+    course_rows: Dict[str, List[Any]] = {}
+    for row in db.session.execute(
+        select(
+            results.c.student_id, results.c.semester, results.c.percentage,
+            Course.course_code, Course.name, Course.credits, Course.course_type, Course.passing_score
+        ).join(Course, Course.id == results.c.course_id)
+    ):
+        course_rows.setdefault(row.student_id, []).append(row)
+
+    in_progress_rows: Dict[str, List[Any]] = {}
+    for row in db.session.execute(
+        select(
+            Enrollment.student_id, Enrollment.semester,
+            Course.course_code, Course.name, Course.credits, Course.course_type
+        )
+        .join(Course, Course.id == Enrollment.course_id)
+        .where(
+            Enrollment.student_id.in_(student_ids),
+            Enrollment.status == EnrollmentStatus.ENROLLED,
+            # 已出成绩的课程列在课程成绩中，不再计入在修
+            ~select(results.c.course_id).where(
+                results.c.student_id == Enrollment.student_id,
+                results.c.course_id == Enrollment.course_id,
+                results.c.semester == Enrollment.semester
+            ).exists()
+        )
+    ):
+        in_progress_rows.setdefault(row.student_id, []).append(row)
+
+    return students, course_rows, in_progress_rows
+
+
+# ========================================
+# 内存计算
+# ========================================
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def _gpa(grade_points: float, graded_credits: float) -> Optional[float]:
+    return round(grade_points / graded_credits, 2) if graded_credits > 0 else None
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, 'value', value)
+
+
+def build_transcript(student, course_rows: Iterable[Any], in_progress_rows: Iterable[Any], scale: GradingScale) -> Dict[str, Any]:
+    """
+    由已加载的数据计算一份成绩单
+
+    Args:
+        student: 学生行
+        course_rows: 该学生的课程成绩行
+        in_progress_rows: 该学生的在修选课行
+        scale: 等级表
+
+    Returns:
+        Dict[str, Any]: 学生信息、按学期排列的课程与GPA/学分、总计
+    """
+    semesters: Dict[str, Dict[str, Any]] = {}
+
+    def semester_entry(name: str) -> Dict[str, Any]:
+        if name not in semesters:
+            semesters[name] = {
+                'semester': name, 'courses': [], 'in_progress': [],
+                'grade_points': 0.0, 'graded_credits': 0.0, 'credits_earned': 0.0, 'credits_in_progress': 0.0
+            }
+        return semesters[name]
+
+    for row in course_rows:
+        entry = semester_entry(row.semester)
+        percentage = float(row.percentage)
+        credits = float(row.credits or 0)
+        point = scale.point_for(percentage)
+        passing_score = row.passing_score if row.passing_score is not None else scale.passing_score
+        passed = percentage >= passing_score
+
+        entry['courses'].append({
+            'course_code': row.course_code,
+            'course_name': row.name,
+            'course_type': _enum_value(row.course_type),
+            'credits': credits,
+            'score': round(percentage, 1),
+            'letter': scale.letter_for(percentage),
+            'grade_point': point,
+            'passed': passed
+        })
+        entry['grade_points'] += point * credits
+        entry['graded_credits'] += credits
+        if passed:
+            entry['credits_earned'] += credits
+
+    for row in in_progress_rows:
+        entry = semester_entry(row.semester)
+        credits = float(row.credits or 0)
+        entry['in_progress'].append({
+            'course_code': row.course_code,
+            'course_name': row.name,
+            'course_type': _enum_value(row.course_type),
+            'credits': credits
+        })
+        entry['credits_in_progress'] += credits
+
+    ordered = []
+    grade_points = graded_credits = earned = in_progress = 0.0
+    course_count = 0
+    for name in sorted(semesters, key=semester_sort_key):
+        entry = semesters[name]
+        entry['courses'].sort(key=lambda course: course['course_code'] or '')
+        entry['in_progress'].sort(key=lambda course: course['course_code'] or '')
+        grade_points += entry['grade_points']
+        graded_credits += entry['graded_credits']
+        earned += entry['credits_earned']
+        in_progress += entry['credits_in_progress']
+        course_count += len(entry['courses'])
+        ordered.append({
+            'semester': name,
+            'courses': entry['courses'],
+            'in_progress': entry['in_progress'],
+            'gpa': _gpa(entry['grade_points'], entry['graded_credits']),
+            'graded_credits': _round(entry['graded_credits'], 1),
+            'credits_earned': _round(entry['credits_earned'], 1),
+            'credits_in_progress': _round(entry['credits_in_progress'], 1),
+            'cumulative_gpa': _gpa(grade_points, graded_credits)
+        })
+
+    first_name, last_name = student.first_name, student.last_name
+    return {
+        'student': {
+            'id': student.id,
+            'student_number': student.student_id,
+            'name': f"{first_name} {last_name}" if first_name or last_name else student.username,
+            'grade': student.grade,
+            'class_name': student.class_name,
+            'major': student.major,
+            'academic_status': _enum_value(student.academic_status),
+            'enrollment_date': student.enrollment_date.isoformat() if student.enrollment_date else None,
+            'expected_graduation_date': (
+                student.expected_graduation_date.isoformat() if student.expected_graduation_date else None
+            )
+        },
+        'semesters': ordered,
+        'summary': {
+            'gpa': _gpa(grade_points, graded_credits),
+            'credits_earned': int(round(earned)),
+            'credits_in_progress': int(round(in_progress)),
+            'total_credits': int(round(earned)) + int(round(in_progress)),
+            'course_count': course_count
+        },
+        'generated_at': datetime.now().isoformat(timespec='seconds')
+    }
+
+
+def iter_transcripts(filters: Dict[str, Any] = None, chunk_size: int = None) -> Iterator[Dict[str, Any]]:
+    """
+    按学号顺序逐个生成成绩单（每块学生三条查询）
+
+    Args:
+        filters: student_ids/grade/major/class_name/academic_status
+        chunk_size: 每块学生数
+
+    Returns:
+        Iterator[Dict[str, Any]]: 成绩单
+    """
+    filters = filters or {}
+    chunk_size = chunk_size or _config('TRANSCRIPT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    scale = get_grading_scale()
+
+    for student_ids in _iter_student_id_chunks(filters, chunk_size):
+        students, course_rows, in_progress_rows = _load_chunk(student_ids)
+        for student in students:
+            yield build_transcript(
+                student, course_rows.get(student.id, ()), in_progress_rows.get(student.id, ()), scale
+            )
+
+
+def get_transcript(student_id: str) -> Optional[Dict[str, Any]]:
+    """
+    单个学生的成绩单
+
+    Args:
+        student_id: 学生ID
+
+    Returns:
+        Optional[Dict[str, Any]]: 成绩单，学生不存在时返回None
+    """
+    return next(iter_transcripts({'student_ids': [student_id]}), None)
+
+
+# ========================================
+# 并行渲染
+# ========================================
+
+def _batches(transcripts: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for transcript in transcripts:
+        batch.append(transcript)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def render_transcripts(
+    transcripts: Iterable[Dict[str, Any]],
+    document_format: str,
+    output_dir: str = None,
+    max_workers: int = None,
+    batch_size: int = None
+) -> Iterator[Tuple[str, Any]]:
+    """
+    并行渲染成绩单，按输入顺序产出结果
+
+    Args:
+        transcripts: 成绩单迭代器（按需读取，最多 2×工作进程数 个批次在途）
+        document_format: html/pdf
+        output_dir: 输出目录；提供时由工作进程直接写文件
+        max_workers: 工作进程数，<=1 时在当前进程内渲染
+        batch_size: 每个任务渲染的成绩单数
+
+    Returns:
+        Iterator[Tuple[str, Any]]: (文件名, 文档字节) 或 (文件名, 字节数)
+    """
+    max_workers = max_workers or _config('TRANSCRIPT_MAX_WORKERS', DEFAULT_MAX_WORKERS)
+    batch_size = batch_size or _config('TRANSCRIPT_RENDER_BATCH_SIZE', DEFAULT_RENDER_BATCH_SIZE)
+    batches = _batches(transcripts, batch_size)
+
+    if max_workers <= 1:
+        for batch in batches:
+            yield from render_transcript_batch(batch, document_format, output_dir)
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(_config('TRANSCRIPT_START_METHOD', DEFAULT_START_METHOD))
+    )
+    in_flight = deque()
+    try:
+        for batch in batches:
+            in_flight.append(executor.submit(render_transcript_batch, batch, document_format, output_dir))
+            if len(in_flight) >= max_workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        # 提前结束（如下载中断）时丢弃未开始的批次
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _check_format(document_format: str):
+    if document_format not in TRANSCRIPT_FORMATS:
+        raise ValueError(f"不支持的成绩单格式: {document_format}")
+    if not transcript_format_available(document_format):
+        raise ValueError(f"服务器未安装生成 {document_format} 所需的依赖")
+
+
+def write_transcripts(
+    filters: Dict[str, Any],
+    output_dir: str,
+    document_format: str = 'pdf',
+    max_workers: int = None
+) -> Dict[str, Any]:
+    """
+    批量生成成绩单文件到目录
+
+    Args:
+        filters: 学生筛选条件
+        output_dir: 输出目录
+        document_format: html/pdf
+        max_workers: 工作进程数
+
+    Returns:
+        Dict[str, Any]: 份数、总字节数、输出目录与耗时
+
+    Raises:
+        ValueError: 格式不支持或依赖未安装
+    """
+    _check_format(document_format)
+    started = time.perf_counter()
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    count = total_bytes = 0
+    for _, size in render_transcripts(iter_transcripts(filters), document_format, output_dir, max_workers):
+        count += 1
+        total_bytes += size
+
+    return {
+        'count': count,
+        'total_bytes': total_bytes,
+        'output_dir': output_dir,
+        'duration_seconds': round(time.perf_counter() - started, 2)
+    }
+
+
+class _ChunkSink:
+    """ZipFile 的输出目标：只追加，由生成器取走已写入的字节"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def transcript_zip_chunks(
+    filters: Dict[str, Any],
+    document_format: str = 'pdf',
+    max_workers: int = None
+) -> Iterator[bytes]:
+    """
+    批量生成成绩单并编码为ZIP分块（每份成绩单写入后即输出）
+
+    Args:
+        filters: 学生筛选条件
+        document_format: html/pdf
+        max_workers: 工作进程数
+
+    Returns:
+        Iterator[bytes]: ZIP分块
+
+    Raises:
+        ValueError: 格式不支持或依赖未安装
+    """
+    _check_format(document_format)
+
+    def generate():
+        sink = _ChunkSink()
+        # PDF 已压缩，不再 DEFLATE
+        compression = zipfile.ZIP_STORED if document_format == 'pdf' else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+            for filename, content in render_transcripts(iter_transcripts(filters), document_format, max_workers=max_workers):
+                archive.writestr(filename, content)
+                yield sink.drain()
+        yield sink.drain()
+
+    return generate()
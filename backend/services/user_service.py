@@ -9,6 +9,8 @@ from sqlalchemy import and_, or_
 from .base_service import BaseService, ServiceError, NotFoundError, ValidationError, BusinessRuleError
 from ..models import User, UserProfile, db
 from ..utils.auth import AuthManager, PasswordManager
+from ..utils.password_hashing import PasswordHashingBusy
+from ..utils.principal import invalidate_principal
 from ..utils.validators import PersonalInfoValidator
 from ..utils.email import send_welcome_email
 from ..utils.logger import get_structured_logger
@@ -64,8 +66,12 @@ class UserService(BaseService):
                 })
                 raise ServiceError("账户已被禁用", 'ACCOUNT_DISABLED')
 
-            # 验证密码
-            if not self.auth_manager.verify_password(password, user.password_hash):
+            # 验证密码（哈希算法或参数变化时顺带升级，随最后登录时间一起提交）
+            try:
+                valid = self.auth_manager.verify_user_password(user, password)
+            except PasswordHashingBusy:
+                raise ServiceError("当前登录人数过多，请稍后再试", 'SERVICE_BUSY')
+            if not valid:
                 self._log_business_action('login_failed', {
                     'user_id': user.id,
                     'reason': 'invalid_password'
@@ -517,6 +523,7 @@ class UserService(BaseService):
             user.is_active = True
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            self._invalidate_principal(user_id)
 
             self._log_business_action('user_activated', {
                 'target_user_id': user_id
@@ -559,6 +566,7 @@ class UserService(BaseService):
             user.is_active = False
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            self._invalidate_principal(user_id)
 
             self._log_business_action('user_deactivated', {
                 'target_user_id': user_id,
@@ -578,6 +586,16 @@ class UserService(BaseService):
     # 权限和角色管理
     # ========================================
 
+    def _invalidate_principal(self, user_id: int):
+        """
+        角色或状态变化后使缓存的用户主体失效
+
+        撤销用户全部令牌（代数+1，各实例按新代数重新加载主体，旧令牌携带的角色声明也随之作废），
+        并清除本实例的缓存条目。
+        """
+        invalidate_principal(user_id)
+        self.auth_manager.revoke_all_tokens(user_id)
+
     def change_user_role(self, user_id: int, new_role: str) -> bool:
         """
         修改用户角色
@@ -611,6 +629,7 @@ class UserService(BaseService):
             user.role = new_role
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            self._invalidate_principal(user_id)
 
             self._log_business_action('user_role_changed', {
                 'target_user_id': user_id,
@@ -4,10 +4,16 @@
 
 import os
 import json
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, jsonify, request, send_file, g
 from flask_cors import CORS
+from itsdangerous import BadSignature, URLSafeTimedSerializer
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
+from functools import wraps
+from typing import NamedTuple
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -20,6 +26,8 @@ except ImportError:
     FileHandler = None
     PrivacyFilter = None
 
+from utils.grade_distribution import summarize as summarize_scores
+
 # 创建Flask应用
 app = Flask(__name__)
 
@@ -81,47 +89,144 @@ def get_role_permissions(role):
     """根据角色返回权限列表"""
     return ROLE_PERMISSIONS.get(role, ['read'])
 
+# ========================================
+# 权限位掩码和令牌验证
+# ========================================
+
+# 启动时把角色权限表编译为位掩码，每次权限检查是一次按位与
+PERMISSION_BITS = {
+    permission: 1 << index
+    for index, permission in enumerate(sorted({p for perms in ROLE_PERMISSIONS.values() for p in perms} | {'read'}))
+}
+
+def permission_mask(permissions) -> int:
+    """权限名列表对应的位掩码（未知权限忽略）"""
+    mask = 0
+    for permission in permissions:
+        mask |= PERMISSION_BITS.get(permission, 0)
+    return mask
+
+ROLE_MASKS = {role: permission_mask(permissions) for role, permissions in ROLE_PERMISSIONS.items()}
+DEFAULT_ROLE_MASK = permission_mask(['read'])
+
+TOKEN_SECRET = os.environ.get('SECRET_KEY', 'simple-app-dev-secret')
+TOKEN_MAX_AGE = 24 * 3600  # 访问令牌有效期（秒）
+TOKEN_CACHE_SIZE = 1024  # 已验证令牌缓存条目数
+LEGACY_TOKEN_PREFIX = 'mock-jwt-token-'
+
+_token_serializer = URLSafeTimedSerializer(TOKEN_SECRET, salt='simple-app-access-token')
+_verified_tokens = OrderedDict()  # 令牌 -> (Principal, 过期时间)
+_verified_tokens_lock = threading.Lock()
+
+class Principal(NamedTuple):
+    """已验证的当前用户"""
+    user_id: int
+    username: str
+    role: str
+    mask: int
+    level: int
+
+    def has_permission(self, permission: str) -> bool:
+        return bool(self.mask & PERMISSION_BITS.get(permission, 0))
+
+    def permissions(self) -> list:
+        return get_role_permissions(self.role)
+
+def make_principal(user: dict) -> Principal:
+    role = user.get('role', 'student')
+    return Principal(
+        user_id=user['id'],
+        username=user.get('username', ''),
+        role=role,
+        mask=ROLE_MASKS.get(role, DEFAULT_ROLE_MASK),
+        level=ROLE_HIERARCHY.get(role, 0)
+    )
+
+def issue_access_token(user: dict) -> str:
+    """签发访问令牌（签名，包含用户ID和角色）"""
+    return _token_serializer.dumps({'uid': user['id'], 'username': user.get('username', ''), 'role': user.get('role', 'student')})
+
+def _verify_token(token: str):
+    """验证令牌，返回 (Principal, 过期时间)；无效返回 None"""
+    now = time.time()
+    if token.startswith(LEGACY_TOKEN_PREFIX):
+        # 兼容旧版登录接口签发的 mock-jwt-token-<用户ID>：旧令牌不含角色（且用户ID不唯一），
+        # 与原来的处理一致按学生权限对待
+        user_id = token[len(LEGACY_TOKEN_PREFIX):]
+        if not user_id.isdigit():
+            return None
+        return make_principal({'id': int(user_id), 'role': 'student'}), now + TOKEN_MAX_AGE
+
+    try:
+        payload, issued_at = _token_serializer.loads(token, max_age=TOKEN_MAX_AGE, return_timestamp=True)
+    except BadSignature:
+        return None
+    principal = make_principal({'id': payload['uid'], 'username': payload.get('username', ''), 'role': payload.get('role')})
+    return principal, issued_at.timestamp() + TOKEN_MAX_AGE
+
+def resolve_token(token: str):
+    """解析令牌（已验证的令牌缓存在 LRU 中，命中时不再验证签名）"""
+    now = time.time()
+    with _verified_tokens_lock:
+        entry = _verified_tokens.get(token)
+        if entry is not None:
+            if entry[1] > now:
+                _verified_tokens.move_to_end(token)
+                return entry[0]
+            del _verified_tokens[token]
+
+    entry = _verify_token(token)
+    if entry is None:
+        return None
+    with _verified_tokens_lock:
+        _verified_tokens[token] = entry
+        while len(_verified_tokens) > TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return entry[0]
+
+@app.before_request
+def authenticate_request():
+    """每个请求解析一次 Authorization 头，结果放在 g.principal（未认证为 None）"""
+    auth_header = request.headers.get('Authorization')
+    g.has_auth_header = bool(auth_header)
+    g.principal = None
+    if auth_header and auth_header.startswith('Bearer '):
+        g.principal = resolve_token(auth_header[7:])
+
 def check_permission(user_role: str, required_permission: str) -> bool:
     """检查用户是否具有指定权限"""
-    user_permissions = get_role_permissions(user_role)
-    return required_permission in user_permissions
+    return bool(ROLE_MASKS.get(user_role, DEFAULT_ROLE_MASK) & PERMISSION_BITS.get(required_permission, 0))
 
 def check_role_hierarchy(user_role: str, required_role: str) -> bool:
     """检查用户角色等级是否满足要求"""
     return ROLE_HIERARCHY.get(user_role, 0) >= ROLE_HIERARCHY.get(required_role, 0)
 
+def _authentication_error():
+    """未认证时的响应"""
+    if not g.has_auth_header:
+        return jsonify({
+            'success': False,
+            'message': '缺少认证信息'
+        }), 401
+    return jsonify({
+        'success': False,
+        'message': '无效的认证信息'
+    }), 401
+
 def require_permission(permission):
     """权限验证装饰器"""
+    # 装饰时确定权限位
+    bit = PERMISSION_BITS.get(permission, 0)
+
     def decorator(func):
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            # 在实际应用中，这里应该从JWT token中获取用户信息
-            # 这里简化处理，从请求中获取用户信息
-            auth_header = request.headers.get('Authorization')
-            if not auth_header:
-                return jsonify({
-                    'success': False,
-                    'message': '缺少认证信息'
-                }), 401
-
-            # 模拟从token中解析用户信息
-            # 在实际应用中，应该验证JWT token
-            try:
-                token = auth_header.replace('Bearer ', '')
-                # 简化处理：根据token模拟用户角色
-                if 'admin' in token.lower():
-                    user_role = 'admin'
-                elif 'teacher' in token.lower():
-                    user_role = 'teacher'
-                else:
-                    user_role = 'student'
-            except:
-                return jsonify({
-                    'success': False,
-                    'message': '无效的认证信息'
-                }), 401
+            principal = g.principal
+            if principal is None:
+                return _authentication_error()
 
             # 检查权限
-            if not check_permission(user_role, permission):
+            if not principal.mask & bit:
                 return jsonify({
                     'success': False,
                     'message': f'权限不足，需要权限: {permission}'
@@ -133,33 +238,17 @@ def require_permission(permission):
 
 def require_role(required_role):
     """角色验证装饰器"""
+    required_level = ROLE_HIERARCHY.get(required_role, 0)
+
     def decorator(func):
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            # 在实际应用中，这里应该从JWT token中获取用户信息
-            auth_header = request.headers.get('Authorization')
-            if not auth_header:
-                return jsonify({
-                    'success': False,
-                    'message': '缺少认证信息'
-                }), 401
-
-            # 模拟从token中解析用户角色
-            try:
-                token = auth_header.replace('Bearer ', '')
-                if 'admin' in token.lower():
-                    user_role = 'admin'
-                elif 'teacher' in token.lower():
-                    user_role = 'teacher'
-                else:
-                    user_role = 'student'
-            except:
-                return jsonify({
-                    'success': False,
-                    'message': '无效的认证信息'
-                }), 401
+            principal = g.principal
+            if principal is None:
+                return _authentication_error()
 
             # 检查角色等级
-            if not check_role_hierarchy(user_role, required_role):
+            if principal.level < required_level:
                 return jsonify({
                     'success': False,
                     'message': f'角色等级不足，需要角色: {required_role} 或更高'
@@ -779,7 +868,7 @@ def login():
                 'success': True,
                 'message': '登录成功',
                 'data': {
-                    'access_token': 'mock-jwt-token-' + str(user['id']),
+                    'access_token': issue_access_token(user),
                     'refresh_token': 'mock-refresh-token-' + str(user['id']),
                     'user_info': user_data
                 }
@@ -1036,33 +1125,21 @@ def get_students():
     if request.method == 'OPTIONS':
         return '', 200
 
-    # 权限检查 - 获取学生列表需要相应权限
-    auth_header = request.headers.get('Authorization')
-    if auth_header:
-        # 如果有认证信息，检查权限
-        if 'admin' in auth_header:
+    # 权限检查 - 获取学生列表需要相应权限（未认证或令牌无效时允许公开访问基础信息）
+    principal = g.principal
+    if principal is not None:
+        if principal.role == 'admin':
             required_permission = 'view_all_students'
-        elif 'teacher' in auth_header:
+        elif principal.role == 'teacher':
             required_permission = 'view_students'
         else:
             required_permission = 'read'
 
-        try:
-            token = auth_header.replace('Bearer ', '')
-            if 'admin' in token.lower():
-                user_role = 'admin'
-            elif 'teacher' in token.lower():
-                user_role = 'teacher'
-            else:
-                user_role = 'student'
-
-            if not check_permission(user_role, required_permission):
-                return jsonify({
-                    'success': False,
-                    'message': f'权限不足，需要权限: {required_permission}'
-                }), 403
-        except:
-            pass  # 如果token解析失败，继续执行（允许公开访问基础信息）
+        if not principal.has_permission(required_permission):
+            return jsonify({
+                'success': False,
+                'message': f'权限不足，需要权限: {required_permission}'
+            }), 403
 
     try:
         page = request.args.get('page', 1, type=int)
@@ -2178,14 +2255,9 @@ def get_grade_statistics():
                 passed = len([g for g in type_grades if g.get('score', 0) >= 60])
                 pass_rates[exam_type] = (passed / len(type_grades)) * 100
 
-        # 成绩分布
-        score_distribution = {
-            '90-100': len([g for g in grades if g.get('score', 0) >= 90]),
-            '80-89': len([g for g in grades if 80 <= g.get('score', 0) < 90]),
-            '70-79': len([g for g in grades if 70 <= g.get('score', 0) < 80]),
-            '60-69': len([g for g in grades if 60 <= g.get('score', 0) < 70]),
-            '0-59': len([g for g in grades if g.get('score', 0) < 60])
-        }
+        # 成绩分布（与后端共用分段规则，高分段在前）
+        distribution = summarize_scores([g.get('score') for g in grades], edges=(0, 60, 70, 80, 90, 100))
+        score_distribution = {item['label']: item['count'] for item in reversed(distribution['histogram'])}
 
         statistics = {
             'total_grades': total_grades,
@@ -2195,7 +2267,8 @@ def get_grade_statistics():
             'grades_by_semester': grades_by_semester,
             'average_scores': avg_scores,
             'pass_rates': pass_rates,
-            'score_distribution': score_distribution
+            'score_distribution': score_distribution,
+            'score_summary': {key: distribution[key] for key in ('average', 'std_deviation', 'median', 'percentiles')}
         }
 
         return jsonify({
@@ -2676,30 +2749,16 @@ def logout():
 def get_user_permissions():
     """获取当前用户的权限列表"""
     try:
-        auth_header = request.headers.get('Authorization')
-        if not auth_header:
-            return jsonify({
-                'success': False,
-                'message': '缺少认证信息'
-            }), 401
-
-        # 模拟从token中解析用户信息
-        token = auth_header.replace('Bearer ', '')
-        if 'admin' in token.lower():
-            user_role = 'admin'
-        elif 'teacher' in token.lower():
-            user_role = 'teacher'
-        else:
-            user_role = 'student'
-
-        permissions = get_role_permissions(user_role)
+        principal = g.principal
+        if principal is None:
+            return _authentication_error()
 
         return jsonify({
             'success': True,
             'data': {
-                'role': user_role,
-                'permissions': permissions,
-                'hierarchy_level': ROLE_HIERARCHY.get(user_role, 0)
+                'role': principal.role,
+                'permissions': principal.permissions(),
+                'hierarchy_level': principal.level
             }
         })
 
@@ -2723,31 +2782,17 @@ def check_user_permission():
                 'message': '缺少权限参数'
             }), 400
 
-        auth_header = request.headers.get('Authorization')
-        if not auth_header:
-            return jsonify({
-                'success': False,
-                'message': '缺少认证信息'
-            }), 401
-
-        # 模拟从token中解析用户信息
-        token = auth_header.replace('Bearer ', '')
-        if 'admin' in token.lower():
-            user_role = 'admin'
-        elif 'teacher' in token.lower():
-            user_role = 'teacher'
-        else:
-            user_role = 'student'
-
-        has_permission = check_permission(user_role, required_permission)
+        principal = g.principal
+        if principal is None:
+            return _authentication_error()
 
         return jsonify({
             'success': True,
             'data': {
-                'has_permission': has_permission,
-                'user_role': user_role,
+                'has_permission': principal.has_permission(required_permission),
+                'user_role': principal.role,
                 'required_permission': required_permission,
-                'user_permissions': get_role_permissions(user_role)
+                'user_permissions': principal.permissions()
             }
         })
 
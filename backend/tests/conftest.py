@@ -0,0 +1,119 @@
+# ========================================
+# 学生信息管理系统 - 测试配置
+# ========================================
+
+import importlib
+import os
+import pkgutil
+import sys
+import types
+from datetime import date
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 与 app.py 一致，以 backend 目录为导入根
+sys.path.insert(0, BACKEND_DIR)
+
+
+def load_service(name: str):
+    """
+    导入服务模块
+
+    服务模块以顶层名导入模型和工具（models、utils），services 包按需导入服务类，
+    因此只加载被测模块；先导入全部模型，保证映射关系完整。
+
+    Args:
+        name: 服务模块名，如 'report_service'
+
+    Returns:
+        module: 服务模块
+    """
+    import extensions  # noqa: F401
+    import models  # noqa: F401
+    for module in pkgutil.iter_modules([os.path.join(BACKEND_DIR, 'models')]):
+        importlib.import_module(f'models.{module.name}')
+
+    return importlib.import_module(f'services.{name}')
+
+
+@pytest.fixture
+def app():
+    """SQLite 内存数据库上的最小应用"""
+    from flask import Flask
+    from extensions import db
+    import models  # noqa: F401
+
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False
+    )
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def session(app):
+    from extensions import db
+    return db.session
+
+
+@pytest.fixture
+def school(session):
+    """
+    一名教师、两名学生（不同院系）、一门课程，以及选课和期末成绩
+
+    Returns:
+        SimpleNamespace: teacher / students / course / enrollments / grades
+    """
+    from models import Course, Enrollment, Grade, Student, Teacher, User, UserProfile
+    from models.course import CourseType
+    from models.grade import GradeType
+    from models.teacher import TeacherTitle
+    from models.user import UserRole
+
+    def person(username, role, first_name, last_name, department):
+        user = User(username=username, email=f'{username}@example.com', password_hash='x', role=role)
+        session.add(user)
+        session.flush()
+        session.add(UserProfile(user_id=user.id, first_name=first_name, last_name=last_name, department=department))
+        return user
+
+    teacher_user = person('t001', UserRole.TEACHER, '老师', '王', '数学学院')
+    teacher = Teacher(user_id=teacher_user.id, teacher_id='T001', department='数学学院',
+                      title=TeacherTitle.PROFESSOR)
+    session.add(teacher)
+
+    students = []
+    for index, department in enumerate(('计算机学院', '数学学院'), start=1):
+        user = person(f's00{index}', UserRole.STUDENT, f'同学{index}', '李', department)
+        student = Student(user_id=user.id, student_id=f'S00{index}', grade='2024', class_name=f'{index}班',
+                          major='软件工程', enrollment_date=date(2024, 9, 1))
+        session.add(student)
+        students.append(student)
+    session.flush()
+
+    course = Course(course_code='MATH101', name='高等数学', credits=4, hours_per_week=4,
+                    course_type=CourseType.REQUIRED, semester='2024秋季', teacher_id=teacher.id)
+    session.add(course)
+    session.flush()
+
+    enrollments, grades = [], []
+    for student, score in zip(students, (92, 58)):
+        enrollment = Enrollment(student_id=student.id, course_id=course.id, semester='2024秋季')
+        grade = Grade(student_id=student.id, course_id=course.id, exam_type=GradeType.FINAL, score=score,
+                      max_score=100, semester='2024秋季', graded_by=teacher_user.id)
+        session.add_all([enrollment, grade])
+        enrollments.append(enrollment)
+        grades.append(grade)
+    session.commit()
+
+    return types.SimpleNamespace(teacher=teacher, students=students, course=course,
+                                 enrollments=enrollments, grades=grades)
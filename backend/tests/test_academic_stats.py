@@ -0,0 +1,38 @@
+# ========================================
+# 学生信息管理系统 - 学业统计测试
+# ========================================
+
+from models.academic_stats import compute_semester_rows, summarize_student
+
+
+def test_graded_enrolled_course_counted_once(school, session):
+    student = school.students[0]
+    rows = compute_semester_rows(session.connection(), [student.id])
+
+    # 已出成绩但选课状态仍为已选课：只计入已获学分
+    stats = rows[(student.id, '2024秋季')]
+    assert stats['credits_earned'] == 4
+    assert stats['credits_in_progress'] == 0
+    assert summarize_student(rows.values())['total_credits'] == 4
+
+    session.refresh(student)
+    assert (student.credits_earned, student.credits_in_progress, student.total_credits) == (4, 0, 4)
+
+
+def test_ungraded_enrollment_in_progress(school, session):
+    from models import Course, Enrollment
+    from models.course import CourseType
+
+    course = Course(course_code='PHYS101', name='大学物理', credits=3, hours_per_week=3,
+                    course_type=CourseType.REQUIRED, semester='2024秋季', teacher_id=school.teacher.id)
+    session.add(course)
+    session.flush()
+    student = school.students[1]
+    session.add(Enrollment(student_id=student.id, course_id=course.id, semester='2024秋季'))
+    session.commit()
+
+    totals = summarize_student(compute_semester_rows(session.connection(), [student.id]).values())
+    # 58分未及格：不计已获学分；未出成绩的物理计入在修学分
+    assert totals['credits_earned'] == 0
+    assert totals['credits_in_progress'] == 3
+    assert totals['total_credits'] == 3
@@ -0,0 +1,37 @@
+# ========================================
+# 学生信息管理系统 - 等级表缓存测试
+# ========================================
+
+import logging
+
+import pytest
+
+from models import grading_scale
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    grading_scale.invalidate_grading_scale()
+    yield
+    grading_scale.invalidate_grading_scale()
+
+
+def test_load_failure_is_logged_and_not_cached(app, monkeypatch, caplog):
+    def broken():
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(grading_scale, '_load_scale_config', broken)
+    with caplog.at_level(logging.ERROR, logger=grading_scale.__name__):
+        assert grading_scale.get_grading_scale() is grading_scale._default_scale
+    assert 'database unavailable' in caplog.text
+    assert grading_scale._cached_scale is None
+
+    # 数据库恢复后下一次调用即读到配置，而不是等默认等级表过期
+    config = {'passing_score': 50, 'bands': [
+        {'min_score': 50, 'letter': 'P', 'grade_point': 1.0},
+        {'min_score': 0, 'letter': 'F', 'grade_point': 0.0}
+    ]}
+    monkeypatch.setattr(grading_scale, '_load_scale_config', lambda: config)
+    scale = grading_scale.get_grading_scale()
+    assert scale is not grading_scale._default_scale
+    assert grading_scale._cached_scale is scale
@@ -0,0 +1,60 @@
+# ========================================
+# 学生信息管理系统 - 游标分页测试
+# ========================================
+
+import base64
+import json
+
+import pytest
+from flask import Flask
+from sqlalchemy import Column, DateTime, Integer, Numeric, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_paginate_query
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = 'rows'
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime)
+    amount = Column(Numeric(10, 2))
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Flask(__name__).app_context(), Session(engine) as session:
+        yield session
+
+
+def _cursor(payload) -> str:
+    raw = json.dumps(payload).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+@pytest.mark.parametrize('cursor', ['not-base64!', _cursor([1, 2]), _cursor({'k': 'id'}), 'AAAA'])
+def test_decode_cursor_rejects_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 'id', False)
+
+
+def test_decode_cursor_rejects_changed_sort():
+    cursor = encode_cursor('created_at', None, 1, descending=True)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 'created_at', False)
+
+
+@pytest.mark.parametrize('sort_key, value', [
+    ('created_at', 'not-a-date'),
+    ('created_at', 12345),
+    ('amount', 'one hundred'),
+])
+def test_keyset_paginate_rejects_tampered_sort_value(session, sort_key, value):
+    cursor = _cursor({'k': sort_key, 'd': 0, 'v': value, 'i': 1})
+    with pytest.raises(InvalidCursorError):
+        keyset_paginate_query(session.query(Row), getattr(Row, sort_key), Row.id,
+                              cursor=cursor, sort_key=sort_key)
@@ -0,0 +1,11 @@
+# ========================================
+# 学生信息管理系统 - SQL指纹归一化测试
+# ========================================
+
+from utils.query_profiler import normalize_statement
+
+
+def test_named_placeholders_collapse_but_casts_survive():
+    statement = "SELECT created_at::date FROM grades WHERE student_id = :student_id AND score > :score_1"
+    assert normalize_statement(statement) == \
+        "SELECT created_at::date FROM grades WHERE student_id = ? AND score > ?"
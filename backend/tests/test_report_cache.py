@@ -0,0 +1,61 @@
+# ========================================
+# 学生信息管理系统 - 报表缓存失效测试
+# ========================================
+
+from conftest import load_service
+
+
+def test_grade_write_bumps_department_scopes(school, session, monkeypatch):
+    report_cache = load_service('report_cache')
+    bumped = []
+    monkeypatch.setattr(report_cache, 'bump_report_scopes', lambda scopes: bumped.append(set(scopes)))
+
+    grade = school.grades[0]
+    grade.score = 95
+    session.commit()
+
+    assert len(bumped) == 1
+    course_id = school.course.id
+    # 学生院系（计算机学院）取自 UserProfile，教师院系取自 Teacher
+    assert f'2024秋季|计算机学院|{course_id}' in bumped[0]
+    assert f'2024秋季|数学学院|{course_id}' in bumped[0]
+    assert '*|*|*' in bumped[0]
+
+
+def test_enrollment_insert_bumps_scopes(school, session, monkeypatch):
+    from models import Enrollment
+
+    report_cache = load_service('report_cache')
+    bumped = []
+    monkeypatch.setattr(report_cache, 'bump_report_scopes', lambda scopes: bumped.append(set(scopes)))
+
+    session.add(Enrollment(student_id=school.students[1].id, course_id=school.course.id, semester='2025春季'))
+    session.commit()
+
+    assert len(bumped) == 1
+    assert '2025春季|数学学院|*' in bumped[0]
+    assert '2024秋季|数学学院|*' not in bumped[0]
+
+
+def test_profile_and_user_changes_bump_global_scope(school, session, monkeypatch):
+    from models import User, UserProfile
+
+    report_cache = load_service('report_cache')
+    bumped = []
+    monkeypatch.setattr(report_cache, 'bump_report_scopes', lambda scopes: bumped.append(set(scopes)))
+
+    student_user_id = school.students[0].user_id
+    # 学生院系取自 UserProfile，改院系后所有报表失效
+    session.query(UserProfile).filter_by(user_id=student_user_id).one().department = '物理学院'
+    session.commit()
+    assert bumped == [{report_cache.GLOBAL_SCOPE}]
+
+    user = session.get(User, student_user_id)
+    user.email = 'renamed@example.com'
+    session.commit()
+    assert len(bumped) == 2
+
+    # 登录信息不出现在报表中
+    user.login_count = (user.login_count or 0) + 1
+    session.commit()
+    assert len(bumped) == 2
@@ -0,0 +1,44 @@
+# ========================================
+# 学生信息管理系统 - 导出查询测试
+# ========================================
+
+from conftest import load_service
+
+
+def test_enrollment_export_query(school):
+    report_service = load_service('report_service')
+
+    rows = report_service.build_enrollment_export_query().order_by('student_id').all()
+
+    assert [row.student_id for row in rows] == ['S001', 'S002']
+    assert rows[0].student_name == '同学1 李'
+    assert rows[0].student_dept == '计算机学院'
+    assert rows[0].class_name == '1班'
+    assert rows[0].teacher == '老师 王'
+
+    filtered = report_service.build_enrollment_export_query({'department': '数学学院'}).all()
+    assert [row.student_id for row in filtered] == ['S002']
+
+
+def test_grade_export_query(school):
+    report_service = load_service('report_service')
+
+    rows = report_service.build_grade_export_query({'semester': '2024秋季'}).order_by('student_id').all()
+
+    assert [(row.student_id, row.department, row.teacher) for row in rows] == [
+        ('S001', '计算机学院', '老师 王'),
+        ('S002', '数学学院', '老师 王'),
+    ]
+    assert rows[0].grade_letter == 'A'
+
+
+def test_teacher_export_query(school):
+    report_service = load_service('report_service')
+
+    rows = report_service.build_teacher_export_query({'department': '数学学院'}).all()
+
+    assert len(rows) == 1
+    assert rows[0].teacher_id == 'T001'
+    assert rows[0].name == '老师 王'
+    assert rows[0].email == 't001@example.com'
+    assert rows[0].workload == 1
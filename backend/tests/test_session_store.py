@@ -0,0 +1,88 @@
+# ========================================
+# 学生信息管理系统 - 会话存储测试
+# ========================================
+
+import time
+import uuid
+
+import pytest
+
+from utils.session_store import SessionStore
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+class Clock:
+    def __init__(self):
+        # Redis 按真实时间使会话键过期，从当前时间开始
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def store(clock):
+    return SessionStore(client=fakeredis.FakeRedis(), idle_timeout=3600, activity_interval=60,
+                        flush_interval=600, flush_batch_size=100, clock=clock)
+
+
+def test_sessions_keyed_by_uuid_user_id(store):
+    user_id = str(uuid.uuid4())
+    first = store.create(user_id, {'browser': 'firefox'}, '10.0.0.1')
+    second = store.create(user_id)
+
+    session = store.get(first)
+    assert session['user_id'] == user_id
+    assert session['device_info'] == {'browser': 'firefox'}
+    assert {item['session_id'] for item in store.list_user_sessions(user_id)} == {first, second}
+
+    assert store.destroy_user_sessions(user_id, except_session_id=first) == 1
+    assert [item['session_id'] for item in store.list_user_sessions(user_id)] == [first]
+
+
+def test_flush_resolves_user_id_for_anonymous_touch(store, clock):
+    user_id = str(uuid.uuid4())
+    session_id = store.create(user_id)
+
+    clock.now += 120
+    assert store.touch(session_id)
+    assert store.touch(str(uuid.uuid4()))  # 不存在的会话在写入时丢弃
+    assert store.flush() == 1
+
+    expires_at = store.redis_client.zscore(f'user_sessions:{user_id}', session_id)
+    assert expires_at == pytest.approx(clock.now + 3600)
+    assert store.list_user_sessions(user_id)[0]['last_activity'] == store.get(session_id)['last_activity']
+
+
+def test_failed_flush_keeps_coalesced_activity(store, clock, monkeypatch):
+    user_id = str(uuid.uuid4())
+    session_id = store.create(user_id)
+    clock.now += 120
+    store.touch(session_id, user_id)
+
+    client = store.redis_client
+    monkeypatch.setattr(client, 'pipeline', lambda *args, **kwargs: (_ for _ in ()).throw(ConnectionError()))
+    assert store.flush() == 0
+    monkeypatch.undo()
+
+    # 合并间隔内的重复活动不再记入，失败的记录仍在队列中
+    assert not store.touch(session_id, user_id)
+    assert store.flush() == 1
+    assert client.zscore(f'user_sessions:{user_id}', session_id) == pytest.approx(clock.now + 3600)
+
+
+def test_cleanup_expired(store, clock):
+    user_id = str(uuid.uuid4())
+    session_id = store.create(user_id)
+
+    clock.now += 3601
+    assert store.cleanup_expired() == 1
+    assert store.list_user_sessions(user_id) == []
+    assert store.redis_client.zcard(f'user_sessions:{user_id}') == 0
+    assert store.get(session_id) is None
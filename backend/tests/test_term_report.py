@@ -0,0 +1,47 @@
+# ========================================
+# 学生信息管理系统 - 全校成绩统计报表测试
+# ========================================
+
+from conftest import load_service
+
+
+def _rows(document, name):
+    section = next(section for section in document['sections'] if section['name'] == name)
+    assert section['status'] == 'completed', section['error']
+    return [dict(zip(section['keys'], row)) for row in section['rows']]
+
+
+def test_term_report_sections(school):
+    term_report = load_service('term_report')
+
+    document = term_report.build_term_report({'semester': '2024秋季'}, max_workers=1)
+
+    assert document['status'] == 'complete'
+    departments = _rows(document, 'departments')
+    assert [(row['department'], row['grade_count'], row['pass_rate']) for row in departments] == [
+        ('数学学院', 1, 0),
+        ('计算机学院', 1, 100.0),
+    ]
+
+    courses = _rows(document, 'courses')
+    assert len(courses) == 1
+    assert courses[0]['teacher_name'] == '老师 王'
+    assert courses[0]['teacher_department'] == '数学学院'
+    assert courses[0]['enrolled_count'] == 2
+
+    teachers = _rows(document, 'teachers')
+    assert [(row['teacher_id'], row['name'], row['department']) for row in teachers] == [
+        ('T001', '老师 王', '数学学院')
+    ]
+
+
+def test_term_report_department_filter(school):
+    term_report = load_service('term_report')
+
+    document = term_report.build_term_report({'department': '计算机学院'}, max_workers=1)
+
+    overview = {row['metric']: row['value'] for row in _rows(document, 'overview')}
+    assert overview['有效选课数'] == 1
+    assert overview['成绩数'] == 1
+    assert overview['最高分'] == 92.0
+    assert [row['department'] for row in _rows(document, 'departments')] == ['计算机学院']
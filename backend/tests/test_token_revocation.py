@@ -0,0 +1,94 @@
+# ========================================
+# 学生信息管理系统 - 令牌撤销同步测试
+# ========================================
+
+import time
+import uuid
+
+import pytest
+
+from utils.token_revocation import TokenRevocation
+
+
+class Clock:
+    def __init__(self):
+        # Redis 按真实时间使 EXAT 键过期，从当前时间开始
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingRevocation(TokenRevocation):
+    """记录整体重建的次数"""
+
+    rebuilds = 0
+
+    def _rebuild(self, now):
+        self.rebuilds += 1
+        super()._rebuild(now)
+
+
+@pytest.fixture
+def instances():
+    fakeredis = pytest.importorskip('fakeredis')
+    # 撤销通过 Lua 脚本写入，fakeredis 需要 lupa 才支持 EVAL
+    pytest.importorskip('lupa')
+    server = fakeredis.FakeServer()
+    clock = Clock()
+
+    def instance(**options):
+        client = fakeredis.FakeRedis(server=server)
+        return CountingRevocation(client=client, sync_interval=0, rebuild_interval=3600, clock=clock, **options)
+    return instance, clock
+
+
+def test_sync_applies_only_new_changes(instances):
+    instance, clock = instances
+    writer, reader = instance(), instance()
+    user_id = str(uuid.uuid4())
+
+    reader.sync()
+    assert reader.rebuilds == 1
+
+    writer.revoke('jti-1', expires_at=clock.now + 600)
+    writer.revoke_all(user_id)
+    assert reader.sync()
+
+    # 增量同步不重新读取整个撤销索引
+    assert reader.rebuilds == 1
+    assert reader.is_revoked({'jti': 'jti-1', 'sub': 'someone'})
+    assert reader.is_revoked({'jti': 'jti-2', 'sub': user_id, 'gen': 0})
+    assert not reader.is_revoked({'jti': 'jti-3', 'sub': user_id, 'gen': 1})
+    assert not reader.sync()
+
+
+def test_truncated_log_and_expiry_sweep_rebuild(instances):
+    instance, clock = instances
+    writer, reader = instance(log_length=2), instance()
+    reader.sync()
+
+    for index in range(4):
+        writer.revoke(f'jti-{index}', expires_at=clock.now + 600)
+    assert reader.sync()
+    # 本地版本之后的日志已被截断，整体重建
+    assert reader.rebuilds == 2
+    assert all(reader.is_revoked({'jti': f'jti-{index}', 'sub': 'someone'}) for index in range(4))
+
+    clock.now += 3600
+    assert reader.sync()
+    assert reader.rebuilds == 3
+    assert not reader.is_revoked({'jti': 'jti-0', 'sub': 'someone'})
+
+
+def test_redis_unavailable_fails_open_locally():
+    class Broken:
+        def __getattr__(self, name):
+            raise ConnectionError('redis down')
+
+    revocation = TokenRevocation(client=Broken(), sync_interval=0)
+    user_id = str(uuid.uuid4())
+
+    assert revocation.revoke_all(user_id) is None
+    assert revocation.is_revoked({'jti': 'jti-1', 'sub': user_id, 'gen': 0})
+    assert not revocation.revoke('jti-2', expires_at=revocation.clock() + 600)
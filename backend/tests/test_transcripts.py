@@ -0,0 +1,92 @@
+# ========================================
+# 学生信息管理系统 - 批量成绩单测试
+# ========================================
+
+import io
+import zipfile
+from datetime import date
+
+from conftest import load_service
+
+
+def _add_student(session, school, number, class_name):
+    from models import Enrollment, Student, User, UserProfile
+    from models.user import UserRole
+
+    user = User(username=f's{number}', email=f's{number}@example.com', password_hash='x', role=UserRole.STUDENT)
+    session.add(user)
+    session.flush()
+    session.add(UserProfile(user_id=user.id, first_name=f'同学{number}', last_name='张', department='计算机学院'))
+    student = Student(user_id=user.id, student_id=f'S{number}', grade='2024', class_name=class_name,
+                      major='软件工程', enrollment_date=date(2024, 9, 1))
+    session.add(student)
+    session.flush()
+    session.add(Enrollment(student_id=student.id, course_id=school.course.id, semester='2024秋季'))
+    return student
+
+
+def test_transcript_totals(school, session):
+    transcripts = load_service('transcripts')
+
+    transcript = transcripts.get_transcript(school.students[0].id)
+
+    assert transcript['student']['name'] == '同学1 李'
+    semester = transcript['semesters'][0]
+    assert semester['semester'] == '2024秋季'
+    assert [course['course_code'] for course in semester['courses']] == ['MATH101']
+    # 已出成绩的课程不再列为在修
+    assert semester['in_progress'] == []
+    assert transcript['summary'] == {
+        'gpa': semester['gpa'],
+        'credits_earned': 4,
+        'credits_in_progress': 0,
+        'total_credits': 4,
+        'course_count': 1
+    }
+
+
+def test_ungraded_enrollment_in_progress(school, session):
+    transcripts = load_service('transcripts')
+    student = _add_student(session, school, '003', '1班')
+    session.commit()
+
+    transcript = transcripts.get_transcript(student.id)
+
+    assert transcript['semesters'][0]['courses'] == []
+    assert [course['course_code'] for course in transcript['semesters'][0]['in_progress']] == ['MATH101']
+    assert transcript['summary']['gpa'] is None
+    assert transcript['summary']['total_credits'] == 4
+
+
+def test_chunks_follow_student_number_keyset(school, session, monkeypatch):
+    transcripts = load_service('transcripts')
+    for number in ('004', '003', '005'):
+        _add_student(session, school, number, '1班')
+    session.commit()
+
+    chunks = []
+    load_chunk = transcripts._load_chunk
+
+    def recording_load_chunk(student_ids):
+        chunks.append(len(student_ids))
+        return load_chunk(student_ids)
+
+    monkeypatch.setattr(transcripts, '_load_chunk', recording_load_chunk)
+
+    numbers = [item['student']['student_number'] for item in transcripts.iter_transcripts(chunk_size=2)]
+    assert numbers == ['S001', 'S002', 'S003', 'S004', 'S005']
+    assert chunks == [2, 2, 1]
+
+    chunks.clear()
+    numbers = [item['student']['student_number'] for item in transcripts.iter_transcripts({'class_name': '1班'}, 2)]
+    assert numbers == ['S001', 'S003', 'S004', 'S005']
+    assert chunks == [2, 2]
+
+
+def test_transcript_zip_html(school):
+    transcripts = load_service('transcripts')
+
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(transcripts.transcript_zip_chunks({}, 'html', max_workers=1))))
+
+    assert archive.namelist() == ['S001_同学1_李.html', 'S002_同学2_李.html']
+    assert '<td colspan="3">在修</td>' not in archive.read('S001_同学1_李.html').decode('utf-8')
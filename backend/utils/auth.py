@@ -7,7 +7,6 @@ import hashlib
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask import current_app, request, g
 from flask_jwt_extended import (
     create_access_token, create_refresh_token,
@@ -15,6 +14,8 @@ from flask_jwt_extended import (
 )
 
 from ..models import User, db
+from .password_hashing import get_password_hasher
+from .two_factor import generate_secret as generate_totp_secret, get_two_factor
 
 
 class AuthManager:
@@ -23,15 +24,18 @@ class AuthManager:
     @staticmethod
     def hash_password(password: str) -> str:
         """
-        密码哈希
+        密码哈希（在密码哈希进程池中计算）
 
         Args:
             password: 明文密码
 
         Returns:
             str: 哈希后的密码
+
+        Raises:
+            PasswordHashingBusy: 密码哈希任务已满
         """
-        return generate_password_hash(password, method='pbkdf2:sha256')
+        return get_password_hasher().hash(password)
 
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
@@ -44,8 +48,31 @@ class AuthManager:
 
         Returns:
             bool: 验证结果
+
+        Raises:
+            PasswordHashingBusy: 密码哈希任务已满
         """
-        return check_password_hash(hashed_password, password)
+        return get_password_hasher().verify(password, hashed_password)
+
+    @staticmethod
+    def verify_user_password(user: User, password: str) -> bool:
+        """
+        验证用户密码，哈希算法或参数已变化时顺带升级 user.password_hash（由调用方提交）
+
+        Args:
+            user: 用户
+            password: 明文密码
+
+        Returns:
+            bool: 验证结果
+
+        Raises:
+            PasswordHashingBusy: 密码哈希任务已满
+        """
+        valid, new_hash = get_password_hasher().verify_and_upgrade(password, user.password_hash)
+        if valid and new_hash:
+            user.password_hash = new_hash
+        return valid
 
     @staticmethod
     def generate_tokens(user_id: int, additional_claims: Optional[Dict] = None) -> Dict[str, Any]:
@@ -183,41 +210,53 @@ class AuthManager:
             raise Exception('令牌无效')
 
     @staticmethod
-    def revoke_token(jti: str) -> bool:
+    def revoke_token(jti: str, expires_at: Optional[int] = None) -> bool:
         """
         撤销令牌
 
         Args:
             jti: 令牌JTI
+            expires_at: 令牌的 exp（Unix秒），撤销记录在此时过期；默认为刷新令牌的最长有效期
+
+        Returns:
+            bool: 是否成功撤销
+        """
+        from utils.token_revocation import get_token_revocation
+        return get_token_revocation().revoke(jti, expires_at)
+
+    @staticmethod
+    def revoke_all_tokens(user_id: str) -> bool:
+        """
+        撤销用户的全部令牌
+
+        Args:
+            user_id: 用户ID
 
         Returns:
             bool: 是否成功撤销
         """
         try:
-            # 这里可以将JTI添加到黑名单中
-            # 例如使用Redis存储黑名单
-            from extensions import cache
-            cache.set(f"revoked_token:{jti}", "true", timeout=86400)  # 24小时
-            return True
-        except Exception:
+            from utils.token_revocation import get_token_revocation
+            return get_token_revocation().revoke_all(user_id) is not None
+        except Exception as e:
+            current_app.logger.error(f"撤销用户令牌失败: {str(e)}")
             return False
 
     @staticmethod
-    def is_token_revoked(jti: str) -> bool:
+    def is_token_revoked(jti: str, user_id: Optional[str] = None, generation: int = 0) -> bool:
         """
-        检查令牌是否被撤销
+        检查令牌是否被撤销（未被撤销的令牌只查本地过滤器）
 
         Args:
             jti: 令牌JTI
+            user_id: 令牌所属用户ID（提供时同时检查用户代数）
+            generation: 令牌的代数声明
 
         Returns:
             bool: 是否被撤销
         """
-        try:
-            from extensions import cache
-            return cache.get(f"revoked_token:{jti}") is not None
-        except Exception:
-            return False
+        from utils.token_revocation import GENERATION_CLAIM, get_token_revocation
+        return get_token_revocation().is_revoked({'jti': jti, 'sub': user_id, GENERATION_CLAIM: generation})
 
 
 class PasswordManager:
@@ -320,7 +359,7 @@ class PasswordManager:
 
 
 class SessionManager:
-    """会话管理器"""
+    """会话管理器（存储见 utils.session_store）"""
 
     @staticmethod
     def create_session(user_id: int, device_info: Optional[Dict] = None) -> str:
@@ -334,22 +373,8 @@ class SessionManager:
         Returns:
             str: 会话ID
         """
-        import uuid
-
-        session_id = str(uuid.uuid4())
-        session_data = {
-            'user_id': user_id,
-            'created_at': datetime.utcnow().isoformat(),
-            'last_activity': datetime.utcnow().isoformat(),
-            'device_info': device_info or {},
-            'ip_address': request.environ.get('REMOTE_ADDR', '')
-        }
-
-        # 存储会话到Redis
-        from extensions import cache
-        cache.set(f"session:{session_id}", session_data, timeout=86400)  # 24小时
-
-        return session_id
+        from utils.session_store import get_session_store
+        return get_session_store().create(user_id, device_info, request.environ.get('REMOTE_ADDR', ''))
 
     @staticmethod
     def get_session(session_id: str) -> Optional[Dict[str, Any]]:
@@ -363,32 +388,28 @@ class SessionManager:
             Optional[Dict[str, Any]]: 会话信息
         """
         try:
-            from extensions import cache
-            return cache.get(f"session:{session_id}")
+            from utils.session_store import get_session_store
+            return get_session_store().get(session_id)
         except Exception:
             return None
 
     @staticmethod
-    def update_session_activity(session_id: str) -> bool:
+    def update_session_activity(session_id: str, user_id: Optional[int] = None) -> bool:
         """
-        更新会话活动时间
+        更新会话活动时间（合并写入：每个会话每 SESSION_ACTIVITY_INTERVAL 秒最多写一次，批量写入）
 
         Args:
             session_id: 会话ID
+            user_id: 用户ID（提供时写入不需要先读取会话）
 
         Returns:
-            bool: 是否成功更新
+            bool: 是否记录了本次活动
         """
         try:
-            from extensions import cache
-            session_data = cache.get(f"session:{session_id}")
-            if session_data:
-                session_data['last_activity'] = datetime.utcnow().isoformat()
-                cache.set(f"session:{session_id}", session_data, timeout=86400)
-                return True
+            from utils.session_store import get_session_store
+            return get_session_store().touch(session_id, user_id)
         except Exception:
-            pass
-        return False
+            return False
 
     @staticmethod
     def destroy_session(session_id: str) -> bool:
@@ -402,8 +423,8 @@ class SessionManager:
             bool: 是否成功销毁
         """
         try:
-            from extensions import cache
-            cache.delete(f"session:{session_id}")
+            from utils.session_store import get_session_store
+            get_session_store().destroy(session_id)
             return True
         except Exception:
             return False
@@ -417,11 +438,28 @@ class SessionManager:
             user_id: 用户ID
 
         Returns:
-            list: 会话列表
+            list: 会话列表，最近活动的在前
+        """
+        try:
+            from utils.session_store import get_session_store
+            return get_session_store().list_user_sessions(user_id)
+        except Exception:
+            return []
+
+    @staticmethod
+    def destroy_user_sessions(user_id: int, except_session_id: Optional[str] = None) -> int:
+        """
+        销毁用户的所有会话
+
+        Args:
+            user_id: 用户ID
+            except_session_id: 保留的会话（如当前会话）
+
+        Returns:
+            int: 销毁的会话数
         """
-        # 这里需要实现更复杂的逻辑来搜索特定用户的所有会话
-        # 可能需要使用Redis的SCAN功能或维护用户会话索引
-        return []
+        from utils.session_store import get_session_store
+        return get_session_store().destroy_user_sessions(user_id, except_session_id)
 
 
 class SecurityManager:
@@ -524,68 +562,102 @@ class TwoFactorAuth:
         Returns:
             str: 密钥
         """
-        import pyotp
-        return pyotp.random_base32()
+        return generate_totp_secret()
 
     @staticmethod
-    def generate_qr_code(user_email: str, secret: str) -> str:
+    def prepare_qr_code(user_email: str, secret: str):
         """
-        生成2FA二维码
+        在后台预生成2FA二维码（生成密钥后立即调用）
 
         Args:
             user_email: 用户邮箱
             secret: 2FA密钥
-
-        Returns:
-            str: 二维码URL
         """
-        import pyotp
-        import qrcode
-        from io import BytesIO
-        import base64
+        get_two_factor().prepare_qr_code(user_email, secret)
 
-        totp_uri = pyotp.totp.TOTP(secret).provisioning_uri(
-            user_email,
-            issuer_name="学生信息管理系统"
-        )
-
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(totp_uri)
-        qr.make(fit=True)
+    @staticmethod
+    def generate_qr_code(user_email: str, secret: str) -> str:
+        """
+        生成2FA二维码（已预生成时直接返回）
 
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
+        Args:
+            user_email: 用户邮箱
+            secret: 2FA密钥
 
-        return base64.b64encode(buffer.getvalue()).decode()
+        Returns:
+            str: Base64 编码的二维码 PNG
+        """
+        return get_two_factor().qr_code(user_email, secret)
 
     @staticmethod
-    def verify_code(secret: str, token: str) -> bool:
+    def verify_code(secret: str, token: str, user_id: Optional[str] = None) -> bool:
         """
-        验证2FA代码
+        验证2FA代码（允许1个时间窗口的偏差）
 
         Args:
             secret: 2FA密钥
             token: 用户输入的代码
+            user_id: 用户ID，提供时同一代码不能重复使用
 
         Returns:
             bool: 验证结果
         """
-        import pyotp
-        totp = pyotp.TOTP(secret)
-        return totp.verify(token, valid_window=1)  # 允许1个时间窗口的偏差
+        return get_two_factor().verify(secret, token, user_id)
+
+    @staticmethod
+    def verify_codes(items) -> list:
+        """
+        批量验证2FA代码
+
+        Args:
+            items: (密钥, 代码, 用户ID或None) 列表
+
+        Returns:
+            list: 每项的验证结果
+        """
+        return get_two_factor().verify_batch(items)
 
 
 # 便捷函数
-def get_current_user() -> Optional[User]:
-    """获取当前登录用户"""
+def generate_password_hash(password: str) -> str:
+    """密码哈希"""
+    return AuthManager.hash_password(password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    """验证密码"""
+    return AuthManager.verify_password(password, hashed_password)
+
+
+def verify_user_password(user: User, password: str) -> bool:
+    """验证用户密码并按需升级哈希"""
+    return AuthManager.verify_user_password(user, password)
+
+
+def revoke_token(jti: str, expires_at: Optional[int] = None) -> bool:
+    """撤销令牌"""
+    return AuthManager.revoke_token(jti, expires_at)
+
+
+def revoke_all_tokens(user_id: str) -> bool:
+    """撤销用户的全部令牌"""
+    return AuthManager.revoke_all_tokens(user_id)
+
+
+def is_token_revoked(jti: str, user_id: Optional[str] = None, generation: int = 0) -> bool:
+    """检查令牌是否被撤销"""
+    return AuthManager.is_token_revoked(jti, user_id, generation)
+
+
+def get_current_user():
+    """获取当前登录用户（CurrentUser，常用属性取自缓存的主体，不查询数据库）"""
     try:
         if hasattr(g, 'current_user') and g.current_user:
             return g.current_user
 
-        user_id = get_jwt_identity()
-        if user_id:
-            g.current_user = User.query.get(user_id)
+        if get_jwt_identity():
+            from utils.principal import load_current_principal
+            load_current_principal()
             return g.current_user
 
     except Exception:
@@ -2,12 +2,53 @@
 # 学生信息管理系统 - 验证码工具类
 # ========================================
 
+"""
+图片验证码：预生成池 + 过期存储。
+
+- CaptchaPool 由后台线程预先生成 CAPTCHA_POOL_SIZE 个（文本, PNG）对，请求时 O(1) 取出，
+  剩余数量低于 CAPTCHA_POOL_LOW_WATERMARK 时唤醒后台线程补满；池为空时在请求线程中生成。
+  每个验证码只会被取出一次
+- 验证码默认存 Redis；CAPTCHA_STORAGE 为 'memory' 或 Redis 未初始化时存进程内的
+  LocalCaptchaStore（按过期时间清理）
+
+Usage:
+    captcha_data = generate_captcha_image()
+    captcha_id = store_captcha(captcha_data)
+    verify_captcha(captcha_id, code)
+    delete_captcha(captcha_id)
+"""
+
 import random
 import string
 import base64
+import threading
+import time
+import uuid
+from collections import deque
+from functools import lru_cache
 from io import BytesIO
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
 from PIL import Image, ImageDraw, ImageFont
-import hashlib
+
+CAPTCHA_KEY = 'captcha:{captcha_id}'
+
+DEFAULT_WIDTH = 120
+DEFAULT_HEIGHT = 40
+DEFAULT_POOL_SIZE = 200
+DEFAULT_LOW_WATERMARK = 50
+DEFAULT_EXPIRE_TIME = 300
+
+_captcha_pool = None
+_local_store = None
+_singleton_lock = threading.Lock()
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
 
 
 def generate_captcha_text(length=4):
@@ -17,22 +58,35 @@ def generate_captcha_text(length=4):
     return ''.join(random.choices(characters, k=length))
 
 
-def generate_captcha_image(width=120, height=40):
-    """生成验证码图片"""
-    # 生成验证码文本
-    captcha_text = generate_captcha_text()
-    captcha_id = hashlib.md5(f"{captcha_text}_{random.random()}".encode()).hexdigest()
+@lru_cache(maxsize=1)
+def _font():
+    try:
+        # 尝试使用系统字体
+        return ImageFont.truetype("arial.ttf", 24)
+    except Exception:
+        # 如果找不到字体，使用默认字体
+        return ImageFont.load_default()
 
-    # 创建图片
-    image = Image.new('RGB', (width, height), color=(255, 255, 255))
-    draw = ImageDraw.Draw(image)
 
-    # 背景
-    for x in range(width):
-        for y in range(height):
-            draw.point((x, y), fill=(random.randint(220, 255),
-                                     random.randint(220, 255),
-                                     random.randint(220, 255)))
+_BACKGROUND_LEVELS = range(220, 256)
+
+
+def render_captcha(captcha_text: str, width: int = DEFAULT_WIDTH, height: int = DEFAULT_HEIGHT) -> bytes:
+    """
+    绘制验证码图片
+
+    Args:
+        captcha_text: 验证码文本
+        width: 宽度
+        height: 高度
+
+    Returns:
+        bytes: PNG 数据
+    """
+    # 背景：每个像素随机的浅色，一次生成全部像素
+    image = Image.frombytes('RGB', (width, height),
+                            bytes(random.choices(_BACKGROUND_LEVELS, k=width * height * 3)))
+    draw = ImageDraw.Draw(image)
 
     # 干扰线
     for _ in range(5):
@@ -52,15 +106,8 @@ def generate_captcha_image(width=120, height=40):
                                 random.randint(0, 255),
                                 random.randint(0, 255)))
 
-    # 验证码文字
-    try:
-        # 尝试使用系统字体
-        font = ImageFont.truetype("arial.ttf", 24)
-    except:
-        # 如果找不到字体，使用默认字体
-        font = ImageFont.load_default()
-
-    # 绘制每个字符，添加随机偏移和旋转
+    # 绘制每个字符，添加随机偏移
+    font = _font()
     for i, char in enumerate(captcha_text):
         x = 20 + i * 25 + random.randint(-5, 5)
         y = 8 + random.randint(-5, 5)
@@ -69,38 +116,220 @@ def generate_captcha_image(width=120, height=40):
         color = (random.randint(0, 100), random.randint(0, 100), random.randint(0, 100))
         draw.text((x, y), char, font=font, fill=color)
 
-    # 转换为base64
     buffer = BytesIO()
     image.save(buffer, format='PNG')
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
+    return buffer.getvalue()
+
+
+def _new_captcha(width: int = DEFAULT_WIDTH, height: int = DEFAULT_HEIGHT) -> Tuple[str, bytes]:
+    captcha_text = generate_captcha_text()
+    return captcha_text, render_captcha(captcha_text, width, height)
+
+
+# ========================================
+# 预生成池
+# ========================================
+
+class CaptchaPool:
+    """预生成的验证码池，后台线程在低于水位线时补满"""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, low_watermark: int = DEFAULT_LOW_WATERMARK,
+                 width: int = DEFAULT_WIDTH, height: int = DEFAULT_HEIGHT,
+                 generator: Optional[Callable[[int, int], Tuple[str, bytes]]] = None):
+        """
+        Args:
+            size: 池容量，0 为不预生成
+            low_watermark: 剩余数量低于该值时补充
+            width: 图片宽度
+            height: 图片高度
+            generator: 生成（文本, PNG）的函数，默认为 _new_captcha
+        """
+        self.size = size
+        self.low_watermark = min(low_watermark, size)
+        self.width = width
+        self.height = height
+        self.generator = generator or _new_captcha
+        self._items: deque = deque()
+        self._refill = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """启动后台补充线程（首次取验证码时自动启动）"""
+        if self.size <= 0 or self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._stopped.clear()
+                self._refill.set()
+                self._worker = threading.Thread(target=self._run, name='captcha-pool', daemon=True)
+                self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """停止后台线程"""
+        worker = self._worker
+        if worker is None:
+            return
+        self._stopped.set()
+        self._refill.set()
+        worker.join(timeout)
+        self._worker = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._refill.wait()
+            self._refill.clear()
+            while len(self._items) < self.size and not self._stopped.is_set():
+                try:
+                    self._items.append(self.generator(self.width, self.height))
+                except Exception as e:
+                    # 生成失败时不重试，等下一次取出时再唤醒
+                    if has_app_context():
+                        current_app.logger.error(f"预生成验证码失败: {str(e)}")
+                    break
+
+    def pop(self) -> Tuple[str, bytes]:
+        """
+        取出一个验证码（池为空时在当前线程生成）
+
+        Returns:
+            Tuple[str, bytes]: (文本, PNG 数据)
+        """
+        self.start()
+        try:
+            item = self._items.popleft()
+        except IndexError:
+            item = None
+        if len(self._items) < self.low_watermark:
+            self._refill.set()
+        if item is None:
+            item = self.generator(self.width, self.height)
+        return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def get_captcha_pool() -> CaptchaPool:
+    """获取全局验证码池"""
+    global _captcha_pool
+    if _captcha_pool is None:
+        with _singleton_lock:
+            if _captcha_pool is None:
+                _captcha_pool = CaptchaPool(
+                    size=_config('CAPTCHA_POOL_SIZE', DEFAULT_POOL_SIZE),
+                    low_watermark=_config('CAPTCHA_POOL_LOW_WATERMARK', DEFAULT_LOW_WATERMARK)
+                )
+    return _captcha_pool
+
+
+def generate_captcha_image(width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    """生成验证码图片（默认尺寸从预生成池中取出）"""
+    if (width, height) == (DEFAULT_WIDTH, DEFAULT_HEIGHT):
+        captcha_text, png = get_captcha_pool().pop()
+    else:
+        captcha_text, png = _new_captcha(width, height)
 
     return {
-        'captcha_id': captcha_id,
+        'captcha_id': uuid.uuid4().hex,
         'captcha_text': captcha_text,
-        'captcha_image': f"data:image/png;base64,{image_base64}"
+        'captcha_image': f"data:image/png;base64,{base64.b64encode(png).decode()}"
     }
 
 
-def verify_captcha(captcha_id, captcha_text, redis_client):
+# ========================================
+# 存储
+# ========================================
+
+class LocalCaptchaStore:
+    """进程内的验证码存储（Redis 未配置时使用），实现 setex/get/delete"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, cleanup_interval: float = 60):
+        self.clock = clock
+        self.cleanup_interval = cleanup_interval
+        self._items: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._next_cleanup = clock() + cleanup_interval
+
+    def _cleanup(self, now: float):
+        if now < self._next_cleanup:
+            return
+        self._next_cleanup = now + self.cleanup_interval
+        expired = [key for key, (_, expires_at) in self._items.items() if expires_at <= now]
+        for key in expired:
+            del self._items[key]
+
+    def setex(self, key: str, expire_time: int, value: str):
+        now = self.clock()
+        with self._lock:
+            self._cleanup(now)
+            self._items[key] = (value, now + expire_time)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[1] <= self.clock():
+                del self._items[key]
+                return None
+            return item[0]
+
+    def delete(self, key: str) -> int:
+        with self._lock:
+            return 1 if self._items.pop(key, None) is not None else 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def get_captcha_store():
+    """
+    获取验证码存储：Redis，或者 CAPTCHA_STORAGE 为 'memory'、Redis 未初始化时的进程内存储
+    """
+    global _local_store
+    if _config('CAPTCHA_STORAGE', 'redis') == 'redis':
+        from extensions import redis_client
+        # FlaskRedis 未 init_app 时没有连接
+        if getattr(redis_client, '_redis_client', None) is not None:
+            return redis_client
+    if _local_store is None:
+        with _singleton_lock:
+            if _local_store is None:
+                _local_store = LocalCaptchaStore()
+    return _local_store
+
+
+def verify_captcha(captcha_id, captcha_text, redis_client=None):
     """验证验证码"""
     if not captcha_id or not captcha_text:
         return False
 
-    # 从Redis获取验证码
-    stored_captcha = redis_client.get(f"captcha:{captcha_id}")
+    store = redis_client if redis_client is not None else get_captcha_store()
+    stored_captcha = store.get(CAPTCHA_KEY.format(captcha_id=captcha_id))
 
     if not stored_captcha:
         return False
+    if isinstance(stored_captcha, bytes):
+        stored_captcha = stored_captcha.decode()
 
     # 验证码不区分大小写
     return stored_captcha.lower() == captcha_text.lower()
 
 
-def store_captcha(captcha_data, redis_client, expire_time=300):
-    """存储验证码到Redis"""
-    redis_client.setex(
-        f"captcha:{captcha_data['captcha_id']}",
+def store_captcha(captcha_data, redis_client=None, expire_time=DEFAULT_EXPIRE_TIME):
+    """存储验证码"""
+    store = redis_client if redis_client is not None else get_captcha_store()
+    store.setex(
+        CAPTCHA_KEY.format(captcha_id=captcha_data['captcha_id']),
         expire_time,
         captcha_data['captcha_text']
     )
-    return captcha_data['captcha_id']
\ No newline at end of file
+    return captcha_data['captcha_id']
+
+
+def delete_captcha(captcha_id, redis_client=None):
+    """删除已使用的验证码"""
+    store = redis_client if redis_client is not None else get_captcha_store()
+    store.delete(CAPTCHA_KEY.format(captcha_id=captcha_id))
@@ -0,0 +1,467 @@
+# ========================================
+# 学生信息管理系统 - 列式导出（Parquet / Arrow IPC）
+# ========================================
+
+"""
+列式导出：按批从服务端游标读取查询结果，逐批转换为 Arrow RecordBatch 写出，
+保留列类型（整数、浮点、日期时间），学期/院系/课程等低基数列采用字典编码。
+
+- parquet: Parquet 文件，适合归档和 pandas/pyarrow 直接读取
+- arrow:   Arrow IPC 流格式，加载时几乎无需解析；字典按增量（delta）追加
+
+写入 HTTP 响应时每写完一批即输出已产生的字节，内存占用只与批大小有关。
+每日快照由 flask export-snapshots 生成（由定时任务每晚执行），
+保存在 create_export_file 使用的 exports 目录下。
+
+pyarrow 为可选依赖，未安装时 columnar_available() 返回 False。
+"""
+
+import enum
+import os
+import shutil
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from flask import current_app, has_app_context
+from sqlalchemy import types as sqltypes
+
+from utils.export_stream import iter_query, query_fields
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 为可选依赖
+    pa = None
+    pq = None
+
+COLUMNAR_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+# 低基数字符串列，按字典编码写出
+DEFAULT_DICTIONARY_COLUMNS = frozenset({
+    'semester', 'department', 'student_dept', 'course_code', 'course_name',
+    'teacher', 'title', 'status', 'grade_letter'
+})
+
+DEFAULT_RECORD_BATCH_SIZE = 10000
+DEFAULT_SNAPSHOT_RETENTION_DAYS = 30
+
+
+def columnar_available() -> bool:
+    """是否可用列式导出（已安装pyarrow）"""
+    return pa is not None
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+# ========================================
+# 类型映射
+# ========================================
+
+def _arrow_type(sql_type) -> Optional['pa.DataType']:
+    """SQLAlchemy类型 -> Arrow类型，无法确定时返回None（按首批数据推断）"""
+    if sql_type is None or isinstance(sql_type, sqltypes.NullType):
+        return None
+    if isinstance(sql_type, sqltypes.Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, sqltypes.Integer):
+        return pa.int64()
+    if isinstance(sql_type, (sqltypes.Float, sqltypes.Numeric)):
+        return pa.float64()
+    if isinstance(sql_type, sqltypes.DateTime):
+        return pa.timestamp('us')
+    if isinstance(sql_type, sqltypes.Date):
+        return pa.date32()
+    if isinstance(sql_type, (sqltypes.String, sqltypes.Enum)):
+        return pa.string()
+    return None
+
+
+def _to_arrow_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _infer_type(values: Sequence[Any]) -> 'pa.DataType':
+    try:
+        inferred = pa.array(values).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.string()
+    return pa.string() if pa.types.is_null(inferred) else inferred
+
+
+class RecordBatchEncoder:
+    """将查询结果行分批编码为 Arrow RecordBatch"""
+
+    def __init__(
+        self,
+        field_names: Sequence[str],
+        sql_types: Sequence[Any] = None,
+        dictionary_columns: Iterable[str] = DEFAULT_DICTIONARY_COLUMNS
+    ):
+        """
+        初始化编码器
+
+        Args:
+            field_names: 字段名
+            sql_types: 对应的SQLAlchemy类型，用于确定列类型
+            dictionary_columns: 需要字典编码的列
+        """
+        self.field_names = list(field_names)
+        self.sql_types = list(sql_types) if sql_types else [None] * len(self.field_names)
+        self.dictionary_columns = set(dictionary_columns or ())
+        self.schema: Optional['pa.Schema'] = None
+        # 字典编码列的累积字典（值 -> 下标），各批次共享同一套下标
+        self._dictionaries: Dict[str, Dict[str, int]] = {}
+
+    def _resolve_schema(self, columns: List[List[Any]]) -> 'pa.Schema':
+        arrow_fields = []
+        for name, sql_type, values in zip(self.field_names, self.sql_types, columns):
+            value_type = _arrow_type(sql_type) or _infer_type(values)
+            if name in self.dictionary_columns and pa.types.is_string(value_type):
+                value_type = pa.dictionary(pa.int32(), pa.string())
+            arrow_fields.append(pa.field(name, value_type))
+        return pa.schema(arrow_fields)
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> 'pa.RecordBatch':
+        """
+        编码一批行
+
+        Args:
+            rows: 行列表（元组或Row）
+
+        Returns:
+            pa.RecordBatch: 记录批
+        """
+        columns = [[_to_arrow_value(row[index]) for row in rows] for index in range(len(self.field_names))]
+        if self.schema is None:
+            # 首批确定schema，后续批次保持一致
+            self.schema = self._resolve_schema(columns)
+
+        arrays = []
+        for field, values in zip(self.schema, columns):
+            if pa.types.is_dictionary(field.type):
+                arrays.append(self._dictionary_array(field.name, values))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def _dictionary_array(self, name: str, values: Sequence[Any]) -> 'pa.DictionaryArray':
+        dictionary = self._dictionaries.setdefault(name, {})
+        indices = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            value = str(value)
+            index = dictionary.get(value)
+            if index is None:
+                index = dictionary[value] = len(dictionary)
+            indices.append(index)
+        # 字典只追加不重排，IPC流写出时只需发送新增部分
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()),
+            pa.array(list(dictionary), type=pa.string())
+        )
+
+    def empty_schema(self) -> 'pa.Schema':
+        """无数据时的schema（类型无法推断的列为字符串）"""
+        if self.schema is None:
+            self.schema = self._resolve_schema([[] for _ in self.field_names])
+        return self.schema
+
+
+def iter_record_batches(
+    rows: Iterable[Sequence[Any]],
+    encoder: RecordBatchEncoder,
+    batch_size: int = DEFAULT_RECORD_BATCH_SIZE
+) -> Iterator['pa.RecordBatch']:
+    """
+    将行迭代器按批编码为 RecordBatch
+
+    Args:
+        rows: 行迭代器
+        encoder: 编码器
+        batch_size: 每批行数
+
+    Returns:
+        Iterator[pa.RecordBatch]: 记录批
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield encoder.encode(batch)
+            batch = []
+    if batch:
+        yield encoder.encode(batch)
+
+
+# ========================================
+# 写出
+# ========================================
+
+class _ChunkSink:
+    """只追加的输出缓冲，供流式响应按批取出已写入的字节"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class _ColumnarWriter:
+    """Parquet / Arrow IPC 写入器的统一封装"""
+
+    def __init__(self, sink, export_format: str, schema: 'pa.Schema'):
+        self.export_format = export_format
+        if export_format == 'parquet':
+            self._writer = pq.ParquetWriter(
+                sink, schema,
+                compression=_config('EXPORT_PARQUET_COMPRESSION', 'zstd'),
+                use_dictionary=True
+            )
+        elif export_format == 'arrow':
+            self._writer = pa.ipc.new_stream(
+                sink, schema,
+                options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            )
+        else:
+            raise ValueError(f"不支持的列式导出格式: {export_format}")
+
+    def write(self, batch: 'pa.RecordBatch'):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("列式导出需要安装 pyarrow")
+
+
+def _write_batches(sink, export_format: str, encoder: RecordBatchEncoder, batches: Iterator['pa.RecordBatch']):
+    """写入所有批次，每写完一批产出一次（供流式输出取数）"""
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = _ColumnarWriter(sink, export_format, batch.schema)
+        writer.write(batch)
+        yield batch.num_rows
+    if writer is None:
+        writer = _ColumnarWriter(sink, export_format, encoder.empty_schema())
+    writer.close()
+
+
+def _query_encoder(query, dictionary_columns: Iterable[str]) -> RecordBatchEncoder:
+    return RecordBatchEncoder(
+        query_fields(query),
+        [column['type'] for column in query.column_descriptions],
+        dictionary_columns
+    )
+
+
+def columnar_chunks(
+    export_format: str,
+    query,
+    dictionary_columns: Iterable[str] = DEFAULT_DICTIONARY_COLUMNS,
+    batch_size: int = None
+) -> Iterator[bytes]:
+    """
+    将查询结果编码为 Parquet / Arrow IPC 分块
+
+    Args:
+        export_format: parquet/arrow
+        query: 列查询（db.session.query(列...)）
+        dictionary_columns: 字典编码的列
+        batch_size: 每个RecordBatch的行数
+
+    Returns:
+        Iterator[bytes]: 文件分块
+    """
+    _require_pyarrow()
+    size = batch_size or _config('EXPORT_RECORD_BATCH_SIZE', DEFAULT_RECORD_BATCH_SIZE)
+    encoder = _query_encoder(query, dictionary_columns)
+    sink = _ChunkSink()
+    stream = pa.PythonFile(sink, mode='w')
+
+    for _ in _write_batches(stream, export_format, encoder, iter_record_batches(iter_query(query), encoder, size)):
+        data = sink.drain()
+        if data:
+            yield data
+
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def write_columnar_rows(
+    file_path: str,
+    export_format: str,
+    rows: Iterable[Sequence[Any]],
+    encoder: RecordBatchEncoder,
+    batch_size: int = None
+) -> Dict[str, Any]:
+    """
+    将行写入 Parquet / Arrow IPC 文件（先写临时文件，完成后原子替换）
+
+    Args:
+        file_path: 目标文件路径
+        export_format: parquet/arrow
+        rows: 行迭代器
+        encoder: 编码器
+        batch_size: 每个RecordBatch的行数
+
+    Returns:
+        Dict[str, Any]: 文件路径、行数和文件大小
+    """
+    _require_pyarrow()
+    size = batch_size or _config('EXPORT_RECORD_BATCH_SIZE', DEFAULT_RECORD_BATCH_SIZE)
+
+    temp_path = f"{file_path}.tmp"
+    row_count = 0
+    try:
+        with pa.OSFile(temp_path, 'wb') as sink:
+            for written in _write_batches(sink, export_format, encoder, iter_record_batches(rows, encoder, size)):
+                row_count += written
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return {
+        'file_path': file_path,
+        'row_count': row_count,
+        'file_size': os.path.getsize(file_path)
+    }
+
+
+def write_columnar_file(
+    file_path: str,
+    export_format: str,
+    query,
+    dictionary_columns: Iterable[str] = DEFAULT_DICTIONARY_COLUMNS,
+    batch_size: int = None
+) -> Dict[str, Any]:
+    """
+    将查询结果写入 Parquet / Arrow IPC 文件
+
+    Args:
+        file_path: 目标文件路径
+        export_format: parquet/arrow
+        query: 列查询
+        dictionary_columns: 字典编码的列
+        batch_size: 每个RecordBatch的行数
+
+    Returns:
+        Dict[str, Any]: 文件路径、行数和文件大小
+    """
+    return write_columnar_rows(file_path, export_format, iter_query(query), _query_encoder(query, dictionary_columns), batch_size)
+
+
+# ========================================
+# 每日快照
+# ========================================
+
+def get_snapshot_folder() -> str:
+    """快照根目录（create_export_file 使用的 exports 目录下的 snapshots）"""
+    upload_folder = _config('UPLOAD_FOLDER', 'uploads')
+    return os.path.join(upload_folder, 'exports', 'snapshots')
+
+
+def write_export_snapshots(
+    queries: Dict[str, Any],
+    export_format: str = 'parquet',
+    snapshot_date: date = None,
+    retention_days: int = None
+) -> Dict[str, Any]:
+    """
+    生成每日快照：exports/snapshots/YYYYMMDD/<报表类型>.<扩展名>
+
+    Args:
+        queries: 报表类型 -> 列查询
+        export_format: parquet/arrow
+        snapshot_date: 快照日期，默认今天
+        retention_days: 保留天数，超期的快照目录被删除
+
+    Returns:
+        Dict[str, Any]: 快照目录、各报表写入结果和已清理的目录
+    """
+    snapshot_date = snapshot_date or date.today()
+    if retention_days is None:
+        retention_days = _config('EXPORT_SNAPSHOT_RETENTION_DAYS', DEFAULT_SNAPSHOT_RETENTION_DAYS)
+    extension = COLUMNAR_FORMATS[export_format][1]
+
+    root = get_snapshot_folder()
+    folder = os.path.join(root, snapshot_date.strftime('%Y%m%d'))
+    Path(folder).mkdir(parents=True, exist_ok=True)
+
+    files = {}
+    for report_type, query in queries.items():
+        files[report_type] = write_columnar_file(
+            os.path.join(folder, f"{report_type}.{extension}"), export_format, query
+        )
+
+    return {
+        'folder': folder,
+        'files': files,
+        'removed': prune_snapshots(root, snapshot_date - timedelta(days=retention_days))
+    }
+
+
+def prune_snapshots(root: str, before: date) -> List[str]:
+    """
+    删除早于指定日期的快照目录
+
+    Args:
+        root: 快照根目录
+        before: 截止日期（不含）
+
+    Returns:
+        List[str]: 已删除的目录
+    """
+    removed = []
+    if not os.path.isdir(root):
+        return removed
+
+    for name in sorted(os.listdir(root)):
+        try:
+            folder_date = datetime.strptime(name, '%Y%m%d').date()
+        except ValueError:
+            continue
+        if folder_date < before:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            removed.append(name)
+    return removed
@@ -9,7 +9,8 @@ from datetime import datetime
 import time
 
 from utils.responses import forbidden_response, unauthorized_response, error_response
-from utils.rate_limit import rate_limiter
+from utils.rate_limit import get_rate_limiter
+from utils.principal import load_current_principal
 
 def require_permission(permission):
     """
@@ -27,19 +28,15 @@ def require_permission(permission):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-
-            if not hasattr(g, 'current_user'):
-                from models import User
-                g.current_user = User.query.get(current_user_id)
+            principal = load_current_principal()
 
-            if not g.current_user:
+            if not principal:
                 return unauthorized_response("用户不存在")
 
-            if not g.current_user.is_active():
+            if not principal.active:
                 return forbidden_response("用户已被禁用")
 
-            if not g.current_user.has_permission(permission):
+            if not principal.has_permission(permission):
                 return forbidden_response("权限不足")
 
             return f(*args, **kwargs)
@@ -62,13 +59,9 @@ def require_role(role):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_id = get_jwt_identity()
+            principal = load_current_principal()
 
-            if not hasattr(g, 'current_user'):
-                from models import User
-                g.current_user = User.query.get(current_user_id)
-
-            if not g.current_user or g.current_user.role.value != role:
+            if not principal or principal.role.value != role:
                 return forbidden_response(f"需要{role}角色")
 
             return f(*args, **kwargs)
@@ -91,13 +84,9 @@ def require_any_role(*roles):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-
-            if not hasattr(g, 'current_user'):
-                from models import User
-                g.current_user = User.query.get(current_user_id)
+            principal = load_current_principal()
 
-            if not g.current_user or g.current_user.role.value not in roles:
+            if not principal or principal.role.value not in roles:
                 return forbidden_response(f"需要以下角色之一: {', '.join(roles)}")
 
             return f(*args, **kwargs)
@@ -129,14 +118,12 @@ def require_self_or_permission(permission):
             is_self = user_id == current_user_id
 
             # 检查是否有权限
-            if not hasattr(g, 'current_user'):
-                from models import User
-                g.current_user = User.query.get(current_user_id)
+            principal = load_current_principal()
 
-            if not g.current_user:
+            if not principal:
                 return unauthorized_response("用户不存在")
 
-            has_permission = g.current_user.has_permission(permission)
+            has_permission = principal.has_permission(permission)
 
             if not (is_self or has_permission):
                 return forbidden_response("权限不足")
@@ -173,7 +160,7 @@ def rate_limit(limit):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             # 使用限流器检查
-            if not rate_limiter.is_allowed(request.endpoint, limit):
+            if not get_rate_limiter().is_allowed(request.endpoint, limit):
                 return error_response("请求过于频繁，请稍后再试", 429, 'TOO_MANY_REQUESTS')
 
             return f(*args, **kwargs)
@@ -0,0 +1,228 @@
+# ========================================
+# 学生信息管理系统 - 流式导出工具
+# ========================================
+
+"""
+流式导出：查询结果按批从服务端游标读取，边读边编码为 CSV / NDJSON / JSON 数组分块输出，
+内存占用只与批大小和缓冲区大小有关，与导出行数无关。
+
+Usage:
+    rows = iter_query(query)
+    chunks = csv_chunks(rows, header=['学号', '姓名'], row_mapper=lambda r: [r.student_id, r.name])
+    return make_streaming_file_response(chunks, 'students.csv', 'text/csv')
+"""
+
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from flask import current_app, has_app_context
+
+from utils.xlsx_stream import DEFAULT_BUFFER_SIZE as XLSX_BUFFER_SIZE, XLSX_CONTENT_TYPE, xlsx_chunks
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_BUFFER_SIZE = 64 * 1024  # 缓冲区达到该字节数时输出一个分块
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'json': ('application/json', 'json'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'xlsx': (XLSX_CONTENT_TYPE, 'xlsx'),
+}
+
+
+def _batch_size(batch_size: Optional[int]) -> int:
+    if batch_size:
+        return batch_size
+    if has_app_context():
+        return current_app.config.get('EXPORT_STREAM_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    return DEFAULT_BATCH_SIZE
+
+
+def _xlsx_buffer_size() -> int:
+    if has_app_context():
+        return current_app.config.get('EXPORT_XLSX_BUFFER_SIZE', XLSX_BUFFER_SIZE)
+    return XLSX_BUFFER_SIZE
+
+
+def iter_query(query, batch_size: int = None) -> Iterator[Any]:
+    """
+    以服务端游标分批读取查询结果
+
+    Args:
+        query: SQLAlchemy查询
+        batch_size: 每批读取的行数，默认为 EXPORT_STREAM_BATCH_SIZE
+
+    Returns:
+        Iterator: 逐行产出查询结果
+    """
+    size = _batch_size(batch_size)
+    return iter(query.execution_options(stream_results=True, max_row_buffer=size).yield_per(size))
+
+
+def query_fields(query) -> List[str]:
+    """获取列查询的字段名（不执行查询）"""
+    return [column['name'] for column in query.column_descriptions]
+
+
+def to_json_value(value: Any) -> Any:
+    """转换为可JSON序列化的值"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def row_to_dict(row, fields: Sequence[str] = None) -> Dict[str, Any]:
+    """将查询结果行转换为字典"""
+    if fields is None:
+        fields = row._fields
+    return {field: to_json_value(value) for field, value in zip(fields, row)}
+
+
+def _drain(buffer: io.StringIO, encoding: str) -> bytes:
+    data = buffer.getvalue().encode(encoding)
+    buffer.seek(0)
+    buffer.truncate(0)
+    return data
+
+
+def csv_chunks(
+    rows: Iterable[Any],
+    header: Sequence[str] = None,
+    row_mapper: Callable[[Any], Sequence[Any]] = None,
+    bom: bool = True,
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> Iterator[bytes]:
+    """
+    将行编码为CSV分块
+
+    Args:
+        rows: 行迭代器
+        header: 表头
+        row_mapper: 行转换函数，默认直接写入行
+        bom: 是否输出UTF-8 BOM（便于Excel识别中文）
+        buffer_size: 分块字节数
+
+    Returns:
+        Iterator[bytes]: CSV分块
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if bom:
+        buffer.write('\ufeff')
+    if header:
+        writer.writerow(header)
+
+    for row in rows:
+        writer.writerow(row_mapper(row) if row_mapper else row)
+        if buffer.tell() >= buffer_size:
+            yield _drain(buffer, 'utf-8')
+
+    if buffer.tell():
+        yield _drain(buffer, 'utf-8')
+
+
+def ndjson_chunks(
+    rows: Iterable[Any],
+    row_mapper: Callable[[Any], Dict[str, Any]] = row_to_dict,
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> Iterator[bytes]:
+    """
+    将行编码为NDJSON（每行一个JSON对象）分块
+
+    Args:
+        rows: 行迭代器
+        row_mapper: 行转换为字典的函数
+        buffer_size: 分块字节数
+
+    Returns:
+        Iterator[bytes]: NDJSON分块
+    """
+    buffer = io.StringIO()
+
+    for row in rows:
+        buffer.write(json.dumps(row_mapper(row), ensure_ascii=False, default=to_json_value))
+        buffer.write('\n')
+        if buffer.tell() >= buffer_size:
+            yield _drain(buffer, 'utf-8')
+
+    if buffer.tell():
+        yield _drain(buffer, 'utf-8')
+
+
+def json_array_chunks(
+    rows: Iterable[Any],
+    row_mapper: Callable[[Any], Dict[str, Any]] = row_to_dict,
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> Iterator[bytes]:
+    """
+    将行编码为JSON数组分块
+
+    Args:
+        rows: 行迭代器
+        row_mapper: 行转换为字典的函数
+        buffer_size: 分块字节数
+
+    Returns:
+        Iterator[bytes]: JSON数组分块
+    """
+    buffer = io.StringIO()
+    buffer.write('[')
+    first = True
+
+    for row in rows:
+        if not first:
+            buffer.write(',')
+        buffer.write('\n')
+        buffer.write(json.dumps(row_mapper(row), ensure_ascii=False, default=to_json_value))
+        first = False
+        if buffer.tell() >= buffer_size:
+            yield _drain(buffer, 'utf-8')
+
+    buffer.write('\n]\n' if not first else ']\n')
+    yield _drain(buffer, 'utf-8')
+
+
+def export_chunks(
+    export_format: str,
+    rows: Iterable[Any],
+    header: Sequence[str] = None,
+    row_mapper: Callable[[Any], Sequence[Any]] = None,
+    dict_mapper: Callable[[Any], Dict[str, Any]] = None,
+    sheet_name: str = None
+) -> Iterator[bytes]:
+    """
+    按格式生成导出分块
+
+    Args:
+        export_format: csv/json/ndjson/xlsx
+        rows: 行迭代器
+        header: CSV/XLSX表头
+        row_mapper: CSV/XLSX行转换函数
+        dict_mapper: JSON行转换函数，默认按字段名转换
+        sheet_name: XLSX工作表名
+
+    Returns:
+        Iterator[bytes]: 导出分块
+
+    Raises:
+        ValueError: 不支持的导出格式
+    """
+    if export_format == 'csv':
+        return csv_chunks(rows, header, row_mapper)
+    if export_format == 'ndjson':
+        return ndjson_chunks(rows, dict_mapper or row_to_dict)
+    if export_format == 'json':
+        return json_array_chunks(rows, dict_mapper or row_to_dict)
+    if export_format == 'xlsx':
+        return xlsx_chunks(rows, header, row_mapper, sheet_name=sheet_name or 'Sheet1', buffer_size=_xlsx_buffer_size())
+    raise ValueError(f"不支持的导出格式: {export_format}")
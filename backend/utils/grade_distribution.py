@@ -0,0 +1,392 @@
+# ========================================
+# 学生信息管理系统 - 成绩分布引擎
+# ========================================
+
+"""
+成绩分布统一计算：分段直方图、等级分布、均值/标准差/中位数/百分位、及格率。
+
+同一套分段规则有两种实现，返回结构相同的结果：
+
+- query_distribution：数据库内计算。分段由 CASE 表达式换算为分段序号，与等级一起
+  GROUP BY，一条查询得到各组的计数、和、平方和、最值与及格数，汇总在内存中完成；
+  百分位按排序后的位置各取两个值插值（每个不同位置一条 LIMIT 2 查询），不传输成绩行
+- summarize：内存数据计算（安装numpy时向量化，否则逐个计算）
+
+分段边界为百分制分数，默认每10分一段；第 i 段为 [edges[i], edges[i+1])，最后一段
+包含上界，低于首个边界或高于末个边界的分数分别归入首段和末段。
+
+Usage:
+    source = select(grade_percentage(Grade).label('value')).where(Grade.course_id == course_id)
+    result = query_distribution(source, get_grading_scale())
+    result = summarize(percentages, get_grading_scale(), edges=(0, 60, 70, 80, 90, 100))
+    result['histogram'], result['grade_distribution'], result['percentiles']
+"""
+
+import math
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, select
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖
+    np = None
+
+DEFAULT_BIN_EDGES = tuple(range(0, 101, 10))
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+DEFAULT_PASSING_SCORE = 60
+
+# 与 GradingScale 一致的浮点误差容忍（如 0.29 * 100 = 28.999999999999996）
+_EPSILON = 1e-9
+
+
+def normalize_bin_edges(edges: Optional[Iterable[float]] = None) -> Tuple[float, ...]:
+    """
+    校验分段边界
+
+    Args:
+        edges: 分段边界（百分制），默认每10分一段
+
+    Returns:
+        Tuple[float, ...]: 边界
+
+    Raises:
+        ValueError: 边界少于两个或不是严格递增
+    """
+    edges = tuple(DEFAULT_BIN_EDGES if edges is None else edges)
+    if len(edges) < 2 or any(upper <= lower for lower, upper in zip(edges, edges[1:])):
+        raise ValueError("分段边界需至少两个且严格递增")
+    return edges
+
+
+def _edge_text(value: float) -> str:
+    return f'{value:g}'
+
+
+def histogram_labels(edges: Optional[Iterable[float]] = None) -> List[str]:
+    """
+    分段名称：整数边界为 “60-69”（最后一段 “90-100”），否则为 “59.5-69.5”
+
+    Args:
+        edges: 分段边界
+
+    Returns:
+        List[str]: 各段名称
+    """
+    edges = normalize_bin_edges(edges)
+    integral = all(float(edge).is_integer() for edge in edges)
+    labels = []
+    for index, (lower, upper) in enumerate(zip(edges, edges[1:])):
+        if integral and index < len(edges) - 2:
+            upper = upper - 1
+        labels.append(f'{_edge_text(lower)}-{_edge_text(upper)}')
+    return labels
+
+
+def _histogram(edges: Tuple[float, ...], counts: Sequence[int], labels: Sequence[str] = None) -> List[Dict[str, Any]]:
+    labels = labels or histogram_labels(edges)
+    return [
+        {'label': label, 'min': lower, 'max': upper, 'count': int(count)}
+        for label, lower, upper, count in zip(labels, edges, edges[1:], counts)
+    ]
+
+
+def _round(value: Optional[float], digits: int = 2) -> float:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 0
+    return round(float(value), digits)
+
+
+def _interpolate(lower_value: float, upper_value: float, fraction: float) -> float:
+    return lower_value + (upper_value - lower_value) * fraction
+
+
+def _result(count: int, total: float, squares: float, lowest, highest, passed: int,
+            percentile_values: Dict[float, float], histogram: List[Dict[str, Any]],
+            grade_distribution: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    if not count:
+        average = deviation = 0.0
+    else:
+        average = total / count
+        deviation = math.sqrt(max(squares / count - average * average, 0.0))
+    result = {
+        'count': count,
+        'average': _round(average),
+        'highest': _round(highest),
+        'lowest': _round(lowest),
+        'std_deviation': _round(deviation),
+        'median': _round(percentile_values.get(50)),
+        'percentiles': {
+            f'p{_edge_text(percent)}': _round(value) for percent, value in percentile_values.items() if percent != 50
+        },
+        'passed_count': passed,
+        'pass_rate': _round(passed / count * 100) if count else 0,
+        'histogram': histogram
+    }
+    if grade_distribution is not None:
+        result['grade_distribution'] = grade_distribution
+    return result
+
+
+def _percent_list(percentiles: Optional[Iterable[float]]) -> List[float]:
+    """请求的百分位，始终包含中位数"""
+    percents = list(DEFAULT_PERCENTILES if percentiles is None else percentiles)
+    if any(not 0 <= percent <= 100 for percent in percents):
+        raise ValueError("百分位需在0-100之间")
+    if 50 not in percents:
+        percents.append(50)
+    return percents
+
+
+# ========================================
+# 内存计算
+# ========================================
+
+def histogram_counts(values: Iterable[Optional[float]], edges: Optional[Iterable[float]] = None) -> List[int]:
+    """
+    分段计数（空值忽略）
+
+    Args:
+        values: 百分制分数
+        edges: 分段边界
+
+    Returns:
+        List[int]: 各段人数
+    """
+    edges = normalize_bin_edges(edges)
+    last = len(edges) - 2
+    if np is not None:
+        array = _float_array(values)
+        array = array[~np.isnan(array)]
+        bins = np.clip(np.searchsorted(edges, array + _EPSILON, side='right') - 1, 0, last)
+        return np.bincount(bins, minlength=last + 1).tolist()
+
+    counts = [0] * (last + 1)
+    for value in values:
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            continue
+        counts[min(max(bisect_right(edges, value + _EPSILON) - 1, 0), last)] += 1
+    return counts
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """线性插值百分位（与 numpy.percentile 默认方法一致），输入需已排序"""
+    if not sorted_values:
+        return 0
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return _interpolate(sorted_values[lower], sorted_values[upper], position - lower)
+
+
+def _float_array(values):
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return values.astype(float, copy=False)
+    return np.asarray([np.nan if value is None else value for value in values], dtype=float)
+
+
+def summarize(
+    values: Iterable[Optional[float]],
+    scale=None,
+    edges: Optional[Iterable[float]] = None,
+    percentiles: Optional[Iterable[float]] = None,
+    passing_score: Any = None,
+    labels: Sequence[str] = None
+) -> Dict[str, Any]:
+    """
+    内存数据的成绩分布
+
+    Args:
+        values: 百分制分数（None/NaN 表示无成绩，不参与统计）
+        scale: 成绩等级表（GradingScale），提供时统计等级分布
+        edges: 分段边界
+        percentiles: 百分位，默认 25/50/75/90（中位数始终计算）
+        passing_score: 及格线，可为单个值或与 values 对应的序列，默认取等级表及格线
+        labels: 分段名称，默认由边界生成
+
+    Returns:
+        Dict[str, Any]: count/average/highest/lowest/std_deviation/median/percentiles/
+                        passed_count/pass_rate/histogram，以及 grade_distribution（提供等级表时）
+    """
+    edges = normalize_bin_edges(edges)
+    percents = _percent_list(percentiles)
+    default_passing = scale.passing_score if scale is not None else DEFAULT_PASSING_SCORE
+    if passing_score is None:
+        passing_score = default_passing
+
+    if np is not None:
+        array = _float_array(values)
+        scored = ~np.isnan(array)
+        thresholds = passing_score
+        if not np.isscalar(passing_score):
+            thresholds = _float_array(passing_score)
+            thresholds = np.where(np.isnan(thresholds), default_passing, thresholds)[scored]
+        array_scored = array[scored]
+        count = int(array_scored.size)
+        distribution = None
+        if scale is not None:
+            bands = np.bincount(scale.band_indexes_for(array_scored), minlength=len(scale.letters) + 1)
+            distribution = dict(zip(scale.letters, bands[:-1].tolist()))
+        percentile_values = (
+            dict(zip(percents, np.percentile(array_scored, percents).tolist())) if count
+            else {percent: 0 for percent in percents}
+        )
+        return _result(
+            count,
+            float(array_scored.sum()),
+            float(np.square(array_scored).sum()),
+            array_scored.min() if count else 0,
+            array_scored.max() if count else 0,
+            int((array_scored + _EPSILON >= thresholds).sum()),
+            percentile_values,
+            _histogram(edges, histogram_counts(array_scored, edges), labels),
+            distribution
+        )
+
+    values = list(values)
+    if isinstance(passing_score, (int, float)):
+        thresholds = [passing_score] * len(values)
+    else:
+        thresholds = [default_passing if threshold is None else threshold for threshold in passing_score]
+    scored = [
+        (value, threshold) for value, threshold in zip(values, thresholds)
+        if value is not None and not (isinstance(value, float) and math.isnan(value))
+    ]
+    scores = sorted(value for value, _ in scored)
+    distribution = None
+    if scale is not None:
+        distribution = scale.empty_distribution()
+        for value in scores:
+            distribution[scale.letter_for(value)] += 1
+    return _result(
+        len(scores),
+        sum(scores),
+        sum(value * value for value in scores),
+        scores[0] if scores else 0,
+        scores[-1] if scores else 0,
+        sum(1 for value, threshold in scored if value + _EPSILON >= threshold),
+        {percent: percentile(scores, percent) for percent in percents},
+        _histogram(edges, histogram_counts(scores, edges), labels),
+        distribution
+    )
+
+
+# ========================================
+# 数据库计算
+# ========================================
+
+def bucket_case(value, edges: Optional[Iterable[float]] = None):
+    """
+    分段序号的SQL CASE表达式
+
+    使用比较链而不是 FLOOR(value / 宽度)：边界可以不等宽，且 SQLite 默认不提供
+    FLOOR、MySQL 的 CAST 为四舍五入，比较链在各数据库上结果一致。
+
+    Args:
+        value: 百分制分数的SQL表达式
+        edges: 分段边界
+
+    Returns:
+        SQL表达式，值为 0..段数-1，分数为NULL时结果为NULL
+    """
+    edges = normalize_bin_edges(edges)
+    inner = list(enumerate(edges[1:-1], start=1))
+    return case(
+        (value.is_(None), None),
+        *[(value >= edge, index) for index, edge in reversed(inner)],
+        else_=0
+    )
+
+
+def _subquery(source):
+    statement = getattr(source, 'statement', source)  # ORM Query -> Select
+    return statement.subquery('distribution_source')
+
+
+def query_distribution(
+    source,
+    scale=None,
+    edges: Optional[Iterable[float]] = None,
+    percentiles: Optional[Iterable[float]] = None,
+    labels: Sequence[str] = None,
+    session=None
+) -> Dict[str, Any]:
+    """
+    在数据库内计算成绩分布（结果与 summarize 相同）
+
+    Args:
+        source: Select 或 ORM Query，第一列为百分制分数；可带名为 passing_score 的列
+                作为逐行及格线（为NULL时使用默认及格线）
+        scale: 成绩等级表（GradingScale），提供时统计等级分布
+        edges: 分段边界
+        percentiles: 百分位，默认 25/50/75/90（中位数始终计算）
+        labels: 分段名称，默认由边界生成
+        session: 数据库会话，默认 db.session
+
+    Returns:
+        Dict[str, Any]: 同 summarize
+    """
+    if session is None:
+        from extensions import db
+        session = db.session
+
+    edges = normalize_bin_edges(edges)
+    percents = _percent_list(percentiles)
+    subquery = _subquery(source)
+    value = subquery.c[0]
+    default_passing = scale.passing_score if scale is not None else DEFAULT_PASSING_SCORE
+    threshold = (
+        func.coalesce(subquery.c.passing_score, default_passing)
+        if 'passing_score' in subquery.c else default_passing
+    )
+
+    bucket = bucket_case(value, edges).label('bucket')
+    group_columns = [bucket]
+    if scale is not None:
+        group_columns.append(scale.letter_case(value).label('letter'))
+
+    rows = session.execute(
+        select(
+            *group_columns,
+            func.count().label('count'),
+            func.sum(value).label('total'),
+            func.sum(value * value).label('squares'),
+            func.min(value).label('lowest'),
+            func.max(value).label('highest'),
+            func.sum(case((value >= threshold, 1), else_=0)).label('passed')
+        ).where(value.isnot(None)).group_by(*group_columns)
+    ).all()
+
+    bins = [0] * (len(edges) - 1)
+    distribution = scale.empty_distribution() if scale is not None else None
+    count = passed = 0
+    total = squares = 0.0
+    lowest = highest = None
+    for row in rows:
+        bins[row.bucket] += row.count
+        if distribution is not None:
+            distribution[row.letter] += row.count
+        count += row.count
+        total += float(row.total)
+        squares += float(row.squares)
+        passed += int(row.passed or 0)
+        lowest = row.lowest if lowest is None else min(lowest, row.lowest)
+        highest = row.highest if highest is None else max(highest, row.highest)
+
+    percentile_values = {percent: 0 for percent in percents}
+    if count:
+        ordered = select(value).where(value.isnot(None)).order_by(value)
+        fetched: Dict[int, List[float]] = {}
+        for percent in percents:
+            position = (count - 1) * percent / 100
+            lower = math.floor(position)
+            if lower not in fetched:
+                fetched[lower] = [float(v) for v in session.execute(ordered.offset(lower).limit(2)).scalars()]
+            pair = fetched[lower]
+            percentile_values[percent] = _interpolate(pair[0], pair[-1], position - lower)
+
+    return _result(
+        count, total, squares, lowest or 0, highest or 0, passed,
+        percentile_values, _histogram(edges, bins, labels), distribution
+    )
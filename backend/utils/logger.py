@@ -330,9 +330,9 @@ class AuditLogger:
         self,
         user_id: int,
         permission: str,
+        granted: bool,
         resource_type: str = None,
-        resource_id: int = None,
-        granted: bool
+        resource_id: int = None
     ):
         """记录权限检查"""
         self.log_action(
@@ -371,6 +371,12 @@ class PerformanceLogger:
         self.logger = logging.getLogger('performance')
         self._setup_performance_logger()
 
+        # 按语句指纹聚合的SQL统计
+        self._query_stats: Dict[str, Dict[str, Any]] = {}
+        self._query_stats_lock = threading.Lock()
+        self._query_stats_since = datetime.utcnow()
+        self._max_query_fingerprints = current_app.config.get('SQL_PROFILER_MAX_FINGERPRINTS', 1000)
+
     def _setup_performance_logger(self):
         """设置性能日志器"""
         if self.logger.handlers:
@@ -402,16 +408,127 @@ class PerformanceLogger:
     ):
         """记录慢查询"""
         if execution_time > threshold:
-            self.logger.info(
-                f"Slow query detected",
-                extra_fields={
-                    'query': query,
-                    'execution_time': execution_time,
-                    'parameters': parameters,
-                    'threshold': threshold
-                }
+            self._log(
+                LogLevel.WARNING,
+                "Slow query detected",
+                query=query,
+                execution_time=execution_time,
+                parameters=parameters,
+                threshold=threshold
+            )
+
+    def record_request_queries(
+        self,
+        endpoint: str,
+        method: str,
+        profile,
+        duplicates: List[Dict[str, Any]] = None,
+        slow_query_threshold: float = 0.5
+    ):
+        """
+        汇总单个请求的SQL统计
+
+        Args:
+            endpoint: 请求端点
+            method: 请求方法
+            profile: 请求SQL统计 (RequestQueryProfile)
+            duplicates: 重复执行的语句（疑似N+1）
+            slow_query_threshold: 慢查询阈值（秒）
+        """
+        with self._query_stats_lock:
+            for fingerprint, count in profile.fingerprint_counts.items():
+                stats = self._query_stats.get(fingerprint)
+                if stats is None:
+                    if len(self._query_stats) >= self._max_query_fingerprints:
+                        self._evict_query_stats()
+                    stats = self._query_stats[fingerprint] = {
+                        'fingerprint': fingerprint,
+                        'statement': profile.fingerprint_statements[fingerprint],
+                        'count': 0,
+                        'total_time': 0.0,
+                        'max_time': 0.0,
+                        'requests': 0,
+                        'endpoints': set()
+                    }
+
+                stats['count'] += count
+                stats['total_time'] += profile.fingerprint_times[fingerprint]
+                stats['max_time'] = max(stats['max_time'], profile.fingerprint_max_times[fingerprint])
+                stats['requests'] += 1
+                if len(stats['endpoints']) < 20:
+                    stats['endpoints'].add(f"{method} {endpoint}")
+
+        for item in profile.slowest:
+            self.log_slow_query(item['statement'], item['duration_ms'] / 1000, threshold=slow_query_threshold)
+
+        if duplicates:
+            self._log(
+                LogLevel.WARNING,
+                "Duplicate queries detected",
+                endpoint=endpoint,
+                method=method,
+                query_count=profile.query_count,
+                db_time_ms=round(profile.total_time * 1000, 3),
+                duplicates=[
+                    {'fingerprint': item['fingerprint'], 'statement': item['statement'], 'count': item['count']}
+                    for item in duplicates
+                ]
             )
 
+    def _evict_query_stats(self):
+        """淘汰累计耗时最少的四分之一指纹，控制内存占用"""
+        evict_count = max(1, len(self._query_stats) // 4)
+        victims = sorted(self._query_stats.values(), key=lambda item: item['total_time'])[:evict_count]
+        for item in victims:
+            del self._query_stats[item['fingerprint']]
+
+    def get_top_queries(self, limit: int = 20, order_by: str = 'total_time') -> Dict[str, Any]:
+        """
+        获取SQL统计排行
+
+        Args:
+            limit: 返回数量
+            order_by: 排序字段 (total_time/count/avg_time/max_time)
+
+        Returns:
+            Dict: 统计起始时间和排行列表
+        """
+        with self._query_stats_lock:
+            items = [
+                {
+                    'fingerprint': stats['fingerprint'],
+                    'statement': stats['statement'],
+                    'count': stats['count'],
+                    'requests': stats['requests'],
+                    'total_time': stats['total_time'],
+                    'avg_time': stats['total_time'] / stats['count'] if stats['count'] else 0.0,
+                    'max_time': stats['max_time'],
+                    'queries_per_request': stats['count'] / stats['requests'] if stats['requests'] else 0.0,
+                    'endpoints': sorted(stats['endpoints'])
+                }
+                for stats in self._query_stats.values()
+            ]
+            since = self._query_stats_since
+
+        items.sort(key=lambda item: item.get(order_by, item['total_time']), reverse=True)
+
+        for item in items:
+            for key in ('total_time', 'avg_time', 'max_time'):
+                item[f"{key}_ms"] = round(item.pop(key) * 1000, 3)
+            item['queries_per_request'] = round(item['queries_per_request'], 2)
+
+        return {
+            'since': since.isoformat(),
+            'fingerprints': len(items),
+            'queries': items[:limit]
+        }
+
+    def reset_query_stats(self):
+        """清空SQL统计"""
+        with self._query_stats_lock:
+            self._query_stats.clear()
+            self._query_stats_since = datetime.utcnow()
+
     def log_api_performance(
         self,
         endpoint: str,
@@ -0,0 +1,483 @@
+# ========================================
+# 学生信息管理系统 - 分页工具类
+# ========================================
+
+import base64
+import binascii
+import hashlib
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import and_, or_, text
+
+from extensions import db
+
+# 总数统计模式
+COUNT_MODES = ('exact', 'estimated', 'cached', 'none')
+
+# 游标中排序值的列标签
+_KEYSET_SORT_LABEL = '_keyset_sort_value'
+
+
+class InvalidCursorError(ValueError):
+    """分页游标无效"""
+
+    def __init__(self, message: str = "分页游标无效"):
+        super().__init__(message)
+
+
+class OffsetPage:
+    """OFFSET分页结果"""
+
+    def __init__(self, items: List[Any], page: int, per_page: int, total: Optional[int]):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def pages(self) -> Optional[int]:
+        """总页数（未统计总数时为None）"""
+        if self.total is None:
+            return None
+        return (self.total + self.per_page - 1) // self.per_page if self.per_page else 0
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        if self.total is None:
+            return len(self.items) >= self.per_page
+        return self.page < (self.pages or 0)
+
+    def to_meta(self) -> Dict[str, Any]:
+        """分页元数据（保持原有响应字段）"""
+        return {
+            'total': self.total,
+            'page': self.page,
+            'per_page': self.per_page,
+            'pages': self.pages
+        }
+
+
+class KeysetPage:
+    """键集（游标）分页结果"""
+
+    def __init__(
+        self,
+        items: List[Any],
+        per_page: int,
+        next_cursor: Optional[str],
+        total: Optional[int] = None,
+        cursor: Optional[str] = None
+    ):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.total = total
+        self.cursor = cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def to_meta(self) -> Dict[str, Any]:
+        """分页元数据"""
+        return {
+            'total': self.total,
+            'per_page': self.per_page,
+            'cursor': self.cursor or None,
+            'next_cursor': self.next_cursor,
+            'has_next': self.has_next
+        }
+
+
+# ========================================
+# 游标编码
+# ========================================
+
+def _dump_value(value: Any) -> Any:
+    """将排序值转换为可JSON序列化的形式"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'value') and hasattr(type(value), '__members__'):
+        # 枚举
+        return value.value
+    return value
+
+
+def _restore_value(column: Any, value: Any) -> Any:
+    """
+    根据列类型还原游标中的排序值
+
+    Raises:
+        InvalidCursorError: 值与列类型不符（游标被篡改或已过时）
+    """
+    if value is None:
+        return None
+
+    column_type = getattr(column, 'type', None)
+    try:
+        enum_class = getattr(column_type, 'enum_class', None)
+        if enum_class is not None:
+            return enum_class(value)
+
+        try:
+            python_type = column_type.python_type
+        except (AttributeError, NotImplementedError):
+            return value
+
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is Decimal:
+            return Decimal(value)
+        if python_type is uuid.UUID:
+            return uuid.UUID(value)
+        return value
+    except (ValueError, TypeError, InvalidOperation):
+        raise InvalidCursorError()
+
+
+def encode_cursor(sort_key: str, sort_value: Any, last_id: Any, descending: bool) -> str:
+    """
+    编码分页游标
+
+    游标包含排序字段名和方向，排序条件改变后旧游标会被拒绝。
+
+    Args:
+        sort_key: 排序字段名
+        sort_value: 最后一行的排序值
+        last_id: 最后一行的ID
+        descending: 是否降序
+
+    Returns:
+        str: URL安全的不透明游标
+    """
+    payload = {
+        'k': sort_key,
+        'd': 1 if descending else 0,
+        'v': _dump_value(sort_value),
+        'i': _dump_value(last_id)
+    }
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str, sort_key: str, descending: bool) -> Dict[str, Any]:
+    """
+    解码分页游标
+
+    Args:
+        cursor: 游标字符串
+        sort_key: 当前请求的排序字段名
+        descending: 当前请求是否降序
+
+    Returns:
+        Dict[str, Any]: 包含 sort_value 和 last_id 的字典
+
+    Raises:
+        InvalidCursorError: 游标格式错误或排序条件已改变
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        raise InvalidCursorError()
+
+    if not isinstance(payload, dict) or 'i' not in payload:
+        raise InvalidCursorError()
+
+    if payload.get('k') != sort_key or bool(payload.get('d')) != bool(descending):
+        raise InvalidCursorError("排序条件已改变，请从第一页重新获取")
+
+    return {'sort_value': payload.get('v'), 'last_id': payload['i']}
+
+
+# ========================================
+# 总数统计
+# ========================================
+
+def _estimate_table_rows(query) -> Optional[int]:
+    """无过滤条件时读取数据库统计信息估算表行数"""
+    if query.whereclause is not None:
+        return None
+
+    descriptions = query.column_descriptions
+    if len(descriptions) != 1:
+        return None
+
+    table = getattr(descriptions[0].get('entity'), '__table__', None)
+    if table is None:
+        return None
+
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        sql = text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+        )
+    elif dialect == 'postgresql':
+        sql = text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table_name")
+    else:
+        return None
+
+    estimate = db.session.execute(sql, {'table_name': table.name}).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def _count_cache_key(query) -> str:
+    """根据SQL语句和参数生成总数缓存键"""
+    compiled = query.order_by(None).statement.compile()
+    params = sorted((key, repr(value)) for key, value in compiled.params.items())
+    digest = hashlib.md5(f"{compiled}|{params}".encode('utf-8')).hexdigest()
+    return f"pagination:count:{digest}"
+
+
+def count_query(query, count_mode: str = 'exact') -> Optional[int]:
+    """
+    统计查询总数
+
+    Args:
+        query: SQLAlchemy查询
+        count_mode: exact（精确COUNT）、estimated（表统计信息估算，
+            有过滤条件时退化为cached）、cached（缓存精确COUNT）、none（不统计）
+
+    Returns:
+        Optional[int]: 总数，count_mode为none时返回None
+    """
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"不支持的总数统计模式: {count_mode}")
+
+    if count_mode == 'none':
+        return None
+
+    if count_mode == 'exact':
+        return query.order_by(None).count()
+
+    if count_mode == 'estimated':
+        estimate = _estimate_table_rows(query)
+        if estimate is not None:
+            return estimate
+
+    from utils.cache import get_cache_manager
+
+    cache_manager = get_cache_manager()
+    cache_key = _count_cache_key(query)
+    total = cache_manager.get(cache_key)
+    if total is None:
+        total = query.order_by(None).count()
+        cache_manager.set(
+            cache_key,
+            total,
+            timeout=current_app.config.get('PAGINATION_COUNT_CACHE_TIMEOUT', 60)
+        )
+    return total
+
+
+# ========================================
+# 分页
+# ========================================
+
+def _clamp_per_page(per_page: int) -> int:
+    """限制每页数量"""
+    max_page_size = current_app.config.get('MAX_PAGE_SIZE', 100)
+    return max(1, min(int(per_page), max_page_size))
+
+
+def paginate_query(query, page: int = 1, per_page: int = 20, count_mode: str = 'exact') -> OffsetPage:
+    """
+    OFFSET分页
+
+    Args:
+        query: 已排序的SQLAlchemy查询
+        page: 页码
+        per_page: 每页数量
+        count_mode: 总数统计模式，见 count_query
+
+    Returns:
+        OffsetPage: 分页结果
+    """
+    page = max(1, int(page))
+    per_page = _clamp_per_page(per_page)
+
+    items = query.limit(per_page).offset((page - 1) * per_page).all()
+
+    if page == 1 and len(items) < per_page and count_mode != 'none':
+        # 第一页未满时无需额外COUNT
+        total = len(items)
+    else:
+        total = count_query(query, count_mode)
+
+    return OffsetPage(items, page, per_page, total)
+
+
+def _is_nullable(column: Any) -> bool:
+    """排序列是否可能为NULL"""
+    expression = getattr(column, 'expression', column)
+    return getattr(expression, 'nullable', True)
+
+
+def _keyset_condition(sort_column, id_column, sort_value, last_id, descending: bool):
+    """
+    构造"位于游标之后"的过滤条件
+
+    NULL按MySQL/SQLite的默认顺序处理：升序排在最前，降序排在最后。
+    """
+    if sort_value is None:
+        if descending:
+            return and_(sort_column.is_(None), id_column < last_id)
+        return or_(
+            and_(sort_column.is_(None), id_column > last_id),
+            sort_column.isnot(None)
+        )
+
+    if descending:
+        conditions = [
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < last_id)
+        ]
+        if _is_nullable(sort_column):
+            conditions.append(sort_column.is_(None))
+        return or_(*conditions)
+
+    return or_(
+        sort_column > sort_value,
+        and_(sort_column == sort_value, id_column > last_id)
+    )
+
+
+def keyset_paginate_query(
+    query,
+    sort_column: Any,
+    id_column: Any,
+    per_page: int = 20,
+    cursor: Optional[str] = None,
+    sort_key: str = 'id',
+    descending: bool = False,
+    count_mode: str = 'none'
+) -> KeysetPage:
+    """
+    键集（游标）分页
+
+    按 (sort_column, id_column) 排序并以最后一行的值作为下一页的起点，
+    翻页代价与页深无关。查询不应预先设置 ORDER BY。
+
+    Args:
+        query: 未排序的SQLAlchemy查询
+        sort_column: 排序列
+        id_column: 唯一ID列，用于打破排序值相同的行
+        per_page: 每页数量
+        cursor: 上一页返回的 next_cursor，为空表示第一页
+        sort_key: 排序字段名，写入游标用于校验
+        descending: 是否降序
+        count_mode: 总数统计模式，见 count_query
+
+    Returns:
+        KeysetPage: 分页结果
+    """
+    per_page = _clamp_per_page(per_page)
+    sort_by_id = sort_column is None or sort_column is id_column
+
+    total = count_query(query, count_mode)
+
+    if cursor:
+        position = decode_cursor(cursor, sort_key, descending)
+        last_id = _restore_value(id_column, position['last_id'])
+        if sort_by_id:
+            condition = id_column < last_id if descending else id_column > last_id
+        else:
+            sort_value = _restore_value(sort_column, position['sort_value'])
+            condition = _keyset_condition(sort_column, id_column, sort_value, last_id, descending)
+        query = query.filter(condition)
+
+    if sort_by_id:
+        order = [id_column.desc() if descending else id_column.asc()]
+    else:
+        query = query.add_columns(sort_column.label(_KEYSET_SORT_LABEL))
+        if descending:
+            order = [sort_column.desc(), id_column.desc()]
+        else:
+            order = [sort_column.asc(), id_column.asc()]
+
+    # 多取一行用于判断是否还有下一页
+    rows = query.order_by(*order).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if sort_by_id:
+        items = rows
+    else:
+        items = [row[0] for row in rows]
+
+    next_cursor = None
+    if has_next and rows:
+        last_item = items[-1]
+        last_sort_value = None if sort_by_id else rows[-1][-1]
+        next_cursor = encode_cursor(sort_key, last_sort_value, last_item.id, descending)
+
+    return KeysetPage(items, per_page, next_cursor, total=total, cursor=cursor)
+
+
+def paginate(
+    query,
+    sort_column: Any,
+    id_column: Any,
+    page: int = 1,
+    per_page: int = 20,
+    cursor: Optional[str] = None,
+    sort_key: str = 'id',
+    descending: bool = False,
+    count_mode: Optional[str] = None
+):
+    """
+    列表接口统一分页入口
+
+    请求携带 cursor 参数（第一页传空字符串）时使用键集分页，否则使用OFFSET分页。
+    两种方式都按 (sort_column, id_column) 排序，保证翻页稳定。
+
+    Args:
+        query: 未排序的SQLAlchemy查询
+        sort_column: 排序列
+        id_column: 唯一ID列
+        page: OFFSET分页页码
+        per_page: 每页数量
+        cursor: 键集分页游标，None表示使用OFFSET分页
+        sort_key: 排序字段名
+        descending: 是否降序
+        count_mode: 总数统计模式，默认OFFSET分页为exact、键集分页为none
+
+    Returns:
+        OffsetPage | KeysetPage: 分页结果，通过 to_meta() 获取分页元数据
+    """
+    if cursor is not None:
+        return keyset_paginate_query(
+            query,
+            sort_column,
+            id_column,
+            per_page=per_page,
+            cursor=cursor,
+            sort_key=sort_key,
+            descending=descending,
+            count_mode=count_mode or 'none'
+        )
+
+    if sort_column is None or sort_column is id_column:
+        order = [id_column.desc() if descending else id_column.asc()]
+    elif descending:
+        order = [sort_column.desc(), id_column.desc()]
+    else:
+        order = [sort_column.asc(), id_column.asc()]
+
+    return paginate_query(query.order_by(*order), page, per_page, count_mode or 'exact')
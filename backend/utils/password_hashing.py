@@ -0,0 +1,372 @@
+# ========================================
+# 学生信息管理系统 - 密码哈希服务
+# ========================================
+
+"""
+密码哈希服务：在独立进程池中计算密码哈希，不占用请求线程的 CPU。
+
+- 支持 argon2（argon2-cffi）、bcrypt 和 pbkdf2（werkzeug 格式，与已有密码兼容）
+- 验证时按哈希前缀识别算法；哈希算法或参数与当前配置不同时，在同一次
+  工作进程调用中顺带计算新哈希，登录成功后透明升级
+- 准入控制：排队和执行中的任务数有上限（PASSWORD_HASH_MAX_PENDING），
+  等待 PASSWORD_HASH_ADMISSION_TIMEOUT 秒仍无空位时抛出 PasswordHashingBusy，
+  登录高峰只会让登录接口返回 503，不会拖垮其他接口
+- 工作进程数默认为 CPU 核数的一半，其余核留给请求处理
+
+argon2-cffi 和 bcrypt 为可选依赖，未安装时对应的 *_available() 返回 False，
+配置的算法不可用时退回 pbkdf2。PASSWORD_HASH_WORKERS=0 时在调用线程中计算（开发和测试用）。
+
+Usage:
+    hasher = get_password_hasher()
+    password_hash = hasher.hash(password)
+    valid, new_hash = hasher.verify_and_upgrade(password, user.password_hash)
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional, Tuple
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import bcrypt
+except ImportError:  # bcrypt 为可选依赖
+    bcrypt = None
+
+try:
+    import argon2
+    from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
+except ImportError:  # argon2-cffi 为可选依赖
+    argon2 = None
+
+DEFAULT_SCHEME = 'pbkdf2'
+DEFAULT_PBKDF2_ITERATIONS = 600000
+DEFAULT_BCRYPT_ROUNDS = 12
+DEFAULT_ARGON2_TIME_COST = 3
+DEFAULT_ARGON2_MEMORY_COST = 65536  # KiB
+DEFAULT_ARGON2_PARALLELISM = 1
+DEFAULT_MAX_PENDING_PER_WORKER = 8
+DEFAULT_ADMISSION_TIMEOUT = 2.0
+DEFAULT_TASK_TIMEOUT = 30.0
+DEFAULT_START_METHOD = 'spawn'
+
+_password_hasher = None
+_password_hasher_lock = threading.Lock()
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def bcrypt_available() -> bool:
+    """是否可用 bcrypt（已安装bcrypt）"""
+    return bcrypt is not None
+
+
+def argon2_available() -> bool:
+    """是否可用 argon2（已安装argon2-cffi）"""
+    return argon2 is not None
+
+
+class PasswordHashingBusy(Exception):
+    """密码哈希任务已满，请求被拒绝"""
+
+
+# ========================================
+# 哈希算法
+# ========================================
+
+class Pbkdf2Hasher:
+    """PBKDF2-SHA256，werkzeug 格式：pbkdf2:sha256:迭代次数$盐$哈希"""
+
+    name = 'pbkdf2'
+
+    def __init__(self, iterations: int = DEFAULT_PBKDF2_ITERATIONS):
+        self.iterations = iterations
+
+    @staticmethod
+    def identify(encoded: str) -> bool:
+        return encoded.startswith('pbkdf2:')
+
+    def hash(self, password: str) -> str:
+        return generate_password_hash(password, method=f'pbkdf2:sha256:{self.iterations}', salt_length=16)
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return check_password_hash(encoded, password)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        method = encoded.split('$', 1)[0].split(':')
+        return len(method) != 3 or method[1] != 'sha256' or method[2] != str(self.iterations)
+
+
+class BcryptHasher:
+    """bcrypt：$2b$轮数$盐和哈希"""
+
+    name = 'bcrypt'
+
+    def __init__(self, rounds: int = DEFAULT_BCRYPT_ROUNDS):
+        self.rounds = rounds
+
+    @staticmethod
+    def identify(encoded: str) -> bool:
+        return encoded.startswith(('$2a$', '$2b$', '$2y$'))
+
+    def hash(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('ascii')
+
+    def verify(self, password: str, encoded: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), encoded.encode('ascii'))
+        except ValueError:
+            return False
+
+    def needs_rehash(self, encoded: str) -> bool:
+        parts = encoded.split('$')
+        return len(parts) < 3 or parts[2] != f'{self.rounds:02d}'
+
+
+class Argon2Hasher:
+    """argon2id：$argon2id$v=19$m=内存,t=迭代,p=并行度$盐$哈希"""
+
+    name = 'argon2'
+
+    def __init__(self, time_cost: int = DEFAULT_ARGON2_TIME_COST, memory_cost: int = DEFAULT_ARGON2_MEMORY_COST,
+                 parallelism: int = DEFAULT_ARGON2_PARALLELISM):
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+
+    @staticmethod
+    def identify(encoded: str) -> bool:
+        return encoded.startswith('$argon2')
+
+    def _hasher(self):
+        return argon2.PasswordHasher(
+            time_cost=self.time_cost, memory_cost=self.memory_cost, parallelism=self.parallelism
+        )
+
+    def hash(self, password: str) -> str:
+        return self._hasher().hash(password)
+
+    def verify(self, password: str, encoded: str) -> bool:
+        try:
+            return self._hasher().verify(encoded, password)
+        except (VerifyMismatchError, VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return self._hasher().check_needs_rehash(encoded)
+
+
+PASSWORD_HASHERS = {
+    Pbkdf2Hasher.name: Pbkdf2Hasher,
+    BcryptHasher.name: BcryptHasher,
+    Argon2Hasher.name: Argon2Hasher
+}
+
+
+def scheme_available(scheme: str) -> bool:
+    """哈希算法是否可用"""
+    if scheme == BcryptHasher.name:
+        return bcrypt_available()
+    if scheme == Argon2Hasher.name:
+        return argon2_available()
+    return scheme in PASSWORD_HASHERS
+
+
+# ========================================
+# 工作进程任务
+# ========================================
+
+def _hash_task(hasher, password: str) -> str:
+    return hasher.hash(password)
+
+
+def _verify_task(hasher, password: str, encoded: str) -> Tuple[bool, Optional[str]]:
+    """
+    验证密码，需要升级时顺带计算新哈希
+
+    Returns:
+        tuple: (是否正确, 新哈希或None)
+    """
+    if not encoded:
+        return False, None
+
+    if hasher.identify(encoded):
+        if not hasher.verify(password, encoded):
+            return False, None
+        return True, hasher.hash(password) if hasher.needs_rehash(encoded) else None
+
+    for scheme, hasher_class in PASSWORD_HASHERS.items():
+        if hasher_class.identify(encoded):
+            if not scheme_available(scheme) or not hasher_class().verify(password, encoded):
+                return False, None
+            break
+    else:
+        # werkzeug 的其他格式（如 scrypt）
+        try:
+            if not check_password_hash(encoded, password):
+                return False, None
+        except ValueError:
+            return False, None
+
+    return True, hasher.hash(password)
+
+
+# ========================================
+# 哈希服务
+# ========================================
+
+class PasswordHasher:
+    """密码哈希服务"""
+
+    def __init__(self, hasher=None, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 admission_timeout: float = DEFAULT_ADMISSION_TIMEOUT, task_timeout: float = DEFAULT_TASK_TIMEOUT,
+                 start_method: str = DEFAULT_START_METHOD):
+        """
+        Args:
+            hasher: 当前哈希算法（新密码和升级使用），默认 pbkdf2
+            workers: 工作进程数，默认为 CPU 核数的一半；0 表示在调用线程中计算
+            max_pending: 排队和执行中的任务上限，默认为 工作进程数×8
+            admission_timeout: 等待空位的最长时间（秒）
+            task_timeout: 单个任务的最长等待时间（秒）
+            start_method: 工作进程启动方式
+        """
+        self.hasher = hasher or Pbkdf2Hasher()
+        self.workers = max(1, (os.cpu_count() or 2) // 2) if workers is None else workers
+        self.max_pending = max_pending or max(1, self.workers) * DEFAULT_MAX_PENDING_PER_WORKER
+        self.admission_timeout = admission_timeout
+        self.task_timeout = task_timeout
+        self.start_method = start_method
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context(self.start_method)
+                    )
+        return self._executor
+
+    def _run(self, task, *args):
+        if not self._slots.acquire(timeout=self.admission_timeout):
+            raise PasswordHashingBusy("当前登录人数过多，请稍后再试")
+        try:
+            if self.workers == 0:
+                return task(*args)
+            try:
+                return self._get_executor().submit(task, *args).result(timeout=self.task_timeout)
+            except BrokenProcessPool:
+                # 工作进程异常退出，重建进程池后重试一次
+                with self._executor_lock:
+                    self._executor = None
+                return self._get_executor().submit(task, *args).result(timeout=self.task_timeout)
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """
+        计算密码哈希
+
+        Args:
+            password: 明文密码
+
+        Returns:
+            str: 哈希后的密码
+
+        Raises:
+            PasswordHashingBusy: 任务已满
+        """
+        return self._run(_hash_task, self.hasher, password)
+
+    def verify_and_upgrade(self, password: str, encoded: str) -> Tuple[bool, Optional[str]]:
+        """
+        验证密码，算法或参数已变化时返回新哈希
+
+        Args:
+            password: 明文密码
+            encoded: 已保存的哈希
+
+        Returns:
+            tuple: (是否正确, 新哈希或None)；新哈希不为 None 时调用方应保存
+
+        Raises:
+            PasswordHashingBusy: 任务已满
+        """
+        return self._run(_verify_task, self.hasher, password, encoded)
+
+    def verify(self, password: str, encoded: str) -> bool:
+        """验证密码"""
+        return self.verify_and_upgrade(password, encoded)[0]
+
+    def shutdown(self):
+        """关闭工作进程"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+def create_hasher(scheme: str, **params):
+    """
+    按名称创建哈希算法
+
+    Args:
+        scheme: argon2/bcrypt/pbkdf2
+        params: 算法参数
+
+    Returns:
+        哈希算法实例
+
+    Raises:
+        ValueError: 不支持的算法
+    """
+    if scheme not in PASSWORD_HASHERS:
+        raise ValueError(f"不支持的密码哈希算法: {scheme}")
+    return PASSWORD_HASHERS[scheme](**params)
+
+
+def _configured_hasher():
+    scheme = _config('PASSWORD_HASH_SCHEME', DEFAULT_SCHEME)
+    if not scheme_available(scheme):
+        if has_app_context():
+            current_app.logger.warning(f"密码哈希算法 {scheme} 不可用，使用 {DEFAULT_SCHEME}")
+        scheme = DEFAULT_SCHEME
+
+    if scheme == Argon2Hasher.name:
+        return Argon2Hasher(
+            _config('PASSWORD_HASH_ARGON2_TIME_COST', DEFAULT_ARGON2_TIME_COST),
+            _config('PASSWORD_HASH_ARGON2_MEMORY_COST', DEFAULT_ARGON2_MEMORY_COST),
+            _config('PASSWORD_HASH_ARGON2_PARALLELISM', DEFAULT_ARGON2_PARALLELISM)
+        )
+    if scheme == BcryptHasher.name:
+        return BcryptHasher(_config('BCRYPT_LOG_ROUNDS', DEFAULT_BCRYPT_ROUNDS))
+    return Pbkdf2Hasher(_config('PASSWORD_HASH_PBKDF2_ITERATIONS', DEFAULT_PBKDF2_ITERATIONS))
+
+
+def get_password_hasher() -> PasswordHasher:
+    """获取全局密码哈希服务"""
+    global _password_hasher
+    if _password_hasher is None:
+        with _password_hasher_lock:
+            if _password_hasher is None:
+                _password_hasher = PasswordHasher(
+                    _configured_hasher(),
+                    workers=_config('PASSWORD_HASH_WORKERS', None),
+                    max_pending=_config('PASSWORD_HASH_MAX_PENDING', None),
+                    admission_timeout=_config('PASSWORD_HASH_ADMISSION_TIMEOUT', DEFAULT_ADMISSION_TIMEOUT),
+                    task_timeout=_config('PASSWORD_HASH_TASK_TIMEOUT', DEFAULT_TASK_TIMEOUT),
+                    start_method=_config('PASSWORD_HASH_START_METHOD', DEFAULT_START_METHOD)
+                )
+    return _password_hasher
@@ -0,0 +1,294 @@
+# ========================================
+# 学生信息管理系统 - 当前用户主体缓存
+# ========================================
+
+"""
+已认证用户的主体（Principal）缓存：权限检查不再每个请求查询 User 和 Admin。
+
+- Principal 是不可变的用户快照：ID、用户名、角色、是否激活和权限位集，
+  权限检查是一次位运算
+- 缓存按 (用户ID, 令牌代数) 查找：撤销用户全部令牌后代数变化，旧条目自然失效，
+  各实例通过令牌撤销列表的同步得知新代数
+- UserService 修改角色、激活、停用用户时撤销其全部令牌并清除本地条目；
+  其他途径的修改（如管理员权限调整）在 PRINCIPAL_CACHE_TTL 秒内生效
+- g.current_user 为 CurrentUser：id、role、has_permission 等取自 Principal，
+  访问其他属性时才加载 User
+
+Usage:
+    principal = load_current_principal()
+    if principal and principal.has_permission('user_management'):
+        ...
+    invalidate_principal(user_id)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from flask import current_app, g, has_app_context
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_CACHE_TTL = 300
+
+_principal_cache = None
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+# ========================================
+# 权限位
+# ========================================
+
+_permission_bits: Dict[str, int] = {}
+_permission_bits_lock = threading.Lock()
+
+
+def permission_bit(permission: str) -> int:
+    """权限对应的位（首次出现的权限名分配新位）"""
+    bit = _permission_bits.get(permission)
+    if bit is None:
+        with _permission_bits_lock:
+            bit = _permission_bits.get(permission)
+            if bit is None:
+                bit = _permission_bits[permission] = 1 << len(_permission_bits)
+    return bit
+
+
+def permission_mask(permissions) -> int:
+    """权限名集合对应的位集"""
+    mask = 0
+    for permission in permissions:
+        mask |= permission_bit(permission)
+    return mask
+
+
+class Principal(NamedTuple):
+    """已认证用户的不可变快照"""
+    user_id: str
+    username: str
+    role: Any  # UserRole
+    active: bool
+    generation: int
+    permission_bits: int
+    super_admin: bool = False
+
+    def has_permission(self, permission: str) -> bool:
+        """检查是否有指定权限（位运算）"""
+        return self.super_admin or bool(self.permission_bits & permission_bit(permission))
+
+    def has_all(self, mask: int) -> bool:
+        """检查是否拥有位集中的全部权限"""
+        return self.super_admin or self.permission_bits & mask == mask
+
+
+def build_principal(user, generation: int = 0) -> Principal:
+    """
+    由 User 构建主体（管理员额外查询一次 Admin）
+
+    Args:
+        user: 用户
+        generation: 令牌代数
+
+    Returns:
+        Principal: 主体
+    """
+    from models import Admin
+    from models.admin import AdminLevel
+    from models.user import STUDENT_PERMISSIONS, TEACHER_PERMISSIONS, UserRole
+
+    bits = 0
+    super_admin = False
+    if user.role == UserRole.ADMIN:
+        admin = Admin.query.filter_by(user_id=user.id).first()
+        # 与 Admin.has_permission 一致：没有权限配置时什么权限都没有
+        if admin and admin.permissions:
+            super_admin = bool(admin.is_super_admin or admin.level == AdminLevel.SUPER_ADMIN)
+            bits = permission_mask(name for name, granted in admin.permissions.items() if granted)
+    elif user.role == UserRole.TEACHER:
+        bits = permission_mask(TEACHER_PERMISSIONS)
+    elif user.role == UserRole.STUDENT:
+        bits = permission_mask(STUDENT_PERMISSIONS)
+
+    return Principal(
+        user_id=user.id,
+        username=user.username,
+        role=user.role,
+        active=user.is_active(),
+        generation=generation,
+        permission_bits=bits,
+        super_admin=super_admin
+    )
+
+
+# ========================================
+# 缓存
+# ========================================
+
+class PrincipalCache:
+    """主体缓存：每个用户一个条目（最新代数），LRU 淘汰，条目有最长有效期"""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, generation: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if principal.generation != generation or expires_at <= self.clock():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.user_id] = (principal, self.clock() + self.ttl)
+            self._entries.move_to_end(principal.user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> bool:
+        with self._lock:
+            return self._entries.pop(str(user_id), None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def get_principal_cache() -> PrincipalCache:
+    """获取全局主体缓存"""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            max_size=_config('PRINCIPAL_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+            ttl=_config('PRINCIPAL_CACHE_TTL', DEFAULT_CACHE_TTL)
+        )
+    return _principal_cache
+
+
+def get_principal(user_id, generation: int = 0) -> Optional[Principal]:
+    """
+    获取用户主体（缓存未命中时查询数据库）
+
+    Args:
+        user_id: 用户ID
+        generation: 令牌代数
+
+    Returns:
+        Optional[Principal]: 主体，用户不存在为 None
+    """
+    if user_id is None:
+        return None
+    user_id = str(user_id)
+    cache = get_principal_cache()
+    principal = cache.get(user_id, generation)
+    if principal is None:
+        from models import User
+        user = User.query.get(user_id)
+        if user is None:
+            return None
+        principal = build_principal(user, generation)
+        cache.put(principal)
+    return principal
+
+
+def invalidate_principal(user_id) -> bool:
+    """清除本实例缓存的用户主体"""
+    return get_principal_cache().invalidate(user_id)
+
+
+# ========================================
+# 当前用户
+# ========================================
+
+class CurrentUser:
+    """
+    g.current_user：常用属性取自 Principal，访问其他属性时才加载 User
+
+    兼容原来 g.current_user 为 User 时的用法（id、role、has_permission、is_active 等）。
+    """
+
+    __slots__ = ('principal', '_user')
+
+    def __init__(self, principal: Principal):
+        self.principal = principal
+        self._user = None
+
+    @property
+    def id(self):
+        return self.principal.user_id
+
+    @property
+    def username(self):
+        return self.principal.username
+
+    @property
+    def role(self):
+        return self.principal.role
+
+    def is_active(self) -> bool:
+        return self.principal.active
+
+    def has_role(self, role) -> bool:
+        return self.principal.role == role
+
+    def has_permission(self, permission: str) -> bool:
+        return self.principal.has_permission(permission)
+
+    @property
+    def user(self):
+        """完整的 User（首次访问时查询）"""
+        if self._user is None:
+            from models import User
+            self._user = User.query.get(self.principal.user_id)
+        return self._user
+
+    def __getattr__(self, name):
+        return getattr(self.user, name)
+
+    def __eq__(self, other):
+        if isinstance(other, CurrentUser):
+            return self.principal.user_id == other.principal.user_id
+        return getattr(other, 'id', None) == self.principal.user_id
+
+    def __hash__(self):
+        return hash(self.principal.user_id)
+
+    def __repr__(self):
+        return f"<CurrentUser(username='{self.principal.username}', role='{self.principal.role.value}')>"
+
+
+def load_current_principal() -> Optional[Principal]:
+    """
+    获取当前请求的主体（需在 jwt_required 之后调用），同时设置 g.principal 和 g.current_user
+
+    Returns:
+        Optional[Principal]: 主体，用户不存在为 None
+    """
+    if 'principal' in g:
+        return g.principal
+
+    from flask_jwt_extended import get_jwt, get_jwt_identity
+    from utils.token_revocation import GENERATION_CLAIM
+
+    principal = get_principal(get_jwt_identity(), get_jwt().get(GENERATION_CLAIM, 0))
+    g.principal = principal
+    if not getattr(g, 'current_user', None):
+        g.current_user = CurrentUser(principal) if principal else None
+    return principal
@@ -0,0 +1,98 @@
+# ========================================
+# 学生信息管理系统 - SQL语句计数工具
+# ========================================
+
+"""
+统计代码块执行的SQL语句数量，用于在测试中固定各接口的查询次数，防止N+1回归。
+
+Usage:
+    with assert_max_queries(3):
+        client.get('/api/v1/students?per_page=50')
+
+    with QueryCounter() as counter:
+        service.get_teacher_courses(teacher_id)
+    print(counter.count, counter.statements)
+"""
+
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+
+from extensions import db
+
+
+class QueryCounter:
+    """SQL语句计数器（上下文管理器）"""
+
+    def __init__(self, engine=None):
+        """
+        初始化计数器
+
+        Args:
+            engine: 要监听的数据库引擎，默认为当前应用的 db.engine
+        """
+        self.engine = engine
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        """已执行的语句数量"""
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        if self.engine is None:
+            self.engine = db.engine
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return False
+
+    def format_statements(self) -> str:
+        """格式化已执行语句，便于断言失败时排查"""
+        return '\n'.join(f"{index}. {statement}" for index, statement in enumerate(self.statements, 1))
+
+
+def _assert_count(counter: QueryCounter, expected: int, exact: bool):
+    if exact and counter.count != expected:
+        raise AssertionError(
+            f"期望执行 {expected} 条SQL，实际执行 {counter.count} 条:\n{counter.format_statements()}"
+        )
+    if not exact and counter.count > expected:
+        raise AssertionError(
+            f"期望最多执行 {expected} 条SQL，实际执行 {counter.count} 条:\n{counter.format_statements()}"
+        )
+
+
+@contextmanager
+def assert_num_queries(expected: int, engine=None):
+    """
+    断言代码块恰好执行指定数量的SQL语句
+
+    Args:
+        expected: 期望的语句数量
+        engine: 数据库引擎，默认为 db.engine
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+    _assert_count(counter, expected, exact=True)
+
+
+@contextmanager
+def assert_max_queries(maximum: int, engine=None):
+    """
+    断言代码块执行的SQL语句不超过指定数量
+
+    Args:
+        maximum: 允许的最大语句数量
+        engine: 数据库引擎，默认为 db.engine
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+    _assert_count(counter, maximum, exact=False)
@@ -0,0 +1,257 @@
+# ========================================
+# 学生信息管理系统 - SQL查询性能分析
+# ========================================
+
+"""
+基于 SQLAlchemy 的 before_cursor_execute / after_cursor_execute 事件，
+按请求统计SQL执行次数、数据库耗时、最慢语句和重复语句（N+1）。
+
+- 每个请求的统计保存在 g.query_profile 中
+- 调试模式（或 SQL_PROFILER_HEADERS=True）下通过响应头返回统计结果
+- 请求结束后汇总到 PerformanceLogger，供管理员“慢查询排行”接口查看
+"""
+
+import hashlib
+import heapq
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 语句指纹归一化规则
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\?")
+_POSTCOMPILE_RE = re.compile(r"__\[POSTCOMPILE_\w+\]")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST_RE = re.compile(r"\bVALUES\s*(\(\s*[?,\s]*\))(?:\s*,\s*\(\s*[?,\s]*\))*", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_fingerprint_cache: Dict[str, tuple] = {}
+_FINGERPRINT_CACHE_SIZE = 2048
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    归一化SQL语句：字面量、占位符统一替换为 ?，IN 列表和批量 VALUES 折叠，空白压缩
+
+    Args:
+        statement: 原始SQL语句
+
+    Returns:
+        str: 归一化后的语句
+    """
+    normalized = _POSTCOMPILE_RE.sub('?', statement)
+    normalized = _STRING_LITERAL_RE.sub('?', normalized)
+    normalized = _PLACEHOLDER_RE.sub('?', normalized)
+    normalized = _NUMBER_LITERAL_RE.sub('?', normalized)
+    normalized = _WHITESPACE_RE.sub(' ', normalized).strip()
+    normalized = _IN_LIST_RE.sub('IN (?)', normalized)
+    normalized = _VALUES_LIST_RE.sub(r'VALUES \1', normalized)
+    return normalized
+
+
+def fingerprint_statement(statement: str) -> tuple:
+    """
+    计算语句指纹
+
+    Args:
+        statement: 原始SQL语句
+
+    Returns:
+        tuple: (指纹, 归一化语句)
+    """
+    cached = _fingerprint_cache.get(statement)
+    if cached is not None:
+        return cached
+
+    normalized = normalize_statement(statement)
+    fingerprint = hashlib.md5(normalized.encode('utf-8')).hexdigest()[:12]
+    result = (fingerprint, normalized)
+
+    # 同一语句文本会被反复执行，缓存避免重复的正则处理
+    if len(_fingerprint_cache) >= _FINGERPRINT_CACHE_SIZE:
+        _fingerprint_cache.clear()
+    _fingerprint_cache[statement] = result
+    return result
+
+
+class RequestQueryProfile:
+    """单个请求的SQL统计"""
+
+    def __init__(self, slowest_limit: int = 5):
+        """
+        初始化请求统计
+
+        Args:
+            slowest_limit: 保留的最慢语句数量
+        """
+        self.slowest_limit = slowest_limit
+        self.query_count = 0
+        self.total_time = 0.0
+        self.fingerprint_counts: Counter = Counter()
+        self.fingerprint_times: Dict[str, float] = {}
+        self.fingerprint_max_times: Dict[str, float] = {}
+        self.fingerprint_statements: Dict[str, str] = {}
+        self._slowest: List[tuple] = []
+        self._sequence = 0
+
+    def record(self, statement: str, duration: float):
+        """
+        记录一条已执行的语句
+
+        Args:
+            statement: SQL语句
+            duration: 执行耗时（秒）
+        """
+        fingerprint, normalized = fingerprint_statement(statement)
+
+        self.query_count += 1
+        self.total_time += duration
+        self.fingerprint_counts[fingerprint] += 1
+        self.fingerprint_times[fingerprint] = self.fingerprint_times.get(fingerprint, 0.0) + duration
+        if duration > self.fingerprint_max_times.get(fingerprint, 0.0):
+            self.fingerprint_max_times[fingerprint] = duration
+        self.fingerprint_statements.setdefault(fingerprint, normalized)
+
+        # 小顶堆仅保留最慢的N条
+        self._sequence += 1
+        entry = (duration, self._sequence, fingerprint, statement)
+        if len(self._slowest) < self.slowest_limit:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> List[Dict[str, Any]]:
+        """最慢语句（按耗时降序）"""
+        return [
+            {
+                'fingerprint': fingerprint,
+                'statement': statement,
+                'duration_ms': round(duration * 1000, 3)
+            }
+            for duration, _, fingerprint, statement in sorted(self._slowest, reverse=True)
+        ]
+
+    def duplicates(self, threshold: int = 2) -> List[Dict[str, Any]]:
+        """
+        获取重复执行的语句
+
+        Args:
+            threshold: 同一指纹执行次数达到该值视为重复
+
+        Returns:
+            List[Dict]: 重复语句列表（按次数降序）
+        """
+        return [
+            {
+                'fingerprint': fingerprint,
+                'statement': self.fingerprint_statements[fingerprint],
+                'count': count,
+                'total_time_ms': round(self.fingerprint_times[fingerprint] * 1000, 3)
+            }
+            for fingerprint, count in self.fingerprint_counts.most_common()
+            if count >= threshold
+        ]
+
+    def to_dict(self, duplicate_threshold: int = 2) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            'query_count': self.query_count,
+            'db_time_ms': round(self.total_time * 1000, 3),
+            'unique_queries': len(self.fingerprint_counts),
+            'slowest': self.slowest,
+            'duplicates': self.duplicates(duplicate_threshold)
+        }
+
+
+def get_request_profile() -> Optional[RequestQueryProfile]:
+    """获取当前请求的SQL统计，不在请求上下文中时返回None"""
+    if not has_request_context():
+        return None
+    return g.get('query_profile')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    profile = get_request_profile()
+    if profile is not None:
+        profile.record(statement, duration)
+
+
+def _handle_error(exception_context):
+    # 语句执行失败时不会触发 after_cursor_execute，需弹出对应的开始时间
+    connection = exception_context.connection
+    if connection is not None:
+        start_times = connection.info.get('query_start_time')
+        if start_times:
+            start_times.pop()
+
+
+def init_query_profiler(app):
+    """
+    注册SQL性能分析
+
+    Args:
+        app: Flask应用
+    """
+    if not app.config.get('SQL_PROFILER_ENABLED', True):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    slowest_limit = app.config.get('SQL_PROFILER_SLOWEST_LIMIT', 5)
+    duplicate_threshold = app.config.get('SQL_PROFILER_DUPLICATE_THRESHOLD', 5)
+    slow_query_threshold = app.config.get('SLOW_QUERY_THRESHOLD', 0.5)
+    expose_headers = app.debug or app.config.get('SQL_PROFILER_HEADERS', False)
+
+    @app.before_request
+    def start_query_profile():
+        g.query_profile = RequestQueryProfile(slowest_limit=slowest_limit)
+
+    @app.after_request
+    def finish_query_profile(response):
+        profile = g.pop('query_profile', None)
+        if profile is None or profile.query_count == 0:
+            return response
+
+        duplicates = profile.duplicates(duplicate_threshold)
+
+        if expose_headers:
+            response.headers['X-DB-Query-Count'] = str(profile.query_count)
+            response.headers['X-DB-Time-Ms'] = f"{profile.total_time * 1000:.3f}"
+            response.headers['X-DB-Unique-Queries'] = str(len(profile.fingerprint_counts))
+            if duplicates:
+                response.headers['X-DB-Duplicate-Queries'] = ','.join(
+                    f"{item['fingerprint']}x{item['count']}" for item in duplicates
+                )
+
+        try:
+            from utils.logger import get_performance_logger
+            get_performance_logger().record_request_queries(
+                endpoint=request.endpoint or request.path,
+                method=request.method,
+                profile=profile,
+                duplicates=duplicates,
+                slow_query_threshold=slow_query_threshold
+            )
+        except Exception as e:
+            app.logger.warning(f"记录SQL统计失败: {e}")
+
+        return response
@@ -2,42 +2,417 @@
 # 学生信息管理系统 - 限流工具类
 # ========================================
 
+"""
+请求限流：限流规则解析、存储后端（内存/Redis/数据库）和装饰器。
+
+内存存储支持多种限流算法，除 sliding_log 外每个键的状态都是常量大小：
+
+- sliding_window（默认）：滑动窗口计数，当前窗口计数 + 上一窗口计数按剩余比例加权
+- token_bucket：令牌桶，容量为限额，按 限额/周期 的速率补充
+- gcra：通用信元速率算法，每个键只保存一个理论到达时间
+- sliding_log：滑动日志，保存窗口内每个请求的时间戳（精确，但内存与限额成正比）
+
+键按哈希分布在多个分片中，每个分片一把锁；状态记录自身失效时间（之后与空状态等价），
+分片定期清理已失效的键，空闲键不会一直占用内存。
+
+Redis 存储用 Lua 脚本实现同样的三种常量内存算法，每次检查一次往返且原子；
+LocalRedis 为进程内替身（执行等价的 Python 算法，不执行脚本）。数据库存储为按时间窗口 upsert 的计数行。
+
+全局限流的规则在 init_rate_limit 时编译为 RateLimitRule 元组（限额、周期、算法），
+按端点和角色查表；一个端点可同时有多条规则（如突发 + 持续），X-RateLimit-* 响应头
+直接取自本次检查的结果。
+
+Usage:
+    limiter = RateLimiter('memory', algorithm='gcra')
+    limiter.is_allowed('login', '5/minute', identifier='user:1')
+    limiter.check('api', compile_limits('20/second@token_bucket;1000/hour'))
+"""
+
+import math
 import time
 import threading
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
-from collections import defaultdict, deque
+from typing import Dict, List, Optional, Any, Callable, NamedTuple, Tuple
+from collections import deque
 from flask import request, current_app, g
-from functools import wraps
+from functools import lru_cache, wraps
+from sqlalchemy import delete, insert, select, update
+
+from extensions import db
+from utils.responses import APIResponse
 
 # 全局限流器实例
 _rate_limiter = None
 
 
+# ========================================
+# 限流算法
+# ========================================
+
+class RateLimitAlgorithm:
+    """
+    限流算法
+
+    每个键的状态是一个列表，首项为状态失效时间：超过该时间后状态与新建状态等价，
+    存储可直接丢弃。算法对象本身无状态，可被多个存储共享。
+    """
+
+    name = ''
+
+    def new_state(self, now: float, max_requests: int, period_seconds: int) -> list:
+        """新键的初始状态"""
+        raise NotImplementedError
+
+    def hit(self, state: list, now: float, max_requests: int, period_seconds: int) -> bool:
+        """记录一次请求（原地更新状态），返回是否允许"""
+        raise NotImplementedError
+
+    def remaining(self, state: list, now: float, max_requests: int, period_seconds: int) -> int:
+        """剩余请求次数（不修改状态）"""
+        raise NotImplementedError
+
+    def refund(self, state: list, now: float, max_requests: int, period_seconds: int):
+        """退还最近一次被允许的请求（原地更新状态）"""
+        raise NotImplementedError
+
+
+class TokenBucket(RateLimitAlgorithm):
+    """令牌桶：[失效时间, 令牌数, 上次更新时间]"""
+
+    name = 'token_bucket'
+
+    def new_state(self, now, max_requests, period_seconds):
+        return [now, float(max_requests), now]
+
+    @staticmethod
+    def _tokens(state, now, max_requests, period_seconds) -> float:
+        return min(float(max_requests), state[1] + (now - state[2]) * max_requests / period_seconds)
+
+    def hit(self, state, now, max_requests, period_seconds):
+        tokens = self._tokens(state, now, max_requests, period_seconds)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        state[1] = tokens
+        state[2] = now
+        # 令牌补满之后与新建状态相同
+        state[0] = now + (max_requests - tokens) * period_seconds / max_requests
+        return allowed
+
+    def remaining(self, state, now, max_requests, period_seconds):
+        return int(self._tokens(state, now, max_requests, period_seconds) + 1e-9)
+
+    def refund(self, state, now, max_requests, period_seconds):
+        tokens = min(float(max_requests), self._tokens(state, now, max_requests, period_seconds) + 1)
+        state[1] = tokens
+        state[2] = now
+        state[0] = now + (max_requests - tokens) * period_seconds / max_requests
+
+
+class GCRA(RateLimitAlgorithm):
+    """通用信元速率算法：[理论到达时间（兼作失效时间）]，允许一个周期内突发 max_requests 次"""
+
+    name = 'gcra'
+
+    def new_state(self, now, max_requests, period_seconds):
+        return [now]
+
+    def hit(self, state, now, max_requests, period_seconds):
+        new_tat = max(state[0], now) + period_seconds / max_requests
+        if new_tat - now > period_seconds + 1e-9:
+            return False
+        state[0] = new_tat
+        return True
+
+    def remaining(self, state, now, max_requests, period_seconds):
+        backlog = max(state[0] - now, 0.0)
+        return max(0, min(max_requests, int((period_seconds - backlog) * max_requests / period_seconds + 1e-9)))
+
+    def refund(self, state, now, max_requests, period_seconds):
+        state[0] = max(state[0] - period_seconds / max_requests, now)
+
+
+class SlidingWindowCounter(RateLimitAlgorithm):
+    """滑动窗口计数：[失效时间, 当前窗口起点, 当前窗口计数, 上一窗口计数]"""
+
+    name = 'sliding_window'
+
+    def new_state(self, now, max_requests, period_seconds):
+        return [now, now - now % period_seconds, 0, 0]
+
+    @staticmethod
+    def _advance(state, now, period_seconds) -> float:
+        """切换到当前窗口，返回上一窗口计数的权重"""
+        window = now - now % period_seconds
+        if window != state[1]:
+            adjacent = abs(window - state[1] - period_seconds) < 1e-6
+            state[3] = state[2] if adjacent else 0
+            state[2] = 0
+            state[1] = window
+        return 1.0 - (now - window) / period_seconds
+
+    def hit(self, state, now, max_requests, period_seconds):
+        weight = self._advance(state, now, period_seconds)
+        if state[3] * weight + state[2] + 1 > max_requests + 1e-9:
+            return False
+        state[2] += 1
+        # 两个窗口之后计数全部过期
+        state[0] = state[1] + 2 * period_seconds
+        return True
+
+    def remaining(self, state, now, max_requests, period_seconds):
+        weight = self._advance(state, now, period_seconds)
+        return max(0, math.floor(max_requests - state[3] * weight - state[2] + 1e-9))
+
+    def refund(self, state, now, max_requests, period_seconds):
+        self._advance(state, now, period_seconds)
+        # 记录后窗口已切换时，该请求已计入上一窗口
+        if state[2] > 0:
+            state[2] -= 1
+        elif state[3] > 0:
+            state[3] -= 1
+
+
+class SlidingLog(RateLimitAlgorithm):
+    """滑动日志：[失效时间, 请求时间戳队列]，精确但内存与限额成正比"""
+
+    name = 'sliding_log'
+
+    def new_state(self, now, max_requests, period_seconds):
+        return [now, deque()]
+
+    @staticmethod
+    def _prune(timestamps, cutoff):
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
+
+    def hit(self, state, now, max_requests, period_seconds):
+        timestamps = state[1]
+        self._prune(timestamps, now - period_seconds)
+        if len(timestamps) >= max_requests:
+            return False
+        timestamps.append(now)
+        state[0] = now + period_seconds
+        return True
+
+    def remaining(self, state, now, max_requests, period_seconds):
+        timestamps = state[1]
+        self._prune(timestamps, now - period_seconds)
+        return max(0, max_requests - len(timestamps))
+
+    def refund(self, state, now, max_requests, period_seconds):
+        if state[1]:
+            state[1].pop()
+
+
+RATE_LIMIT_ALGORITHMS: Dict[str, RateLimitAlgorithm] = {
+    algorithm.name: algorithm
+    for algorithm in (SlidingWindowCounter(), TokenBucket(), GCRA(), SlidingLog())
+}
+
+DEFAULT_ALGORITHM = 'sliding_window'
+
+
+def get_algorithm(name: str) -> RateLimitAlgorithm:
+    """按名称获取限流算法"""
+    if name not in RATE_LIMIT_ALGORITHMS:
+        raise ValueError(f"不支持的限流算法: {name}")
+    return RATE_LIMIT_ALGORITHMS[name]
+
+
+# ========================================
+# 限流规则
+# ========================================
+
+# 时间单位（秒）
+TIME_UNITS: Dict[str, int] = {
+    'second': 1,
+    'seconds': 1,
+    's': 1,
+    'minute': 60,
+    'minutes': 60,
+    'm': 60,
+    'hour': 3600,
+    'hours': 3600,
+    'h': 3600,
+    'day': 86400,
+    'days': 86400,
+    'd': 86400,
+    'week': 604800,
+    'weeks': 604800,
+    'w': 604800,
+    'month': 2592000,  # 30天
+    'months': 2592000,
+    'y': 31536000  # 365天
+}
+
+
+@lru_cache(maxsize=256)
+def parse_limit(limit: str) -> Tuple[int, int]:
+    """
+    解析限流规则（结果缓存，同一规则字符串只解析一次）
+
+    Args:
+        limit: 限流字符串 (如 "10/minute")
+
+    Returns:
+        tuple: (最大请求数, 时间周期秒数)，格式无效时为每分钟10次
+    """
+    try:
+        parts = limit.split('/')
+        if len(parts) != 2:
+            raise ValueError("无效的限流格式")
+
+        max_requests = int(parts[0])
+        period_str = parts[1].strip().lower()
+
+        if period_str not in TIME_UNITS:
+            raise ValueError(f"不支持的时间单位: {period_str}")
+
+        return max_requests, TIME_UNITS[period_str]
+
+    except Exception as e:
+        current_app.logger.error(f"解析限流规则失败: {limit}, 错误: {str(e)}")
+        # 默认值：每分钟10次
+        return 10, 60
+
+
+class RateLimitRule:
+    """预编译的限流规则：限额、周期和算法（None 表示使用限流器的默认算法）"""
+
+    __slots__ = ('limit', 'max_requests', 'period_seconds', 'algorithm', 'suffix')
+
+    def __init__(self, limit: str, algorithm: Optional[str] = None):
+        if algorithm is not None:
+            get_algorithm(algorithm)
+        self.limit = limit
+        self.max_requests, self.period_seconds = parse_limit(limit)
+        self.algorithm = algorithm
+        # 一个端点有多条规则时，用于区分各规则的限流键
+        self.suffix = f"{self.max_requests}/{self.period_seconds}"
+
+    def __repr__(self):
+        return f"RateLimitRule({self.limit!r}, algorithm={self.algorithm!r})"
+
+
+@lru_cache(maxsize=256)
+def compile_limits(limits: str) -> Tuple[RateLimitRule, ...]:
+    """
+    编译限流规则字符串，多条规则用分号分隔，可用 @ 指定算法
+
+    Args:
+        limits: 限流规则，如 "1000/hour" 或 "20/second@token_bucket;1000/hour"（突发 + 持续）
+
+    Returns:
+        Tuple[RateLimitRule, ...]: 规则元组（同一字符串返回同一对象）
+
+    Raises:
+        ValueError: 算法名称无效
+    """
+    rules = []
+    for part in limits.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        limit, _, algorithm = part.partition('@')
+        rules.append(RateLimitRule(limit.strip(), algorithm.strip() or None))
+    return tuple(rules)
+
+
+class RateLimitResult(NamedTuple):
+    """限流检查结果：多条规则时为最严格（剩余最少或拒绝）的一条"""
+    allowed: bool
+    rule: RateLimitRule
+    remaining: int
+    reset_after: int  # 距配额完全恢复的秒数
+
+
+# ========================================
+# 限流器
+# ========================================
+
 class RateLimiter:
     """限流器"""
 
-    def __init__(self, storage_backend='memory'):
+    def __init__(self, storage_backend='memory', algorithm: str = DEFAULT_ALGORITHM, **storage_options):
         """
         初始化限流器
 
         Args:
             storage_backend: 存储后端 ('memory', 'redis', 'database')
+            algorithm: 内存存储的限流算法（见 RATE_LIMIT_ALGORITHMS）
+            storage_options: 存储后端的其他参数（内存：shards、sweep_interval；
+                Redis：client；数据库：cleanup_interval）
         """
         self.storage_backend = storage_backend
+        self.algorithm = algorithm
+        self.storage_options = storage_options
         self._init_storage()
 
     def _init_storage(self):
         """初始化存储后端"""
+        self.storage = self._create_storage(self.algorithm)
+        # 规则可指定其他算法，每种算法一个存储
+        self._storages = {self.algorithm: self.storage}
+        self._storages_lock = threading.Lock()
+
+    def _create_storage(self, algorithm: str):
         if self.storage_backend == 'memory':
-            self.storage = MemoryStorage()
+            return MemoryStorage(algorithm, **self.storage_options)
         elif self.storage_backend == 'redis':
-            self.storage = RedisStorage()
+            return RedisStorage(algorithm, **self.storage_options)
         elif self.storage_backend == 'database':
-            self.storage = DatabaseStorage()
+            return DatabaseStorage(**self.storage_options)
         else:
             raise ValueError(f"不支持的存储后端: {self.storage_backend}")
 
+    def get_storage(self, algorithm: Optional[str] = None):
+        """获取指定算法的存储（None 为默认算法；数据库存储只有滑动窗口计数，所有算法共用）"""
+        if algorithm is None or self.storage_backend == 'database':
+            return self.storage
+        storage = self._storages.get(algorithm)
+        if storage is None:
+            with self._storages_lock:
+                storage = self._storages.get(algorithm)
+                if storage is None:
+                    storage = self._storages[algorithm] = self._create_storage(algorithm)
+        return storage
+
+    def check(self, key: str, rules: Tuple[RateLimitRule, ...], identifier: Optional[str] = None) -> RateLimitResult:
+        """
+        按预编译规则检查并记录请求，同时返回响应头所需的剩余次数和恢复时间（每条规则一次存储调用）
+
+        Args:
+            key: 限流键名
+            rules: compile_limits 返回的规则（至少一条）
+            identifier: 标识符（默认使用用户ID或IP地址）
+
+        Returns:
+            RateLimitResult: 第一条拒绝的规则；全部允许时为剩余次数最少的规则
+
+        被后面的规则拒绝时，退还前面规则已记录的本次请求，被拒绝的请求不占用任何规则的配额
+        （记录与退还之间的并发请求看到的是已扣减的配额，只会偏严）。
+        """
+        if identifier is None:
+            identifier = self._get_identifier()
+
+        result = None
+        consumed = []
+        for rule in rules:
+            if len(rules) == 1:
+                rate_key = f"rate_limit:{key}:{identifier}"
+            else:
+                rate_key = f"rate_limit:{key}:{rule.suffix}:{identifier}"
+            storage = self.get_storage(rule.algorithm)
+            allowed, remaining, reset_after = storage.check(rate_key, rule.max_requests, rule.period_seconds)
+            if not allowed:
+                for consumed_storage, consumed_key, consumed_rule in reversed(consumed):
+                    consumed_storage.refund(consumed_key, consumed_rule.max_requests, consumed_rule.period_seconds)
+                return RateLimitResult(False, rule, remaining, reset_after)
+            consumed.append((storage, rate_key, rule))
+            if result is None or remaining < result.remaining:
+                result = RateLimitResult(True, rule, remaining, reset_after)
+        return result
+
     def is_allowed(self, key: str, limit: str, identifier: Optional[str] = None) -> bool:
         """
         检查是否允许请求
@@ -110,46 +485,7 @@ class RateLimiter:
         Returns:
             tuple: (最大请求数, 时间周期秒数)
         """
-        try:
-            parts = limit.split('/')
-            if len(parts) != 2:
-                raise ValueError("无效的限流格式")
-
-            max_requests = int(parts[0])
-            period_str = parts[1].lower()
-
-            # 时间单位映射
-            time_units = {
-                'second': 1,
-                'seconds': 1,
-                's': 1,
-                'minute': 60,
-                'minutes': 60,
-                'm': 60,
-                'hour': 3600,
-                'hours': 3600,
-                'h': 3600,
-                'day': 86400,
-                'days': 86400,
-                'd': 86400,
-                'week': 604800,
-                'weeks': 604800,
-                'w': 604800,
-                'month': 2592000,  # 30天
-                'months': 2592000,
-                'y': 31536000  # 365天
-            }
-
-            if period_str not in time_units:
-                raise ValueError(f"不支持的时间单位: {period_str}")
-
-            period_seconds = time_units[period_str]
-            return max_requests, period_seconds
-
-        except Exception as e:
-            current_app.logger.error(f"解析限流规则失败: {limit}, 错误: {str(e)}")
-            # 默认值：每分钟10次
-            return 10, 60
+        return parse_limit(limit)
 
     def _get_identifier(self) -> str:
         """获取请求标识符"""
@@ -161,185 +497,455 @@ class RateLimiter:
         return request.environ.get('REMOTE_ADDR', 'unknown')
 
 
-class MemoryStorage:
-    """内存存储"""
+# ========================================
+# 存储后端
+# ========================================
+
+class _Shard:
+    """内存存储的分片：独立的锁和键表"""
+
+    __slots__ = ('lock', 'entries', 'next_sweep')
 
     def __init__(self):
-        self.data = defaultdict(lambda: deque())
         self.lock = threading.Lock()
+        self.entries: Dict[str, list] = {}
+        self.next_sweep = 0.0
 
-    def is_allowed(self, key: str, max_requests: int, period_seconds: int) -> bool:
-        """检查是否允许请求"""
-        now = time.time()
-        cutoff_time = now - period_seconds
-
-        with self.lock:
-            timestamps = self.data[key]
 
-            # 清理过期记录
-            while timestamps and timestamps[0] <= cutoff_time:
-                timestamps.popleft()
+class MemoryStorage:
+    """内存存储（分片锁，空闲键定期回收）"""
 
-            # 检查是否超过限制
-            if len(timestamps) >= max_requests:
-                return False
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, shards: int = 16,
+                 sweep_interval: float = 60, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            algorithm: 限流算法名称
+            shards: 分片数
+            sweep_interval: 每个分片清理失效键的间隔（秒）
+            clock: 时间函数（测试和基准测试中可替换）
+        """
+        self.algorithm = get_algorithm(algorithm)
+        self.shards = [_Shard() for _ in range(max(1, shards))]
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+
+    def _shard(self, key: str) -> _Shard:
+        return self.shards[hash(key) % len(self.shards)]
+
+    def _sweep(self, shard: _Shard, now: float) -> int:
+        """清理分片中已失效的键（调用方持有分片锁）"""
+        expired = [key for key, state in shard.entries.items() if state[0] <= now]
+        for key in expired:
+            del shard.entries[key]
+        shard.next_sweep = now + self.sweep_interval
+        return len(expired)
 
-            # 添加当前请求
-            timestamps.append(now)
-            return True
+    def is_allowed(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        """检查是否允许请求"""
+        now = self.clock()
+        shard = self._shard(key)
+
+        with shard.lock:
+            if now >= shard.next_sweep:
+                self._sweep(shard, now)
+
+            state = shard.entries.get(key)
+            if state is None or state[0] <= now:
+                state = shard.entries[key] = self.algorithm.new_state(now, max_requests, period_seconds)
+            return self.algorithm.hit(state, now, max_requests, period_seconds)
+
+    def check(self, key: str, max_requests: int, period_seconds: int) -> tuple:
+        """检查并记录请求，返回 (是否允许, 剩余次数, 距完全恢复的秒数)"""
+        now = self.clock()
+        shard = self._shard(key)
+
+        with shard.lock:
+            if now >= shard.next_sweep:
+                self._sweep(shard, now)
+
+            state = shard.entries.get(key)
+            if state is None or state[0] <= now:
+                state = shard.entries[key] = self.algorithm.new_state(now, max_requests, period_seconds)
+            allowed = self.algorithm.hit(state, now, max_requests, period_seconds)
+            remaining = self.algorithm.remaining(state, now, max_requests, period_seconds)
+            return allowed, remaining, max(0, math.ceil(state[0] - now))
 
     def get_remaining(self, key: str, max_requests: int, period_seconds: int) -> int:
         """获取剩余请求次数"""
-        now = time.time()
-        cutoff_time = now - period_seconds
-
-        with self.lock:
-            timestamps = self.data[key]
-
-            # 清理过期记录
-            while timestamps and timestamps[0] <= cutoff_time:
-                timestamps.popleft()
-
-            return max(0, max_requests - len(timestamps))
+        now = self.clock()
+        shard = self._shard(key)
+
+        with shard.lock:
+            state = shard.entries.get(key)
+            if state is None or state[0] <= now:
+                return max_requests
+            return self.algorithm.remaining(state, now, max_requests, period_seconds)
+
+    def refund(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        """退还最近一次被允许的请求"""
+        now = self.clock()
+        shard = self._shard(key)
+
+        with shard.lock:
+            state = shard.entries.get(key)
+            if state is None or state[0] <= now:
+                return False
+            self.algorithm.refund(state, now, max_requests, period_seconds)
+            return True
 
     def reset(self, key: str) -> bool:
         """重置计数"""
-        with self.lock:
-            if key in self.data:
-                del self.data[key]
-                return True
-            return False
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.entries.pop(key, None) is not None
 
+    def cleanup(self) -> int:
+        """立即清理所有分片中已失效的键，返回清理数量"""
+        now = self.clock()
+        removed = 0
+        for shard in self.shards:
+            with shard.lock:
+                removed += self._sweep(shard, now)
+        return removed
 
-class RedisStorage:
-    """Redis存储"""
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self.shards)
 
-    def __init__(self):
-        try:
-            from extensions import cache
-            self.redis_client = cache
-        except ImportError:
-            raise ImportError("需要安装redis: pip install redis")
 
-    def is_allowed(self, key: str, max_requests: int, period_seconds: int) -> bool:
-        """使用Redis滑动窗口算法"""
-        try:
-            now = int(time.time())
-            pipeline = self.redis_client.redis_client.pipeline()
+# ========================================
+# Redis 限流脚本
+# ========================================
 
-            # 清理过期的键
-            pipeline.zremrangebyscore(key, 0, now - period_seconds)
+# 所有脚本：KEYS[1] 限流键；ARGV[1] 限额；ARGV[2] 周期（秒）；ARGV[3] 为1时记录本次请求，为0时只查询，
+# 为-1时退还一次已记录的请求（多规则检查中被后面的规则拒绝）。
+# 时间取 Redis 服务器的 TIME，各应用实例共用同一时钟（Redis 5+ 默认按效果复制脚本）。
+# 返回 {是否允许(1/0), 剩余次数, 状态失效（完全恢复）的秒数}。
+
+_LUA_NOW = '''
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local mode = tonumber(ARGV[3])
+local consume = mode == 1
+'''
+
+REDIS_SCRIPTS: Dict[str, str] = {
+    'sliding_window': _LUA_NOW + '''
+local window = now - (now % period)
+local state = redis.call('HMGET', KEYS[1], 'w', 'c', 'p')
+local start = tonumber(state[1]) or window
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+if start ~= window then
+    if math.abs(window - start - period) < 1e-6 then previous = current else previous = 0 end
+    current = 0
+end
+local weight = 1 - (now - window) / period
+local used = previous * weight + current
+local allowed = 0
+if used + 1 <= limit + 1e-9 then allowed = 1 end
+if consume and allowed == 1 then
+    current = current + 1
+    used = used + 1
+    redis.call('HSET', KEYS[1], 'w', window, 'c', current, 'p', previous)
+    redis.call('EXPIREAT', KEYS[1], math.ceil(window + 2 * period))
+elseif mode == -1 and state[1] then
+    if current > 0 then current = current - 1 elseif previous > 0 then previous = previous - 1 end
+    used = previous * weight + current
+    redis.call('HSET', KEYS[1], 'w', window, 'c', current, 'p', previous)
+end
+return {allowed, math.max(0, math.floor(limit - used + 1e-9)), math.ceil(window + 2 * period - now)}
+''',
+    'token_bucket': _LUA_NOW + '''
+local state = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(state[1]) or limit
+local updated = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + (now - updated) * limit / period)
+local allowed = 0
+if tokens >= 1 then allowed = 1 end
+local refill = (limit - tokens) * period / limit
+if consume or (mode == -1 and state[1]) then
+    if consume and allowed == 1 then tokens = tokens - 1 end
+    if mode == -1 then tokens = math.min(limit, tokens + 1) end
+    refill = (limit - tokens) * period / limit
+    redis.call('HSET', KEYS[1], 't', tokens, 'u', now)
+    redis.call('PEXPIRE', KEYS[1], math.max(1, math.ceil(refill * 1000)))
+end
+return {allowed, math.floor(tokens + 1e-9), math.ceil(refill)}
+''',
+    'gcra': _LUA_NOW + '''
+local emission = period / limit
+local stored = tonumber(redis.call('GET', KEYS[1]))
+local tat = math.max(stored or now, now)
+local allowed = 0
+if tat + emission - now <= period + 1e-9 then allowed = 1 end
+if consume and allowed == 1 then
+    tat = tat + emission
+    redis.call('SET', KEYS[1], string.format('%.6f', tat), 'PX', math.max(1, math.ceil((tat - now) * 1000)))
+elseif mode == -1 and stored then
+    tat = math.max(tat - emission, now)
+    if tat > now then
+        redis.call('SET', KEYS[1], string.format('%.6f', tat), 'PX', math.max(1, math.ceil((tat - now) * 1000)))
+    else
+        redis.call('DEL', KEYS[1])
+    end
+end
+local remaining = math.floor((period - (tat - now)) / emission + 1e-9)
+return {allowed, math.max(0, math.min(limit, remaining)), math.ceil(tat - now)}
+''',
+}
+
+
+class LocalRedis:
+    """
+    进程内的 Redis 替身（开发环境和测试用）
+
+    只实现限流需要的命令：register_script 注册的限流脚本按脚本内容映射到
+    RATE_LIMIT_ALGORITHMS 中等价的 Python 实现，每次调用在同一把锁内完成。
+    不执行 Lua 脚本本身，因此不能用来校验脚本的正确性或原子性。
+    """
 
-            # 获取当前计数
-            pipeline.zcard(key)
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._states: Dict[str, list] = {}
+        self._script_algorithms = {script: name for name, script in REDIS_SCRIPTS.items()}
+
+    def register_script(self, script: str) -> Callable:
+        if script not in self._script_algorithms:
+            raise NotImplementedError("LocalRedis 只支持限流脚本")
+        algorithm = get_algorithm(self._script_algorithms[script])
+
+        def run(keys=(), args=()):
+            key = keys[0]
+            max_requests, period_seconds, mode = int(args[0]), int(args[1]), int(args[2])
+            consume = mode == 1
+            with self._lock:
+                now = self.clock()
+                state = self._states.get(key)
+                if state is None or state[0] <= now:
+                    state = algorithm.new_state(now, max_requests, period_seconds)
+                    if consume:
+                        self._states[key] = state
+                elif mode == -1:
+                    algorithm.refund(state, now, max_requests, period_seconds)
+                if consume:
+                    allowed = algorithm.hit(state, now, max_requests, period_seconds)
+                else:
+                    allowed = algorithm.remaining(state, now, max_requests, period_seconds) >= 1
+                remaining = algorithm.remaining(state, now, max_requests, period_seconds)
+                return [int(allowed), remaining, max(0, math.ceil(state[0] - now))]
+
+        return run
+
+    def delete(self, *keys) -> int:
+        with self._lock:
+            return sum(self._states.pop(key, None) is not None for key in keys)
 
-            # 添加当前请求
-            pipeline.zadd(key, {str(now): now})
 
-            # 设置过期时间
-            pipeline.expire(key, period_seconds)
+class RedisStorage:
+    """Redis存储：每次检查是一次原子的脚本调用（单次往返）"""
 
-            results = pipeline.execute()
-            current_count = results[1]
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, client=None):
+        """
+        Args:
+            algorithm: 限流算法（sliding_window/token_bucket/gcra）
+            client: Redis客户端，默认为 extensions.redis_client；可传入 LocalRedis
 
-            return current_count < max_requests
+        Raises:
+            ValueError: 算法没有对应的Redis脚本
+        """
+        if algorithm not in REDIS_SCRIPTS:
+            raise ValueError(f"Redis存储不支持限流算法: {algorithm}")
+        if client is None:
+            from extensions import redis_client as client
+        self.algorithm = algorithm
+        self.redis_client = client
+        # FlaskRedis 在 init_app 之后才能注册脚本，首次使用时注册
+        self._script = None
+
+    def _run(self, key: str, max_requests: int, period_seconds: int, mode: int) -> tuple:
+        """执行限流脚本，mode：1 记录，0 查询，-1 退还"""
+        if self._script is None:
+            self._script = self.redis_client.register_script(REDIS_SCRIPTS[self.algorithm])
+        allowed, remaining, reset_after = self._script(
+            keys=[key], args=[max_requests, period_seconds, mode]
+        )
+        return bool(allowed), int(remaining), int(reset_after)
 
+    def is_allowed(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        """检查并记录请求（原子操作）"""
+        try:
+            return self._run(key, max_requests, period_seconds, 1)[0]
         except Exception as e:
             current_app.logger.error(f"Redis限流检查失败: {str(e)}")
             # 降级到允许请求
             return True
 
+    def check(self, key: str, max_requests: int, period_seconds: int) -> tuple:
+        """检查并记录请求，返回 (是否允许, 剩余次数, 距完全恢复的秒数)"""
+        try:
+            return self._run(key, max_requests, period_seconds, 1)
+        except Exception as e:
+            current_app.logger.error(f"Redis限流检查失败: {str(e)}")
+            return True, max_requests, 0
+
     def get_remaining(self, key: str, max_requests: int, period_seconds: int) -> int:
         """获取剩余请求次数"""
         try:
-            now = int(time.time())
-            self.redis_client.redis_client.zremrangebyscore(key, 0, now - period_seconds)
-            current_count = self.redis_client.redis_client.zcard(key)
-            return max(0, max_requests - current_count)
+            return self._run(key, max_requests, period_seconds, 0)[1]
         except Exception:
             return max_requests
 
+    def refund(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        """退还最近一次被允许的请求"""
+        try:
+            self._run(key, max_requests, period_seconds, -1)
+            return True
+        except Exception as e:
+            current_app.logger.error(f"Redis限流退还失败: {str(e)}")
+            return False
+
     def reset(self, key: str) -> bool:
         """重置计数"""
         try:
-            self.redis_client.redis_client.delete(key)
+            self.redis_client.delete(key)
             return True
         except Exception:
             return False
 
 
 class DatabaseStorage:
-    """数据库存储"""
-
-    def is_allowed(self, key: str, max_requests: int, period_seconds: int) -> bool:
-        """使用数据库记录"""
-        try:
-            from models import db, RateLimitRecord
-            from sqlalchemy import func
-
-            now = datetime.utcnow()
-            cutoff_time = now - timedelta(seconds=period_seconds)
-
-            # 查询当前时间窗口内的请求数
-            count = db.session.query(func.count(RateLimitRecord.id))\
-                           .filter(RateLimitRecord.rate_key == key)\
-                           .filter(RateLimitRecord.created_at >= cutoff_time)\
-                           .scalar()
-
-            if count >= max_requests:
-                return False
-
-            # 记录当前请求
-            record = RateLimitRecord(rate_key=key, created_at=now)
-            db.session.add(record)
+    """
+    数据库存储：滑动窗口计数，每个键每个窗口一行计数
 
-            # 清理过期记录（定期执行，避免数据库膨胀）
-            if count % 100 == 0:  # 每100次请求清理一次
-                db.session.query(RateLimitRecord)\
-                         .filter(RateLimitRecord.created_at < cutoff_time)\
-                         .delete()
+    记录请求为一条 upsert（计数+1，持有该行锁直到提交），随后读取当前和上一窗口的计数；
+    超限时在同一事务内撤销本次计数，因此只有被允许的请求计入。使用独立连接，
+    不提交调用方会话中的修改。过期窗口按时间间隔批量删除。
+    """
 
-            db.session.commit()
-            return True
+    def __init__(self, cleanup_interval: float = 60, clock: Callable[[], float] = time.time):
+        self.cleanup_interval = cleanup_interval
+        self.clock = clock
+        self._next_cleanup = 0.0
+
+    @staticmethod
+    def _upsert_increment(connection, key: str, window: int, expires_at: int):
+        """当前窗口计数+1（不存在时插入）"""
+        table = RateLimitCounter.__table__
+        values = {'rate_key': key, 'window_start': window, 'count': 1, 'expires_at': expires_at}
+        dialect = connection.dialect.name
+
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+            statement = mysql_insert(table).values(**values)
+            statement = statement.on_duplicate_key_update(count=table.c.count + 1)
+        elif dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            statement = dialect_insert(table).values(**values).on_conflict_do_update(
+                index_elements=['rate_key', 'window_start'], set_={'count': table.c.count + 1}
+            )
+        else:
+            updated = connection.execute(
+                update(table)
+                .where(table.c.rate_key == key, table.c.window_start == window)
+                .values(count=table.c.count + 1)
+            ).rowcount
+            if not updated:
+                connection.execute(insert(table).values(**values))
+            return
+        connection.execute(statement)
+
+    def _check(self, key: str, max_requests: int, period_seconds: int, consume: bool) -> tuple:
+        table = RateLimitCounter.__table__
+        now = self.clock()
+        window = int(now // period_seconds * period_seconds)
+        previous_window = window - period_seconds
+
+        with db.engine.begin() as connection:
+            if consume:
+                self._upsert_increment(connection, key, window, window + 2 * period_seconds)
+
+            counts = dict(connection.execute(
+                select(table.c.window_start, table.c.count)
+                .where(table.c.rate_key == key, table.c.window_start.in_((window, previous_window)))
+            ).all())
+            used = counts.get(previous_window, 0) * (1 - (now - window) / period_seconds) + counts.get(window, 0)
+
+            if consume:
+                allowed = used <= max_requests + 1e-9
+                if not allowed:
+                    # 撤销本次计数（仍持有行锁）
+                    connection.execute(
+                        update(table)
+                        .where(table.c.rate_key == key, table.c.window_start == window)
+                        .values(count=table.c.count - 1)
+                    )
+                    used -= 1
+            else:
+                allowed = used + 1 <= max_requests + 1e-9
+
+            if now >= self._next_cleanup:
+                self._next_cleanup = now + self.cleanup_interval
+                connection.execute(delete(table).where(table.c.expires_at <= now))
+
+        remaining = max(0, math.floor(max_requests - used + 1e-9))
+        return allowed, remaining, max(0, math.ceil(window + 2 * period_seconds - now))
 
+    def is_allowed(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        """检查并记录请求"""
+        try:
+            return self._check(key, max_requests, period_seconds, True)[0]
         except Exception as e:
             current_app.logger.error(f"数据库限流检查失败: {str(e)}")
-            db.session.rollback()
             # 降级到允许请求
             return True
 
+    def check(self, key: str, max_requests: int, period_seconds: int) -> tuple:
+        """检查并记录请求，返回 (是否允许, 剩余次数, 距完全恢复的秒数)"""
+        try:
+            return self._check(key, max_requests, period_seconds, True)
+        except Exception as e:
+            current_app.logger.error(f"数据库限流检查失败: {str(e)}")
+            return True, max_requests, 0
+
     def get_remaining(self, key: str, max_requests: int, period_seconds: int) -> int:
         """获取剩余请求次数"""
         try:
-            from models import db, RateLimitRecord
-            from sqlalchemy import func
-
-            now = datetime.utcnow()
-            cutoff_time = now - timedelta(seconds=period_seconds)
-
-            count = db.session.query(func.count(RateLimitRecord.id))\
-                           .filter(RateLimitRecord.rate_key == key)\
-                           .filter(RateLimitRecord.created_at >= cutoff_time)\
-                           .scalar()
-
-            return max(0, max_requests - count)
-
+            return self._check(key, max_requests, period_seconds, False)[1]
         except Exception:
             return max_requests
 
+    def refund(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        """退还最近一次被允许的请求（当前窗口计数-1；记录后窗口已切换时为上一窗口）"""
+        table = RateLimitCounter.__table__
+        window = int(self.clock() // period_seconds * period_seconds)
+        try:
+            with db.engine.begin() as connection:
+                for window_start in (window, window - period_seconds):
+                    updated = connection.execute(
+                        update(table)
+                        .where(table.c.rate_key == key, table.c.window_start == window_start, table.c.count > 0)
+                        .values(count=table.c.count - 1)
+                    ).rowcount
+                    if updated:
+                        return True
+            return False
+        except Exception as e:
+            current_app.logger.error(f"数据库限流退还失败: {str(e)}")
+            return False
+
     def reset(self, key: str) -> bool:
         """重置计数"""
         try:
-            from models import db, RateLimitRecord
-
-            db.session.query(RateLimitRecord)\
-                     .filter(RateLimitRecord.rate_key == key)\
-                     .delete()
-            db.session.commit()
+            with db.engine.begin() as connection:
+                connection.execute(delete(RateLimitCounter.__table__).where(RateLimitCounter.rate_key == key))
             return True
-
         except Exception:
-            db.session.rollback()
             return False
 
 
@@ -391,8 +997,17 @@ def get_rate_limiter() -> RateLimiter:
     """获取全局限流器实例"""
     global _rate_limiter
     if _rate_limiter is None:
-        storage_backend = current_app.config.get('RATE_LIMIT_STORAGE', 'memory')
-        _rate_limiter = RateLimiter(storage_backend)
+        config = current_app.config
+        storage_backend = config.get('RATE_LIMIT_STORAGE', 'memory')
+        options = {}
+        if storage_backend == 'memory':
+            options = {
+                'shards': config.get('RATE_LIMIT_SHARDS', 16),
+                'sweep_interval': config.get('RATE_LIMIT_SWEEP_INTERVAL', 60)
+            }
+        elif storage_backend == 'database':
+            options = {'cleanup_interval': config.get('RATE_LIMIT_SWEEP_INTERVAL', 60)}
+        _rate_limiter = RateLimiter(storage_backend, config.get('RATE_LIMIT_ALGORITHM', DEFAULT_ALGORITHM), **options)
     return _rate_limiter
 
 
@@ -435,9 +1050,8 @@ def rate_limit(limit: str, key: Optional[str] = None, per_user: bool = False):
 
             # 检查限流
             if not limiter.is_allowed(rate_key, limit, identifier):
-                from ..utils.responses import too_many_requests_response
                 remaining = limiter.get_remaining(rate_key, limit, identifier)
-                return too_many_requests_response(
+                return APIResponse.too_many_requests(
                     f"请求过于频繁，请稍后再试。剩余次数: {remaining}"
                 )
 
@@ -447,53 +1061,124 @@ def rate_limit(limit: str, key: Optional[str] = None, per_user: bool = False):
     return decorator
 
 
+class EndpointRateLimits:
+    """
+    全局限流规则表：按 (端点, 角色) 预编译的规则元组
+
+    规则来源（优先级从高到低）：RATE_LIMIT_ENDPOINTS 中按端点名配置的规则；
+    认证端点用 login 规则；API 端点用 api 规则（按角色）；上传端点用 upload 规则；
+    其余用 RATE_LIMIT_DEFAULT。规则字符串在创建时编译，每个端点首次请求时解析一次，
+    之后每次请求只是一次字典查找。
+    """
+
+    def __init__(self, config):
+        self.endpoint_rules = {
+            endpoint: compile_limits(limits)
+            for endpoint, limits in (config.get('RATE_LIMIT_ENDPOINTS') or {}).items()
+        }
+        self.login_rules = compile_limits(RateLimitConfig.get_limit('login'))
+        self.upload_rules = compile_limits(RateLimitConfig.get_limit('upload'))
+        self.api_rules = {
+            role: compile_limits(RateLimitConfig.get_limit('api', role))
+            for role in (None, *RateLimitConfig.ROLE_RULES)
+        }
+        self.default_rules = compile_limits(config.get('RATE_LIMIT_DEFAULT', '1000/hour'))
+        self._table: Dict[tuple, Tuple[RateLimitRule, ...]] = {}
+
+    def _resolve(self, endpoint: Optional[str], role: Optional[str]) -> Tuple[RateLimitRule, ...]:
+        if endpoint is None:
+            return self.default_rules
+        if endpoint in self.endpoint_rules:
+            return self.endpoint_rules[endpoint]
+        # 根据端点类型应用不同的限流规则
+        if 'auth' in endpoint:
+            return self.login_rules
+        if 'api' in endpoint:
+            return self.api_rules.get(role, self.api_rules[None])
+        if 'upload' in endpoint:
+            return self.upload_rules
+        return self.default_rules
+
+    def rules_for(self, endpoint: Optional[str], role: Optional[str] = None) -> Tuple[RateLimitRule, ...]:
+        """获取端点的限流规则"""
+        rules = self._table.get((endpoint, role))
+        if rules is None:
+            rules = self._table[(endpoint, role)] = self._resolve(endpoint, role)
+        return rules
+
+
+def rate_limit_headers(result: RateLimitResult) -> Dict[str, str]:
+    """
+    限流响应头
+
+    Args:
+        result: 限流检查结果
+
+    Returns:
+        Dict[str, str]: X-RateLimit-Limit/Remaining/Reset，拒绝时另加 Retry-After
+    """
+    headers = {
+        'X-RateLimit-Limit': str(result.rule.max_requests),
+        'X-RateLimit-Remaining': str(result.remaining),
+        'X-RateLimit-Reset': str(result.reset_after)
+    }
+    if not result.allowed:
+        headers['Retry-After'] = str(max(1, result.reset_after))
+    return headers
+
+
 # Flask应用初始化时调用
 def init_rate_limit(app):
     """初始化限流功能"""
     app.config.setdefault('RATE_LIMIT_STORAGE', 'memory')
     app.config.setdefault('RATE_LIMIT_DEFAULT', '1000/hour')
+    app.config.setdefault('RATE_LIMIT_ENDPOINTS', {})
+    app.config.setdefault('RATE_LIMIT_HEADERS', True)
+    app.config.setdefault('RATE_LIMIT_ALGORITHM', DEFAULT_ALGORITHM)
+    app.config.setdefault('RATE_LIMIT_SHARDS', 16)
+    app.config.setdefault('RATE_LIMIT_SWEEP_INTERVAL', 60)
+
+    # 启动时编译限流规则
+    endpoint_limits = EndpointRateLimits(app.config)
+    send_headers = app.config['RATE_LIMIT_HEADERS']
 
     # 添加限流相关的配置
     @app.before_request
     def check_global_rate_limit():
         """检查全局限流"""
-        if request.endpoint and request.endpoint.startswith('static'):
+        endpoint = request.endpoint
+        if endpoint and endpoint.startswith('static'):
             return
 
-        limiter = get_rate_limiter()
         user_role = None
-
         if hasattr(g, 'current_user') and g.current_user:
             user_role = g.current_user.role.value
 
-        # 根据端点类型应用不同的限流规则
-        if 'auth' in request.endpoint:
-            limit_rule = RateLimitConfig.get_limit('login')
-        elif 'api' in request.endpoint:
-            limit_rule = RateLimitConfig.get_limit('api', user_role)
-        elif 'upload' in request.endpoint:
-            limit_rule = RateLimitConfig.get_limit('upload')
-        else:
-            limit_rule = app.config.get('RATE_LIMIT_DEFAULT', '1000/hour')
+        result = get_rate_limiter().check('global', endpoint_limits.rules_for(endpoint, user_role))
+        g.rate_limit_result = result
+
+        if not result.allowed:
+            return APIResponse.too_many_requests("全局请求频率超限")
 
-        if not limiter.is_allowed('global', limit_rule):
-            from ..utils.responses import too_many_requests_response
-            return too_many_requests_response("全局请求频率超限")
+    if send_headers:
+        @app.after_request
+        def add_rate_limit_headers(response):
+            """添加限流响应头（使用本次检查的结果，不再访问存储）"""
+            result = g.pop('rate_limit_result', None)
+            if result is not None:
+                response.headers.extend(rate_limit_headers(result))
+            return response
 
 
 # 数据库模型（如果使用数据库存储）
-class RateLimitRecord(db.Model):
-    """限流记录模型"""
-    __tablename__ = 'rate_limit_records'
-
-    id = db.Column(db.Integer, primary_key=True)
-    rate_key = db.Column(db.String(255), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
-
-    # 为提高查询性能添加复合索引
-    __table_args__ = (
-        db.Index('idx_rate_key_created_at', 'rate_key', 'created_at'),
-    )
+class RateLimitCounter(db.Model):
+    """限流计数模型：每个限流键每个时间窗口一行"""
+    __tablename__ = 'rate_limit_counters'
+
+    rate_key = db.Column(db.String(255), primary_key=True)
+    window_start = db.Column(db.BigInteger, primary_key=True, autoincrement=False)  # 窗口起点（Unix秒）
+    count = db.Column(db.Integer, nullable=False, default=0)
+    expires_at = db.Column(db.BigInteger, nullable=False, index=True)  # 之后不再参与计算，可删除
 
 
 # 便捷函数
@@ -0,0 +1,510 @@
+# ========================================
+# 学生信息管理系统 - 报表计算层
+# ========================================
+
+"""
+报表计算层：成绩报表和教师报表的统计在列数据上完成。
+
+查询结果按列转置一次后载入 NumPy 数组 / pandas DataFrame（院系、课程等字符串列为
+categorical），等级由等级表批量换算为序号，分布用 bincount 计数，分组均值、中位数、
+标准差、百分位和分数直方图均为向量化计算。未安装 numpy/pandas 时使用逐行计算，
+两种实现返回相同结构的结果。
+
+Usage:
+    result = compute_grade_report(rows, GRADE_REPORT_COLUMNS, get_grading_scale())
+    result['summary'], result['course_statistics'], result['letters']
+"""
+
+import math
+import statistics
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.grade_distribution import DEFAULT_PERCENTILES, histogram_counts, histogram_labels, percentile
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # numpy/pandas 为可选依赖
+    np = None
+    pd = None
+
+UNKNOWN = '未知'
+PERCENTILES = DEFAULT_PERCENTILES
+HISTOGRAM_BIN_WIDTH = 10  # 直方图按百分制每10分一档
+HISTOGRAM_EDGES = tuple(range(0, 101, HISTOGRAM_BIN_WIDTH))
+
+# 与 GradingScale.is_passing 一致的浮点误差容忍
+_EPSILON = 1e-9
+
+GRADE_REPORT_COLUMNS = ('score', 'max_score', 'course_name', 'course_code', 'teacher_name', 'department')
+TEACHER_COLUMNS = ('id', 'department', 'workload')
+_COURSE_TEACHER_COLUMNS = ('course_id', 'teacher_id')
+_ENROLLMENT_COUNT_COLUMNS = ('course_id', 'count')
+_TEACHER_GRADE_COLUMNS = ('course_id', 'score', 'department')
+
+
+def vectorized_available() -> bool:
+    """是否可以使用向量化计算"""
+    return np is not None and pd is not None
+
+
+def _use_vectorized(vectorized: Optional[bool]) -> bool:
+    if vectorized is None:
+        return vectorized_available()
+    if vectorized and not vectorized_available():
+        raise RuntimeError("向量化计算需要安装 numpy 和 pandas")
+    return vectorized
+
+
+def _columns(rows: Sequence[Sequence[Any]], columns: Sequence[str],
+             needed: Sequence[str]) -> Dict[str, Sequence[Any]]:
+    """行 -> 列，只取需要的列"""
+    positions = {name: index for index, name in enumerate(columns)}
+    return {name: list(map(itemgetter(positions[name]), rows)) for name in needed}
+
+
+def _round(value: Optional[float], digits: int = 2) -> float:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 0
+    return round(float(value), digits)
+
+
+def _score_histogram(percentages) -> List[Dict[str, Any]]:
+    """分数直方图（分段规则与成绩分布引擎一致）"""
+    counts = histogram_counts(percentages, HISTOGRAM_EDGES)
+    return [
+        {'label': label, 'min': lower, 'max': upper, 'count': count}
+        for label, lower, upper, count in zip(
+            histogram_labels(HISTOGRAM_EDGES), HISTOGRAM_EDGES, HISTOGRAM_EDGES[1:], counts
+        )
+    ]
+
+
+# ========================================
+# 成绩报表
+# ========================================
+
+def compute_grade_report(rows: Sequence[Sequence[Any]], columns: Sequence[str], scale,
+                         vectorized: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    计算成绩报表统计
+
+    Args:
+        rows: 查询结果行，至少包含 GRADE_REPORT_COLUMNS 中的列
+        columns: 行中各列的名称
+        scale: 成绩等级表（GradingScale）
+        vectorized: 是否使用向量化计算，None表示可用时使用
+
+    Returns:
+        Dict: summary / course_statistics / department_statistics，
+              以及与行一一对应的 letters（等级）和 points（绩点）
+    """
+    data = _columns(rows, columns, GRADE_REPORT_COLUMNS)
+    if _use_vectorized(vectorized):
+        return _grade_report_vectorized(data, scale)
+    return _grade_report_python(data, scale)
+
+
+def _categorical(values: Sequence[Any]):
+    """字符串列 -> categorical，类别按首次出现顺序排列，空值归入“未知”"""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    categories = list(uniques)
+    if (codes < 0).any():
+        if UNKNOWN in categories:
+            missing_code = categories.index(UNKNOWN)
+        else:
+            missing_code = len(categories)
+            categories.append(UNKNOWN)
+        codes = np.where(codes < 0, missing_code, codes)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _score_summary_vectorized(scores, passed) -> Dict[str, Any]:
+    """一组分数（已去除空值）的汇总指标"""
+    if not scores.size:
+        return {'average': 0, 'highest': 0, 'lowest': 0, 'std': 0, 'median': 0, 'pass_rate': 0}
+    return {
+        'average': _round(scores.mean()),
+        'highest': float(scores.max()),
+        'lowest': float(scores.min()),
+        'std': _round(scores.std()),
+        'median': _round(np.median(scores)),
+        'pass_rate': _round(passed.sum() / scores.size * 100)
+    }
+
+
+def _grade_report_vectorized(data: Dict[str, Sequence[Any]], scale) -> Dict[str, Any]:
+    scores = np.asarray(data['score'], dtype=float)
+    max_scores = np.asarray(data['max_score'], dtype=float)
+    percentages = scores * 100.0 / np.where(np.isnan(max_scores), 100.0, max_scores)
+    bands = scale.band_indexes_for(percentages)
+    scored = ~np.isnan(scores)
+
+    frame = pd.DataFrame({
+        'score': scores,
+        'passed': percentages + _EPSILON >= scale.passing_score,
+        'course': _categorical(data['course_name']),
+        'department': _categorical(data['department'])
+    })
+
+    letters = scale.letters
+    width = len(letters) + 1  # 末位为无成绩
+    summary_stats = _score_summary_vectorized(scores[scored], frame['passed'].to_numpy()[scored])
+    distribution = np.bincount(bands, minlength=width)[:-1]
+
+    histogram = _score_histogram(percentages[scored])
+
+    percentile_values = np.percentile(scores[scored], PERCENTILES) if scored.any() else [0] * len(PERCENTILES)
+
+    summary = {
+        'total_grades': len(scores),
+        'average_score': summary_stats['average'],
+        'highest_score': summary_stats['highest'],
+        'lowest_score': summary_stats['lowest'],
+        'grade_distribution': dict(zip(letters, distribution.tolist())),
+        'std_deviation': summary_stats['std'],
+        'median_score': summary_stats['median'],
+        'percentiles': {f'p{p}': _round(value) for p, value in zip(PERCENTILES, percentile_values)},
+        'pass_rate': summary_stats['pass_rate'],
+        'score_histogram': histogram
+    }
+
+    course_statistics = {}
+    course_groups = _group_statistics_vectorized(frame, 'course', bands, letters)
+    first_rows = course_groups.pop('first_rows')
+    for index, name in enumerate(course_groups['names']):
+        first = first_rows[index]
+        course_statistics[name] = {
+            'course_code': data['course_code'][first],
+            'teacher': data['teacher_name'][first],
+            'total_students': course_groups['counts'][index],
+            **course_groups['stats'][index]
+        }
+
+    department_statistics = {}
+    dept_groups = _group_statistics_vectorized(frame, 'department', bands, letters)
+    for index, name in enumerate(dept_groups['names']):
+        department_statistics[name] = {
+            'total_grades': dept_groups['counts'][index],
+            **dept_groups['stats'][index]
+        }
+
+    return {
+        'summary': summary,
+        'course_statistics': course_statistics,
+        'department_statistics': department_statistics,
+        'letters': scale.letters_for(percentages).tolist(),
+        'points': [None if math.isnan(point) else point for point in scale.points_for(percentages).tolist()]
+    }
+
+
+def _group_statistics_vectorized(frame, key: str, bands, letters: List[str]) -> Dict[str, Any]:
+    """按 categorical 列分组的计数、等级分布、均值、中位数、标准差和及格率"""
+    width = len(letters) + 1
+    codes = frame[key].cat.codes.to_numpy().astype(np.intp)
+    names = list(frame[key].cat.categories)
+    size = len(names)
+    positions = pd.RangeIndex(size)
+
+    counts = np.bincount(codes, minlength=size)
+    distribution = np.bincount(codes * width + bands, minlength=size * width).reshape(size, width)[:, :-1]
+
+    scores = frame['score'].groupby(codes)
+    aggregated = scores.agg(['count', 'mean', 'median']).reindex(positions)
+    deviations = scores.std(ddof=0).reindex(positions)
+    passed = frame['passed'].groupby(codes).sum().reindex(positions, fill_value=0)
+
+    scored_counts = aggregated['count'].fillna(0).to_numpy()
+    pass_rates = np.divide(passed.to_numpy() * 100.0, scored_counts, out=np.zeros(size), where=scored_counts > 0)
+
+    stats = []
+    for mean, median, deviation, pass_rate, row in zip(
+            aggregated['mean'].tolist(), aggregated['median'].tolist(), deviations.tolist(),
+            pass_rates.tolist(), distribution.tolist()):
+        stats.append({
+            'avg_score': _round(mean),
+            'grade_distribution': dict(zip(letters, row)),
+            'std_deviation': _round(deviation),
+            'median_score': _round(median),
+            'pass_rate': _round(pass_rate)
+        })
+
+    return {
+        'names': names,
+        'counts': counts.tolist(),
+        'stats': stats,
+        'first_rows': np.unique(codes, return_index=True)[1].tolist() if size else []
+    }
+
+
+def _grade_report_python(data: Dict[str, Sequence[Any]], scale) -> Dict[str, Any]:
+    letters: List[Optional[str]] = [None] * len(data['score'])
+    points: List[Optional[float]] = [None] * len(data['score'])
+    passed = []
+
+    for index, (score, max_score) in enumerate(zip(data['score'], data['max_score'])):
+        if score is None:
+            passed.append(False)
+            continue
+        percentage = score * 100.0 / (max_score if max_score is not None else 100.0)
+        letters[index] = scale.letter_for(percentage)
+        points[index] = scale.point_for(percentage)
+        passed.append(scale.is_passing(percentage))
+
+    scores = [score for score in data['score'] if score is not None]
+    histogram = _score_histogram([
+        score * 100.0 / (max_score if max_score is not None else 100.0)
+        for score, max_score in zip(data['score'], data['max_score']) if score is not None
+    ])
+    summary_stats = _score_summary_python(scores, sum(passed))
+    grade_distribution = scale.empty_distribution()
+    for letter in letters:
+        if letter in grade_distribution:
+            grade_distribution[letter] += 1
+
+    summary = {
+        'total_grades': len(letters),
+        'average_score': summary_stats['average'],
+        'highest_score': summary_stats['highest'],
+        'lowest_score': summary_stats['lowest'],
+        'grade_distribution': grade_distribution,
+        'std_deviation': summary_stats['std'],
+        'median_score': summary_stats['median'],
+        'percentiles': {f'p{p}': _round(percentile(sorted(scores), p)) for p in PERCENTILES},
+        'pass_rate': summary_stats['pass_rate'],
+        'score_histogram': histogram
+    }
+
+    course_statistics = {}
+    for index, stats in _group_statistics_python(data['course_name'], data['score'], letters, passed, scale).items():
+        name, first = index
+        course_statistics[name] = {
+            'course_code': data['course_code'][first],
+            'teacher': data['teacher_name'][first],
+            'total_students': stats.pop('count'),
+            **stats
+        }
+
+    department_statistics = {}
+    for index, stats in _group_statistics_python(data['department'], data['score'], letters, passed, scale).items():
+        name, _ = index
+        department_statistics[name] = {'total_grades': stats.pop('count'), **stats}
+
+    return {
+        'summary': summary,
+        'course_statistics': course_statistics,
+        'department_statistics': department_statistics,
+        'letters': letters,
+        'points': points
+    }
+
+
+def _score_summary_python(scores: List[float], passed_count: int) -> Dict[str, Any]:
+    if not scores:
+        return {'average': 0, 'highest': 0, 'lowest': 0, 'std': 0, 'median': 0, 'pass_rate': 0}
+    return {
+        'average': _round(sum(scores) / len(scores)),
+        'highest': float(max(scores)),
+        'lowest': float(min(scores)),
+        'std': _round(statistics.pstdev(scores)),
+        'median': _round(statistics.median(scores)),
+        'pass_rate': _round(passed_count / len(scores) * 100)
+    }
+
+
+def _group_statistics_python(keys, scores, letters, passed, scale) -> Dict[tuple, Dict[str, Any]]:
+    """逐行分组统计，返回 {(分组名, 首行下标): 统计}"""
+    groups: Dict[Any, Dict[str, Any]] = {}
+    for index, key in enumerate(keys):
+        key = key if key is not None else UNKNOWN
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'first': index, 'count': 0, 'scores': [], 'passed': 0,
+                'grade_distribution': scale.empty_distribution()
+            }
+        group['count'] += 1
+        if scores[index] is not None:
+            group['scores'].append(scores[index])
+            group['passed'] += passed[index]
+        if letters[index] in group['grade_distribution']:
+            group['grade_distribution'][letters[index]] += 1
+
+    result = {}
+    for key, group in groups.items():
+        summary = _score_summary_python(group['scores'], group['passed'])
+        result[(key, group['first'])] = {
+            'count': group['count'],
+            'avg_score': summary['average'],
+            'grade_distribution': group['grade_distribution'],
+            'std_deviation': summary['std'],
+            'median_score': summary['median'],
+            'pass_rate': summary['pass_rate']
+        }
+    return result
+
+
+# ========================================
+# 教师报表
+# ========================================
+
+def compute_teacher_report(teachers: Sequence[Sequence[Any]], teacher_columns: Sequence[str],
+                           course_teachers: Sequence[Sequence[Any]], enrollment_counts: Sequence[Sequence[Any]],
+                           grades: Sequence[Sequence[Any]], vectorized: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    计算教师报表统计
+
+    Args:
+        teachers: 教师行，至少包含 TEACHER_COLUMNS 中的列
+        teacher_columns: 教师行中各列的名称
+        course_teachers: (课程ID, 教师ID) 行
+        enrollment_counts: (课程ID, 选课人数) 行
+        grades: (课程ID, 分数, 学生院系) 行
+        vectorized: 是否使用向量化计算，None表示可用时使用
+
+    Returns:
+        Dict: teacher_statistics（与 teachers 顺序一致）/ summary / department_statistics
+    """
+    data = _columns(teachers, teacher_columns, TEACHER_COLUMNS)
+    courses = _columns(course_teachers, _COURSE_TEACHER_COLUMNS, _COURSE_TEACHER_COLUMNS)
+    enrollments = _columns(enrollment_counts, _ENROLLMENT_COUNT_COLUMNS, _ENROLLMENT_COUNT_COLUMNS)
+    grade_data = _columns(grades, _TEACHER_GRADE_COLUMNS, _TEACHER_GRADE_COLUMNS)
+
+    if _use_vectorized(vectorized):
+        per_teacher = _teacher_statistics_vectorized(data, courses, enrollments, grade_data)
+    else:
+        per_teacher = _teacher_statistics_python(data, courses, enrollments, grade_data)
+
+    return {
+        'teacher_statistics': per_teacher,
+        'summary': {
+            'total_teachers': len(per_teacher),
+            'total_courses': sum(item['courses'] for item in per_teacher),
+            'total_students': sum(item['total_students'] for item in per_teacher)
+        },
+        'department_statistics': _teacher_department_statistics(data, per_teacher)
+    }
+
+
+def _lookup_positions(values: Sequence[Any], mapping: Dict[Any, int]):
+    """
+    批量查找位置，未找到为 -1
+
+    先对整列 factorize，只对去重后的值查字典，再按编码展开
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    lookup = np.fromiter((mapping.get(value, -1) for value in uniques), dtype=np.intp, count=len(uniques))
+    # 编码 -1（空值）取末尾追加的 -1
+    return np.append(lookup, -1)[codes]
+
+
+def _teacher_statistics_vectorized(data, courses, enrollments, grade_data) -> List[Dict[str, Any]]:
+    size = len(data['id'])
+    positions = {teacher_id: index for index, teacher_id in enumerate(data['id'])}
+    # 课程 -> 教师位置（课程数量级小，直接建字典）
+    course_owner = {
+        course_id: positions[teacher_id]
+        for course_id, teacher_id in zip(courses['course_id'], courses['teacher_id'])
+        if teacher_id in positions
+    }
+
+    def owners(course_ids):
+        return _lookup_positions(course_ids, course_owner)
+
+    def per_teacher(positions, weights=None):
+        mask = positions >= 0
+        return np.bincount(
+            positions[mask], weights=None if weights is None else weights[mask], minlength=size
+        )[:size]
+
+    course_counts = per_teacher(np.fromiter(course_owner.values(), dtype=np.intp, count=len(course_owner)))
+    student_counts = per_teacher(owners(enrollments['course_id']), np.asarray(enrollments['count'], dtype=float))
+
+    grade_owner = owners(grade_data['course_id'])
+    scores = np.asarray(grade_data['score'], dtype=float)
+    scored = ~np.isnan(scores)
+    score_sums = per_teacher(np.where(scored, grade_owner, -1), np.where(scored, scores, 0.0))
+    score_counts = per_teacher(np.where(scored, grade_owner, -1))
+
+    # 学生院系去重计数（空院系不计，与 COUNT(DISTINCT) 一致）
+    dept_codes, dept_uniques = pd.factorize(np.asarray(grade_data['department'], dtype=object))
+    valid = (grade_owner >= 0) & (dept_codes >= 0)
+    pairs = np.unique(grade_owner[valid] * max(len(dept_uniques), 1) + dept_codes[valid])
+    dept_counts = np.bincount(pairs // max(len(dept_uniques), 1), minlength=size)[:size]
+
+    averages = np.divide(score_sums, score_counts, out=np.zeros(size), where=score_counts > 0)
+    return [
+        {
+            'courses': int(courses_count),
+            'total_students': int(students),
+            'average_grade': _round(average),
+            'student_departments': int(departments)
+        }
+        for courses_count, students, average, departments in zip(
+            course_counts.tolist(), student_counts.tolist(), averages.tolist(), dept_counts.tolist())
+    ]
+
+
+def _teacher_statistics_python(data, courses, enrollments, grade_data) -> List[Dict[str, Any]]:
+    positions = {teacher_id: index for index, teacher_id in enumerate(data['id'])}
+    course_owner = {
+        course_id: positions[teacher_id]
+        for course_id, teacher_id in zip(courses['course_id'], courses['teacher_id'])
+        if teacher_id in positions
+    }
+    stats = [
+        {'courses': 0, 'total_students': 0, 'score_sum': 0.0, 'score_count': 0, 'departments': set()}
+        for _ in data['id']
+    ]
+
+    for owner in course_owner.values():
+        stats[owner]['courses'] += 1
+    for course_id, count in zip(enrollments['course_id'], enrollments['count']):
+        if course_id in course_owner:
+            stats[course_owner[course_id]]['total_students'] += count or 0
+    for course_id, score, department in zip(grade_data['course_id'], grade_data['score'], grade_data['department']):
+        owner = course_owner.get(course_id)
+        if owner is None:
+            continue
+        if score is not None:
+            stats[owner]['score_sum'] += score
+            stats[owner]['score_count'] += 1
+        if department is not None:
+            stats[owner]['departments'].add(department)
+
+    return [
+        {
+            'courses': item['courses'],
+            'total_students': item['total_students'],
+            'average_grade': _round(item['score_sum'] / item['score_count']) if item['score_count'] else 0,
+            'student_departments': len(item['departments'])
+        }
+        for item in stats
+    ]
+
+
+def _teacher_department_statistics(data, per_teacher: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """按教师院系汇总（教师数量级小，逐行计算）"""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for department, workload, stats in zip(data['department'], data['workload'], per_teacher):
+        group = groups.setdefault(department or UNKNOWN, {
+            'teacher_count': 0, 'course_count': 0, 'student_count': 0, 'workloads': [], 'grades': []
+        })
+        group['teacher_count'] += 1
+        group['course_count'] += stats['courses']
+        group['student_count'] += stats['total_students']
+        group['workloads'].append(workload or 0)
+        if stats['average_grade']:
+            group['grades'].append(stats['average_grade'])
+
+    return {
+        department: {
+            'teacher_count': group['teacher_count'],
+            'course_count': group['course_count'],
+            'student_count': group['student_count'],
+            'avg_workload': _round(sum(group['workloads']) / len(group['workloads'])),
+            'avg_grade': _round(sum(group['grades']) / len(group['grades'])) if group['grades'] else 0
+        }
+        for department, group in groups.items()
+    }
@@ -0,0 +1,230 @@
+# ========================================
+# 学生信息管理系统 - 报表文档输出
+# ========================================
+
+"""
+多分节报表文档的输出：JSON、XLSX（每个分节一个工作表）、PDF。
+
+文档结构（由 services.term_report.build_term_report 生成）：
+    {'title', 'filters', 'status', 'generated_at', 'duration_ms',
+     'sections': [{'name', 'title', 'status', 'error', 'keys', 'columns', 'rows', ...}]}
+
+- JSON 中每个分节的行按 keys 转为对象
+- XLSX 首个工作表为报表说明（筛选条件、生成时间、各分节状态），其后每个分节一个工作表，
+  由 xlsx_workbook_chunks 流式写入文件
+- PDF 为横向A4表格，使用内置宋体（STSong-Light）显示中文；超时或失败的分节注明状态
+
+reportlab 为可选依赖，未安装时 document_format_available('pdf') 返回 False。
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List
+
+from utils.xlsx_stream import XLSX_CONTENT_TYPE, xlsx_workbook_chunks
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, TableStyle
+except ImportError:  # reportlab 为可选依赖
+    pdfmetrics = None
+
+DOCUMENT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'xlsx': (XLSX_CONTENT_TYPE, 'xlsx'),
+    'pdf': ('application/pdf', 'pdf'),
+}
+
+SECTION_STATUS_LABELS = {
+    'completed': '已完成',
+    'timeout': '超时未完成',
+    'failed': '计算失败',
+    'pending': '未开始',
+}
+
+DOCUMENT_STATUS_LABELS = {
+    'complete': '完整',
+    'partial': '部分（存在未完成的分节）',
+    'failed': '失败',
+}
+
+PDF_FONT_NAME = 'STSong-Light'
+
+
+def document_format_available(document_format: str) -> bool:
+    """格式所需的依赖是否已安装"""
+    if document_format == 'pdf':
+        return pdfmetrics is not None
+    return document_format in DOCUMENT_FORMATS
+
+
+def _filter_text(document: Dict[str, Any]) -> str:
+    filters = document.get('filters') or {}
+    labels = {'semester': '学期', 'department': '院系'}
+    return '，'.join(f"{labels.get(key, key)}: {value}" for key, value in filters.items()) or '全部'
+
+
+def _section_note(section: Dict[str, Any]) -> str:
+    note = SECTION_STATUS_LABELS.get(section['status'], section['status'])
+    if section.get('error'):
+        note += f"（{section['error']}）"
+    return note
+
+
+# ========================================
+# JSON
+# ========================================
+
+def write_report_json(document: Dict[str, Any], path: str):
+    """写出JSON文档，分节的行转为对象"""
+    output = dict(document)
+    output['sections'] = [
+        {
+            **{key: value for key, value in section.items() if key not in ('keys', 'columns', 'rows')},
+            'columns': dict(zip(section['keys'], section['columns'])),
+            'rows': [dict(zip(section['keys'], row)) for row in section['rows']]
+        }
+        for section in document['sections']
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, default=str)
+
+
+# ========================================
+# XLSX
+# ========================================
+
+def _cover_rows(document: Dict[str, Any]) -> List[List[Any]]:
+    rows = [
+        ['报表', document['title']],
+        ['筛选条件', _filter_text(document)],
+        ['生成时间', document['generated_at']],
+        ['状态', DOCUMENT_STATUS_LABELS.get(document['status'], document['status'])],
+        ['耗时(ms)', document.get('duration_ms')],
+    ]
+    for section in document['sections']:
+        rows.append([section['title'], f"{_section_note(section)}，{section['row_count']} 行"])
+    return rows
+
+
+def report_xlsx_chunks(document: Dict[str, Any]) -> Iterator[bytes]:
+    """报表文档 -> XLSX分块（说明页 + 每个分节一个工作表）"""
+    sheets = [('报表说明', ['项目', '内容'], _cover_rows(document), [16, 60])]
+    for section in document['sections']:
+        if section['status'] == 'completed':
+            sheets.append((section['title'], section['columns'], section['rows']))
+    return xlsx_workbook_chunks(sheets)
+
+
+def write_report_xlsx(document: Dict[str, Any], path: str):
+    """写出XLSX文档"""
+    with open(path, 'wb') as f:
+        for chunk in report_xlsx_chunks(document):
+            f.write(chunk)
+
+
+# ========================================
+# PDF
+# ========================================
+
+def register_pdf_font():
+    """注册内置中文字体（重复调用无副作用）"""
+    if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont(PDF_FONT_NAME))
+
+
+def _pdf_cell(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return f'{value:g}'
+    return str(value)
+
+
+def write_report_pdf(document: Dict[str, Any], path: str):
+    """
+    写出PDF文档（横向A4，每个分节一张表格，表头跨页重复）
+
+    Args:
+        document: 报表文档
+        path: 输出路径
+
+    Raises:
+        RuntimeError: 未安装reportlab
+    """
+    if pdfmetrics is None:
+        raise RuntimeError('生成PDF需要安装 reportlab')
+    register_pdf_font()
+
+    styles = getSampleStyleSheet()
+    for name in ('Title', 'Heading2', 'Normal'):
+        styles[name].fontName = PDF_FONT_NAME
+    table_style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), PDF_FONT_NAME),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+        ('LEADING', (0, 0), (-1, -1), 9),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D9E1F2')),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+
+    story = [
+        Paragraph(document['title'], styles['Title']),
+        Paragraph(
+            f"筛选条件：{_filter_text(document)}　生成时间：{document['generated_at']}　"
+            f"状态：{DOCUMENT_STATUS_LABELS.get(document['status'], document['status'])}",
+            styles['Normal']
+        ),
+        Spacer(1, 4 * mm),
+    ]
+    for section in document['sections']:
+        story.append(Paragraph(section['title'], styles['Heading2']))
+        if section['status'] != 'completed':
+            story.append(Paragraph(_section_note(section), styles['Normal']))
+            continue
+        if not section['rows']:
+            story.append(Paragraph('无数据', styles['Normal']))
+            continue
+        data = [section['columns']] + [[_pdf_cell(value) for value in row] for row in section['rows']]
+        table = LongTable(data, repeatRows=1)
+        table.setStyle(table_style)
+        story.extend([table, Spacer(1, 4 * mm)])
+
+    SimpleDocTemplate(
+        path, pagesize=landscape(A4), title=document['title'],
+        leftMargin=10 * mm, rightMargin=10 * mm, topMargin=10 * mm, bottomMargin=10 * mm
+    ).build(story)
+
+
+# ========================================
+# 统一入口
+# ========================================
+
+_WRITERS = {
+    'json': write_report_json,
+    'xlsx': write_report_xlsx,
+    'pdf': write_report_pdf,
+}
+
+
+def write_report_document(document: Dict[str, Any], path: str, document_format: str):
+    """
+    按格式写出报表文档
+
+    Args:
+        document: 报表文档
+        path: 输出路径
+        document_format: json/xlsx/pdf
+
+    Raises:
+        ValueError: 不支持的格式
+    """
+    if document_format not in _WRITERS:
+        raise ValueError(f"不支持的报表格式: {document_format}")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _WRITERS[document_format](document, path)
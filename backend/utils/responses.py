@@ -2,7 +2,8 @@
 # 学生信息管理系统 - 响应工具类
 # ========================================
 
-from flask import jsonify, make_response
+from flask import Response, jsonify, make_response, stream_with_context
+from urllib.parse import quote
 from datetime import datetime
 from typing import Any, Dict, Optional, Union
 
@@ -290,6 +291,27 @@ def make_file_response(file_data, filename, content_type='application/octet-stre
     response.headers['Content-Type'] = content_type
     return response
 
+def make_streaming_file_response(chunks, filename, content_type='application/octet-stream'):
+    """
+    创建流式文件响应（分块传输，不在内存中拼接完整文件）
+
+    Args:
+        chunks: 字节分块迭代器
+        filename: 下载文件名
+        content_type: 内容类型
+
+    Returns:
+        Response: 流式响应
+    """
+    response = Response(stream_with_context(chunks), content_type=content_type)
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename="{filename}"; filename*=UTF-8\'\'{quote(filename)}'
+    )
+    # 禁止反向代理缓冲，保证分块及时下发
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 def make_csv_response(csv_data, filename):
     """创建CSV响应"""
     return make_file_response(csv_data, filename, 'text/csv')
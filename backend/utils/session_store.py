@@ -0,0 +1,368 @@
+# ========================================
+# 学生信息管理系统 - 会话存储
+# ========================================
+
+"""
+基于 Redis 的用户会话存储。
+
+- session:{id} 哈希保存会话字段，空闲超过 SESSION_IDLE_TIMEOUT 秒自动过期
+- user_sessions:{user_id} 有序集合为每个用户的会话索引（分数为过期时间），
+  列出和注销某个用户的全部会话只涉及该用户的会话
+- sessions:expiry 有序集合按过期时间记录所有会话，批量清理时按分数范围分批取出
+- 活动时间先记在进程内，每个会话最多每 SESSION_ACTIVITY_INTERVAL 秒写一次，
+  每 SESSION_FLUSH_INTERVAL 秒（或积累 SESSION_FLUSH_BATCH_SIZE 个）批量写入
+
+Usage:
+    store = get_session_store()
+    session_id = store.create(user.id, device_info, ip_address)
+    store.touch(session_id, user.id)
+    store.list_user_sessions(user.id)
+    store.destroy_user_sessions(user.id)
+    store.cleanup_expired()
+"""
+
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import current_app, has_app_context
+
+SESSION_KEY = 'session:{session_id}'
+USER_SESSIONS_KEY = 'user_sessions:{user_id}'
+SESSION_EXPIRY_KEY = 'sessions:expiry'
+
+DEFAULT_IDLE_TIMEOUT = 86400
+DEFAULT_ACTIVITY_INTERVAL = 60
+DEFAULT_FLUSH_INTERVAL = 5
+DEFAULT_FLUSH_BATCH_SIZE = 500
+DEFAULT_CLEANUP_BATCH_SIZE = 1000
+
+_session_store = None
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.utcfromtimestamp(timestamp).isoformat()
+
+
+class SessionStore:
+    """用户会话存储"""
+
+    def __init__(self, client=None, idle_timeout: int = DEFAULT_IDLE_TIMEOUT,
+                 activity_interval: float = DEFAULT_ACTIVITY_INTERVAL,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 flush_batch_size: int = DEFAULT_FLUSH_BATCH_SIZE,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            client: Redis客户端，默认为 extensions.redis_client
+            idle_timeout: 会话空闲过期时间（秒）
+            activity_interval: 同一会话两次写入活动时间的最小间隔（秒）
+            flush_interval: 批量写入活动时间的间隔（秒）
+            flush_batch_size: 待写入的会话达到该数量时立即写入
+            clock: 时钟
+        """
+        if client is None:
+            from extensions import redis_client as client
+        self.redis_client = client
+        self.idle_timeout = idle_timeout
+        self.activity_interval = activity_interval
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        # 待写入的活动时间：会话ID -> (用户ID字符串或None, 时间戳)
+        self._pending: Dict[str, tuple] = {}
+        # 最近一次写入（或创建）的时间，用于合并同一会话的频繁活动
+        self._written: Dict[str, float] = {}
+        self._next_flush = clock() + flush_interval
+
+    # ---------- 创建和读取 ----------
+
+    def create(self, user_id: str, device_info: Optional[Dict] = None, ip_address: str = '') -> str:
+        """
+        创建会话
+
+        Args:
+            user_id: 用户ID
+            device_info: 设备信息
+            ip_address: IP地址
+
+        Returns:
+            str: 会话ID
+        """
+        session_id = str(uuid.uuid4())
+        user_id = str(user_id)
+        now = self.clock()
+        expires_at = now + self.idle_timeout
+        key = SESSION_KEY.format(session_id=session_id)
+
+        pipe = self.redis_client.pipeline()
+        pipe.hset(key, mapping={
+            'user_id': user_id,
+            'created_at': _isoformat(now),
+            'last_activity': _isoformat(now),
+            'device_info': json.dumps(device_info or {}, ensure_ascii=False),
+            'ip_address': ip_address or ''
+        })
+        pipe.expire(key, self.idle_timeout)
+        pipe.zadd(USER_SESSIONS_KEY.format(user_id=user_id), {session_id: expires_at})
+        pipe.zadd(SESSION_EXPIRY_KEY, {f"{user_id}:{session_id}": expires_at})
+        pipe.execute()
+
+        with self._lock:
+            self._written[session_id] = now
+        return session_id
+
+    @staticmethod
+    def _decode(session_id: str, fields: Dict) -> Optional[Dict[str, Any]]:
+        if not fields:
+            return None
+        data = {_text(name): _text(value) for name, value in fields.items()}
+        if 'user_id' not in data:
+            return None
+        data['session_id'] = session_id
+        data['device_info'] = json.loads(data.get('device_info') or '{}')
+        return data
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取会话（包含本进程尚未写入的活动时间）
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 会话信息，不存在或已过期为 None
+        """
+        data = self._decode(session_id, self.redis_client.hgetall(SESSION_KEY.format(session_id=session_id)))
+        pending = self._pending.get(session_id)
+        if data and pending:
+            data['last_activity'] = _isoformat(pending[1])
+        return data
+
+    def list_user_sessions(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        列出用户的有效会话（按用户索引读取，一次往返取出所有会话）
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            List[Dict[str, Any]]: 会话列表，最近活动的在前
+        """
+        index_key = USER_SESSIONS_KEY.format(user_id=user_id)
+        session_ids = [
+            _text(session_id)
+            for session_id in self.redis_client.zrangebyscore(index_key, self.clock(), '+inf')
+        ]
+        if not session_ids:
+            return []
+
+        pipe = self.redis_client.pipeline()
+        for session_id in session_ids:
+            pipe.hgetall(SESSION_KEY.format(session_id=session_id))
+        sessions = []
+        for session_id, fields in zip(session_ids, pipe.execute()):
+            data = self._decode(session_id, fields)
+            if data:
+                pending = self._pending.get(session_id)
+                if pending:
+                    data['last_activity'] = _isoformat(pending[1])
+                sessions.append(data)
+        sessions.sort(key=lambda item: item['last_activity'], reverse=True)
+        return sessions
+
+    # ---------- 活动时间 ----------
+
+    def touch(self, session_id: str, user_id: Optional[str] = None) -> bool:
+        """
+        记录会话活动（不访问 Redis，到期后批量写入）
+
+        Args:
+            session_id: 会话ID
+            user_id: 用户ID（提供时写入不需要先读取会话）
+
+        Returns:
+            bool: 是否记入待写入队列（间隔内的重复活动被合并，返回 False）
+        """
+        now = self.clock()
+        with self._lock:
+            if now - self._written.get(session_id, float('-inf')) < self.activity_interval:
+                return False
+            self._written[session_id] = now
+            self._pending[session_id] = (str(user_id) if user_id is not None else None, now)
+            due = len(self._pending) >= self.flush_batch_size or now >= self._next_flush
+        if due:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """
+        批量写入待写入的活动时间并延长会话有效期（写入失败时放回队列，下次重试）
+
+        Returns:
+            int: 写入的会话数
+        """
+        now = self.clock()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._next_flush = now + self.flush_interval
+            # 超过合并间隔的记录不再需要
+            cutoff = now - self.activity_interval
+            self._written = {session_id: at for session_id, at in self._written.items() if at > cutoff}
+        if not pending:
+            return 0
+
+        try:
+            # 未提供用户ID的会话先批量读取（同时确认会话仍然存在）
+            unknown = [session_id for session_id, (user_id, _) in pending.items() if user_id is None]
+            if unknown:
+                pipe = self.redis_client.pipeline()
+                for session_id in unknown:
+                    pipe.hget(SESSION_KEY.format(session_id=session_id), 'user_id')
+                for session_id, user_id in zip(unknown, pipe.execute()):
+                    if user_id is None:
+                        del pending[session_id]
+                    else:
+                        pending[session_id] = (_text(user_id), pending[session_id][1])
+
+            pipe = self.redis_client.pipeline()
+            for session_id, (user_id, at) in pending.items():
+                key = SESSION_KEY.format(session_id=session_id)
+                expires_at = at + self.idle_timeout
+                pipe.hset(key, 'last_activity', _isoformat(at))
+                pipe.expireat(key, int(expires_at) + 1)
+                pipe.zadd(USER_SESSIONS_KEY.format(user_id=user_id), {session_id: expires_at}, xx=True)
+                pipe.zadd(SESSION_EXPIRY_KEY, {f"{user_id}:{session_id}": expires_at}, xx=True)
+            pipe.execute()
+            return len(pending)
+        except Exception as e:
+            if has_app_context():
+                current_app.logger.warning(f"写入会话活动时间失败: {str(e)}")
+            # 合并间隔内的活动已被跳过，丢弃这批记录会丢失活动时间；期间有更新的记录时以新的为准
+            with self._lock:
+                for session_id, entry in pending.items():
+                    self._pending.setdefault(session_id, entry)
+            return 0
+
+    # ---------- 销毁和清理 ----------
+
+    def destroy(self, session_id: str) -> bool:
+        """
+        销毁会话
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            bool: 会话是否存在
+        """
+        key = SESSION_KEY.format(session_id=session_id)
+        user_id = _text(self.redis_client.hget(key, 'user_id'))
+        with self._lock:
+            self._pending.pop(session_id, None)
+            self._written.pop(session_id, None)
+        if user_id is None:
+            return False
+
+        pipe = self.redis_client.pipeline()
+        pipe.delete(key)
+        pipe.zrem(USER_SESSIONS_KEY.format(user_id=user_id), session_id)
+        pipe.zrem(SESSION_EXPIRY_KEY, f"{user_id}:{session_id}")
+        pipe.execute()
+        return True
+
+    def destroy_user_sessions(self, user_id: str, except_session_id: Optional[str] = None) -> int:
+        """
+        销毁用户的全部会话
+
+        Args:
+            user_id: 用户ID
+            except_session_id: 保留的会话（如当前会话）
+
+        Returns:
+            int: 销毁的会话数
+        """
+        index_key = USER_SESSIONS_KEY.format(user_id=user_id)
+        session_ids = [
+            _text(session_id) for session_id in self.redis_client.zrange(index_key, 0, -1)
+            if _text(session_id) != except_session_id
+        ]
+        if not session_ids:
+            return 0
+
+        with self._lock:
+            for session_id in session_ids:
+                self._pending.pop(session_id, None)
+                self._written.pop(session_id, None)
+
+        pipe = self.redis_client.pipeline()
+        pipe.delete(*[SESSION_KEY.format(session_id=session_id) for session_id in session_ids])
+        pipe.zrem(index_key, *session_ids)
+        pipe.zrem(SESSION_EXPIRY_KEY, *[f"{user_id}:{session_id}" for session_id in session_ids])
+        pipe.execute()
+        return len(session_ids)
+
+    def cleanup_expired(self, batch_size: int = DEFAULT_CLEANUP_BATCH_SIZE) -> int:
+        """
+        批量清理过期会话（会话键已由 Redis 过期删除，这里清理两个索引中的残留）
+
+        Args:
+            batch_size: 每批处理的会话数
+
+        Returns:
+            int: 清理的会话数
+        """
+        # 先写入本进程的活动时间，避免仍活跃的会话被当作过期
+        self.flush()
+        now = self.clock()
+        removed = 0
+        while True:
+            members = [
+                _text(member) for member in
+                self.redis_client.zrangebyscore(SESSION_EXPIRY_KEY, '-inf', now, start=0, num=batch_size)
+            ]
+            if not members:
+                break
+
+            pipe = self.redis_client.pipeline()
+            for member in members:
+                user_id, _, session_id = member.rpartition(':')
+                pipe.zremrangebyscore(USER_SESSIONS_KEY.format(user_id=user_id), '-inf', now)
+                pipe.delete(SESSION_KEY.format(session_id=session_id))
+            pipe.zrem(SESSION_EXPIRY_KEY, *members)
+            pipe.execute()
+
+            removed += len(members)
+            if len(members) < batch_size:
+                break
+        return removed
+
+
+def get_session_store() -> SessionStore:
+    """获取全局会话存储"""
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore(
+            idle_timeout=_config('SESSION_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT),
+            activity_interval=_config('SESSION_ACTIVITY_INTERVAL', DEFAULT_ACTIVITY_INTERVAL),
+            flush_interval=_config('SESSION_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+            flush_batch_size=_config('SESSION_FLUSH_BATCH_SIZE', DEFAULT_FLUSH_BATCH_SIZE)
+        )
+    return _session_store
@@ -0,0 +1,403 @@
+# ========================================
+# 学生信息管理系统 - 令牌撤销
+# ========================================
+
+"""
+JWT 令牌撤销：Redis 共享存储 + 进程内布隆过滤器。
+
+- 撤销单个令牌：Redis 键 revoked_token:{jti} 在令牌自身的 exp 过期，同时记入有序集合
+  （分数为 exp）供各实例同步
+- 撤销用户全部令牌：用户代数（generation）+1；签发令牌时写入当前代数（gen 声明），
+  代数小于当前代数的令牌无效，检查只是一次字典查找
+- 每次撤销由 Lua 脚本把版本号+1，并以新版本号为分数写入变更日志（有序集合，只保留最近
+  TOKEN_REVOCATION_LOG_LENGTH 条）
+- 各实例每 TOKEN_REVOCATION_SYNC_INTERVAL 秒读取一次版本号，变化时只读取日志中比本地版本新的
+  条目并加入过滤器和代数表；每 TOKEN_REVOCATION_REBUILD_INTERVAL 秒清理一次已过期的令牌并整体重建
+  过滤器（布隆过滤器不能删除），日志已被截断到本地版本之后或过滤器超出容量时也整体重建
+- 未被撤销的令牌（绝大多数请求）只查本地过滤器，不访问 Redis。过滤器命中时再查 Redis 确认，
+  误判不会拒绝有效令牌
+- 其他实例上的撤销最多延迟一个同步间隔生效；本实例上的撤销立即生效
+
+Usage:
+    revocation = get_token_revocation()
+    revocation.revoke(jti, expires_at=payload['exp'])
+    revocation.revoke_all(user_id)
+    revocation.is_revoked(payload)
+"""
+
+import hashlib
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app, has_app_context
+
+# Redis 键
+REVOKED_TOKEN_KEY = 'revoked_token:{jti}'
+REVOKED_TOKENS_INDEX = 'revoked_tokens'
+TOKEN_GENERATIONS_KEY = 'token_generations'
+REVOCATION_VERSION_KEY = 'token_revocation:version'
+REVOCATION_LOG_KEY = 'token_revocation:log'
+
+# 令牌中的代数声明
+GENERATION_CLAIM = 'gen'
+
+DEFAULT_FILTER_CAPACITY = 100000
+DEFAULT_FILTER_ERROR_RATE = 0.001
+DEFAULT_SYNC_INTERVAL = 5
+DEFAULT_REBUILD_INTERVAL = 3600
+DEFAULT_LOG_LENGTH = 10000
+
+# 版本号+1，并以新版本号为分数写入变更日志，只保留最近 length 条；
+# 版本号与日志在同一脚本中更新，按版本号增量读取日志不会遗漏
+_LUA_LOG_CHANGE = '''
+local function log_change(version_key, log_key, member, length)
+    local version = redis.call('INCR', version_key)
+    redis.call('ZADD', log_key, version, member)
+    redis.call('ZREMRANGEBYRANK', log_key, 0, -tonumber(length) - 1)
+    return version
+end
+'''
+
+# KEYS: 令牌键, 撤销索引, 版本号, 变更日志；ARGV: jti, exp, 日志长度
+REVOKE_TOKEN_SCRIPT = _LUA_LOG_CHANGE + '''
+redis.call('SET', KEYS[1], 1, 'EXAT', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+return log_change(KEYS[3], KEYS[4], 'jti:' .. ARGV[1], ARGV[3])
+'''
+
+# KEYS: 代数表, 版本号, 变更日志；ARGV: 用户ID, 日志长度；返回新的代数
+REVOKE_ALL_SCRIPT = _LUA_LOG_CHANGE + '''
+local generation = redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+log_change(KEYS[2], KEYS[3], 'gen:' .. generation .. ':' .. ARGV[1], ARGV[2])
+return generation
+'''
+
+_token_revocation = None
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _int(value) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+class BloomFilter:
+    """
+    布隆过滤器：只会误判“可能存在”，不会漏判
+
+    按容量和误判率确定位数和哈希次数，哈希由一次 blake2b 摘要的两半做双重哈希得到。
+    """
+
+    __slots__ = ('size', 'hash_count', 'bits', '_lock')
+
+    def __init__(self, capacity: int = DEFAULT_FILTER_CAPACITY, error_rate: float = DEFAULT_FILTER_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str):
+        positions = self._positions(item)
+        with self._lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocation:
+    """令牌撤销列表"""
+
+    def __init__(self, client=None, sync_interval: float = DEFAULT_SYNC_INTERVAL,
+                 capacity: int = DEFAULT_FILTER_CAPACITY, error_rate: float = DEFAULT_FILTER_ERROR_RATE,
+                 rebuild_interval: float = DEFAULT_REBUILD_INTERVAL, log_length: int = DEFAULT_LOG_LENGTH,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            client: Redis客户端，默认为 extensions.redis_client
+            sync_interval: 检查共享存储版本号的间隔（秒）
+            capacity: 过滤器容量（撤销数量超过时按实际数量扩容）
+            error_rate: 过滤器误判率
+            rebuild_interval: 清理过期令牌并整体重建过滤器的间隔（秒）
+            log_length: 变更日志保留的条数
+            clock: 时钟
+        """
+        if client is None:
+            from extensions import redis_client as client
+        self.redis_client = client
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.log_length = log_length
+        self.clock = clock
+
+        # 过滤器和代数表整体替换或只增不减，读取不加锁
+        self._filter = BloomFilter(capacity, error_rate)
+        self._filter_capacity = capacity
+        self._filter_count = 0
+        self._generations: Dict[str, int] = {}
+        self._version: Optional[int] = None
+        self._next_sync = 0.0
+        self._next_rebuild = 0.0
+        self._sync_lock = threading.Lock()
+        self._scripts: Dict[str, Any] = {}
+
+    def _script(self, script: str):
+        # FlaskRedis 在 init_app 之后才能注册脚本，首次使用时注册
+        if script not in self._scripts:
+            self._scripts[script] = self.redis_client.register_script(script)
+        return self._scripts[script]
+
+    # ---------- 同步 ----------
+
+    def _rebuild(self, now: float):
+        """清理已过期的令牌，按 Redis 中的全部撤销记录重建过滤器和代数表"""
+        pipe = self.redis_client.pipeline()
+        pipe.get(REVOCATION_VERSION_KEY)
+        pipe.zremrangebyscore(REVOKED_TOKENS_INDEX, '-inf', int(now))
+        pipe.zrange(REVOKED_TOKENS_INDEX, 0, -1)
+        pipe.hgetall(TOKEN_GENERATIONS_KEY)
+        version, _, jtis, generations = pipe.execute()
+
+        jtis = [_text(jti) for jti in jtis]
+        capacity = max(self.capacity, len(jtis) * 2)
+        bloom = BloomFilter(capacity, self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self._filter = bloom
+        self._filter_capacity = capacity
+        self._filter_count = len(jtis)
+        self._generations = {_text(user_id): int(generation) for user_id, generation in generations.items()}
+        self._version = _int(version) or 0
+        self._next_rebuild = now + self.rebuild_interval
+
+    def _apply_changes(self) -> bool:
+        """
+        读取变更日志中比本地版本新的条目并应用
+
+        Returns:
+            bool: 是否已应用；日志已被截断到本地版本之后时返回False，需要整体重建
+        """
+        pipe = self.redis_client.pipeline()
+        pipe.zrange(REVOCATION_LOG_KEY, 0, 0, withscores=True)
+        pipe.zrangebyscore(REVOCATION_LOG_KEY, f'({self._version}', '+inf', withscores=True)
+        oldest, changes = pipe.execute()
+        if not oldest or int(oldest[0][1]) > self._version + 1:
+            return False
+
+        generations = None
+        for member, score in changes:
+            kind, _, value = _text(member).partition(':')
+            if kind == 'jti':
+                self._filter.add(value)
+                self._filter_count += 1
+            elif kind == 'gen':
+                generation, _, user_id = value.partition(':')
+                if generations is None:
+                    generations = dict(self._generations)
+                generations[user_id] = max(generations.get(user_id, 0), int(generation))
+            self._version = max(self._version, int(score))
+        if generations is not None:
+            self._generations = generations
+        return True
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        从 Redis 同步撤销列表（版本号未变化时只读取版本号，变化时只读取新增的变更）
+
+        Args:
+            force: 忽略同步间隔和版本号，强制重建
+
+        Returns:
+            bool: 本地撤销列表是否有变化
+        """
+        now = self.clock()
+        if not force and now < self._next_sync:
+            return False
+        if not self._sync_lock.acquire(blocking=force):
+            # 其他线程正在同步
+            return False
+        try:
+            self._next_sync = now + self.sync_interval
+            if force or self._version is None or now >= self._next_rebuild:
+                self._rebuild(now)
+                return True
+
+            version = _int(self.redis_client.get(REVOCATION_VERSION_KEY)) or 0
+            if version == self._version:
+                return False
+            # 版本号回退（Redis 被清空）、日志已截断或过滤器超出容量时整体重建
+            if version < self._version or not self._apply_changes() \
+                    or self._filter_count > self._filter_capacity:
+                self._rebuild(now)
+            return True
+        except Exception as e:
+            if has_app_context():
+                current_app.logger.warning(f"同步令牌撤销列表失败: {str(e)}")
+            return False
+        finally:
+            self._sync_lock.release()
+
+    # ---------- 撤销 ----------
+
+    def _default_expiry(self) -> int:
+        """未提供 exp 时按刷新令牌的最长有效期保留"""
+        lifetime = _config('JWT_REFRESH_TOKEN_EXPIRES', 30 * 86400)
+        if hasattr(lifetime, 'total_seconds'):
+            lifetime = lifetime.total_seconds()
+        return int(self.clock() + lifetime)
+
+    def revoke(self, jti: str, expires_at: Optional[int] = None) -> bool:
+        """
+        撤销单个令牌，记录在令牌过期时自动删除
+
+        Args:
+            jti: 令牌JTI
+            expires_at: 令牌的 exp（Unix秒），默认为刷新令牌的最长有效期
+
+        Returns:
+            bool: 是否成功撤销
+        """
+        expires_at = int(expires_at or self._default_expiry())
+        # 本实例立即生效
+        self._filter.add(jti)
+        if expires_at <= self.clock():
+            return True
+        try:
+            self._script(REVOKE_TOKEN_SCRIPT)(
+                keys=[REVOKED_TOKEN_KEY.format(jti=jti), REVOKED_TOKENS_INDEX, REVOCATION_VERSION_KEY, REVOCATION_LOG_KEY],
+                args=[jti, expires_at, self.log_length]
+            )
+            return True
+        except Exception as e:
+            if has_app_context():
+                current_app.logger.error(f"撤销令牌失败: {str(e)}")
+            return False
+
+    def revoke_all(self, user_id) -> Optional[int]:
+        """
+        撤销用户的全部令牌（代数+1，之前签发的令牌全部失效）
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            Optional[int]: 新的代数；Redis 不可用时为None（只在本实例生效）
+        """
+        user_id = str(user_id)
+        try:
+            generation = int(self._script(REVOKE_ALL_SCRIPT)(
+                keys=[TOKEN_GENERATIONS_KEY, REVOCATION_VERSION_KEY, REVOCATION_LOG_KEY],
+                args=[user_id, self.log_length]
+            ))
+        except Exception as e:
+            if has_app_context():
+                current_app.logger.error(f"撤销用户全部令牌失败: {str(e)}")
+            generation = None
+
+        # 本实例立即生效
+        generations = dict(self._generations)
+        generations[user_id] = generation if generation is not None else generations.get(user_id, 0) + 1
+        self._generations = generations
+        return generation
+
+    def current_generation(self, user_id) -> int:
+        """
+        用户的当前代数（签发令牌时调用，直接读取 Redis，保证新令牌不会被其他实例上的撤销误伤）
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            int: 代数，从未撤销过为 0
+        """
+        try:
+            generation = self.redis_client.hget(TOKEN_GENERATIONS_KEY, str(user_id))
+        except Exception:
+            return self._generations.get(str(user_id), 0)
+        return int(generation) if generation is not None else 0
+
+    # ---------- 检查 ----------
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        """
+        检查令牌是否被撤销
+
+        Args:
+            payload: 已验证签名的令牌内容（需含 jti、sub，可含 gen）
+
+        Returns:
+            bool: 是否被撤销
+        """
+        self.sync()
+
+        generation = self._generations.get(_text(payload.get('sub')))
+        if generation is not None and payload.get(GENERATION_CLAIM, 0) < generation:
+            return True
+
+        jti = payload.get('jti')
+        if not jti or jti not in self._filter:
+            return False
+
+        # 过滤器可能误判，以 Redis 为准；Redis 不可用时按已撤销处理
+        try:
+            return self.redis_client.exists(REVOKED_TOKEN_KEY.format(jti=jti)) > 0
+        except Exception:
+            return True
+
+
+def get_token_revocation() -> TokenRevocation:
+    """获取全局令牌撤销列表"""
+    global _token_revocation
+    if _token_revocation is None:
+        _token_revocation = TokenRevocation(
+            sync_interval=_config('TOKEN_REVOCATION_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL),
+            capacity=_config('TOKEN_REVOCATION_FILTER_CAPACITY', DEFAULT_FILTER_CAPACITY),
+            error_rate=_config('TOKEN_REVOCATION_FILTER_ERROR_RATE', DEFAULT_FILTER_ERROR_RATE),
+            rebuild_interval=_config('TOKEN_REVOCATION_REBUILD_INTERVAL', DEFAULT_REBUILD_INTERVAL),
+            log_length=_config('TOKEN_REVOCATION_LOG_LENGTH', DEFAULT_LOG_LENGTH)
+        )
+    return _token_revocation
+
+
+def init_token_revocation(app, jwt):
+    """
+    注册 JWT 回调：签发时写入用户代数，验证时检查撤销
+
+    Args:
+        app: Flask应用
+        jwt: JWTManager 实例
+    """
+    app.config.setdefault('TOKEN_REVOCATION_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL)
+    app.config.setdefault('TOKEN_REVOCATION_FILTER_CAPACITY', DEFAULT_FILTER_CAPACITY)
+    app.config.setdefault('TOKEN_REVOCATION_FILTER_ERROR_RATE', DEFAULT_FILTER_ERROR_RATE)
+    app.config.setdefault('TOKEN_REVOCATION_REBUILD_INTERVAL', DEFAULT_REBUILD_INTERVAL)
+    app.config.setdefault('TOKEN_REVOCATION_LOG_LENGTH', DEFAULT_LOG_LENGTH)
+
+    @jwt.additional_claims_loader
+    def add_generation_claim(identity):
+        return {GENERATION_CLAIM: get_token_revocation().current_generation(identity)}
+
+    @jwt.token_in_blocklist_loader
+    def check_token_revoked(jwt_header, jwt_payload):
+        return get_token_revocation().is_revoked(jwt_payload)
@@ -0,0 +1,263 @@
+# ========================================
+# 学生信息管理系统 - 成绩单文档
+# ========================================
+
+"""
+成绩单渲染：HTML（可直接打印）与 PDF。
+
+输入为 services.transcripts 生成的成绩单字典（纯数据，可跨进程传递），
+本模块不访问数据库也不依赖应用上下文，供批量生成时的工作进程直接调用：
+
+    render_transcript_batch(transcripts, 'pdf')               # -> [(文件名, 字节)]
+    render_transcript_batch(transcripts, 'pdf', output_dir)   # 写入目录 -> [(文件名, 字节数)]
+
+PDF 使用 reportlab（可选依赖）和内置宋体（STSong-Light）。
+"""
+
+import io
+import os
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+from jinja2 import Environment
+
+from utils.report_document import document_format_available, register_pdf_font, PDF_FONT_NAME
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import KeepTogether, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+except ImportError:  # reportlab 为可选依赖
+    Table = None
+
+TRANSCRIPT_FORMATS = {
+    'html': ('text/html; charset=utf-8', 'html'),
+    'pdf': ('application/pdf', 'pdf'),
+}
+
+COURSE_TYPE_LABELS = {
+    'required': '必修',
+    'elective': '选修',
+    'professional': '专业',
+    'general': '通识',
+}
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+_HTML_TEMPLATE = Environment(autoescape=True).from_string('''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>成绩单 - {{ t.student.student_number }} {{ t.student.name }}</title>
+<style>
+  body { font-family: "SimSun", "Songti SC", serif; font-size: 12px; margin: 24px; color: #222; }
+  h1 { text-align: center; font-size: 20px; letter-spacing: 4px; }
+  table { width: 100%; border-collapse: collapse; margin-bottom: 8px; }
+  th, td { border: 1px solid #999; padding: 3px 6px; }
+  th { background: #d9e1f2; }
+  td.num { text-align: right; }
+  .info td { border: none; padding: 2px 6px; }
+  .semester { margin-top: 14px; page-break-inside: avoid; }
+  .semester h2 { font-size: 14px; margin: 0 0 4px; }
+  .summary { margin: 0 0 6px; }
+  .footer { margin-top: 18px; color: #666; font-size: 11px; }
+</style>
+</head>
+<body>
+<h1>学生成绩单</h1>
+<table class="info">
+  <tr><td>学号：{{ t.student.student_number }}</td><td>姓名：{{ t.student.name }}</td><td>专业：{{ t.student.major or '' }}</td></tr>
+  <tr><td>年级：{{ t.student.grade or '' }}</td><td>班级：{{ t.student.class_name or '' }}</td><td>学籍状态：{{ t.student.academic_status or '' }}</td></tr>
+  <tr><td>入学日期：{{ t.student.enrollment_date or '' }}</td><td colspan="2">预计毕业：{{ t.student.expected_graduation_date or '' }}</td></tr>
+</table>
+{% for s in t.semesters %}
+<div class="semester">
+  <h2>{{ s.semester }}</h2>
+  <table>
+    <tr><th>课程代码</th><th>课程名称</th><th>类型</th><th>学分</th><th>成绩</th><th>等级</th><th>绩点</th></tr>
+    {% for c in s.courses %}
+    <tr><td>{{ c.course_code }}</td><td>{{ c.course_name }}</td><td>{{ type_label(c.course_type) }}</td>
+        <td class="num">{{ c.credits }}</td><td class="num">{{ c.score }}</td><td>{{ c.letter }}</td><td class="num">{{ c.grade_point }}</td></tr>
+    {% endfor %}
+    {% for c in s.in_progress %}
+    <tr><td>{{ c.course_code }}</td><td>{{ c.course_name }}</td><td>{{ type_label(c.course_type) }}</td>
+        <td class="num">{{ c.credits }}</td><td colspan="3">在修</td></tr>
+    {% endfor %}
+  </table>
+  <p class="summary">学期GPA：{{ s.gpa if s.gpa is not none else '-' }}　已获学分：{{ s.credits_earned }}　在修学分：{{ s.credits_in_progress }}　累计GPA：{{ s.cumulative_gpa if s.cumulative_gpa is not none else '-' }}</p>
+</div>
+{% endfor %}
+<table>
+  <tr><th>总GPA</th><th>已获学分</th><th>在修学分</th><th>总学分</th><th>已修课程数</th></tr>
+  <tr><td class="num">{{ t.summary.gpa if t.summary.gpa is not none else '-' }}</td><td class="num">{{ t.summary.credits_earned }}</td>
+      <td class="num">{{ t.summary.credits_in_progress }}</td><td class="num">{{ t.summary.total_credits }}</td><td class="num">{{ t.summary.course_count }}</td></tr>
+</table>
+<p class="footer">生成时间：{{ t.generated_at }}</p>
+</body>
+</html>
+''')
+
+
+def transcript_format_available(document_format: str) -> bool:
+    """格式所需的依赖是否已安装"""
+    if document_format == 'pdf':
+        return document_format_available('pdf')
+    return document_format in TRANSCRIPT_FORMATS
+
+
+def transcript_filename(transcript: Dict[str, Any], document_format: str) -> str:
+    """成绩单文件名：学号_姓名.扩展名"""
+    student = transcript['student']
+    stem = _UNSAFE_FILENAME_CHARS.sub('_', f"{student['student_number']}_{student['name'] or ''}").strip('_')
+    return f"{stem}.{TRANSCRIPT_FORMATS[document_format][1]}"
+
+
+def _type_label(course_type: str) -> str:
+    return COURSE_TYPE_LABELS.get(course_type, course_type or '')
+
+
+def _text(value: Any) -> str:
+    return '-' if value is None else str(value)
+
+
+# ========================================
+# 渲染
+# ========================================
+
+def render_transcript_html(transcript: Dict[str, Any]) -> bytes:
+    """成绩单 -> HTML"""
+    return _HTML_TEMPLATE.render(t=transcript, type_label=_type_label).encode('utf-8')
+
+
+def render_transcript_pdf(transcript: Dict[str, Any]) -> bytes:
+    """
+    成绩单 -> PDF（纵向A4，每学期一张表格）
+
+    Raises:
+        RuntimeError: 未安装reportlab
+    """
+    if Table is None:
+        raise RuntimeError('生成PDF需要安装 reportlab')
+    register_pdf_font()
+
+    styles = getSampleStyleSheet()
+    for name in ('Title', 'Heading3', 'Normal'):
+        styles[name].fontName = PDF_FONT_NAME
+    grid = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), PDF_FONT_NAME),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D9E1F2')),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),
+    ])
+    plain = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), PDF_FONT_NAME),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ])
+
+    student = transcript['student']
+    info = Table([
+        [f"学号：{student['student_number']}", f"姓名：{student['name'] or ''}", f"专业：{student['major'] or ''}"],
+        [f"年级：{student['grade'] or ''}", f"班级：{student['class_name'] or ''}", f"学籍状态：{student['academic_status'] or ''}"],
+        [f"入学日期：{student['enrollment_date'] or ''}", f"预计毕业：{student['expected_graduation_date'] or ''}", ''],
+    ], colWidths=[60 * mm, 55 * mm, 65 * mm])
+    info.setStyle(plain)
+    story = [Paragraph('学生成绩单', styles['Title']), info, Spacer(1, 4 * mm)]
+
+    column_widths = [22 * mm, 62 * mm, 16 * mm, 16 * mm, 18 * mm, 16 * mm, 16 * mm]
+    for semester in transcript['semesters']:
+        rows = [['课程代码', '课程名称', '类型', '学分', '成绩', '等级', '绩点']]
+        for course in semester['courses']:
+            rows.append([
+                course['course_code'], course['course_name'], _type_label(course['course_type']),
+                _text(course['credits']), _text(course['score']), _text(course['letter']), _text(course['grade_point'])
+            ])
+        for course in semester['in_progress']:
+            rows.append([
+                course['course_code'], course['course_name'], _type_label(course['course_type']),
+                _text(course['credits']), '在修', '', ''
+            ])
+        table = Table(rows, colWidths=column_widths, repeatRows=1)
+        table.setStyle(grid)
+        summary = (
+            f"学期GPA：{_text(semester['gpa'])}　已获学分：{semester['credits_earned']}　"
+            f"在修学分：{semester['credits_in_progress']}　累计GPA：{_text(semester['cumulative_gpa'])}"
+        )
+        story.append(KeepTogether([
+            Paragraph(semester['semester'], styles['Heading3']), table, Paragraph(summary, styles['Normal'])
+        ]))
+
+    totals = transcript['summary']
+    summary_table = Table([
+        ['总GPA', '已获学分', '在修学分', '总学分', '已修课程数'],
+        [_text(totals['gpa']), totals['credits_earned'], totals['credits_in_progress'],
+         totals['total_credits'], totals['course_count']],
+    ])
+    summary_table.setStyle(grid)
+    story.extend([
+        Spacer(1, 4 * mm), summary_table, Spacer(1, 4 * mm),
+        Paragraph(f"生成时间：{transcript['generated_at']}", styles['Normal'])
+    ])
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(
+        buffer, pagesize=A4, title=f"成绩单 {student['student_number']}",
+        leftMargin=15 * mm, rightMargin=15 * mm, topMargin=15 * mm, bottomMargin=15 * mm
+    ).build(story)
+    return buffer.getvalue()
+
+
+_RENDERERS = {
+    'html': render_transcript_html,
+    'pdf': render_transcript_pdf,
+}
+
+
+def render_transcript(transcript: Dict[str, Any], document_format: str) -> bytes:
+    """
+    按格式渲染成绩单
+
+    Args:
+        transcript: 成绩单
+        document_format: html/pdf
+
+    Returns:
+        bytes: 文档内容
+
+    Raises:
+        ValueError: 不支持的格式
+    """
+    if document_format not in _RENDERERS:
+        raise ValueError(f"不支持的成绩单格式: {document_format}")
+    return _RENDERERS[document_format](transcript)
+
+
+def render_transcript_batch(
+    transcripts: Sequence[Dict[str, Any]],
+    document_format: str,
+    output_dir: str = None
+) -> List[Tuple[str, Any]]:
+    """
+    渲染一批成绩单（工作进程入口）
+
+    Args:
+        transcripts: 成绩单列表
+        document_format: html/pdf
+        output_dir: 输出目录；提供时直接写文件，只返回文件大小
+
+    Returns:
+        List[Tuple[str, Any]]: (文件名, 文档字节) 或 (文件名, 字节数)
+    """
+    results = []
+    for transcript in transcripts:
+        filename = transcript_filename(transcript, document_format)
+        content = render_transcript(transcript, document_format)
+        if output_dir:
+            with open(os.path.join(output_dir, filename), 'wb') as f:
+                f.write(content)
+            results.append((filename, len(content)))
+        else:
+            results.append((filename, content))
+    return results
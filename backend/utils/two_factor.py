@@ -0,0 +1,428 @@
+# ========================================
+# 学生信息管理系统 - 双因素认证
+# ========================================
+
+"""
+TOTP 双因素认证（RFC 6238）。
+
+- 解密后的密钥在进程内缓存 TWO_FACTOR_SECRET_CACHE_TTL 秒，同一用户重复提交时不再解密和解码
+- 每个缓存条目按当前时间步预先算好允许窗口内的全部验证码（验证码 -> 时间步），
+  验证是一次字典查找；时间步变化时才重新计算，批量验证共用同一个时间步
+- 防重放：Redis 哈希 totp:last_step 为每个用户只保存最后一次通过的时间步（一个整数），
+  同一时间步及更早的验证码不能再次使用；Redis 不可用时退回进程内记录
+- 二维码在后台线程中预生成（prepare_qr_code），展示时直接取结果
+
+Usage:
+    two_factor = get_two_factor()
+    secret = generate_secret()
+    two_factor.prepare_qr_code(user.email, secret)
+    image = two_factor.qr_code(user.email, secret)
+    two_factor.verify(secret, code, user_id=user.id)
+"""
+
+import base64
+import hashlib
+import hmac
+import secrets
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from flask import current_app, has_app_context
+
+try:
+    import qrcode
+except ImportError:  # pragma: no cover - 可选依赖
+    qrcode = None
+
+# Redis 键：用户ID -> 最后一次通过的时间步
+TOTP_LAST_STEP_KEY = 'totp:last_step'
+
+# 时间步大于已记录的值时写入并返回 1，否则返回 0
+ACCEPT_STEP_SCRIPT = """
+local last = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '-1')
+if tonumber(ARGV[2]) > last then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+DEFAULT_ISSUER = '学生信息管理系统'
+DEFAULT_DIGITS = 6
+DEFAULT_INTERVAL = 30
+DEFAULT_VALID_WINDOW = 1
+DEFAULT_SECRET_CACHE_TTL = 60
+DEFAULT_SECRET_CACHE_SIZE = 10000
+DEFAULT_QR_CACHE_SIZE = 256
+
+_two_factor = None
+
+
+def _config(key: str, default: Any) -> Any:
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def qr_code_available() -> bool:
+    """qrcode 是否已安装"""
+    return qrcode is not None
+
+
+# ========================================
+# TOTP
+# ========================================
+
+def generate_secret() -> str:
+    """生成 2FA 密钥（160 位，Base32）"""
+    return base64.b32encode(secrets.token_bytes(20)).decode()
+
+
+def decode_secret(secret: str) -> bytes:
+    """
+    解码 Base32 密钥（忽略空格和大小写，补齐填充）
+
+    Raises:
+        ValueError: 密钥格式错误
+    """
+    secret = secret.replace(' ', '').upper()
+    try:
+        return base64.b32decode(secret + '=' * (-len(secret) % 8))
+    except Exception as e:
+        raise ValueError(f"无效的2FA密钥: {str(e)}")
+
+
+def totp_code(key: bytes, counter: int, digits: int = DEFAULT_DIGITS) -> str:
+    """
+    计算指定时间步的验证码（HMAC-SHA1 动态截断）
+
+    Args:
+        key: 解码后的密钥
+        counter: 时间步
+        digits: 位数
+
+    Returns:
+        str: 验证码
+    """
+    digest = hmac.new(key, struct.pack('>Q', counter), hashlib.sha1).digest()
+    offset = digest[-1] & 0x0F
+    value = struct.unpack('>I', digest[offset:offset + 4])[0] & 0x7FFFFFFF
+    return str(value % 10 ** digits).zfill(digits)
+
+
+def provisioning_uri(account: str, secret: str, issuer: str = DEFAULT_ISSUER) -> str:
+    """身份验证器应用扫描的 otpauth:// 地址"""
+    return (f"otpauth://totp/{quote(issuer)}:{quote(account)}"
+            f"?secret={secret}&issuer={quote(issuer)}")
+
+
+def render_qr_code(data: str) -> str:
+    """
+    把数据绘制为二维码 PNG
+
+    Returns:
+        str: Base64 编码的 PNG
+
+    Raises:
+        RuntimeError: qrcode 未安装
+    """
+    if qrcode is None:
+        raise RuntimeError("生成二维码需要安装 qrcode")
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def _decrypt_secret(value: str) -> str:
+    """解密以 ENCRYPTION_KEY 加密存储的密钥"""
+    from cryptography.fernet import Fernet
+    return Fernet(_config('ENCRYPTION_KEY', None)).decrypt(value.encode()).decode()
+
+
+class _SecretEntry:
+    """缓存的密钥和当前时间步的验证码表"""
+
+    __slots__ = ('key', 'expires_at', 'window')
+
+    def __init__(self, key: bytes, expires_at: float):
+        self.key = key
+        self.expires_at = expires_at
+        # (时间步, 验证码表)，整体替换，并发读取时两者总是配套的
+        self.window: Tuple[Optional[int], Dict[str, int]] = (None, {})
+
+
+# ========================================
+# 验证
+# ========================================
+
+class TwoFactorVerifier:
+    """TOTP 验证器：密钥缓存、预计算验证码窗口、防重放"""
+
+    def __init__(self, client=None, digits: int = DEFAULT_DIGITS, interval: int = DEFAULT_INTERVAL,
+                 valid_window: int = DEFAULT_VALID_WINDOW, issuer: str = DEFAULT_ISSUER,
+                 cache_ttl: float = DEFAULT_SECRET_CACHE_TTL, cache_size: int = DEFAULT_SECRET_CACHE_SIZE,
+                 qr_cache_size: int = DEFAULT_QR_CACHE_SIZE,
+                 decrypt: Optional[Callable[[str], str]] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            client: Redis客户端，默认为 extensions.redis_client
+            digits: 验证码位数
+            interval: 时间步长（秒）
+            valid_window: 允许前后偏差的时间步数
+            issuer: 二维码中显示的发行方
+            cache_ttl: 解密后的密钥缓存秒数
+            cache_size: 缓存的密钥数
+            qr_cache_size: 预生成的二维码数
+            decrypt: 密钥解密函数，密钥明文存储时为 None
+            clock: 时钟
+        """
+        if client is None:
+            from extensions import redis_client as client
+        self.redis_client = client
+        self.digits = digits
+        self.interval = interval
+        self.valid_window = valid_window
+        self.issuer = issuer
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.qr_cache_size = qr_cache_size
+        self.decrypt = decrypt
+        self.clock = clock
+
+        self._secrets: 'OrderedDict[str, _SecretEntry]' = OrderedDict()
+        self._secrets_lock = threading.Lock()
+        # Redis 不可用时的防重放记录
+        self._last_steps: Dict[str, int] = {}
+        self._last_steps_lock = threading.Lock()
+        self._accept_script = None
+
+        self._qr_codes: 'OrderedDict[str, Future]' = OrderedDict()
+        self._qr_lock = threading.Lock()
+        self._qr_executor = None
+
+    # ---------- 密钥缓存 ----------
+
+    def _entry(self, secret: str, now: float) -> _SecretEntry:
+        with self._secrets_lock:
+            entry = self._secrets.get(secret)
+            if entry is not None and entry.expires_at > now:
+                self._secrets.move_to_end(secret)
+                return entry
+
+        plain = self.decrypt(secret) if self.decrypt else secret
+        entry = _SecretEntry(decode_secret(plain), now + self.cache_ttl)
+        with self._secrets_lock:
+            self._secrets[secret] = entry
+            self._secrets.move_to_end(secret)
+            while len(self._secrets) > self.cache_size:
+                self._secrets.popitem(last=False)
+        return entry
+
+    def _codes(self, entry: _SecretEntry, step: int) -> Dict[str, int]:
+        window_step, codes = entry.window
+        if window_step != step:
+            # 同一验证码出现在多个时间步时保留最新的
+            codes = {
+                totp_code(entry.key, counter, self.digits): counter
+                for counter in range(max(0, step - self.valid_window), step + self.valid_window + 1)
+            }
+            entry.window = (step, codes)
+        return codes
+
+    def forget(self, secret: str) -> bool:
+        """清除缓存的密钥（停用或重置 2FA 时调用）"""
+        with self._secrets_lock:
+            return self._secrets.pop(secret, None) is not None
+
+    def current_step(self) -> int:
+        return int(self.clock()) // self.interval
+
+    # ---------- 验证 ----------
+
+    def match(self, secret: str, code: str, step: Optional[int] = None) -> Optional[int]:
+        """
+        查找验证码对应的时间步（不检查重放）
+
+        Args:
+            secret: 密钥（TWO_FACTOR_SECRETS_ENCRYPTED 时为密文）
+            code: 用户输入的验证码
+            step: 当前时间步，默认按时钟计算
+
+        Returns:
+            Optional[int]: 时间步，不匹配为 None
+        """
+        code = str(code or '').strip()
+        if len(code) != self.digits or not code.isdigit():
+            return None
+        if step is None:
+            step = self.current_step()
+        try:
+            entry = self._entry(secret, self.clock())
+        except ValueError:
+            return None
+        return self._codes(entry, step).get(code)
+
+    def _accept_local(self, user_id: str, step: int) -> bool:
+        with self._last_steps_lock:
+            if step <= self._last_steps.get(user_id, -1):
+                return False
+            self._last_steps[user_id] = step
+            return True
+
+    def _script(self):
+        if self._accept_script is None:
+            self._accept_script = self.redis_client.register_script(ACCEPT_STEP_SCRIPT)
+        return self._accept_script
+
+    def accept(self, user_id: str, step: int) -> bool:
+        """
+        记录用户通过验证的时间步（防重放）
+
+        Args:
+            user_id: 用户ID
+            step: 验证码的时间步
+
+        Returns:
+            bool: 该时间步是否晚于用户上一次通过的时间步
+        """
+        user_id = str(user_id)
+        if not self._accept_local(user_id, step):
+            return False
+        try:
+            return bool(self._script()(keys=[TOTP_LAST_STEP_KEY], args=[user_id, step]))
+        except Exception as e:
+            if has_app_context():
+                current_app.logger.warning(f"记录2FA时间步失败，仅在本实例防重放: {str(e)}")
+            return True
+
+    def verify(self, secret: str, code: str, user_id: Optional[str] = None) -> bool:
+        """
+        验证 2FA 代码
+
+        Args:
+            secret: 密钥（TWO_FACTOR_SECRETS_ENCRYPTED 时为密文）
+            code: 用户输入的验证码
+            user_id: 用户ID，提供时拒绝重放
+
+        Returns:
+            bool: 验证结果
+        """
+        step = self.match(secret, code)
+        if step is None:
+            return False
+        return user_id is None or self.accept(user_id, step)
+
+    def verify_batch(self, items: Iterable[Tuple[str, str, Any]]) -> List[bool]:
+        """
+        批量验证（共用一个时间步，防重放写入在一个管道中完成）
+
+        Args:
+            items: (密钥, 验证码, 用户ID或None) 列表
+
+        Returns:
+            List[bool]: 每项的验证结果
+        """
+        step = self.current_step()
+        results: List[bool] = []
+        pending = []  # (结果下标, 用户ID, 时间步)
+        for secret, code, user_id in items:
+            matched = self.match(secret, code, step)
+            if matched is not None and user_id is not None:
+                user_id = str(user_id)
+                if self._accept_local(user_id, matched):
+                    pending.append((len(results), user_id, matched))
+                    results.append(True)
+                    continue
+                matched = None
+            results.append(matched is not None)
+
+        if pending:
+            try:
+                script = self._script()
+                pipe = self.redis_client.pipeline()
+                for _, user_id, matched in pending:
+                    script(keys=[TOTP_LAST_STEP_KEY], args=[user_id, matched], client=pipe)
+                for (index, _, _), accepted in zip(pending, pipe.execute()):
+                    results[index] = bool(accepted)
+            except Exception as e:
+                if has_app_context():
+                    current_app.logger.warning(f"记录2FA时间步失败，仅在本实例防重放: {str(e)}")
+        return results
+
+    # ---------- 二维码 ----------
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._qr_executor is None:
+            with self._qr_lock:
+                if self._qr_executor is None:
+                    self._qr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='qr-code')
+        return self._qr_executor
+
+    def prepare_qr_code(self, account: str, secret: str) -> Future:
+        """
+        在后台线程中生成二维码（启用 2FA 时先调用，展示时由 qr_code 取结果）
+
+        Args:
+            account: 账户名（通常为邮箱）
+            secret: 明文密钥
+
+        Returns:
+            Future: 生成结果（Base64 编码的 PNG）
+        """
+        uri = provisioning_uri(account, secret, self.issuer)
+        with self._qr_lock:
+            future = self._qr_codes.get(uri)
+            if future is not None:
+                return future
+        future = self._executor().submit(render_qr_code, uri)
+        with self._qr_lock:
+            future = self._qr_codes.setdefault(uri, future)
+            while len(self._qr_codes) > self.qr_cache_size:
+                self._qr_codes.popitem(last=False)
+        return future
+
+    def qr_code(self, account: str, secret: str) -> str:
+        """
+        获取二维码（已预生成时直接返回，否则在当前线程生成）
+
+        Returns:
+            str: Base64 编码的 PNG
+        """
+        uri = provisioning_uri(account, secret, self.issuer)
+        with self._qr_lock:
+            future = self._qr_codes.pop(uri, None)
+        if future is not None:
+            return future.result()
+        return render_qr_code(uri)
+
+    def shutdown(self):
+        """停止二维码生成线程"""
+        if self._qr_executor is not None:
+            self._qr_executor.shutdown(wait=True)
+            self._qr_executor = None
+
+
+def get_two_factor() -> TwoFactorVerifier:
+    """获取全局 2FA 验证器"""
+    global _two_factor
+    if _two_factor is None:
+        _two_factor = TwoFactorVerifier(
+            valid_window=_config('TWO_FACTOR_VALID_WINDOW', DEFAULT_VALID_WINDOW),
+            issuer=_config('TWO_FACTOR_ISSUER', DEFAULT_ISSUER),
+            cache_ttl=_config('TWO_FACTOR_SECRET_CACHE_TTL', DEFAULT_SECRET_CACHE_TTL),
+            cache_size=_config('TWO_FACTOR_SECRET_CACHE_SIZE', DEFAULT_SECRET_CACHE_SIZE),
+            qr_cache_size=_config('TWO_FACTOR_QR_CACHE_SIZE', DEFAULT_QR_CACHE_SIZE),
+            decrypt=_decrypt_secret if _config('TWO_FACTOR_SECRETS_ENCRYPTED', False) else None
+        )
+    return _two_factor
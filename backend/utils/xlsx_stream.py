@@ -0,0 +1,398 @@
+# ========================================
+# 学生信息管理系统 - 流式XLSX导出
+# ========================================
+
+"""
+只写、流式的 XLSX 生成：工作表 XML 逐行写入 ZIP 条目并即时压缩，
+缓冲区超过上限即作为一个分块输出，内存占用与导出行数无关。
+
+- 字符串以 inlineStr 写入（不维护共享字符串表），中文按 UTF-8 编码，
+  XML 非法控制字符被移除，超过 Excel 单元格上限（32767字符）的文本被截断
+- 数字、布尔、日期、日期时间写为对应类型的单元格，日期使用 yyyy-mm-dd 格式
+- 表头加粗、底色、边框并冻结首行，带自动筛选；列宽按表头显示宽度（中文计2）估算
+- 单个工作表超过 Excel 行数上限时自动续写到下一个工作表
+- ZIP 写入不可回退的输出流（数据描述符 + ZIP64），无需临时文件
+
+多个工作表写入同一文件用 xlsx_workbook_chunks。
+
+Usage:
+    chunks = xlsx_chunks(rows, header=['学号', '姓名'], sheet_name='学生信息')
+    return make_streaming_file_response(chunks, 'students.xlsx', XLSX_CONTENT_TYPE)
+"""
+
+import enum
+import math
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Iterator, List, Sequence
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+DEFAULT_BUFFER_SIZE = 256 * 1024  # 缓冲区上限，超过即输出一个分块
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_CELL_CHARS = 32767
+SHEET_NAME_MAX_LENGTH = 31
+
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_ILLEGAL_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# 单元格样式序号（与 _STYLES_XML 中 cellXfs 的顺序一致）
+_STYLE_HEADER = 1
+_STYLE_DATE = 2
+_STYLE_DATETIME = 3
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+_STYLES_XML = (
+    _XML_HEADER +
+    f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd hh:mm:ss"/>'
+    '</numFmts>'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="等线"/><family val="2"/><charset val="134"/></font>'
+    '<font><b/><sz val="11"/><name val="等线"/><family val="2"/><charset val="134"/></font>'
+    '</fonts>'
+    '<fills count="3">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFD9E1F2"/><bgColor indexed="64"/></patternFill></fill>'
+    '</fills>'
+    '<borders count="2">'
+    '<border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"><color auto="1"/></left><right style="thin"><color auto="1"/></right>'
+    '<top style="thin"><color auto="1"/></top><bottom style="thin"><color auto="1"/></bottom><diagonal/></border>'
+    '</borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="1" xfId="0" applyFont="1" applyFill="1" applyBorder="1" '
+    'applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="常规" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+# ========================================
+# 单元格编码
+# ========================================
+
+def column_letter(index: int) -> str:
+    """列序号（从0开始）-> Excel列名"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def display_width(text: str) -> int:
+    """显示宽度：中日韩等全角字符计2"""
+    return sum(2 if ord(char) > 0x2E80 else 1 for char in text)
+
+
+def _escape(text: str) -> str:
+    if len(text) > EXCEL_MAX_CELL_CHARS:
+        text = text[:EXCEL_MAX_CELL_CHARS]
+    text = _ILLEGAL_XML_CHARS.sub('', text)
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _string_cell(ref: str, text: str, style: int = 0) -> str:
+    style_attr = f' s="{style}"' if style else ''
+    space = ' xml:space="preserve"' if text and (text[0].isspace() or text[-1].isspace()) else ''
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t{space}>{_escape(text)}</t></is></c>'
+
+
+def _excel_serial(value: datetime) -> float:
+    if value.tzinfo is not None:
+        # Excel 没有时区概念，按本地墙上时间写入
+        value = value.replace(tzinfo=None)
+    delta = value - _EXCEL_EPOCH
+    return delta.days + delta.seconds / 86400 + delta.microseconds / 86400e6
+
+
+def _cell(ref: str, value: Any) -> str:
+    """单个值 -> <c> 元素，None 返回空字符串"""
+    if value is None:
+        return ''
+    if isinstance(value, enum.Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        if isinstance(value, float) and not math.isfinite(value):
+            return ''
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        return f'<c r="{ref}" s="{_STYLE_DATETIME}"><v>{_excel_serial(value)!r}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="{_STYLE_DATE}"><v>{(value - _EXCEL_EPOCH.date()).days}</v></c>'
+    if isinstance(value, time):
+        return _string_cell(ref, value.isoformat())
+    if isinstance(value, timedelta):
+        return f'<c r="{ref}"><v>{value.total_seconds() / 86400!r}</v></c>'
+    return _string_cell(ref, str(value))
+
+
+def _sheet_title(name: str, index: int) -> str:
+    """工作表名：去除非法字符，限31字符，续写的工作表加序号"""
+    name = _ILLEGAL_SHEET_CHARS.sub('_', name or 'Sheet').strip("'") or 'Sheet'
+    suffix = f'({index + 1})' if index else ''
+    return name[:SHEET_NAME_MAX_LENGTH - len(suffix)] + suffix
+
+
+def _attribute(text: str) -> str:
+    return _escape(text).replace('"', '&quot;')
+
+
+# ========================================
+# ZIP 输出
+# ========================================
+
+class _ChunkSink:
+    """ZipFile 的输出目标：只追加，由生成器取走已写入的字节"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._size += len(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    @property
+    def buffered(self) -> int:
+        return self._size
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        return data
+
+
+def _sheet_prefix(widths: Sequence[float]) -> str:
+    cols = ''.join(
+        f'<col min="{index + 1}" max="{index + 1}" width="{width}" customWidth="1"/>'
+        for index, width in enumerate(widths)
+    )
+    return (
+        _XML_HEADER +
+        f'<worksheet xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+        '<sheetViews><sheetView workbookViewId="0">'
+        '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+        '</sheetView></sheetViews>'
+        '<sheetFormatPr defaultRowHeight="15"/>'
+        + (f'<cols>{cols}</cols>' if cols else '') +
+        '<sheetData>'
+    )
+
+
+def _workbook_parts(sheets: List[tuple]) -> List[tuple]:
+    """工作表写完后生成的其余包内文件：(路径, 内容)"""
+    sheet_entries = ''.join(
+        f'<sheet name="{_attribute(title)}" sheetId="{index + 1}" r:id="rId{index + 1}"/>'
+        for index, (title, _, _) in enumerate(sheets)
+    )
+    defined_names = ''.join(
+        f'<definedName name="_xlnm._FilterDatabase" localSheetId="{index}" hidden="1">'
+        f"'{_escape(title.replace(chr(39), chr(39) * 2))}'!$A$1:${column_letter(columns - 1)}${rows}</definedName>"
+        for index, (title, rows, columns) in enumerate(sheets) if columns
+    )
+    workbook = (
+        _XML_HEADER +
+        f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+        f'<bookViews><workbookView/></bookViews><sheets>{sheet_entries}</sheets>'
+        + (f'<definedNames>{defined_names}</definedNames>' if defined_names else '') +
+        '</workbook>'
+    )
+    workbook_rels = (
+        _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">' +
+        ''.join(
+            f'<Relationship Id="rId{index + 1}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{index + 1}.xml"/>'
+            for index in range(len(sheets))
+        ) +
+        f'<Relationship Id="rId{len(sheets) + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    )
+    content_types = (
+        _XML_HEADER +
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>' +
+        ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{index + 1}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for index in range(len(sheets))
+        ) +
+        '</Types>'
+    )
+    root_rels = (
+        _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    return [
+        ('xl/workbook.xml', workbook),
+        ('xl/_rels/workbook.xml.rels', workbook_rels),
+        ('xl/styles.xml', _STYLES_XML),
+        ('[Content_Types].xml', content_types),
+        ('_rels/.rels', root_rels),
+    ]
+
+
+def xlsx_chunks(
+    rows: Iterable[Any],
+    header: Sequence[str] = None,
+    row_mapper: Callable[[Any], Sequence[Any]] = None,
+    sheet_name: str = 'Sheet1',
+    column_widths: Sequence[float] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    max_rows_per_sheet: int = EXCEL_MAX_ROWS,
+    compresslevel: int = 6
+) -> Iterator[bytes]:
+    """
+    将行编码为XLSX分块
+
+    Args:
+        rows: 行迭代器
+        header: 表头（每个工作表首行重复）
+        row_mapper: 行转换函数，默认直接写入行
+        sheet_name: 工作表名
+        column_widths: 列宽，默认按表头显示宽度估算
+        buffer_size: 缓冲区上限（字节），超过即输出一个分块
+        max_rows_per_sheet: 每个工作表的最大行数（含表头）
+        compresslevel: DEFLATE压缩级别
+
+    Returns:
+        Iterator[bytes]: XLSX分块
+    """
+    if row_mapper:
+        rows = map(row_mapper, rows)
+    return xlsx_workbook_chunks(
+        [(sheet_name, header, rows, column_widths)],
+        buffer_size=buffer_size,
+        max_rows_per_sheet=max_rows_per_sheet,
+        compresslevel=compresslevel
+    )
+
+
+def xlsx_workbook_chunks(
+    sheets: Iterable[tuple],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    max_rows_per_sheet: int = EXCEL_MAX_ROWS,
+    compresslevel: int = 6
+) -> Iterator[bytes]:
+    """
+    将多个工作表依次编码为一个XLSX文件的分块
+
+    Args:
+        sheets: (工作表名, 表头, 行迭代器[, 列宽]) 序列，按顺序写出；
+                重名的工作表自动加序号
+        buffer_size: 缓冲区上限（字节），超过即输出一个分块
+        max_rows_per_sheet: 每个工作表的最大行数（含表头）
+        compresslevel: DEFLATE压缩级别
+
+    Returns:
+        Iterator[bytes]: XLSX分块
+    """
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+    written = []  # (标题, 行数, 列数)
+    used_titles = set()
+
+    for sheet in sheets:
+        sheet_name, header, rows = sheet[:3]
+        column_widths = sheet[3] if len(sheet) > 3 else None
+        header = list(header or [])
+        if column_widths is None:
+            column_widths = [min(max(display_width(str(title)) + 4, 10), 60) for title in header]
+        refs = [column_letter(index) for index in range(len(header))]
+        header_xml = ''.join(
+            _string_cell(f'{ref}1', str(title), _STYLE_HEADER) for ref, title in zip(refs, header)
+        )
+        part = 0
+        entry = None
+        row_number = 0
+        column_count = len(header)
+
+        def open_sheet():
+            nonlocal entry, row_number
+            entry = archive.open(f'xl/worksheets/sheet{len(written) + 1}.xml', 'w', force_zip64=True)
+            entry.write(_sheet_prefix(column_widths).encode('utf-8'))
+            row_number = 0
+            if header:
+                entry.write(f'<row r="1">{header_xml}</row>'.encode('utf-8'))
+                row_number = 1
+
+        def close_sheet():
+            nonlocal part
+            last_column = column_letter(column_count - 1) if column_count else None
+            tail = '</sheetData>'
+            if header and last_column:
+                tail += f'<autoFilter ref="A1:{last_column}{max(row_number, 1)}"/>'
+            entry.write((tail + '</worksheet>').encode('utf-8'))
+            entry.close()
+            title = _sheet_title(sheet_name, part)
+            duplicate = 1
+            while title.lower() in used_titles:
+                duplicate += 1
+                title = _sheet_title(f'{sheet_name}_{duplicate}', part)
+            used_titles.add(title.lower())
+            written.append((title, max(row_number, 1), column_count))
+            part += 1
+
+        open_sheet()
+        for values in rows:
+            if row_number >= max_rows_per_sheet:
+                close_sheet()
+                open_sheet()
+
+            row_number += 1
+            if len(values) > len(refs):
+                refs.extend(column_letter(index) for index in range(len(refs), len(values)))
+            column_count = max(column_count, len(values))
+            suffix = str(row_number)
+            cells = ''.join(_cell(ref + suffix, value) for ref, value in zip(refs, values))
+            entry.write(f'<row r="{suffix}">{cells}</row>'.encode('utf-8'))
+
+            if sink.buffered >= buffer_size:
+                yield sink.drain()
+
+        close_sheet()
+
+    if not written:
+        # 工作簿至少需要一个工作表
+        yield from xlsx_workbook_chunks([('Sheet1', None, ())], buffer_size, max_rows_per_sheet, compresslevel)
+        return
+
+    for name, content in _workbook_parts(written):
+        archive.writestr(name, content)
+    archive.close()
+    yield sink.drain()
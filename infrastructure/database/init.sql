@@ -276,6 +276,99 @@ CREATE TABLE IF NOT EXISTS grades (
     CONSTRAINT chk_grades_exam_type CHECK (exam_type IN ('midterm', 'final', 'quiz', 'assignment', 'project'))
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='成绩表';
 
+-- 学生学期学业统计表（由成绩和选课增量刷新）
+CREATE TABLE IF NOT EXISTS student_semester_stats (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    student_id CHAR(36) NOT NULL COMMENT '学生ID',
+    semester VARCHAR(20) NOT NULL COMMENT '学期',
+    grade_points DOUBLE NOT NULL DEFAULT 0 COMMENT '绩点×学分之和',
+    graded_credits DOUBLE NOT NULL DEFAULT 0 COMMENT '已出成绩学分',
+    credits_earned DOUBLE NOT NULL DEFAULT 0 COMMENT '已获学分',
+    credits_in_progress DOUBLE NOT NULL DEFAULT 0 COMMENT '在修学分',
+    course_count INT NOT NULL DEFAULT 0 COMMENT '已出成绩课程数',
+    gpa DOUBLE NULL COMMENT '学期GPA',
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '刷新时间',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_student_semester_stats (student_id, semester),
+    INDEX idx_semester_stats_semester (semester)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='学生学期学业统计表';
+
+-- 课程每日汇总表（由选课和成绩增量刷新）
+CREATE TABLE IF NOT EXISTS course_daily_rollups (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    day DATE NOT NULL COMMENT '日期',
+    course_id CHAR(36) NOT NULL COMMENT '课程ID',
+    new_enrollments INT NOT NULL DEFAULT 0 COMMENT '当日选课数',
+    grades_recorded INT NOT NULL DEFAULT 0 COMMENT '当日录入成绩数',
+    scored_count INT NOT NULL DEFAULT 0 COMMENT '当日有分数的成绩数',
+    score_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '分数合计',
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '刷新时间',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_course_daily_rollup (day, course_id),
+    INDEX idx_course_daily_rollup_course (course_id, day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='课程每日汇总表';
+
+-- 课程学期汇总表（由选课和成绩增量刷新）
+CREATE TABLE IF NOT EXISTS course_semester_rollups (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    semester VARCHAR(20) NOT NULL COMMENT '学期',
+    course_id CHAR(36) NOT NULL COMMENT '课程ID',
+    department VARCHAR(100) NOT NULL DEFAULT '未知' COMMENT '任课教师院系',
+    enrollment_count INT NOT NULL DEFAULT 0 COMMENT '选课记录总数',
+    enrolled_count INT NOT NULL DEFAULT 0 COMMENT '已选课数',
+    waitlist_count INT NOT NULL DEFAULT 0 COMMENT '候补数',
+    dropped_count INT NOT NULL DEFAULT 0 COMMENT '退选数',
+    completed_count INT NOT NULL DEFAULT 0 COMMENT '已完成数',
+    failed_count INT NOT NULL DEFAULT 0 COMMENT '不及格数',
+    auditing_count INT NOT NULL DEFAULT 0 COMMENT '旁听数',
+    grade_count INT NOT NULL DEFAULT 0 COMMENT '成绩记录数',
+    scored_count INT NOT NULL DEFAULT 0 COMMENT '有分数的成绩数',
+    score_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '分数合计',
+    score_min DOUBLE NULL COMMENT '最低分',
+    score_max DOUBLE NULL COMMENT '最高分',
+    pass_count INT NOT NULL DEFAULT 0 COMMENT '及格成绩数',
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '刷新时间',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_course_semester_rollup (semester, course_id),
+    INDEX idx_course_semester_rollup_course (course_id, semester),
+    INDEX idx_course_semester_rollup_dept (department, semester)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='课程学期汇总表';
+
+-- 院系学期汇总表（由课程学期汇总聚合）
+CREATE TABLE IF NOT EXISTS department_semester_rollups (
+    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+    semester VARCHAR(20) NOT NULL COMMENT '学期',
+    department VARCHAR(100) NOT NULL COMMENT '院系',
+    course_count INT NOT NULL DEFAULT 0 COMMENT '课程数',
+    enrollment_count INT NOT NULL DEFAULT 0 COMMENT '选课记录总数',
+    enrolled_count INT NOT NULL DEFAULT 0 COMMENT '已选课数',
+    waitlist_count INT NOT NULL DEFAULT 0 COMMENT '候补数',
+    dropped_count INT NOT NULL DEFAULT 0 COMMENT '退选数',
+    completed_count INT NOT NULL DEFAULT 0 COMMENT '已完成数',
+    failed_count INT NOT NULL DEFAULT 0 COMMENT '不及格数',
+    auditing_count INT NOT NULL DEFAULT 0 COMMENT '旁听数',
+    grade_count INT NOT NULL DEFAULT 0 COMMENT '成绩记录数',
+    scored_count INT NOT NULL DEFAULT 0 COMMENT '有分数的成绩数',
+    score_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '分数合计',
+    score_min DOUBLE NULL COMMENT '最低分',
+    score_max DOUBLE NULL COMMENT '最高分',
+    pass_count INT NOT NULL DEFAULT 0 COMMENT '及格成绩数',
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '刷新时间',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    UNIQUE KEY uq_department_semester_rollup (semester, department)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='院系学期汇总表';
+
 -- 消息表
 CREATE TABLE IF NOT EXISTS messages (
     id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
@@ -3,80 +3,31 @@
 简化的注册功能测试服务器
 """
 
+import os
+import sys
 import json
 import uuid
 import hashlib
-import random
 from datetime import datetime
 from flask import Flask, request, jsonify
-from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
-import base64
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from utils.captcha import (
+    CAPTCHA_KEY, LocalCaptchaStore, delete_captcha, generate_captcha_image, store_captcha, verify_captcha
+)
 
 app = Flask(__name__)
 
 # 模拟数据库
 users_db = {}
-captchas_db = {}
-
-def generate_captcha_image():
-    """生成验证码图片"""
-    # 生成验证码文本
-    characters = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    captcha_text = ''.join(random.choices(characters, k=4))
-    captcha_id = hashlib.md5(f"{captcha_text}_{random.random()}".encode()).hexdigest()
-
-    # 创建图片
-    width, height = 120, 40
-    image = Image.new('RGB', (width, height), color=(255, 255, 255))
-    draw = ImageDraw.Draw(image)
-
-    # 背景
-    for x in range(width):
-        for y in range(height):
-            draw.point((x, y), fill=(random.randint(220, 255),
-                                     random.randint(220, 255),
-                                     random.randint(220, 255)))
-
-    # 干扰线
-    for _ in range(5):
-        x1 = random.randint(0, width)
-        y1 = random.randint(0, height)
-        x2 = random.randint(0, width)
-        y2 = random.randint(0, height)
-        draw.line([(x1, y1), (x2, y2)], fill=(random.randint(0, 255),
-                                              random.randint(0, 255),
-                                              random.randint(0, 255)), width=1)
-
-    # 验证码文字
-    try:
-        font = ImageFont.truetype("arial.ttf", 20)
-    except:
-        font = ImageFont.load_default()
-
-    for i, char in enumerate(captcha_text):
-        x = 20 + i * 25 + random.randint(-3, 3)
-        y = 8 + random.randint(-3, 3)
-        color = (random.randint(0, 100), random.randint(0, 100), random.randint(0, 100))
-        draw.text((x, y), char, font=font, fill=color)
-
-    # 转换为base64
-    buffer = BytesIO()
-    image.save(buffer, format='PNG')
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
-
-    return {
-        'captcha_id': captcha_id,
-        'captcha_text': captcha_text,
-        'captcha_image': f"data:image/png;base64,{image_base64}"
-    }
+captchas_db = LocalCaptchaStore()
 
 @app.route('/auth/captcha', methods=['GET'])
 def get_captcha():
     """获取验证码"""
     try:
         captcha_data = generate_captcha_image()
-        captchas_db[captcha_data['captcha_id']] = captcha_data['captcha_text']
+        store_captcha(captcha_data, captchas_db)
         return jsonify({
             'success': True,
             'message': '验证码生成成功',
@@ -166,20 +117,20 @@ def register():
         captcha = data.get('captcha')
 
         # 验证验证码
-        if not captcha_id or captcha_id not in captchas_db:
+        if not captcha_id or captchas_db.get(CAPTCHA_KEY.format(captcha_id=captcha_id)) is None:
             return jsonify({
                 'success': False,
                 'message': '验证码ID无效'
             }), 400
 
-        if captcha.lower() != captchas_db[captcha_id].lower():
+        if not verify_captcha(captcha_id, captcha, captchas_db):
             return jsonify({
                 'success': False,
                 'message': '验证码错误'
             }), 400
 
         # 清除已使用的验证码
-        del captchas_db[captcha_id]
+        delete_captcha(captcha_id, captchas_db)
 
         # 检查必填字段
         required_fields = ['username', 'email', 'password', 'confirm_password', 'phone', 'real_name', 'student_id']